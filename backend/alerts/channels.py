@@ -0,0 +1,242 @@
+"""
+Channels - Canaux d'envoi des alertes (Telegram, Discord, SendGrid, webhook)
+
+Un canal reçoit un lot d'alertes et l'envoie en un seul message. Il lève
+AlertDeliveryError en cas d'échec, avec le délai demandé par le service
+(429) et l'indication qu'un nouvel essai a un sens; les retries et le
+débit sont gérés par AlertDispatcher. L'URL de chaque service est
+paramétrable (serveur local de test).
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+import asyncio
+import math
+import time
+
+import aiohttp
+
+
+class AlertDeliveryError(Exception):
+    """Échec d'envoi d'un message"""
+
+    def __init__(self, message: str, retryable: bool = True, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+@dataclass
+class Alert:
+    """Une recommandation TES à notifier"""
+    match_id: str
+    bet_type: str
+    confidence: str
+    probability: float
+    description: str
+    home_team: str = ""
+    away_team: str = ""
+    competition: str = ""
+    score: str = ""
+    minute: Optional[int] = None
+    strategy: Optional[str] = None
+    reasoning: List[str] = field(default_factory=list)
+    # Création (timestamp Unix) et mise en file (horloge monotone, latence d'envoi)
+    created_at: float = field(default_factory=time.time)
+    queued_at: float = field(default_factory=time.monotonic)
+
+    def to_dict(self) -> Dict:
+        return {
+            "match_id": self.match_id,
+            "home_team": self.home_team,
+            "away_team": self.away_team,
+            "competition": self.competition,
+            "score": self.score,
+            "minute": self.minute,
+            "bet_type": self.bet_type,
+            "strategy": self.strategy,
+            "confidence": self.confidence,
+            "probability": round(self.probability * 100, 1),
+            "description": self.description,
+            "reasoning": self.reasoning,
+            "created_at": self.created_at,
+        }
+
+
+def format_alert(alert: Alert) -> str:
+    """Texte d'une alerte (quelques lignes)"""
+    teams = " ".join(part for part in (alert.home_team, alert.score, alert.away_team) if part)
+    minute = f" ({alert.minute}')" if alert.minute is not None else ""
+    lines = [
+        f"⚽ {teams}{minute}",
+        f"🎯 {alert.description} - {alert.probability * 100:.0f}% ({alert.confidence})",
+    ]
+    lines.extend(f"  • {reason}" for reason in alert.reasoning[:3])
+    return "\n".join(lines)
+
+
+def format_batch(alerts: List[Alert], limit: int = 4000) -> str:
+    """Message d'un lot, tronqué à `limit` caractères"""
+    title = "🚨 ALERTE PARIS FOOTBALL" if len(alerts) == 1 else f"🚨 {len(alerts)} ALERTES PARIS FOOTBALL"
+    text = "\n\n".join([title] + [format_alert(alert) for alert in alerts])
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Délai d'un 429: secondes ou date HTTP (Retry-After), None si illisible"""
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+        return max(0.0, seconds) if math.isfinite(seconds) else None
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = parsedate_to_datetime(str(value))
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class AlertChannel(ABC):
+    """Canal d'alertes sur HTTP (une session aiohttp par canal)"""
+
+    name = "channel"
+
+    def __init__(self, rate: float = 1.0, burst: float = 3.0, max_batch: int = 10, timeout: float = 10.0):
+        """
+        Args:
+            rate: Messages par seconde autorisés par le service
+            burst: Messages envoyables d'un coup
+            max_batch: Alertes maximum par message
+            timeout: Délai maximum d'une requête
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_batch = max_batch
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=self.timeout)
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _post(self, url: str, payload: Dict, headers: Optional[Dict[str, str]] = None) -> Dict:
+        """POST JSON; lève AlertDeliveryError sur erreur réseau ou statut >= 400"""
+        await self.start()
+        try:
+            async with self._session.post(url, json=payload, headers=headers) as response:
+                try:
+                    body = await response.json(content_type=None)
+                except ValueError:
+                    body = None
+                body = body if isinstance(body, dict) else {}
+                if response.status == 429:
+                    retry_after = body.get('retry_after') or body.get('parameters', {}).get('retry_after') \
+                        or response.headers.get('Retry-After')
+                    raise AlertDeliveryError(f"{self.name}: HTTP 429", retry_after=parse_retry_after(retry_after))
+                if response.status >= 400:
+                    raise AlertDeliveryError(
+                        f"{self.name}: HTTP {response.status}",
+                        retryable=response.status >= 500
+                    )
+                return body
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise AlertDeliveryError(f"{self.name}: {type(e).__name__} {e}")
+
+    @abstractmethod
+    async def send(self, alerts: List[Alert]):
+        """Envoyer un lot d'alertes en un message"""
+
+
+class TelegramChannel(AlertChannel):
+    """Bot Telegram (sendMessage)"""
+
+    name = "telegram"
+
+    def __init__(self, token: str, chat_id: str, api_url: str = "https://api.telegram.org", **kwargs):
+        # Telegram: environ un message par seconde et par conversation
+        kwargs.setdefault('rate', 1.0)
+        super().__init__(**kwargs)
+        self.url = f"{api_url.rstrip('/')}/bot{token}/sendMessage"
+        self.chat_id = chat_id
+
+    async def send(self, alerts: List[Alert]):
+        await self._post(self.url, {
+            "chat_id": self.chat_id,
+            "text": format_batch(alerts, 4096),
+            "disable_web_page_preview": True,
+        })
+
+
+class DiscordChannel(AlertChannel):
+    """Webhook Discord"""
+
+    name = "discord"
+
+    def __init__(self, webhook_url: str, **kwargs):
+        # Discord: 30 messages par minute et par webhook
+        kwargs.setdefault('rate', 0.5)
+        kwargs.setdefault('burst', 5.0)
+        super().__init__(**kwargs)
+        self.url = webhook_url
+
+    async def send(self, alerts: List[Alert]):
+        await self._post(self.url, {"content": format_batch(alerts, 2000)})
+
+
+class SendGridChannel(AlertChannel):
+    """E-mail via l'API SendGrid (v3/mail/send)"""
+
+    name = "email"
+
+    def __init__(
+        self,
+        api_key: str,
+        to_email: str,
+        from_email: str,
+        api_url: str = "https://api.sendgrid.com",
+        **kwargs
+    ):
+        # Un e-mail regroupe plus d'alertes et part moins souvent
+        kwargs.setdefault('rate', 0.2)
+        kwargs.setdefault('max_batch', 25)
+        super().__init__(**kwargs)
+        self.url = f"{api_url.rstrip('/')}/v3/mail/send"
+        self.headers = {"Authorization": f"Bearer {api_key}"}
+        self.to_email = to_email
+        self.from_email = from_email
+
+    async def send(self, alerts: List[Alert]):
+        subject = alerts[0].description if len(alerts) == 1 else f"{len(alerts)} alertes paris football"
+        await self._post(self.url, {
+            "personalizations": [{"to": [{"email": self.to_email}]}],
+            "from": {"email": self.from_email},
+            "subject": subject,
+            "content": [{"type": "text/plain", "value": format_batch(alerts, 100_000)}],
+        }, self.headers)
+
+
+class WebhookChannel(AlertChannel):
+    """Webhook générique: {"alerts": [Alert.to_dict(), ...]}"""
+
+    name = "webhook"
+
+    def __init__(self, url: str, **kwargs):
+        kwargs.setdefault('rate', 5.0)
+        kwargs.setdefault('burst', 10.0)
+        super().__init__(**kwargs)
+        self.url = url
+
+    async def send(self, alerts: List[Alert]):
+        await self._post(self.url, {"alerts": [alert.to_dict() for alert in alerts]})
@@ -0,0 +1,260 @@
+"""
+Dispatcher - File d'envoi asynchrone des alertes TES
+
+`submit()` est appelé à chaque poll avec les recommandations du match et ne
+fait que filtrer puis empiler: la boucle de polling n'attend jamais un
+service externe.
+- filtre: niveau de confiance minimum (ALERT_MIN_CONFIDENCE)
+- déduplication: une seule alerte par (match, type de pari) sur la fenêtre
+- une file et une tâche par canal: les alertes arrivées pendant
+  `batch_window` partent dans le même message (au plus `max_batch` du
+  canal), au débit autorisé par le canal (token bucket), avec retries et
+  backoff propres au canal. Un canal lent ou en panne ne retarde pas les
+  autres
+- une alerte plus vieille que `max_age` n'est plus envoyée
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import asyncio
+import random
+import time
+
+from pipeline.cadence import TokenBucket
+from strategies.tes_engine import BetRecommendation, Confidence
+
+from .channels import Alert, AlertChannel, AlertDeliveryError
+
+# Du plus faible au plus fort (cf. Confidence)
+CONFIDENCE_ORDER = [
+    Confidence.VERY_LOW, Confidence.LOW, Confidence.MEDIUM, Confidence.HIGH, Confidence.VERY_HIGH
+]
+
+
+def parse_confidence(value: str) -> Confidence:
+    """"HIGH" / "high" -> Confidence.HIGH"""
+    try:
+        return Confidence[value.strip().upper()]
+    except KeyError:
+        raise ValueError(f"Niveau de confiance inconnu '{value}' ({', '.join(level.name for level in Confidence)})")
+
+
+class _ChannelWorker:
+    """File, limiteur de débit et compteurs d'un canal"""
+
+    def __init__(self, channel: AlertChannel, max_pending: int):
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self.bucket = TokenBucket(channel.rate, channel.burst)
+        self.task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.messages = 0
+        self.retries = 0
+        self.failures = 0
+        self.dropped = 0
+        self.expired = 0
+        self.max_latency = 0.0
+        self.last_error: Optional[str] = None
+
+    def stats(self) -> Dict:
+        return {
+            "pending": self.queue.qsize(),
+            "sent": self.sent,
+            "messages": self.messages,
+            "retries": self.retries,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "expired": self.expired,
+            # Délai max entre la recommandation et l'envoi de son message
+            "max_latency_s": round(self.max_latency, 2),
+            "last_error": self.last_error,
+        }
+
+
+class AlertDispatcher:
+    """Alertes TES vers les canaux configurés (cf. docstring du module)"""
+
+    def __init__(
+        self,
+        channels: Sequence[AlertChannel],
+        min_confidence: Confidence = Confidence.HIGH,
+        dedup_window: float = 600.0,
+        batch_window: float = 0.5,
+        max_age: float = 120.0,
+        max_pending: int = 1000,
+        retries: int = 3,
+        backoff_base: float = 1.0
+    ):
+        """
+        Args:
+            channels: Canaux d'envoi
+            min_confidence: Niveau minimum d'une recommandation pour alerter
+            dedup_window: Durée (s) pendant laquelle un même (match, type de pari) n'est plus alerté
+            batch_window: Attente (s) après la première alerte pour grouper les suivantes
+            max_age: Âge (s) au-delà duquel une alerte en file est abandonnée
+            max_pending: Alertes en file par canal (au-delà, les nouvelles sont ignorées)
+            retries, backoff_base: Nouveaux essais d'un message et backoff exponentiel
+        """
+        self.workers = [_ChannelWorker(channel, max_pending) for channel in channels]
+        self.min_rank = CONFIDENCE_ORDER.index(min_confidence)
+        self.dedup_window = dedup_window
+        self.batch_window = batch_window
+        self.max_age = max_age
+        self.retries = retries
+        self.backoff_base = backoff_base
+        # Dernière alerte par (match, type de pari), horloge monotone
+        self._last_alert: Dict[Tuple[str, str], float] = {}
+        self._next_prune = 0.0
+
+        self.submitted = 0
+        self.filtered = 0
+        self.duplicates = 0
+
+    def start(self):
+        for worker in self.workers:
+            if worker.task is None or worker.task.done():
+                worker.task = asyncio.create_task(self._run(worker))
+
+    async def close(self):
+        tasks = [worker.task for worker in self.workers if worker.task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for worker in self.workers:
+            worker.task = None
+            await worker.channel.close()
+
+    # Entrée
+
+    def submit(
+        self,
+        match: Dict,
+        recommendations: Iterable[BetRecommendation],
+        minute: Optional[int] = None
+    ) -> int:
+        """
+        Filtrer, dédoublonner et mettre en file les alertes d'un match (non bloquant)
+
+        Returns:
+            Nombre d'alertes mises en file
+        """
+        now = time.monotonic()
+        if now >= self._next_prune:
+            self._prune(now)
+        queued = 0
+        for rec in recommendations:
+            self.submitted += 1
+            if CONFIDENCE_ORDER.index(rec.confidence) < self.min_rank:
+                self.filtered += 1
+                continue
+            key = (match['id'], rec.bet_type.value)
+            last = self._last_alert.get(key)
+            if last is not None and now - last < self.dedup_window:
+                self.duplicates += 1
+                continue
+
+            alert = Alert(
+                match_id=match['id'],
+                bet_type=rec.bet_type.value,
+                confidence=rec.confidence.value,
+                probability=rec.probability,
+                description=rec.description,
+                home_team=match.get('home_team', ''),
+                away_team=match.get('away_team', ''),
+                competition=match.get('competition', ''),
+                score=match.get('score', ''),
+                minute=minute,
+                strategy=rec.strategy,
+                reasoning=list(rec.reasoning),
+                queued_at=now
+            )
+            accepted = False
+            for worker in self.workers:
+                try:
+                    worker.queue.put_nowait(alert)
+                    accepted = True
+                except asyncio.QueueFull:
+                    worker.dropped += 1
+            # Une alerte refusée par toutes les files pourra être reproposée
+            if accepted:
+                self._last_alert[key] = now
+                queued += 1
+        return queued
+
+    def _prune(self, now: float):
+        limit = now - self.dedup_window
+        self._last_alert = {key: at for key, at in self._last_alert.items() if at >= limit}
+        self._next_prune = now + self.dedup_window
+
+    # Envoi
+
+    async def _run(self, worker: _ChannelWorker):
+        channel = worker.channel
+        while True:
+            batch = [await worker.queue.get()]
+            # Grouper les alertes qui arrivent juste après la première
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < channel.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(worker.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            while len(batch) < channel.max_batch and not worker.queue.empty():
+                batch.append(worker.queue.get_nowait())
+
+            while not worker.bucket.take(1):
+                await asyncio.sleep(worker.bucket.time_until_available())
+            try:
+                await self._deliver(worker, batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                worker.last_error = f"{type(e).__name__}: {e}"
+                worker.failures += 1
+                print(f"Erreur du canal d'alertes {channel.name}: {worker.last_error}")
+
+    async def _deliver(self, worker: _ChannelWorker, batch: List[Alert]):
+        now = time.monotonic()
+        fresh = [alert for alert in batch if now - alert.queued_at <= self.max_age]
+        worker.expired += len(batch) - len(fresh)
+        if not fresh:
+            return
+
+        for attempt in range(self.retries + 1):
+            try:
+                await worker.channel.send(fresh)
+            except AlertDeliveryError as e:
+                worker.last_error = str(e)
+                if not e.retryable or attempt == self.retries:
+                    worker.failures += 1
+                    print(f"Erreur d'envoi des alertes ({worker.channel.name}, {len(fresh)} alertes): {e}")
+                    return
+                worker.retries += 1
+                delay = e.retry_after if e.retry_after is not None \
+                    else random.uniform(0, self.backoff_base * 2 ** attempt)
+                await asyncio.sleep(delay)
+                continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Bug ou réponse inattendue: le lot est perdu, pas la tâche du canal
+                worker.last_error = f"{type(e).__name__}: {e}"
+                worker.failures += 1
+                print(f"Erreur d'envoi des alertes ({worker.channel.name}, {len(fresh)} alertes): {worker.last_error}")
+                return
+
+            worker.messages += 1
+            worker.sent += len(fresh)
+            latency = time.monotonic() - min(alert.queued_at for alert in fresh)
+            worker.max_latency = max(worker.max_latency, latency)
+            return
+
+    def stats(self) -> Dict:
+        return {
+            "submitted": self.submitted,
+            "filtered": self.filtered,
+            "duplicates": self.duplicates,
+            "channels": {worker.channel.name: worker.stats() for worker in self.workers},
+        }
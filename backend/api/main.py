@@ -4,7 +4,9 @@ API FastAPI - Point d'entrée principal
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Dict
+from fastapi.responses import PlainTextResponse
+from contextlib import asynccontextmanager
+from typing import List, Dict, Optional
 import asyncio
 import json
 from datetime import datetime
@@ -13,13 +15,166 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from config import settings
+from alerts.channels import AlertChannel, DiscordChannel, SendGridChannel, TelegramChannel, WebhookChannel
+from alerts.dispatcher import AlertDispatcher, parse_confidence
+from metrics.profiler import SamplingProfiler
+from metrics.registry import REGISTRY, counter, gauge
+from scrapers.aggregator import AggregatorScraper
+from scrapers.base_scraper import BaseScraper
+from scrapers.browser_pool import BrowserPool
+from scrapers.fake_scraper import FakeScraper
 from scrapers.sofascore_scraper import SofascoreScraper
+from scrapers.cache import CachingTransport, MemoryCacheBackend, RedisCacheBackend
+from scrapers.metered import MeteredTransport
+from scrapers.resilience import ResilientTransport, RetryBudget
+from scrapers.transports import FallbackTransport, HttpTransport, PlaywrightTransport
 from strategies.tes_engine import TESEngine, BetRecommendation
+from pipeline.cadence import CadencePolicy
+from pipeline.clock import match_minute
+from pipeline.broadcaster import Broadcaster
+from pipeline.pubsub import PubSub
+from pipeline.scheduler import IngestionScheduler, recommendation_to_dict
+from pipeline.topics import topics_from_filters, topics_from_query
+from storage.history import HistoryStore
+
+# Pool de navigateurs partagé (démarré dans le lifespan)
+browser_pool = BrowserPool(
+    size=settings.browser_pool_size,
+    browsers=settings.browser_count,
+    headless=settings.headless_browser,
+    acquire_timeout=settings.browser_acquire_timeout,
+    max_page_uses=settings.browser_max_page_uses,
+    max_lease_time=settings.browser_max_lease_time
+)
+
+use_browser = settings.scraper_transport == "browser" or settings.browser_fallback
+
+# Transport partagé par tous les scrapers (HTTP keep-alive, navigateur en repli)
+http_upstream: Optional[FallbackTransport] = None
+if settings.scraper_transport == "browser":
+    upstream = PlaywrightTransport(pool=browser_pool)
+else:
+    upstream = http_upstream = FallbackTransport(
+        HttpTransport(
+            limit=settings.http_pool_limit,
+            limit_per_host=settings.http_limit_per_host,
+            timeout=settings.http_timeout,
+            # Avec la couche de résilience, les retries passent par son budget global
+            retries=0 if settings.resilience_enabled else settings.http_retries
+        ),
+        PlaywrightTransport(pool=browser_pool) if settings.browser_fallback else None
+    )
+
+# Latence de chaque requête upstream réelle, par endpoint (/metrics)
+upstream = MeteredTransport(upstream)
+
+# Délais, requêtes doublées, budget de retries et disjoncteurs (sous le cache)
+resilient = ResilientTransport(
+    upstream,
+    deadline=settings.upstream_deadline,
+    retries=settings.http_retries,
+    budget=RetryBudget(ratio=settings.retry_budget_ratio),
+    hedge_min_delay=settings.hedge_min_delay,
+    failure_threshold=settings.breaker_failure_threshold,
+    reset_timeout=settings.breaker_reset_timeout
+) if settings.resilience_enabled else None
+if resilient:
+    upstream = resilient
+
+# Cache des réponses upstream (TTL par endpoint, requêtes concurrentes fusionnées)
+if settings.cache_backend == "none":
+    transport = upstream
+else:
+    if settings.cache_backend == "redis":
+        cache_backend = RedisCacheBackend(settings.redis_url)
+    else:
+        cache_backend = MemoryCacheBackend(
+            max_entries=settings.cache_max_entries,
+            max_bytes=settings.cache_max_mb * 1024 * 1024
+        )
+    transport = CachingTransport(
+        upstream,
+        cache_backend,
+        ttls=[
+            (r"/events/live$", settings.cache_ttl_live),
+            (r"/event/\d+/statistics$", settings.cache_ttl_stats),
+            (r"/event/\d+$", settings.cache_ttl_live),
+        ]
+    )
+
+# Fournisseurs de matchs (SCRAPER_PROVIDERS)
+PROVIDERS = {
+    "sofascore": lambda: SofascoreScraper(transport=transport, api_url=settings.sofascore_api_url),
+    "fake": lambda: FakeScraper(),
+}
+unknown_providers = [name for name in settings.scraper_provider_list if name not in PROVIDERS]
+if unknown_providers or not settings.scraper_provider_list:
+    raise ValueError(f"SCRAPER_PROVIDERS invalide: {settings.scraper_providers!r} (connus: {', '.join(PROVIDERS)})")
+
+# Une seule instance, sans ressource propre (transport partagé): l'index des
+# matchs et la santé des sources de l'agrégateur servent à toutes les routes
+providers = [PROVIDERS[name]() for name in settings.scraper_provider_list]
+aggregator = AggregatorScraper(
+    providers,
+    discovery_timeout=settings.aggregator_discovery_timeout,
+    hedge_delay=settings.aggregator_hedge_delay,
+    refresh_after=settings.aggregator_refresh_after
+) if len(providers) > 1 else None
+scraper: BaseScraper = aggregator or providers[0]
+
+
+def make_scraper() -> BaseScraper:
+    return scraper
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Démarrage / arrêt des ressources partagées"""
+    if use_browser:
+        try:
+            await browser_pool.start()
+        except Exception as e:
+            if settings.scraper_transport == "browser":
+                raise
+            # Sans pool, une réponse bloquée doit rester une erreur HTTP
+            http_upstream.fallback = None
+            print(f"Pool de navigateurs indisponible, repli navigateur désactivé: {e}")
+    await transport.start()
+    if history:
+        await history.start()
+    if alerts:
+        alerts.start()
+    manager.start(pubsub)
+    if profiler:
+        # Thread courant = celui de la boucle (scheduler, TES, fan-out)
+        profiler.start()
+    scheduler.start()
+    rules_watcher = None
+    if settings.strategy_reload_interval > 0:
+        rules_watcher = asyncio.create_task(tes_engine.watch_rules(settings.strategy_reload_interval))
+    try:
+        yield
+    finally:
+        if rules_watcher:
+            rules_watcher.cancel()
+        await scheduler.stop()
+        if profiler:
+            profiler.stop()
+        if history:
+            await history.close()
+        if alerts:
+            await alerts.close()
+        await manager.stop()
+        await transport.close()
+        await browser_pool.close()
+
 
 app = FastAPI(
     title="Football AI Agent API",
     description="API d'analyse en temps réel de matchs de football",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS
@@ -32,32 +187,128 @@ app.add_middleware(
 )
 
 # Instances globales
-tes_engine = TESEngine()
-active_connections: List[WebSocket] = []
-
-
-class ConnectionManager:
-    """Gestionnaire de connexions WebSocket"""
-
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+tes_engine = TESEngine(
+    settings.strategy_rules_path or None,
+    calibration_path=settings.calibration_path or None
+)
+pubsub = PubSub()
+history = HistoryStore(
+    settings.history_db_path,
+    batch_size=settings.history_batch_size,
+    flush_interval=settings.history_flush_interval
+) if settings.history_db_path else None
+
+
+def alert_channels() -> List[AlertChannel]:
+    """Canaux d'alerte configurés dans l'environnement"""
+    channels: List[AlertChannel] = []
+    if settings.telegram_bot_token and settings.telegram_chat_id:
+        channels.append(TelegramChannel(
+            settings.telegram_bot_token, settings.telegram_chat_id, api_url=settings.telegram_api_url
+        ))
+    if settings.discord_webhook_url:
+        channels.append(DiscordChannel(settings.discord_webhook_url))
+    if settings.sendgrid_api_key and settings.alert_email:
+        channels.append(SendGridChannel(
+            settings.sendgrid_api_key, settings.alert_email, settings.alert_from_email,
+            api_url=settings.sendgrid_api_url
+        ))
+    if settings.alert_webhook_url:
+        channels.append(WebhookChannel(settings.alert_webhook_url))
+    return channels
+
+
+channels = alert_channels()
+alerts = AlertDispatcher(
+    channels,
+    min_confidence=parse_confidence(settings.alert_min_confidence),
+    dedup_window=settings.alert_dedup_window,
+    batch_window=settings.alert_batch_window,
+    max_age=settings.alert_max_age
+) if channels else None
+scheduler = IngestionScheduler(
+    scraper_factory=make_scraper,
+    tes_engine=tes_engine,
+    pubsub=pubsub,
+    interval=settings.scrape_interval,
+    max_live_matches=settings.max_live_matches,
+    max_concurrency=settings.max_concurrent_matches,
+    stats_timeout=settings.stats_timeout,
+    cadence=CadencePolicy(
+        tes_engine.thresholds,
+        min_interval=settings.poll_interval_min,
+        max_interval=settings.poll_interval_max
+    ),
+    request_budget=settings.request_budget_per_second,
+    competitions=settings.live_competition_list,
+    history=history,
+    alerts=alerts
+)
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                pass
 
+manager = Broadcaster(
+    max_pending=settings.ws_max_pending,
+    max_lag=settings.ws_max_lag,
+    send_timeout=settings.ws_send_timeout
+)
 
-manager = ConnectionManager()
+profiler = SamplingProfiler(settings.profiler_interval) if settings.profiler_enabled else None
+
+
+def register_metrics():
+    """Métriques lues à l'export dans les compteurs que tient déjà chaque composant"""
+    gauge("browser_pool_pages", "Pages du pool par état", ("state",), lambda: {
+        (state,): value for state, value in browser_pool.stats().items() if state in ("in_use", "idle", "waiting")
+    })
+    gauge("browser_pool_utilization", "Part des pages du pool empruntées",
+          collect=lambda: browser_pool.stats()["in_use"] / browser_pool.size)
+    counter("browser_pool_recycled_total", "Pages recyclées", collect=lambda: browser_pool.recycled)
+    counter("browser_pool_recycle_failures_total", "Pages impossibles à recréer",
+            collect=lambda: browser_pool.recycle_failures)
+    counter("browser_pool_timeouts_total", "Attentes de page abandonnées", collect=lambda: browser_pool.timeouts)
+
+    if isinstance(transport, CachingTransport):
+        counter("cache_lookups_total", "Lectures du cache upstream par résultat", ("result",), lambda: {
+            (result,): value for result, value in transport.stats().items() if result != "hit_rate"
+        })
+        gauge("cache_hit_ratio", "Part des lectures servies sans aller-retour upstream",
+              collect=lambda: transport.stats()["hit_rate"])
+    if resilient:
+        gauge("upstream_circuit_open", "Disjoncteur ouvert (1) par endpoint", ("endpoint",), lambda: {
+            (name,): float(endpoint["state"] != "closed")
+            for name, endpoint in resilient.stats()["endpoints"].items()
+        })
+        counter("upstream_retries_denied_total", "Retries refusés par le budget",
+                collect=lambda: resilient.budget.denied)
+
+    gauge("websocket_connections", "Clients WebSocket connectés", collect=lambda: len(manager.connections))
+    gauge("websocket_queue_depth", "Messages en attente dans les files clients", ("stat",), lambda: {
+        (stat[len("queue_depth_"):],): value for stat, value in manager.stats().items() if stat.startswith("queue_depth_")
+    })
+    counter("websocket_messages_total", "Messages WebSocket par issue", ("result",), lambda: {
+        (stat[len("messages_"):],): value for stat, value in manager.stats().items() if stat.startswith("messages_")
+    })
+    counter("websocket_evicted_total", "Clients évincés car trop en retard", collect=lambda: manager.evicted)
+
+    gauge("scheduler_matches", "Matchs suivis (live) et programmés (queued)", ("state",), lambda: {
+        ("live",): len(scheduler.matches),
+        ("queued",): scheduler.queue_size(),
+    })
+    counter("scheduler_polls_total", "Polls de stats publiés", collect=lambda: scheduler.polls)
+    counter("tes_evaluations_total", "Stratégies TES évaluées ou reprises du mémo", ("result",), lambda: {
+        ("evaluated",): tes_engine.evaluations,
+        ("reused",): tes_engine.reused,
+    })
+    if alerts:
+        gauge("alerts_pending", "Alertes en attente par canal", ("channel",), lambda: {
+            (worker.channel.name,): worker.queue.qsize() for worker in alerts.workers
+        })
+        counter("alerts_sent_total", "Alertes envoyées par canal", ("channel",), lambda: {
+            (worker.channel.name,): worker.sent for worker in alerts.workers
+        })
+
+
+register_metrics()
 
 
 @app.get("/")
@@ -76,16 +327,96 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "active_connections": len(manager.active_connections)
+        "active_connections": len(manager.connections),
+        "websocket": manager.stats(),
+        "scheduler": {
+            "cycles": scheduler.cycles,
+            "polls": scheduler.polls,
+            "queued_matches": scheduler.queue_size(),
+            "last_cycle_at": scheduler.last_cycle_at.isoformat() if scheduler.last_cycle_at else None,
+            "live_matches": len(scheduler.latest),
+            "trends": len(scheduler.trends)
+        },
+        "history": history.stats() if history else None,
+        "rules": {
+            "path": tes_engine.rules_path,
+            "strategies": [strategy.id for strategy in tes_engine.rules.strategies],
+            "reloads": tes_engine.reloads,
+            "memo": tes_engine.memo_stats()
+        },
+        "calibration": tes_engine.calibration_stats(),
+        "browser_pool": browser_pool.stats(),
+        "cache": transport.stats() if isinstance(transport, CachingTransport) else None,
+        "resilience": resilient.stats() if resilient else None,
+        "alerts": alerts.stats() if alerts else None,
+        "providers": aggregator.stats() if aggregator else None
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Métriques au format texte Prometheus"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/api/metrics")
+async def metrics_json():
+    """Métriques en JSON: valeurs, et effectif / moyenne / p50 / p95 / p99 des histogrammes (secondes)"""
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "metrics": REGISTRY.to_dict(),
+        "slowest_matches": manager.slowest_matches(),
+        "profiler": profiler.stats() if profiler else None
+    }
+
+
+@app.get("/api/metrics/profile")
+async def metrics_profile(
+    format: str = "json",
+    limit: int = 30,
+    focus: Optional[str] = None,
+    seconds: Optional[float] = None
+):
+    """
+    Résultats du profileur par échantillonnage (PROFILER_ENABLED)
+
+    Args:
+        format: "json" (fonctions les plus coûteuses) ou "collapsed" (piles
+            repliées pour flamegraph.pl / speedscope)
+        limit: Nombre de fonctions (json)
+        focus: Ne garder que les piles passant par une fonction dont le nom
+            contient ce texte ("scheduler.py", "tes_engine.py:analyze_batch")
+        seconds: Repartir de zéro et échantillonner pendant ce délai avant de répondre
+    """
+    if profiler is None:
+        return {"success": False, "error": "Profileur désactivé (PROFILER_ENABLED)"}
+    if seconds:
+        profiler.reset()
+        await asyncio.sleep(min(seconds, 300))
+    if format == "collapsed":
+        return PlainTextResponse(profiler.collapsed(focus))
+    return {
+        "success": True,
+        **profiler.stats(),
+        "top": profiler.top(limit, focus)
     }
 
 
 @app.get("/api/live-matches")
-async def get_live_matches():
-    """Récupérer tous les matchs en cours"""
+async def get_live_matches(competition: Optional[str] = None, status: Optional[str] = None):
+    """
+    Récupérer les matchs en cours
+
+    Args:
+        competition: Compétitions à garder, séparées par des virgules
+        status: Statuts à garder ("1st half", "inprogress"...), idem
+    """
     try:
-        async with SofascoreScraper(headless=True) as scraper:
-            matches = await scraper.get_live_matches()
+        async with make_scraper() as scraper:
+            matches = await scraper.get_live_matches(
+                competition.split(",") if competition else None,
+                status.split(",") if status else None
+            )
             return {
                 "success": True,
                 "count": len(matches),
@@ -104,12 +435,12 @@ async def get_live_matches():
 async def get_match_stats(match_id: str):
     """Récupérer les stats d'un match spécifique"""
     try:
-        async with SofascoreScraper(headless=True) as scraper:
+        async with make_scraper() as scraper:
             stats = await scraper.get_match_stats(match_id)
             return {
                 "success": True,
                 "match_id": match_id,
-                "stats": stats,
+                "stats": stats.to_dict(),
                 "timestamp": datetime.now().isoformat()
             }
     except Exception as e:
@@ -121,32 +452,31 @@ async def get_match_stats(match_id: str):
 
 
 @app.get("/api/match/{match_id}/analysis")
-async def get_match_analysis(match_id: str, time_elapsed: int = 60):
+async def get_match_analysis(match_id: str, time_elapsed: Optional[int] = None):
     """
     Analyser un match et obtenir les recommandations TES
 
     Args:
         match_id: ID du match
-        time_elapsed: Temps écoulé en minutes
+        time_elapsed: Minute de jeu à forcer; par défaut l'horloge du match
+            (suivi par le scheduler, sinon lue depuis `event/{id}`)
     """
     try:
-        async with SofascoreScraper(headless=True) as scraper:
+        async with make_scraper() as scraper:
             stats = await scraper.get_match_stats(match_id)
 
+            if time_elapsed is None:
+                time_elapsed = scheduler.clock.minute(match_id)
+                if time_elapsed is None and match_id not in scheduler.matches:
+                    match = await scraper.get_match(match_id)
+                    time_elapsed = match_minute(match) if match else None
+
             # Analyser avec TES Engine
-            recommendations = tes_engine.analyze_match(stats, time_elapsed)
+            recommendations = tes_engine.analyze_match(stats, time_elapsed, scheduler.trends.get(match_id))
 
             # Convertir en dict pour le JSON
             recommendations_dict = [
-                {
-                    "bet_type": rec.bet_type.value,
-                    "description": rec.description,
-                    "confidence": rec.confidence.value,
-                    "probability": round(rec.probability * 100, 1),
-                    "reasoning": rec.reasoning,
-                    "current_stats": rec.current_stats,
-                    "threshold_reached": rec.threshold_reached
-                }
+                recommendation_to_dict(rec, detailed=True)
                 for rec in recommendations
             ]
 
@@ -155,7 +485,7 @@ async def get_match_analysis(match_id: str, time_elapsed: int = 60):
                 "match_id": match_id,
                 "time_elapsed": time_elapsed,
                 "recommendations": recommendations_dict,
-                "stats": stats,
+                "stats": stats.to_dict(),
                 "timestamp": datetime.now().isoformat()
             }
     except Exception as e:
@@ -166,63 +496,106 @@ async def get_match_analysis(match_id: str, time_elapsed: int = 60):
         }
 
 
+@app.get("/api/match/{match_id}/trends")
+async def get_match_trends(match_id: str):
+    """Rythmes récents (par 10 min) et momentum d'un match suivi par le scheduler"""
+    trend = scheduler.trends.get(match_id)
+    if trend is None:
+        return {"success": False, "error": "Match non suivi", "trends": None}
+    return {
+        "success": True,
+        "match_id": match_id,
+        "windows": list(trend.windows),
+        "trends": trend.to_dict(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.get("/api/match/{match_id}/history")
+async def get_match_history(
+    match_id: str,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    limit: Optional[int] = None
+):
+    """
+    Historique enregistré d'un match (polls et recommandations)
+
+    Args:
+        since: Timestamp Unix de début (inclus)
+        until: Timestamp Unix de fin (exclu)
+        limit: Nombre maximum de polls
+    """
+    if history is None:
+        return {"success": False, "error": "Historique désactivé (HISTORY_DB_PATH)", "snapshots": []}
+    try:
+        points = await history.fetch_stats(match_id, since, until, limit)
+        recommendations = await history.fetch_recommendations(match_id, since, until)
+        return {
+            "success": True,
+            "match_id": match_id,
+            "count": len(points),
+            "snapshots": [
+                {
+                    "ts": point.ts,
+                    "minute": point.minute,
+                    "score": point.score,
+                    "status": point.status,
+                    "stats": point.stats.to_dict()
+                }
+                for point in points
+            ],
+            "recommendations": recommendations
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "snapshots": []
+        }
+
+
 @app.websocket("/ws/live-feed")
 async def websocket_live_feed(websocket: WebSocket):
     """
     WebSocket pour le flux en temps réel
-    Envoie les mises à jour des matchs toutes les 30 secondes
+
+    Le client reçoit d'abord un snapshot complet (`match_update`) de chaque
+    match, puis uniquement des `match_delta` numérotés par `seq`. En cas de
+    trou dans la séquence, il envoie `{"type": "resync", "match_ids": [...]}`
+    pour recevoir à nouveau les snapshots complets.
+
+    Abonnements: sans filtre le client reçoit tous les matchs. Il peut se
+    restreindre dès la connexion (`?matches=1,2&bet_types=corner`) ou via
+    `{"type": "subscribe" | "unsubscribe", "matches": [...],
+    "competitions": [...], "bet_types": [...], "confidences": [...]}`.
+    Les filtres se cumulent; un match qui sort des filtres est signalé par
+    `match_removed`.
     """
-    await manager.connect(websocket)
+    connection = await manager.connect(
+        websocket,
+        scheduler.latest.values(),
+        topics_from_query(websocket.query_params)
+    )
 
     try:
-        # Boucle de mise à jour en temps réel
         while True:
             try:
-                # Récupérer les matchs live
-                async with SofascoreScraper(headless=True) as scraper:
-                    matches = await scraper.get_live_matches()
-
-                    # Pour chaque match, obtenir les stats et l'analyse
-                    for match in matches[:5]:  # Limiter à 5 matchs pour la démo
-                        match_id = match['id']
-
-                        # Récupérer les stats
-                        stats = await scraper.get_match_stats(match_id)
-
-                        # Analyser avec TES (supposons 60 min de jeu)
-                        recommendations = tes_engine.analyze_match(stats, 60)
-
-                        # Préparer le message
-                        message = {
-                            "type": "match_update",
-                            "match": match,
-                            "stats": stats,
-                            "recommendations": [
-                                {
-                                    "bet_type": rec.bet_type.value,
-                                    "description": rec.description,
-                                    "confidence": rec.confidence.value,
-                                    "probability": round(rec.probability * 100, 1),
-                                    "reasoning": rec.reasoning
-                                }
-                                for rec in recommendations
-                            ],
-                            "timestamp": datetime.now().isoformat()
-                        }
-
-                        # Envoyer à tous les clients connectés
-                        await manager.broadcast(message)
-
-                # Attendre 30 secondes avant la prochaine mise à jour
-                await asyncio.sleep(30)
-
-            except Exception as e:
-                print(f"Erreur dans la boucle WebSocket: {e}")
-                await asyncio.sleep(5)
-
-    except WebSocketDisconnect:
-        manager.disconnect(websocket)
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                continue
+            if not isinstance(message, dict):
+                continue
+            if message.get("type") == "resync":
+                connection.resync(scheduler.latest.values(), message.get("match_ids"))
+            elif message.get("type") == "subscribe":
+                manager.subscribe(connection, topics_from_filters(message), scheduler.latest.values())
+            elif message.get("type") == "unsubscribe":
+                manager.unsubscribe(connection, topics_from_filters(message), scheduler.latest.values())
+    except (WebSocketDisconnect, RuntimeError):
         print("Client déconnecté")
+    finally:
+        await manager.disconnect(connection)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,143 @@
+"""
+Ajustement de la calibration des stratégies TES
+
+Rejoue l'historique sans calibration, puis ajuste pour chaque stratégie un
+modèle qui transforme le score de la règle en probabilité de gain
+(cf. strategies.calibration). Les matchs sont séparés en apprentissage et
+validation: le score de Brier avant / après est mesuré sur la validation et
+enregistré avec le modèle. Une nouvelle version v<N+1>.json est écrite dans
+--out; le backend la charge à chaud (CALIBRATION_PATH).
+
+Usage (depuis backend/):
+    python -m backtest.calibrate --history data/history.db --since 2025-01-01
+    python -m backtest.calibrate --synthetic 3000 --kind isotonic --dry-run
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from strategies.calibration import (
+    ISOTONIC, LOGISTIC, CalibrationModel, brier, fit_isotonic, fit_logistic, save_calibration
+)
+from strategies.rules import CompiledStrategy, load_rules
+
+from backtest.replay import HORIZON, Bet, replay
+from backtest.run import add_source_arguments, load_timelines
+
+
+def split_matches(match_ids: Sequence[str], holdout: float, seed: int = 0) -> set:
+    """Matchs de validation: une fraction `holdout`, tirée par match (pas par pari)"""
+    unique = sorted(set(match_ids))
+    random.Random(seed).shuffle(unique)
+    return set(unique[:int(round(len(unique) * holdout))])
+
+
+def fit_strategy(
+    strategy: CompiledStrategy,
+    bets: List[Bet],
+    validation: set,
+    kind: str = LOGISTIC,
+    l2: float = 1.0
+) -> Optional[CalibrationModel]:
+    """
+    Ajuster le modèle d'une stratégie sur ses paris tranchés
+
+    Returns:
+        None si un des ensembles ne contient qu'une seule issue
+    """
+    features = np.array([bet.features for bet in bets], dtype=float)
+    won = np.array([bool(bet.won) for bet in bets], dtype=float)
+    held = np.array([bet.match_id in validation for bet in bets], dtype=bool)
+    train = ~held if held.any() else np.ones(len(bets), dtype=bool)
+    test = held if held.any() else train
+    if won[train].min() == won[train].max():
+        return None
+
+    model = CalibrationModel(strategy=strategy.id, kind=kind, fingerprint=strategy.fingerprint)
+    if kind == ISOTONIC:
+        fitted = fit_isotonic(features[train, 0], won[train])
+        model.x, model.y = fitted["x"], fitted["y"]
+    else:
+        fitted = fit_logistic(features[train], won[train], l2=l2)
+        model.features = strategy.feature_names
+        model.mean, model.scale = fitted["mean"], fitted["scale"]
+        model.coef, model.intercept = fitted["coef"], fitted["intercept"]
+
+    model.metrics = {
+        "train": int(train.sum()),
+        "validation": int(test.sum()) if held.any() else 0,
+        "base_rate": round(float(won[test].mean()), 4),
+        "brier_raw": round(brier(features[test, 0], won[test]), 4),
+        "brier": round(brier(model.score_many(features[test]), won[test]), 4),
+    }
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_source_arguments(parser)
+    parser.add_argument("--rules", help="fichier de règles (défaut: strategies/tes_rules.json)")
+    parser.add_argument("--horizon", type=int, default=HORIZON, help="horizon des paris en minutes")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processus")
+    parser.add_argument("--kind", choices=(LOGISTIC, ISOTONIC), default=LOGISTIC, help="modèle")
+    parser.add_argument("--l2", type=float, default=1.0, help="régularisation (logistique)")
+    parser.add_argument("--holdout", type=float, default=0.2, help="part des matchs gardés pour la validation")
+    parser.add_argument("--min-samples", type=int, default=200, help="paris tranchés minimum par stratégie")
+    parser.add_argument("--out", default="data/calibration", help="dossier des versions")
+    parser.add_argument("--dry-run", action="store_true", help="mesurer sans écrire de version")
+    args = parser.parse_args()
+
+    rules = load_rules(args.rules)
+    timelines = load_timelines(args)
+    if not timelines:
+        print("Aucun match à rejouer")
+        return
+
+    started = time.perf_counter()
+    bets = [bet for bet in replay(timelines, rules, args.horizon, args.workers) if bet.won is not None]
+    print(f"{len(timelines)} matchs rejoués en {time.perf_counter() - started:.1f}s, {len(bets)} paris tranchés\n")
+
+    validation = split_matches([timeline.match_id for timeline in timelines], args.holdout, args.seed)
+    by_strategy: Dict[str, List[Bet]] = {}
+    for bet in bets:
+        by_strategy.setdefault(bet.strategy, []).append(bet)
+
+    models: Dict[str, CalibrationModel] = {}
+    print(f"{'':<30} {'paris':>6} {'réussi':>7} {'Brier brut':>10} {'calibré':>8}")
+    for strategy in rules.strategies:
+        strategy_bets = by_strategy.get(strategy.id, [])
+        if len(strategy_bets) < args.min_samples:
+            print(f"{strategy.id:<30} {len(strategy_bets):>6}  ignorée (moins de {args.min_samples} paris)")
+            continue
+        model = fit_strategy(strategy, strategy_bets, validation, args.kind, args.l2)
+        if model is None:
+            print(f"{strategy.id:<30} {len(strategy_bets):>6}  ignorée (une seule issue observée)")
+            continue
+        metrics = model.metrics
+        models[strategy.id] = model
+        print(
+            f"{strategy.id:<30} {len(strategy_bets):>6} {metrics['base_rate'] * 100:6.1f}% "
+            f"{metrics['brier_raw']:>10.4f} {metrics['brier']:>8.4f}"
+        )
+
+    if not models:
+        print("\nAucun modèle ajusté")
+        return
+    if args.dry_run:
+        return
+    source = args.fixtures or args.history or f"synthetic:{args.synthetic}:{args.seed}"
+    path = save_calibration(args.out, models, source=f"{source} ({args.kind})")
+    print(f"\nCalibration écrite: {path}")
+
+
+if __name__ == "__main__":
+    main()
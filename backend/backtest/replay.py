@@ -0,0 +1,234 @@
+"""
+Replay - Rejouer des matchs enregistrés dans TESEngine et trancher les paris
+
+Chaque match est rejoué minute par minute (stats, minute, tendances) comme
+le ferait le scheduler. Une recommandation devient un pari à la première
+minute où elle apparaît; la même stratégie ne reparie sur ce match qu'une
+fois le pari tranché (après `horizon` minutes). Un pari est gagné si:
+- corner: au moins un corner dans les `horizon` minutes suivantes
+- card: au moins un carton (jaune ou rouge) dans l'horizon
+- goal: au moins un but dans l'horizon
+- both_teams_score: les deux équipes ont marqué à la fin du match
+
+Le rejeu n'utilise pas de calibration: les probabilités des paris sont les
+scores des règles bornés à [0, 1] (cf. backtest.calibrate).
+
+Les matchs sont répartis en tranches sur un pool de processus; chaque
+processus reçoit les matchs une seule fois (initializer) puis rejoue les
+tranches demandées pour chaque jeu de règles (balayage de seuils).
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import itertools
+import math
+
+from models.match_stats import MatchStats
+from strategies.rules import RuleSet
+from strategies.tes_engine import TESEngine
+from strategies.trends import TrendTracker
+
+from .timeline import MatchTimeline
+
+# Horizon par défaut des paris "dans les prochaines minutes"
+HORIZON = 10
+# Paris tranchés à la fin du match plutôt que sur l'horizon
+MATCH_BET_TYPES = {'both_teams_score'}
+
+
+@dataclass
+class Bet:
+    """Une recommandation rejouée et son issue"""
+    match_id: str
+    minute: int
+    strategy: str
+    bet_type: str
+    confidence: str
+    probability: float
+    won: Optional[bool]   # None: pas encore tranché (match incomplet, score inconnu)
+    # Score brut de la règle et ses features (ajustement de la calibration)
+    raw_probability: Optional[float] = None
+    features: Tuple = ()
+
+
+def _cards(stats: MatchStats) -> int:
+    return stats.total('yellow_cards') + stats.total('red_cards')
+
+
+def settle(timeline: MatchTimeline, index: int, bet_type: str, horizon: int = HORIZON) -> Optional[bool]:
+    """Issue d'un pari pris au snapshot `index` (minutes consécutives, cf. MatchTimeline)"""
+    if bet_type in MATCH_BET_TYPES:
+        final = timeline.final_score
+        return None if final is None else min(final) > 0
+
+    end = index + horizon
+    if end >= len(timeline):
+        if not timeline.finished:
+            return None
+        end = len(timeline) - 1
+
+    before, after = timeline.stats[index], timeline.stats[end]
+    if bet_type == 'corner':
+        return after.total('corners') > before.total('corners')
+    if bet_type == 'card':
+        return _cards(after) > _cards(before)
+    if bet_type == 'goal':
+        start_score, end_score = timeline.scores[index], timeline.scores[end]
+        if start_score is None or end_score is None:
+            return None
+        return sum(end_score) > sum(start_score)
+    return None
+
+
+def replay_timeline(engine: TESEngine, timeline: MatchTimeline, horizon: int = HORIZON) -> List[Bet]:
+    """Rejouer un match et trancher chaque pari"""
+    trends = TrendTracker()
+    match_id = timeline.match_id
+    # Minute à partir de laquelle chaque stratégie peut reparier
+    next_bet: Dict[str, float] = {}
+    bets = []
+    try:
+        for index, (minute, ts, stats) in enumerate(zip(timeline.minutes, timeline.timestamps, timeline.stats)):
+            trend = trends.update(match_id, stats, ts)
+            for rec in engine.analyze_match(stats, minute, trend, match_id):
+                if minute < next_bet.get(rec.strategy, -1):
+                    continue
+                bet_type = rec.bet_type.value
+                next_bet[rec.strategy] = math.inf if bet_type in MATCH_BET_TYPES else minute + horizon
+                bets.append(Bet(
+                    match_id=match_id,
+                    minute=minute,
+                    strategy=rec.strategy,
+                    bet_type=bet_type,
+                    confidence=rec.confidence.value,
+                    probability=rec.probability,
+                    won=settle(timeline, index, bet_type, horizon),
+                    raw_probability=rec.raw_probability,
+                    features=rec.features
+                ))
+    finally:
+        engine.forget(match_id)
+    return bets
+
+
+# Pool de processus
+
+_worker_timelines: List[MatchTimeline] = []
+_worker_specs: List[Dict] = []
+_worker_horizon = HORIZON
+_worker_engines: Dict[int, TESEngine] = {}
+
+
+def _init_worker(timelines: List[MatchTimeline], specs: List[Dict], horizon: int):
+    global _worker_timelines, _worker_specs, _worker_horizon
+    _worker_timelines, _worker_specs, _worker_horizon = timelines, specs, horizon
+    _worker_engines.clear()
+
+
+def _replay_shard(spec_index: int, start: int, stop: int) -> Tuple[int, int, List[Bet]]:
+    engine = _worker_engines.get(spec_index)
+    if engine is None:
+        engine = _worker_engines[spec_index] = TESEngine(rules=RuleSet(_worker_specs[spec_index]))
+    bets = []
+    for timeline in _worker_timelines[start:stop]:
+        bets.extend(replay_timeline(engine, timeline, _worker_horizon))
+    return spec_index, start, bets
+
+
+def _shards(count: int, workers: int) -> List[Tuple[int, int]]:
+    # Quelques tranches par processus pour équilibrer les matchs longs et courts
+    size = max(1, math.ceil(count / (workers * 4)))
+    return [(start, min(count, start + size)) for start in range(0, count, size)]
+
+
+def replay_many(
+    timelines: Sequence[MatchTimeline],
+    specs: Sequence[Dict],
+    horizon: int = HORIZON,
+    workers: int = 1
+) -> List[List[Bet]]:
+    """
+    Rejouer tous les matchs pour chaque jeu de règles
+
+    Args:
+        timelines: Matchs à rejouer
+        specs: Spécifications de règles (RuleSet.spec), une par variante
+        horizon: Horizon des paris en minutes
+        workers: Processus (1 = dans le processus courant)
+
+    Returns:
+        Les paris de chaque spécification, dans l'ordre des matchs
+    """
+    timelines, specs = list(timelines), list(specs)
+    shards = _shards(len(timelines), max(1, workers))
+    tasks = list(itertools.product(range(len(specs)), shards))
+    results: Dict[Tuple[int, int], List[Bet]] = {}
+
+    if workers <= 1 or len(tasks) <= 1:
+        _init_worker(timelines, specs, horizon)
+        for spec_index, (start, stop) in tasks:
+            results[(spec_index, start)] = _replay_shard(spec_index, start, stop)[2]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(timelines, specs, horizon)
+        ) as pool:
+            futures = [pool.submit(_replay_shard, spec_index, start, stop) for spec_index, (start, stop) in tasks]
+            for future in futures:
+                spec_index, start, bets = future.result()
+                results[(spec_index, start)] = bets
+
+    return [
+        [bet for start, _ in shards for bet in results[(spec_index, start)]]
+        for spec_index in range(len(specs))
+    ]
+
+
+def replay(
+    timelines: Sequence[MatchTimeline],
+    rules: RuleSet,
+    horizon: int = HORIZON,
+    workers: int = 1
+) -> List[Bet]:
+    """Rejouer tous les matchs avec un seul jeu de règles"""
+    return replay_many(timelines, [rules.spec], horizon, workers)[0]
+
+
+# Balayage de seuils
+
+def parse_grid(items: Sequence[str]) -> Dict[str, Dict[str, List[Any]]]:
+    """
+    ["corner_high_activity.time_min=55,60,65", ...] -> {stratégie: {seuil: [valeurs]}}
+    """
+    grid: Dict[str, Dict[str, List[Any]]] = {}
+    for item in items:
+        target, _, values = item.partition('=')
+        strategy, _, key = target.partition('.')
+        if not strategy or not key or not values:
+            raise ValueError(f"Grille invalide '{item}' (attendu: stratégie.seuil=v1,v2,...)")
+        grid.setdefault(strategy, {})[key] = [_number(value) for value in values.split(',')]
+    return grid
+
+
+def _number(text: str):
+    value = float(text)
+    return int(value) if value.is_integer() and '.' not in text else value
+
+
+def threshold_grid(
+    rules: RuleSet,
+    grid: Dict[str, Dict[str, List[Any]]]
+) -> Iterator[Tuple[Dict[str, Dict[str, Any]], RuleSet]]:
+    """Toutes les combinaisons de seuils de la grille: (remplacements, règles recompilées)"""
+    axes = [(strategy, key, values) for strategy, keys in grid.items() for key, values in keys.items()]
+    thresholds = rules.thresholds
+    for strategy, key, _ in axes:
+        if key not in thresholds.get(strategy, {}):
+            raise ValueError(f"Seuil inconnu '{strategy}.{key}'")
+    for combination in itertools.product(*(values for _, _, values in axes)):
+        overrides: Dict[str, Dict[str, Any]] = {}
+        for (strategy, key, _), value in zip(axes, combination):
+            overrides.setdefault(strategy, {})[key] = value
+        yield overrides, rules.with_thresholds(overrides)
@@ -0,0 +1,174 @@
+"""
+Report - Taux de réussite, calibration et ROI des paris rejoués
+
+Pour l'ensemble des paris, par stratégie et par niveau de Confidence:
+- hit rate sur les paris tranchés
+- calibration: probabilité annoncée contre fréquence observée, par tranche
+  de 10 points, score de Brier et écart de calibration moyen (ECE)
+- ROI à mise fixe, avec une cote décimale par type de pari (les cotes
+  réelles ne sont pas enregistrées: `--odds` les fixe)
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from strategies.tes_engine import Confidence
+
+from .replay import Bet
+
+DEFAULT_ODDS = 1.90
+CALIBRATION_BINS = 10
+
+
+def _summary(probability: np.ndarray, won: np.ndarray, resolved: np.ndarray, odds: np.ndarray) -> Dict:
+    total = len(probability)
+    probability, won, odds = probability[resolved], won[resolved], odds[resolved]
+    count = len(probability)
+    if not count:
+        return {"bets": total, "resolved": 0, "wins": 0, "hit_rate": None,
+                "mean_probability": None, "brier": None, "roi": None}
+    clipped = np.clip(probability, 0.0, 1.0)
+    profit = np.where(won, odds - 1.0, -1.0)
+    return {
+        "bets": total,
+        "resolved": count,
+        "wins": int(won.sum()),
+        "hit_rate": round(float(won.mean()), 4),
+        "mean_probability": round(float(probability.mean()), 4),
+        "brier": round(float(np.mean((clipped - won) ** 2)), 4),
+        "roi": round(float(profit.mean()), 4),
+    }
+
+
+def _calibration(probability: np.ndarray, won: np.ndarray, bins: int) -> Dict:
+    clipped = np.clip(probability, 0.0, 1.0)
+    # Tranche k: [k/bins, (k+1)/bins), 1.0 dans la dernière
+    index = np.minimum((clipped * bins).astype(int), bins - 1)
+    counts = np.bincount(index, minlength=bins)
+    sum_probability = np.bincount(index, weights=clipped, minlength=bins)
+    sum_won = np.bincount(index, weights=won.astype(float), minlength=bins)
+
+    table, ece = [], 0.0
+    for k in np.flatnonzero(counts).tolist():
+        mean_probability = sum_probability[k] / counts[k]
+        frequency = sum_won[k] / counts[k]
+        ece += counts[k] / len(probability) * abs(mean_probability - frequency)
+        table.append({
+            "range": [k / bins, (k + 1) / bins],
+            "count": int(counts[k]),
+            "mean_probability": round(float(mean_probability), 4),
+            "frequency": round(float(frequency), 4),
+        })
+    return {"bins": table, "ece": round(ece, 4) if table else None}
+
+
+def summarize(
+    bets: Sequence[Bet],
+    odds: Optional[Dict[str, float]] = None,
+    default_odds: float = DEFAULT_ODDS,
+    bins: int = CALIBRATION_BINS
+) -> Dict:
+    """
+    Métriques des paris rejoués
+
+    Args:
+        bets: Paris (cf. replay.replay)
+        odds: Cote décimale par type de pari ({'corner': 1.85})
+        default_odds: Cote des types absents de `odds`
+        bins: Tranches de calibration
+
+    Returns:
+        {"overall": ..., "calibration": ..., "confidence": {niveau: ...},
+         "strategies": {id: {..., "confidence": ..., "calibration": ...}}}
+    """
+    odds = odds or {}
+    probability = np.fromiter((bet.probability for bet in bets), dtype=float, count=len(bets))
+    resolved = np.fromiter((bet.won is not None for bet in bets), dtype=bool, count=len(bets))
+    won = np.fromiter((bool(bet.won) for bet in bets), dtype=bool, count=len(bets))
+    bet_odds = np.fromiter((odds.get(bet.bet_type, default_odds) for bet in bets), dtype=float, count=len(bets))
+    strategies = np.array([bet.strategy for bet in bets], dtype=object)
+    confidences = np.array([bet.confidence for bet in bets], dtype=object)
+    levels = [level.value for level in Confidence]
+
+    def group(mask: np.ndarray) -> Dict:
+        return _summary(probability[mask], won[mask], resolved[mask], bet_odds[mask])
+
+    def calibration(mask: np.ndarray) -> Dict:
+        mask = mask & resolved
+        return _calibration(probability[mask], won[mask], bins)
+
+    def by_confidence(mask: np.ndarray) -> Dict:
+        return {
+            level: group(mask & (confidences == level))
+            for level in levels
+            if np.any(mask & (confidences == level))
+        }
+
+    everything = np.ones(len(bets), dtype=bool)
+    return {
+        "overall": group(everything),
+        "calibration": calibration(everything),
+        "confidence": by_confidence(everything),
+        "strategies": {
+            strategy: {
+                **group(strategies == strategy),
+                "confidence": by_confidence(strategies == strategy),
+                "calibration": calibration(strategies == strategy),
+            }
+            for strategy in dict.fromkeys(bet.strategy for bet in bets)
+        },
+    }
+
+
+# Affichage
+
+def _percent(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value * 100:5.1f}%"
+
+
+def _row(label: str, summary: Dict) -> str:
+    return (
+        f"{label:<30} {summary['bets']:>6} {summary['resolved']:>6} {_percent(summary['hit_rate']):>7} "
+        f"{_percent(summary['mean_probability']):>7} {_percent(summary['roi']):>7} "
+        f"{'-' if summary['brier'] is None else format(summary['brier'], '.3f'):>6}"
+    )
+
+
+def format_report(summary: Dict) -> str:
+    """Tableau texte de summarize()"""
+    header = f"{'':<30} {'paris':>6} {'tranch':>6} {'réussi':>7} {'annonc':>7} {'ROI':>7} {'Brier':>6}"
+    lines = [header, _row("TOTAL", summary["overall"])]
+    for level, values in summary["confidence"].items():
+        lines.append(_row(f"  {level}", values))
+    for strategy, values in summary["strategies"].items():
+        lines.append("")
+        lines.append(_row(strategy, values))
+        for level, level_values in values["confidence"].items():
+            lines.append(_row(f"  {level}", level_values))
+        calibration = values["calibration"]
+        if calibration["bins"]:
+            cells = ", ".join(
+                f"{row['range'][0]:.1f}-{row['range'][1]:.1f}: {row['frequency'] * 100:.0f}% (n={row['count']})"
+                for row in calibration["bins"]
+            )
+            lines.append(f"  calibration (ECE {calibration['ece']:.3f}): {cells}")
+    return "\n".join(lines)
+
+
+def format_sweep(results: List[Dict], top: int = 10) -> str:
+    """Classement des combinaisons de seuils ({"overrides", "summary"}, déjà triées)"""
+    lines = [f"{'#':>3} {'paris':>6} {'réussi':>7} {'ROI':>7} {'Brier':>6}  seuils"]
+    for rank, result in enumerate(results[:top], 1):
+        summary = result["summary"]
+        overrides = " ".join(
+            f"{strategy}.{key}={value}"
+            for strategy, keys in result["overrides"].items()
+            for key, value in keys.items()
+        )
+        brier = '-' if summary['brier'] is None else format(summary['brier'], '.3f')
+        lines.append(
+            f"{rank:>3} {summary['resolved']:>6} {_percent(summary['hit_rate']):>7} "
+            f"{_percent(summary['roi']):>7} {brier:>6}  {overrides}"
+        )
+    return "\n".join(lines)
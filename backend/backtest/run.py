@@ -0,0 +1,141 @@
+"""
+Back-test des stratégies TES sur des matchs enregistrés
+
+Rejoue des matchs minute par minute dans TESEngine, tranche chaque pari et
+affiche hit rate, calibration et ROI par stratégie et par niveau de
+confiance. Avec --grid, balaie des seuils et classe les combinaisons.
+
+Usage (depuis backend/):
+    python -m backtest.run --history data/history.db --since 2025-01-01
+    python -m backtest.run --fixtures chemin/vers/matchs/ --odds corner=1.85
+    python -m backtest.run --synthetic 2000 --grid corner_high_activity.time_min=55,60,65
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from strategies.rules import load_rules
+
+from backtest.replay import HORIZON, parse_grid, replay_many, threshold_grid
+from backtest.report import DEFAULT_ODDS, format_report, format_sweep, summarize
+from backtest.timeline import (
+    MatchTimeline, load_fixtures, load_history, synthetic_timelines, timeline_to_fixture
+)
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    """Date ISO ("2025-01-15", "2025-01-15T20:00") ou timestamp Unix"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def _odds(items: List[str]) -> Dict:
+    """["1.9", "corner=1.85"] -> (cote par défaut, {type: cote})"""
+    default, odds = DEFAULT_ODDS, {}
+    for item in items:
+        if '=' in item:
+            bet_type, _, value = item.partition('=')
+            odds[bet_type] = float(value)
+        else:
+            default = float(item)
+    return {"default_odds": default, "odds": odds}
+
+
+def add_source_arguments(parser: argparse.ArgumentParser):
+    """Options de choix des matchs rejoués (communes à run et calibrate)"""
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--fixtures", help="fichier ou dossier de matchs JSON")
+    source.add_argument("--history", help="base SQLite du scheduler (HISTORY_DB_PATH)")
+    source.add_argument("--synthetic", type=int, help="nombre de matchs synthétiques")
+    parser.add_argument("--since", help="début de période (--history)")
+    parser.add_argument("--until", help="fin de période (--history)")
+    parser.add_argument("--seed", type=int, default=0, help="graine des matchs synthétiques")
+
+
+def load_timelines(args) -> List[MatchTimeline]:
+    """Matchs désignés par les options de add_source_arguments"""
+    if args.fixtures:
+        return load_fixtures(args.fixtures)
+    if args.history:
+        return load_history(args.history, _timestamp(args.since), _timestamp(args.until))
+    return list(synthetic_timelines(args.synthetic, args.seed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_source_arguments(parser)
+    parser.add_argument("--rules", help="fichier de règles (défaut: strategies/tes_rules.json)")
+    parser.add_argument("--horizon", type=int, default=HORIZON, help="horizon des paris en minutes")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processus")
+    parser.add_argument("--odds", action="append", default=[], help="cote décimale: 1.9 ou corner=1.85")
+    parser.add_argument("--grid", action="append", default=[], help="stratégie.seuil=v1,v2,...")
+    parser.add_argument("--rank", help="stratégie servant au classement du balayage (défaut: total)")
+    parser.add_argument("--min-bets", type=int, default=30, help="paris tranchés minimum pour être classé")
+    parser.add_argument("--top", type=int, default=10, help="combinaisons affichées")
+    parser.add_argument("--json", help="écrire les résultats complets dans ce fichier")
+    parser.add_argument("--export", help="écrire les matchs chargés en fixtures JSON")
+    args = parser.parse_args()
+
+    rules = load_rules(args.rules)
+    odds = _odds(args.odds)
+
+    started = time.perf_counter()
+    timelines = load_timelines(args)
+    minutes = sum(len(timeline) for timeline in timelines)
+    print(f"{len(timelines)} matchs, {minutes} minutes chargés en {time.perf_counter() - started:.1f}s")
+    if not timelines:
+        return
+    if args.export:
+        Path(args.export).write_text(
+            json.dumps({"matches": [timeline_to_fixture(timeline) for timeline in timelines]}),
+            encoding='utf-8'
+        )
+
+    variants = list(threshold_grid(rules, parse_grid(args.grid))) if args.grid else [({}, rules)]
+    started = time.perf_counter()
+    all_bets = replay_many(timelines, [variant.spec for _, variant in variants], args.horizon, args.workers)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{len(variants)} jeu(x) de règles rejoué(s) en {elapsed:.1f}s "
+        f"({minutes * len(variants) / max(elapsed, 1e-9):,.0f} minutes de match/s, {args.workers} processus)\n"
+    )
+
+    results = [
+        {"overrides": overrides, "summary": summarize(bets, **odds)}
+        for (overrides, _), bets in zip(variants, all_bets)
+    ]
+
+    if args.grid:
+        def ranked(result: Dict) -> Dict:
+            summary = result["summary"]
+            return summary["strategies"].get(args.rank, {}) if args.rank else summary["overall"]
+
+        eligible = [result for result in results if (ranked(result).get("resolved") or 0) >= args.min_bets]
+        eligible.sort(key=lambda result: ranked(result)["roi"], reverse=True)
+        print(format_sweep(
+            [{"overrides": result["overrides"], "summary": ranked(result)} for result in eligible],
+            args.top
+        ))
+        if eligible:
+            print(f"\nMeilleure combinaison:\n{format_report(eligible[0]['summary'])}")
+    else:
+        print(format_report(results[0]["summary"]))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+
+
+if __name__ == "__main__":
+    main()
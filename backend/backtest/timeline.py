@@ -0,0 +1,250 @@
+"""
+Timelines - Déroulé minute par minute des matchs à rejouer
+
+Trois sources:
+- fixtures JSON (un fichier ou un dossier), format:
+    {"id": "123", "final_score": "2-1",
+     "snapshots": [{"minute": 1, "score": "0-0", "stats": {...}}, ...]}
+  (`stats` au format MatchStats.to_dict; un fichier peut contenir une
+  liste de matchs ou {"matches": [...]})
+- l'historique SQLite enregistré par le scheduler (storage.history)
+- des matchs synthétiques (processus de Poisson) pour tester le harnais
+
+Chaque match est ramené à un snapshot par minute: le dernier poll de la
+minute, les minutes sans poll reprennent le précédent.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import json
+import math
+import random
+
+from models.match_stats import MatchStats
+from storage.history import HistoryStore
+
+# Libellés de statut d'un match terminé (cf. pipeline.clock)
+FINISHED_STATUSES = ('ended', 'ft', 'finished', 'aet', 'ap')
+
+
+def parse_score(score) -> Optional[Tuple[int, int]]:
+    """"2-1" / "2 - 1" -> (2, 1); None si illisible"""
+    if not score:
+        return None
+    try:
+        home, away = str(score).split('-', 1)
+        return int(home), int(away)
+    except ValueError:
+        return None
+
+
+@dataclass
+class MatchTimeline:
+    """Un match rejouable: un snapshot par minute, du premier au dernier poll"""
+    match_id: str
+    minutes: List[int]
+    timestamps: List[float]
+    stats: List[MatchStats]
+    scores: List[Optional[Tuple[int, int]]]
+    # Match allé à son terme (sinon les paris non encore tranchés restent ouverts)
+    finished: bool = True
+
+    def __len__(self) -> int:
+        return len(self.minutes)
+
+    @property
+    def final_score(self) -> Optional[Tuple[int, int]]:
+        return self.scores[-1] if self.scores and self.finished else None
+
+    @classmethod
+    def from_points(
+        cls,
+        match_id: str,
+        points: List[Tuple[int, Optional[float], MatchStats, Optional[Tuple[int, int]]]],
+        finished: bool = True,
+        final_score: Optional[Tuple[int, int]] = None
+    ) -> Optional["MatchTimeline"]:
+        """
+        Ramener des polls (minute, ts, stats, score) à un snapshot par minute
+
+        Returns:
+            None si aucun poll n'a de minute connue
+        """
+        points = sorted((point for point in points if point[0] is not None), key=lambda point: point[0])
+        if not points:
+            return None
+
+        by_minute: Dict[int, Tuple] = {}
+        for point in points:
+            by_minute[point[0]] = point   # dernier poll de la minute
+        first, last = points[0][0], points[-1][0]
+
+        minutes, timestamps, stats, scores = [], [], [], []
+        current = by_minute[first]
+        base_ts = current[1] if current[1] is not None else first * 60.0
+        for minute in range(first, last + 1):
+            exact = minute in by_minute
+            if exact:
+                current = by_minute[minute]
+            minutes.append(minute)
+            ts = current[1] if exact and current[1] is not None else None
+            timestamps.append(ts if ts is not None else base_ts + (minute - first) * 60.0)
+            stats.append(current[2])
+            scores.append(current[3])
+        if final_score is not None:
+            scores[-1] = final_score
+        return cls(str(match_id), minutes, timestamps, stats, scores, finished)
+
+
+# Fixtures
+
+def _timeline_from_fixture(data: Dict) -> Optional[MatchTimeline]:
+    points = [
+        (
+            snapshot.get('minute'),
+            snapshot.get('ts'),
+            MatchStats.from_dict(snapshot.get('stats', {})),
+            parse_score(snapshot.get('score')),
+        )
+        for snapshot in data.get('snapshots', [])
+    ]
+    return MatchTimeline.from_points(
+        data.get('id', ''),
+        points,
+        finished=data.get('finished', True),
+        final_score=parse_score(data.get('final_score'))
+    )
+
+
+def load_fixtures(path: str) -> List[MatchTimeline]:
+    """Matchs d'un fichier JSON ou de tous les .json d'un dossier"""
+    path = Path(path)
+    files = sorted(path.glob("*.json")) if path.is_dir() else [path]
+    timelines = []
+    for file in files:
+        data = json.loads(file.read_text(encoding='utf-8'))
+        matches = data.get('matches', [data]) if isinstance(data, dict) else data
+        for match in matches:
+            timeline = _timeline_from_fixture(match)
+            if timeline is not None:
+                timelines.append(timeline)
+    return timelines
+
+
+def timeline_to_fixture(timeline: MatchTimeline) -> Dict:
+    """Inverse de load_fixtures (export de l'historique en fixtures)"""
+    final = timeline.final_score
+    return {
+        "id": timeline.match_id,
+        "finished": timeline.finished,
+        "final_score": f"{final[0]}-{final[1]}" if final else None,
+        "snapshots": [
+            {
+                "minute": minute,
+                "ts": ts,
+                "score": f"{score[0]}-{score[1]}" if score else None,
+                "stats": {key: value for key, value in stats.to_dict().items() if key != 'source'},
+            }
+            for minute, ts, stats, score in zip(timeline.minutes, timeline.timestamps, timeline.stats, timeline.scores)
+        ],
+    }
+
+
+# Historique SQLite
+
+def load_history(
+    path: str,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    min_minutes: int = 10
+) -> List[MatchTimeline]:
+    """
+    Matchs enregistrés par le scheduler sur la période
+
+    Args:
+        path: Base SQLite (HISTORY_DB_PATH)
+        since, until: Bornes (timestamps Unix) des polls
+        min_minutes: Matchs suivis moins longtemps ignorés
+    """
+    store = HistoryStore(path).open()
+    timelines = []
+    try:
+        for match in store.matches(since, until):
+            points = store.stats_range(match['id'], since, until)
+            if not points:
+                continue
+            last = points[-1]
+            # Le scheduler cesse de suivre un match dès sa fin: le dernier poll est rarement "Ended"
+            finished = str(last.status or '').lower() in FINISHED_STATUSES or (last.minute or 0) >= 90
+            timeline = MatchTimeline.from_points(
+                match['id'],
+                [(point.minute, point.ts, point.stats, parse_score(point.score)) for point in points],
+                finished=finished
+            )
+            if timeline is not None and len(timeline) >= min_minutes:
+                timelines.append(timeline)
+    finally:
+        store.close_sync()
+    return timelines
+
+
+# Matchs synthétiques
+
+# Événements moyens par équipe et par match (ordre de grandeur des championnats européens)
+_SYNTHETIC_RATES = {
+    'corners': 5.0,
+    'yellow_cards': 2.0,
+    'red_cards': 0.1,
+    'fouls': 11.0,
+    'shots': 12.0,
+    'offsides': 2.0,
+    'throw_ins': 22.0,
+    'dangerous_attacks': 50.0,
+    'attacks': 100.0,
+}
+_GOALS_PER_TEAM = 1.4
+_ON_TARGET_RATIO = 0.35
+
+
+def synthetic_timelines(count: int, seed: int = 0) -> Iterator[MatchTimeline]:
+    """
+    Matchs de 90 minutes générés aléatoirement (reproductibles par `seed`)
+
+    Chaque match a une intensité propre par équipe, pour que les
+    stratégies aient des matchs calmes et des matchs ouverts à distinguer.
+    Sert à tester le harnais et à mesurer ses performances, pas à valider
+    des seuils.
+    """
+    rng = random.Random(seed)
+    for number in range(count):
+        intensity = (rng.uniform(0.6, 1.5), rng.uniform(0.6, 1.5))
+        stats = MatchStats()
+        possession = rng.randint(35, 65)
+        goals = [0, 0]
+        points = []
+        for minute in range(1, 91):
+            stats = stats.copy()
+            for side in (0, 1):
+                scale = intensity[side] / 90.0
+                for name, rate in _SYNTHETIC_RATES.items():
+                    count = _poisson(rng, rate * scale)
+                    stats.add(name, *((count, 0) if side == 0 else (0, count)))
+                    if name == 'shots' and count:
+                        on_target = sum(rng.random() < _ON_TARGET_RATIO for _ in range(count))
+                        stats.add('shots_on_target', *((on_target, 0) if side == 0 else (0, on_target)))
+                goals[side] += _poisson(rng, _GOALS_PER_TEAM * scale)
+            possession = min(75, max(25, possession + rng.randint(-2, 2)))
+            stats.set('possession', possession, 100 - possession)
+            points.append((minute, None, stats, (goals[0], goals[1])))
+        yield MatchTimeline.from_points(f"synthetic-{seed}-{number}", points)
+
+
+def _poisson(rng: random.Random, lam: float) -> int:
+    # Petites intensités par minute: méthode de Knuth
+    k, p, threshold = 0, 1.0, math.exp(-lam)
+    while True:
+        p *= rng.random()
+        if p <= threshold:
+            return k
+        k += 1
@@ -0,0 +1,113 @@
+"""
+Micro-benchmark du parser de statistiques Sofascore
+
+Compare, sur le corpus de benchmarks/fixtures/sofascore/:
+- l'ancien parser (chaîne de sous-chaînes, somme de toutes les périodes)
+- parse_statistics sur la réponse déjà décodée
+- parse_statistics_bytes avec json standard et avec orjson (si installé)
+
+Usage (depuis backend/):
+    python -m benchmarks.bench_parser [--number 2000]
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, List
+import argparse
+import json
+import sys
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scrapers import fastjson
+from scrapers.sofascore_parser import parse_statistics, parse_statistics_bytes
+
+FIXTURES = Path(__file__).parent / "fixtures" / "sofascore"
+
+
+def legacy_parse(data: Dict) -> Dict:
+    """Parser d'origine de SofascoreScraper.get_match_stats (référence)"""
+    stats = {key: {'home': 0, 'away': 0} for key in (
+        'corners', 'yellow_cards', 'red_cards', 'fouls', 'shots', 'shots_on_target',
+        'possession', 'offsides', 'throw_ins', 'dangerous_attacks', 'attacks'
+    )}
+    for period_stats in data.get("statistics", []):
+        for group in period_stats.get("groups", []):
+            for item in group.get("statisticsItems", []):
+                stat_name = item.get("name", "").lower()
+                home_value = int(item.get("homeValue", 0) or 0)
+                away_value = int(item.get("awayValue", 0) or 0)
+                if "corner" in stat_name:
+                    key = 'corners'
+                elif "yellow card" in stat_name:
+                    key = 'yellow_cards'
+                elif "red card" in stat_name:
+                    key = 'red_cards'
+                elif "foul" in stat_name:
+                    key = 'fouls'
+                elif "total shot" in stat_name or stat_name == "shots":
+                    key = 'shots'
+                elif "on target" in stat_name:
+                    key = 'shots_on_target'
+                elif "ball possession" in stat_name:
+                    stats['possession'] = {'home': home_value, 'away': away_value}
+                    continue
+                elif "offside" in stat_name:
+                    key = 'offsides'
+                elif "throw" in stat_name:
+                    key = 'throw_ins'
+                elif "dangerous attack" in stat_name:
+                    key = 'dangerous_attacks'
+                elif "attack" in stat_name and "dangerous" not in stat_name:
+                    key = 'attacks'
+                else:
+                    continue
+                stats[key]['home'] += home_value
+                stats[key]['away'] += away_value
+    return stats
+
+
+def _bench(label: str, func: Callable, number: int, results: List):
+    try:
+        func()
+    except Exception as e:
+        print(f"{label:<38} échec: {e!r}")
+        return
+    seconds = min(timeit.repeat(func, number=number, repeat=3)) / number
+    results.append((label, seconds))
+    print(f"{label:<38} {seconds * 1e6:9.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=2000, help="itérations par mesure")
+    args = parser.parse_args()
+
+    print(f"orjson: {'oui' if fastjson.orjson else 'non'}\n")
+    for path in sorted(FIXTURES.glob("statistics_*.json")):
+        raw = path.read_bytes()
+        data = json.loads(raw)
+        print(f"== {path.name} ({len(raw)} octets)")
+        print(f"   parse_statistics: {parse_statistics(data)}")
+        try:
+            expected = {key: value for key, value in parse_statistics(data).to_dict().items() if key != 'source'}
+            if legacy_parse(data) != expected:
+                print("   (l'ancien parser donne des valeurs différentes sur ce fichier)")
+        except ValueError as e:
+            print(f"   (l'ancien parser échoue sur ce fichier: {e})")
+
+        results: List = []
+        _bench("ancien parser (dict décodé)", lambda: legacy_parse(data), args.number, results)
+        _bench("parse_statistics (dict décodé)", lambda: parse_statistics(data), args.number, results)
+        _bench("json.loads + ancien parser", lambda: legacy_parse(json.loads(raw)), args.number, results)
+        _bench("json.loads + parse_statistics", lambda: parse_statistics(json.loads(raw)), args.number, results)
+        if fastjson.orjson:
+            _bench("parse_statistics_bytes (orjson)", lambda: parse_statistics_bytes(raw), args.number, results)
+
+        if len(results) >= 2 and results[0][0].startswith("ancien"):
+            print(f"   gain parse seul: x{results[0][1] / results[1][1]:.1f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Comparaison de deux résultats de benchmarks.load_test (régressions entre commits)
+
+Chaque métrique a un sens (débit: plus haut est mieux, latence / mémoire /
+CPU: plus bas est mieux). Une variation défavorable au-delà de --threshold
+est une régression: code de sortie 1, utilisable en CI.
+
+Usage (depuis backend/):
+    python -m benchmarks.compare base.json new.json --threshold 0.1
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import argparse
+import json
+import sys
+
+# (chemin dans "results", plus haut est mieux)
+METRICS: List[Tuple[str, bool]] = [
+    ("messages_per_s", True),
+    ("matches_per_s", True),
+    ("publications_per_s", True),
+    ("freshness_ms.p50", False),
+    ("freshness_ms.p95", False),
+    ("freshness_ms.p99", False),
+    ("delivery_ms.p50", False),
+    ("delivery_ms.p95", False),
+    ("delivery_ms.p99", False),
+    ("connect_ms.p95", False),
+    ("server.scrape_to_send_ms.p50", False),
+    ("server.scrape_to_send_ms.p95", False),
+    ("server.scrape_to_send_ms.p99", False),
+    ("server.tes_strategy_ms.p95", False),
+    ("server.fanout_ms.p95", False),
+    ("server.parse_ms.p95", False),
+    ("server.rss_mb_peak", False),
+    ("server.cpu_pct", False),
+    ("swarm.rss_mb_peak", False),
+]
+# Compteurs qui doivent rester nuls
+FAILURES = ["gaps", "disconnects", "client_errors"]
+# Paramètres qui rendent deux résultats comparables
+COMPARED_CONFIG = ["matches", "clients", "duration_s", "latency_s", "jitter_s", "error_rate", "period_s", "seed"]
+
+
+def lookup(data: Dict, path: str) -> Optional[float]:
+    for key in path.split("."):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data if isinstance(data, (int, float)) else None
+
+
+def compare(base: Dict, new: Dict, threshold: float) -> Tuple[List[Dict], List[str]]:
+    """Lignes du tableau et régressions détectées"""
+    rows, regressions = [], []
+    for path, higher_is_better in METRICS:
+        before, after = lookup(base["results"], path), lookup(new["results"], path)
+        if before is None or after is None:
+            continue
+        change = (after - before) / before if before else (0.0 if after == before else float("inf"))
+        worse = -change if higher_is_better else change
+        status = "ok"
+        if worse > threshold:
+            status = "RÉGRESSION"
+            regressions.append(f"{path}: {before} -> {after} ({change:+.1%})")
+        elif worse < -threshold:
+            status = "mieux"
+        rows.append({"metric": path, "base": before, "new": after, "change": change, "status": status})
+
+    for key in FAILURES:
+        before, after = base["results"].get(key, 0), new["results"].get(key, 0)
+        if after > before:
+            regressions.append(f"{key}: {before} -> {after}")
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("base", help="résultat de référence (JSON)")
+    parser.add_argument("new", help="résultat à comparer (JSON)")
+    parser.add_argument("--threshold", type=float, default=0.1, help="variation défavorable tolérée (0.1 = 10%%)")
+    args = parser.parse_args()
+
+    base = json.loads(Path(args.base).read_text())
+    new = json.loads(Path(args.new).read_text())
+
+    print(f"base: {base.get('commit')} {base.get('label') or ''}")
+    print(f"new:  {new.get('commit')} {new.get('label') or ''}")
+    differences = [
+        key for key in COMPARED_CONFIG
+        if base["config"].get(key) != new["config"].get(key)
+    ]
+    if base["config"].get("env") != new["config"].get("env"):
+        differences.append("env")
+    if base.get("environment") != new.get("environment"):
+        differences.append("environment")
+    if differences:
+        print(f"Attention: configurations différentes ({', '.join(differences)}), comparaison indicative")
+
+    rows, regressions = compare(base, new, args.threshold)
+    print(f"\n{'métrique':<32} {'base':>10} {'new':>10} {'écart':>9}")
+    for row in rows:
+        print(f"{row['metric']:<32} {row['base']:>10} {row['new']:>10} {row['change']:>+9.1%}  {row['status']}")
+
+    if regressions:
+        print(f"\n{len(regressions)} régression(s) au-delà de {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        sys.exit(1)
+    print(f"\nAucune régression au-delà de {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Faux serveur Sofascore pour les benchmarks et tests de charge
+
+Sert `sport/football/events/live`, `event/{id}` et `event/{id}/statistics`
+à partir des réponses enregistrées de benchmarks/fixtures/sofascore/,
+dupliquées pour `matches` matchs, avec une latence, une gigue et un taux
+d'erreur (503) configurables. Les corners à domicile du match n°i valent
+1 + le nombre de périodes écoulées depuis `epoch + phase(i)`: un client
+sait ainsi à quel instant chaque valeur est apparue upstream
+(UpstreamSchedule.change_time) et mesure la fraîcheur de bout en bout.
+
+Usage (depuis backend/):
+    python -m benchmarks.fake_upstream --port 8900 --matches 100 --latency 0.05 --jitter 0.05
+    SOFASCORE_API_URL=http://127.0.0.1:8900/api/v1 SCRAPER_PROVIDERS=sofascore uvicorn api.main:app
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import copy
+import json
+import random
+import time
+
+from aiohttp import web
+
+FIXTURES = Path(__file__).parent / "fixtures" / "sofascore"
+API_PREFIX = "/api/v1"
+# Identifiants des matchs simulés: ID_BASE + n°
+ID_BASE = 20_000_000
+# Valeur repère remplacée à chaque réponse par les corners courants
+_MARKER = b"987654321"
+
+
+class UpstreamSchedule:
+    """Instants auxquels les corners à domicile de chaque match changent"""
+
+    def __init__(self, matches: int, period: float = 10.0, epoch: Optional[float] = None):
+        self.matches = max(1, matches)
+        self.period = period
+        self.epoch = epoch if epoch is not None else time.time()
+
+    def match_id(self, index: int) -> str:
+        return str(ID_BASE + index)
+
+    def index(self, match_id: str) -> Optional[int]:
+        try:
+            index = int(match_id) - ID_BASE
+        except (TypeError, ValueError):
+            return None
+        return index if 0 <= index < self.matches else None
+
+    def phase(self, index: int) -> float:
+        # Changements étalés sur la période: pas de rafale commune à tous les matchs
+        return self.period * index / self.matches
+
+    def corners(self, index: int, now: Optional[float] = None) -> int:
+        now = time.time() if now is None else now
+        return 1 + max(0, int((now - self.epoch - self.phase(index)) // self.period))
+
+    def change_time(self, index: int, corners: int) -> float:
+        """Timestamp Unix auquel `corners` est apparu upstream"""
+        return self.epoch + self.phase(index) + (corners - 1) * self.period
+
+
+def _statistics_template(data: Dict) -> List[bytes]:
+    """Réponse statistics sérialisée, coupée autour des corners à domicile de la période ALL"""
+    data = copy.deepcopy(data)
+    periods = data.get("statistics") or []
+    period = next((p for p in periods if p.get("period") == "ALL"), periods[0] if periods else None)
+    if period is None:
+        raise ValueError("fixture statistics sans période")
+    marked = False
+    for group in period.get("groups", []):
+        for item in group.get("statisticsItems", []):
+            if item.get("key") == "cornerKicks" or "corner" in item.get("name", "").lower():
+                if "homeValue" in item:
+                    item["homeValue"] = int(_MARKER)
+                item["home"] = _MARKER.decode()
+                marked = True
+    if not marked:
+        raise ValueError("fixture statistics sans corners")
+    return json.dumps(data, separators=(",", ":")).encode().split(_MARKER)
+
+
+class FakeSofascore:
+    """Application aiohttp qui imite l'API Sofascore"""
+
+    def __init__(
+        self,
+        schedule: UpstreamSchedule,
+        latency: float = 0.05,
+        jitter: float = 0.05,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        fixtures: Path = FIXTURES
+    ):
+        self.schedule = schedule
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self.requests: Dict[str, int] = {"live": 0, "event": 0, "statistics": 0, "errors": 0}
+
+        templates = json.loads((fixtures / "events_live.json").read_text())["events"]
+        self._statistics = [
+            _statistics_template(json.loads(path.read_text()))
+            for path in sorted(fixtures.glob("statistics_*.json"))
+        ]
+        started_at = time.time()
+        self._events = [self._event(templates[index % len(templates)], index, started_at) for index in range(schedule.matches)]
+        self._live_body = json.dumps({"events": self._events}, separators=(",", ":")).encode()
+
+    def _event(self, template: Dict, index: int, started_at: float) -> Dict:
+        """Événement n°index, à une minute de jeu propre (5e à 84e)"""
+        event = copy.deepcopy(template)
+        minute = 5 + index * 7 % 80
+        first_half = minute < 45
+        event["id"] = ID_BASE + index
+        for side in ("homeTeam", "awayTeam"):
+            event[side]["name"] = f"{event[side]['name']} {index}"
+            event[side]["id"] = ID_BASE + 2 * index + (side == "awayTeam")
+        event["status"] = (
+            {"code": 6, "description": "1st half", "type": "inprogress"} if first_half
+            else {"code": 7, "description": "2nd half", "type": "inprogress"}
+        )
+        event["time"] = {
+            "initial": 0 if first_half else 2700,
+            "max": 2700 if first_half else 5400,
+            "extra": 540,
+            "currentPeriodStartTimestamp": int(started_at - (minute if first_half else minute - 45) * 60),
+        }
+        event["startTimestamp"] = int(started_at - minute * 60)
+        return event
+
+    async def _respond(self, endpoint: str, body: bytes) -> web.Response:
+        self.requests[endpoint] += 1
+        await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.requests["errors"] += 1
+            return web.Response(status=503, text="Service Unavailable")
+        return web.Response(body=body, content_type="application/json")
+
+    async def live(self, request: web.Request) -> web.Response:
+        return await self._respond("live", self._live_body)
+
+    async def event(self, request: web.Request) -> web.Response:
+        index = self.schedule.index(request.match_info["match_id"])
+        if index is None:
+            raise web.HTTPNotFound()
+        body = json.dumps({"event": self._events[index]}, separators=(",", ":")).encode()
+        return await self._respond("event", body)
+
+    async def statistics(self, request: web.Request) -> web.Response:
+        index = self.schedule.index(request.match_info["match_id"])
+        if index is None:
+            raise web.HTTPNotFound()
+        # Valeur lue à la réception (avant la latence), comme un upstream qui sert son état courant
+        corners = str(self.schedule.corners(index)).encode()
+        body = corners.join(self._statistics[index % len(self._statistics)])
+        return await self._respond("statistics", body)
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.requests)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get(f"{API_PREFIX}/sport/football/events/live", self.live)
+        app.router.add_get(f"{API_PREFIX}/event/{{match_id}}", self.event)
+        app.router.add_get(f"{API_PREFIX}/event/{{match_id}}/statistics", self.statistics)
+        app.router.add_get("/__stats", self.stats)
+        return app
+
+
+def add_upstream_arguments(parser: argparse.ArgumentParser):
+    """Options du faux upstream (partagées avec benchmarks.load_test)"""
+    parser.add_argument("--matches", type=int, default=50, help="matchs live simulés")
+    parser.add_argument("--latency", type=float, default=0.05, help="latence upstream (s)")
+    parser.add_argument("--jitter", type=float, default=0.05, help="gigue ajoutée à la latence (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="part des réponses en 503")
+    parser.add_argument("--period", type=float, default=10.0, help="secondes entre deux corners d'un match")
+    parser.add_argument("--seed", type=int, default=0, help="graine de la gigue et des erreurs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--epoch", type=float, help="origine du calendrier des corners (défaut: maintenant)")
+    add_upstream_arguments(parser)
+    args = parser.parse_args()
+
+    schedule = UpstreamSchedule(args.matches, args.period, args.epoch)
+    fake = FakeSofascore(schedule, args.latency, args.jitter, args.error_rate, args.seed)
+    print(f"Faux Sofascore: http://{args.host}:{args.port}{API_PREFIX} ({args.matches} matchs)", flush=True)
+    web.run_app(fake.app(), host=args.host, port=args.port, print=None, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
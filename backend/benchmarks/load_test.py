@@ -0,0 +1,501 @@
+"""
+Test de charge de bout en bout: faux Sofascore -> ingestion -> TES -> /ws/live-feed
+
+Lance le faux upstream (benchmarks.fake_upstream) et la vraie API (uvicorn,
+configuration de production hormis l'URL Sofascore) dans deux processus,
+connecte un essaim de clients WebSocket qui se comportent comme le
+dashboard (snapshots, deltas, resync sur trou de séquence), puis mesure
+pendant `--duration` secondes:
+- débit: messages et octets reçus par seconde, matchs pollés et mises à
+  jour publiées par seconde
+- fraîcheur: délai entre un changement upstream (corners, cf.
+  UpstreamSchedule) et sa réception par chaque client
+- livraison: délai entre la publication côté serveur et la réception
+- latences internes lues sur /metrics (poll -> envoi, upstream, TES),
+  mesurées sur la seule fenêtre de mesure
+- mémoire (RSS) et CPU du serveur et de l'essaim
+
+Le résultat est un JSON (--out) à comparer entre deux commits avec
+benchmarks.compare.
+
+Usage (depuis backend/):
+    python -m benchmarks.load_test --matches 50 --clients 200 --duration 30 --out bench.json
+    python -m benchmarks.load_test --latency 0.2 --jitter 0.3 --error-rate 0.05 --env CACHE_BACKEND=none
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import resource
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import aiohttp
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fake_upstream import API_PREFIX, UpstreamSchedule, add_upstream_arguments
+
+BACKEND = Path(__file__).resolve().parent.parent
+RESULT_VERSION = 1
+# Histogrammes du serveur relus sur la fenêtre de mesure (nom sans préfixe -> clé du résultat)
+SERVER_HISTOGRAMS = {
+    "pipeline_scrape_to_broadcast_seconds": "scrape_to_broadcast_ms",
+    "pipeline_scrape_to_send_seconds": "scrape_to_send_ms",
+    "upstream_fetch_seconds": "upstream_fetch_ms",
+    "tes_strategy_seconds": "tes_strategy_ms",
+    "websocket_fanout_seconds": "fanout_ms",
+    "parse_seconds": "parse_ms",
+}
+_BUCKET_LINE = re.compile(r'^football_ai_(\w+)_bucket\{(.*?)le="([^"]+)"\} (\S+)$')
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentiles(values: List[float]) -> Dict:
+    """p50 / p90 / p95 / p99 / max (valeurs en ms)"""
+    if not values:
+        return {"count": 0, "p50": None, "p90": None, "p95": None, "p99": None, "max": None}
+    data = np.asarray(values, dtype=float)
+    p50, p90, p95, p99 = np.percentile(data, [50, 90, 95, 99]).tolist()
+    return {
+        "count": len(values),
+        "p50": round(p50, 2),
+        "p90": round(p90, 2),
+        "p95": round(p95, 2),
+        "p99": round(p99, 2),
+        "max": round(float(data.max()), 2),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND, capture_output=True, text=True, timeout=10
+        )
+        commit = output.stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=BACKEND, capture_output=True, text=True, timeout=10
+        ).stdout.strip()
+        return f"{commit}{'-dirty' if dirty else ''}" if commit else None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+# Processus
+
+def proc_rss_mb(pid: int) -> Optional[float]:
+    """RSS d'un processus (Linux, /proc), None ailleurs"""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def proc_cpu_seconds(pid: int) -> Optional[float]:
+    """Temps CPU (utilisateur + système) d'un processus (Linux, /proc)"""
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            fields = stat.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def spawn(args: List[str], env: Dict[str, str], log_path: Path) -> subprocess.Popen:
+    log = open(log_path, "wb")
+    return subprocess.Popen(
+        [sys.executable, *args], cwd=BACKEND, env={**os.environ, **env}, stdout=log, stderr=subprocess.STDOUT
+    )
+
+
+def stop(process: Optional[subprocess.Popen]):
+    if process is None or process.poll() is not None:
+        return
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def api_env(args, upstream_url: str) -> Dict[str, str]:
+    """Configuration de l'API testée: production, sans navigateur, historique ni alertes"""
+    env = {
+        "SCRAPER_PROVIDERS": "sofascore",
+        "SOFASCORE_API_URL": upstream_url,
+        "SCRAPER_TRANSPORT": "http",
+        "BROWSER_FALLBACK": "false",
+        "HISTORY_DB_PATH": "",
+        "SCRAPE_INTERVAL": str(args.discovery_interval),
+        "POLL_INTERVAL_MIN": str(args.poll_min),
+        "POLL_INTERVAL_MAX": str(args.poll_max),
+        "REQUEST_BUDGET_PER_SECOND": str(args.request_budget),
+        "MAX_CONCURRENT_MATCHES": str(args.max_concurrency),
+        "MAX_LIVE_MATCHES": "0",
+        "LIVE_COMPETITIONS": "",
+        "TELEGRAM_BOT_TOKEN": "",
+        "DISCORD_WEBHOOK_URL": "",
+        "SENDGRID_API_KEY": "",
+        "ALERT_WEBHOOK_URL": "",
+        "PROFILER_ENABLED": "false",
+    }
+    for item in args.env:
+        key, _, value = item.partition("=")
+        env[key.strip().upper()] = value
+    return env
+
+
+# Métriques du serveur
+
+def parse_buckets(text: str) -> Dict[str, Dict[float, float]]:
+    """Seaux cumulés de chaque histogramme de /metrics, toutes séries confondues"""
+    buckets: Dict[str, Dict[float, float]] = {}
+    for line in text.splitlines():
+        match = _BUCKET_LINE.match(line)
+        if match is None:
+            continue
+        name, _, le, value = match.groups()
+        bound = float("inf") if le == "+Inf" else float(le)
+        series = buckets.setdefault(name, {})
+        series[bound] = series.get(bound, 0.0) + float(value)
+    return buckets
+
+
+def bucket_quantiles(before: Dict[float, float], after: Dict[float, float]) -> Dict:
+    """Effectif et quantiles (ms) d'un histogramme sur l'intervalle [before, after]"""
+    bounds = sorted(after)
+    cumulative = [after[bound] - before.get(bound, 0.0) for bound in bounds]
+    total = cumulative[-1] if cumulative else 0
+    result: Dict = {"count": int(total)}
+    for q in (0.5, 0.95, 0.99):
+        value = None
+        if total:
+            rank = q * total
+            previous_bound, previous_count = 0.0, 0.0
+            for bound, count in zip(bounds, cumulative):
+                if count >= rank:
+                    if bound == float("inf"):
+                        value = previous_bound
+                    else:
+                        fraction = (rank - previous_count) / (count - previous_count) if count > previous_count else 1.0
+                        value = previous_bound + (bound - previous_bound) * fraction
+                    break
+                previous_bound, previous_count = bound, count
+        result[f"p{int(q * 100)}"] = round(value * 1000, 3) if value is not None else None
+    return result
+
+
+# Essaim de clients
+
+class SwarmStats:
+    """Mesures agrégées de tous les clients"""
+
+    def __init__(self, schedule: UpstreamSchedule):
+        self.schedule = schedule
+        self.measuring = False
+        self.connected = 0
+        self.connect_ms: List[float] = []
+        self.messages = 0
+        self.bytes = 0
+        self.freshness_ms: List[float] = []
+        self.delivery_ms: List[float] = []
+        self.gaps = 0
+        self.disconnects = 0
+        self.errors = 0
+
+
+async def run_client(session: aiohttp.ClientSession, url: str, stats: SwarmStats, ready: asyncio.Event):
+    """Client qui suit le flux comme le dashboard (useWebSocket)"""
+    seqs: Dict[str, int] = {}
+    corners: Dict[str, int] = {}
+    # Matchs dont un snapshot a été redemandé
+    resyncing: Set[str] = set()
+    started = time.perf_counter()
+    try:
+        async with session.ws_connect(url, max_msg_size=0, heartbeat=None) as ws:
+            stats.connected += 1
+            stats.connect_ms.append((time.perf_counter() - started) * 1000)
+            ready.set()
+            async for message in ws:
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    break
+                received = time.time()
+                data = json.loads(message.data)
+                kind = data.get("type")
+                match_id = data.get("match_id")
+                if stats.measuring:
+                    stats.messages += 1
+                    stats.bytes += len(message.data)
+
+                if kind == "match_update":
+                    seqs[match_id] = data["seq"]
+                    resyncing.discard(match_id)
+                    home = data["stats"].get("corners", {}).get("home")
+                elif kind == "match_delta":
+                    if match_id in resyncing:
+                        # Snapshot déjà demandé: deltas ignorés jusqu'à sa réception
+                        continue
+                    if seqs.get(match_id) != data.get("base_seq"):
+                        stats.gaps += 1
+                        resyncing.add(match_id)
+                        await ws.send_str(json.dumps({"type": "resync", "match_ids": [match_id]}))
+                        continue
+                    seqs[match_id] = data["seq"]
+                    home = data.get("stats", {}).get("corners", {}).get("home")
+                else:
+                    seqs.pop(match_id, None)
+                    corners.pop(match_id, None)
+                    resyncing.discard(match_id)
+                    continue
+
+                if not stats.measuring:
+                    if home is not None:
+                        corners[match_id] = home
+                    continue
+                if data.get("timestamp"):
+                    stats.delivery_ms.append((received - datetime.fromisoformat(data["timestamp"]).timestamp()) * 1000)
+                if home is None:
+                    continue
+                previous = corners.get(match_id)
+                corners[match_id] = home
+                index = stats.schedule.index(match_id)
+                if previous is not None and home > previous and index is not None:
+                    stats.freshness_ms.append((received - stats.schedule.change_time(index, home)) * 1000)
+            stats.disconnects += 1
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        stats.errors += 1
+        if stats.errors <= 5:
+            print(f"Erreur client WebSocket: {type(e).__name__}: {e}")
+    finally:
+        ready.set()
+
+
+async def wait_ready(session: aiohttp.ClientSession, api: str, matches: int, timeout: float, server: subprocess.Popen) -> Dict:
+    """Attendre que l'API réponde et suive tous les matchs"""
+    deadline = time.monotonic() + timeout
+    health: Dict = {}
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"L'API s'est arrêtée (code {server.returncode})")
+        try:
+            async with session.get(f"{api}/api/health") as response:
+                health = await response.json()
+            if health["scheduler"]["live_matches"] >= matches:
+                return health
+        except (aiohttp.ClientError, KeyError, ValueError):
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError(f"API pas prête après {timeout}s: {health.get('scheduler')}")
+
+
+async def server_snapshot(session: aiohttp.ClientSession, api: str, upstream: str) -> Tuple[Dict, Dict, Dict]:
+    async with session.get(f"{api}/api/health") as response:
+        health = await response.json()
+    async with session.get(f"{api}/metrics") as response:
+        buckets = parse_buckets(await response.text())
+    async with session.get(f"{upstream}/__stats") as response:
+        requests = await response.json()
+    return health, buckets, requests
+
+
+async def run(args) -> Dict:
+    upstream_port, api_port = free_port(), free_port()
+    upstream = f"http://127.0.0.1:{upstream_port}"
+    api = f"http://127.0.0.1:{api_port}"
+    schedule = UpstreamSchedule(args.matches, args.period, time.time())
+    logs = Path(args.log_dir)
+    logs.mkdir(parents=True, exist_ok=True)
+
+    upstream_process = spawn([
+        "-m", "benchmarks.fake_upstream", "--port", str(upstream_port), "--epoch", repr(schedule.epoch),
+        "--matches", str(args.matches), "--latency", str(args.latency), "--jitter", str(args.jitter),
+        "--error-rate", str(args.error_rate), "--period", str(args.period), "--seed", str(args.seed),
+    ], {}, logs / "fake_upstream.log")
+    server: Optional[subprocess.Popen] = None
+    stats = SwarmStats(schedule)
+    clients: List[asyncio.Task] = []
+
+    try:
+        server = spawn(
+            ["-m", "uvicorn", "api.main:app", "--host", "127.0.0.1", "--port", str(api_port), "--log-level", "warning"],
+            api_env(args, f"{upstream}{API_PREFIX}"),
+            logs / "api.log"
+        )
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
+            await wait_ready(session, api, args.matches, args.startup_timeout, server)
+            print(f"API prête ({args.matches} matchs suivis), connexion de {args.clients} clients...")
+
+            # Montée en charge étalée sur --ramp secondes
+            ws_url = f"{api.replace('http', 'ws')}/ws/live-feed"
+            connector = aiohttp.TCPConnector(limit=0)
+            async with aiohttp.ClientSession(connector=connector) as ws_session:
+                for number in range(args.clients):
+                    ready = asyncio.Event()
+                    clients.append(asyncio.create_task(run_client(ws_session, ws_url, stats, ready)))
+                    await ready.wait()
+                    if args.ramp:
+                        await asyncio.sleep(args.ramp / args.clients)
+                await asyncio.sleep(args.warmup)
+
+                health_before, buckets_before, upstream_before = await server_snapshot(session, api, upstream)
+                cpu_before = proc_cpu_seconds(server.pid)
+                client_cpu_before = time.process_time()
+                stats.measuring = True
+                started = time.monotonic()
+                rss_samples: List[float] = []
+                print(f"{stats.connected} clients connectés, mesure pendant {args.duration}s...")
+                while time.monotonic() - started < args.duration:
+                    rss = proc_rss_mb(server.pid)
+                    if rss is not None:
+                        rss_samples.append(rss)
+                    await asyncio.sleep(0.5)
+                stats.measuring = False
+                elapsed = time.monotonic() - started
+                health_after, buckets_after, upstream_after = await server_snapshot(session, api, upstream)
+                cpu_after = proc_cpu_seconds(server.pid)
+                client_cpu = time.process_time() - client_cpu_before
+
+                for task in clients:
+                    task.cancel()
+                await asyncio.gather(*clients, return_exceptions=True)
+    finally:
+        stop(server)
+        stop(upstream_process)
+
+    polls = health_after["scheduler"]["polls"] - health_before["scheduler"]["polls"]
+    published = health_after["websocket"]["published"] - health_before["websocket"]["published"]
+    upstream_requests = sum(
+        upstream_after[key] - upstream_before[key] for key in ("live", "event", "statistics")
+    )
+    server_histograms = {
+        key: bucket_quantiles(buckets_before.get(name, {}), buckets_after[name])
+        for name, key in SERVER_HISTOGRAMS.items() if name in buckets_after
+    }
+    return {
+        "benchmark": "load_test",
+        "version": RESULT_VERSION,
+        "label": args.label,
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "config": {
+            "matches": args.matches,
+            "clients": args.clients,
+            "duration_s": args.duration,
+            "latency_s": args.latency,
+            "jitter_s": args.jitter,
+            "error_rate": args.error_rate,
+            "period_s": args.period,
+            "seed": args.seed,
+            "poll_min_s": args.poll_min,
+            "poll_max_s": args.poll_max,
+            "request_budget": args.request_budget,
+            "env": api_env(args, "")
+        },
+        "results": {
+            "elapsed_s": round(elapsed, 2),
+            "clients_connected": stats.connected,
+            "connect_ms": percentiles(stats.connect_ms),
+            "messages": stats.messages,
+            "messages_per_s": round(stats.messages / elapsed, 1),
+            "bytes_per_s": round(stats.bytes / elapsed),
+            "matches_per_s": round(polls / elapsed, 2),
+            "publications_per_s": round(published / elapsed, 2),
+            "upstream_requests_per_s": round(upstream_requests / elapsed, 2),
+            "upstream_errors": upstream_after["errors"] - upstream_before["errors"],
+            "freshness_ms": percentiles(stats.freshness_ms),
+            "delivery_ms": percentiles(stats.delivery_ms),
+            "gaps": stats.gaps,
+            "disconnects": stats.disconnects,
+            "client_errors": stats.errors,
+            "server": {
+                **server_histograms,
+                "rss_mb_peak": round(max(rss_samples), 1) if rss_samples else None,
+                "rss_mb_end": round(rss_samples[-1], 1) if rss_samples else None,
+                "cpu_pct": round((cpu_after - cpu_before) / elapsed * 100, 1)
+                if cpu_before is not None and cpu_after is not None else None,
+                "websocket": health_after["websocket"],
+            },
+            "swarm": {
+                # ru_maxrss est en Ko sous Linux
+                "rss_mb_peak": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+                "cpu_pct": round(client_cpu / elapsed * 100, 1),
+            },
+        },
+    }
+
+
+def print_summary(result: Dict):
+    res = result["results"]
+    server = res["server"]
+    print(f"\n== {result['config']['matches']} matchs, {res['clients_connected']} clients, {res['elapsed_s']}s ({result['commit']})")
+    print(f"messages reçus        {res['messages_per_s']:>10} /s  ({res['bytes_per_s'] / 1024:.0f} Ko/s)")
+    print(f"matchs pollés         {res['matches_per_s']:>10} /s  (publications {res['publications_per_s']}/s, upstream {res['upstream_requests_per_s']} req/s)")
+    for label, key in (("fraîcheur (ms)", "freshness_ms"), ("livraison (ms)", "delivery_ms")):
+        values = res[key]
+        print(f"{label:<21} p50 {values['p50']}  p95 {values['p95']}  p99 {values['p99']}  max {values['max']}  (n={values['count']})")
+    for key in ("scrape_to_send_ms", "upstream_fetch_ms", "tes_strategy_ms", "fanout_ms"):
+        if key in server:
+            values = server[key]
+            print(f"serveur {key:<13} p50 {values['p50']}  p95 {values['p95']}  p99 {values['p99']}  (n={values['count']})")
+    print(f"mémoire serveur       pic {server['rss_mb_peak']} Mo, fin {server['rss_mb_end']} Mo; CPU {server['cpu_pct']}%")
+    print(f"essaim                pic {res['swarm']['rss_mb_peak']} Mo, CPU {res['swarm']['cpu_pct']}%")
+    print(f"trous de séquence {res['gaps']}, déconnexions {res['disconnects']}, erreurs {res['client_errors']}, erreurs upstream {res['upstream_errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_upstream_arguments(parser)
+    parser.add_argument("--clients", type=int, default=100, help="clients WebSocket simulés")
+    parser.add_argument("--duration", type=float, default=30.0, help="fenêtre de mesure (s)")
+    parser.add_argument("--warmup", type=float, default=5.0, help="attente après la connexion des clients (s)")
+    parser.add_argument("--ramp", type=float, default=2.0, help="durée de connexion des clients (s)")
+    parser.add_argument("--poll-min", type=float, default=2.0, help="POLL_INTERVAL_MIN de l'API")
+    parser.add_argument("--poll-max", type=float, default=10.0, help="POLL_INTERVAL_MAX de l'API")
+    parser.add_argument("--request-budget", type=float, default=100.0, help="REQUEST_BUDGET_PER_SECOND de l'API")
+    parser.add_argument("--max-concurrency", type=int, default=20, help="MAX_CONCURRENT_MATCHES de l'API")
+    parser.add_argument("--discovery-interval", type=int, default=10, help="SCRAPE_INTERVAL de l'API")
+    parser.add_argument("--env", action="append", default=[], metavar="CLÉ=VALEUR", help="paramètre de l'API en plus")
+    parser.add_argument("--startup-timeout", type=float, default=60.0, help="attente du démarrage de l'API (s)")
+    parser.add_argument("--log-dir", default="data/benchmarks", help="journaux de l'API et du faux upstream")
+    parser.add_argument("--label", default="", help="libellé libre enregistré avec le résultat")
+    parser.add_argument("--out", help="fichier JSON du résultat")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print_summary(result)
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps(result, indent=2, ensure_ascii=False))
+        print(f"\nRésultat écrit: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Configuration - Paramètres du backend lus depuis l'environnement (.env)
+"""
+
+from typing import List
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """Paramètres globaux (voir .env.example)"""
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    # Scraping
+    scrape_interval: int = 30
+    headless_browser: bool = True
+    max_concurrent_matches: int = 10
+    max_live_matches: int = 0
+    live_competitions: str = ""
+    stats_timeout: float = 15.0
+
+    # Cadence adaptative par match et budget global de requêtes
+    poll_interval_min: float = 5.0
+    poll_interval_max: float = 180.0
+    request_budget_per_second: float = 5.0
+
+    # WebSocket: file d'envoi par client et éviction des clients lents
+    ws_max_pending: int = 256
+    ws_max_lag: float = 30.0
+    ws_send_timeout: float = 10.0
+
+    # Fournisseurs de matchs ("sofascore", "fake"), agrégés s'il y en a plusieurs
+    scraper_providers: str = "sofascore"
+    # API Sofascore (un serveur local pour les benchmarks, cf. benchmarks/fake_upstream.py)
+    sofascore_api_url: str = "https://api.sofascore.com/api/v1"
+    aggregator_discovery_timeout: float = 10.0
+    aggregator_hedge_delay: float = 1.0
+    aggregator_refresh_after: float = 30.0
+
+    # Transport: "http" (aiohttp, navigateur en repli) ou "browser"
+    scraper_transport: str = "http"
+    browser_fallback: bool = True
+    http_pool_limit: int = 100
+    http_limit_per_host: int = 20
+    http_timeout: float = 10.0
+    http_retries: int = 2
+
+    # Résilience des requêtes upstream: délai par appel, requêtes doublées au p95,
+    # budget de retries global, disjoncteur par endpoint (HTTP_RETRIES passe par le budget)
+    resilience_enabled: bool = True
+    upstream_deadline: float = 8.0
+    retry_budget_ratio: float = 0.1
+    hedge_min_delay: float = 0.2
+    breaker_failure_threshold: int = 5
+    breaker_reset_timeout: float = 30.0
+
+    # Cache des réponses upstream: "memory", "redis" ou "none"
+    cache_backend: str = "memory"
+    redis_url: str = "redis://localhost:6379"
+    cache_ttl_live: float = 10.0
+    cache_ttl_stats: float = 4.0
+    cache_max_entries: int = 2000
+    cache_max_mb: int = 64
+
+    # Historique SQLite des polls et recommandations ("" = désactivé)
+    history_db_path: str = "data/history.db"
+    history_batch_size: int = 500
+    history_flush_interval: float = 2.0
+
+    # Règles des stratégies TES ("" = strategies/tes_rules.json), relues à chaud
+    strategy_rules_path: str = ""
+    strategy_reload_interval: float = 5.0
+    # Calibration des probabilités (dossier de versions v<N>.json, "" = scores bruts bornés)
+    calibration_path: str = "data/calibration"
+
+    # Alertes: un canal est actif dès qu'il est configuré
+    alert_min_confidence: str = "HIGH"
+    alert_dedup_window: float = 600.0
+    alert_batch_window: float = 0.5
+    alert_max_age: float = 120.0
+    telegram_bot_token: str = ""
+    telegram_chat_id: str = ""
+    telegram_api_url: str = "https://api.telegram.org"
+    discord_webhook_url: str = ""
+    sendgrid_api_key: str = ""
+    sendgrid_api_url: str = "https://api.sendgrid.com"
+    alert_email: str = ""
+    alert_from_email: str = "alertes@football-ai.local"
+    alert_webhook_url: str = ""
+
+    # Profileur par échantillonnage de la boucle (GET /api/metrics/profile)
+    profiler_enabled: bool = False
+    profiler_interval: float = 0.01
+
+    # Pool de navigateurs Playwright
+    browser_pool_size: int = 4
+    browser_count: int = 1
+    browser_acquire_timeout: float = 15.0
+    browser_max_page_uses: int = 200
+    browser_max_lease_time: float = 120.0
+
+    @property
+    def scraper_provider_list(self) -> List[str]:
+        return [name.strip().lower() for name in self.scraper_providers.split(",") if name.strip()]
+
+    @property
+    def live_competition_list(self) -> List[str]:
+        return [name.strip() for name in self.live_competitions.split(",") if name.strip()]
+
+
+settings = Settings()
@@ -0,0 +1,165 @@
+"""
+Profileur par échantillonnage - Où passe le temps de la boucle asyncio
+
+Un thread relève toutes les `interval` secondes la pile du thread de la
+boucle (scheduler, TES, fan-out WebSocket partagent ce thread) et compte
+les piles identiques. Aucun code n'est instrumenté: le coût est celui du
+relevé, payé hors de la boucle. Les échantillons où la boucle attend des
+I/O (pile arrêtée dans `selectors` ou dans la boucle elle-même, cas
+d'uvloop) sont comptés à part pour donner son taux d'occupation.
+
+Sortie au format "pile repliée" (`a;b;c 42`), lisible par flamegraph.pl ou
+speedscope, ou par fonction (temps propre / inclusif).
+"""
+
+from collections import Counter
+from inspect import CO_ASYNC_GENERATOR, CO_COROUTINE
+from typing import Dict, List, Optional, Set, Tuple
+import os
+import sys
+import threading
+
+# Piles distinctes conservées; les suivantes sont comptées dans OVERFLOW
+OVERFLOW = "(autres)"
+
+
+def _frame_label(code) -> str:
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def _loop_codes(frame) -> Set:
+    """Code des cadres sous la première coroutine: la boucle et ce qui l'a lancée"""
+    stack = []
+    while frame is not None:
+        stack.append(frame.f_code)
+        frame = frame.f_back
+    codes = set()
+    for code in reversed(stack):
+        if code.co_flags & (CO_COROUTINE | CO_ASYNC_GENERATOR):
+            break
+        codes.add(code)
+    return codes
+
+
+class SamplingProfiler:
+    """Échantillonneur de pile d'un thread (par défaut celui qui appelle start)"""
+
+    def __init__(self, interval: float = 0.01, max_depth: int = 64, max_stacks: int = 5000):
+        """
+        Args:
+            interval: Secondes entre deux relevés
+            max_depth: Profondeur maximum des piles (les cadres les plus
+                proches de la racine sont coupés au-delà)
+            max_stacks: Piles distinctes conservées
+        """
+        self.interval = interval
+        self.max_depth = max_depth
+        self.max_stacks = max_stacks
+        self.samples = 0
+        self.idle_samples = 0
+        self._stacks: Counter = Counter()
+        self._labels: Dict = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._target: Optional[int] = None
+        self._idle_codes: Set = set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, thread_id: Optional[int] = None):
+        """Échantillonner `thread_id`, ou le thread appelant (appelé depuis la boucle, sa pile sert à reconnaître l'attente)"""
+        if self.running:
+            return
+        if thread_id is None:
+            thread_id = threading.get_ident()
+            self._idle_codes = _loop_codes(sys._getframe(1))
+        self._target = thread_id
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._thread = None
+
+    def reset(self):
+        self.samples = 0
+        self.idle_samples = 0
+        with self._lock:
+            self._stacks = Counter()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            self.sample(frame)
+
+    def sample(self, frame):
+        """Compter la pile qui se termine par `frame`"""
+        self.samples += 1
+        if frame.f_code in self._idle_codes or frame.f_code.co_filename.endswith("selectors.py"):
+            self.idle_samples += 1
+            return
+        labels = self._labels
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            code = frame.f_code
+            label = labels.get(code)
+            if label is None:
+                label = labels[code] = _frame_label(code)
+            stack.append(label)
+            frame = frame.f_back
+        key = tuple(reversed(stack))
+        with self._lock:
+            if key not in self._stacks and len(self._stacks) >= self.max_stacks:
+                key = (OVERFLOW,)
+            self._stacks[key] += 1
+
+    def _filtered(self, focus: Optional[str]) -> List[Tuple[Tuple[str, ...], int]]:
+        with self._lock:
+            stacks = list(self._stacks.items())
+        if focus:
+            stacks = [(stack, count) for stack, count in stacks if any(focus in label for label in stack)]
+        return stacks
+
+    def collapsed(self, focus: Optional[str] = None) -> str:
+        """Piles repliées, une par ligne, les plus fréquentes d'abord"""
+        stacks = sorted(self._filtered(focus), key=lambda item: -item[1])
+        return "\n".join(f"{';'.join(stack)} {count}" for stack, count in stacks) + "\n"
+
+    def top(self, limit: int = 30, focus: Optional[str] = None) -> List[Dict]:
+        """Fonctions les plus coûteuses: temps propre (en bout de pile) et inclusif, en % des échantillons actifs"""
+        stacks = self._filtered(focus)
+        busy = sum(count for _, count in stacks)
+        own: Counter = Counter()
+        inclusive: Counter = Counter()
+        for stack, count in stacks:
+            own[stack[-1]] += count
+            for label in set(stack):
+                inclusive[label] += count
+        return [
+            {
+                "function": label,
+                "self_pct": round(own[label] / busy * 100, 2),
+                "total_pct": round(inclusive[label] / busy * 100, 2),
+            }
+            for label, _ in own.most_common(limit)
+        ] if busy else []
+
+    def stats(self) -> Dict:
+        busy = self.samples - self.idle_samples
+        return {
+            "running": self.running,
+            "interval_s": self.interval,
+            "samples": self.samples,
+            "idle_samples": self.idle_samples,
+            # Part du temps où la boucle exécute du code Python plutôt que d'attendre les I/O
+            "busy_ratio": round(busy / self.samples, 3) if self.samples else None,
+            "stacks": len(self._stacks),
+        }
@@ -0,0 +1,256 @@
+"""
+Registre de métriques - Compteurs, jauges et histogrammes
+
+Registre minimal, sans dépendance, exporté au format texte Prometheus
+(`/metrics`) et en JSON (`/api/metrics`). Les modules déclarent leurs
+métriques au chargement et les mettent à jour sur le chemin chaud pour le
+prix d'une recherche de dictionnaire (et d'un bisect pour un histogramme).
+Les compteurs déjà tenus ailleurs (stats() du cache, du pool...) sont lus
+au moment de l'export via `collect`.
+
+    FETCH = histogram("upstream_fetch_seconds", "Latence upstream", ("endpoint",))
+    FETCH.observe(0.12, "statistics")
+"""
+
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+# Latences réseau (secondes)
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+# Calcul local: décodage, évaluation TES, fan-out (secondes)
+FAST_BUCKETS: Tuple[float, ...] = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.1
+)
+# Tailles de file
+DEPTH_BUCKETS: Tuple[float, ...] = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+Labels = Tuple[str, ...]
+# Valeur lue à l'export: un nombre, ou {valeurs des labels: nombre}
+Collected = Union[float, Dict[Labels, float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    TYPE = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        collect: Optional[Callable[[], Collected]] = None
+    ):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.collect = collect
+        self._values: Dict[Labels, float] = {}
+
+    def values(self) -> Dict[Labels, float]:
+        """Valeurs courantes par labels (collectées si `collect`)"""
+        if self.collect is None:
+            return dict(self._values)
+        try:
+            collected = self.collect()
+        except Exception as e:
+            print(f"Erreur de collecte de la métrique {self.name}: {e}")
+            return {}
+        if collected is None:
+            return {}
+        if isinstance(collected, dict):
+            return {tuple(str(v) for v in key) if isinstance(key, tuple) else (str(key),): float(value)
+                    for key, value in collected.items()}
+        return {(): float(collected)}
+
+    def remove(self, *labels: str):
+        self._values.pop(labels, None)
+
+    def render(self, name: str) -> Iterator[str]:
+        for labels, value in sorted(self.values().items()):
+            yield f"{name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+
+    def to_dict(self) -> List[Dict]:
+        return [
+            {"labels": dict(zip(self.label_names, labels)), "value": round(value, 6)}
+            for labels, value in sorted(self.values().items())
+        ]
+
+
+class Counter(_Metric):
+    """Valeur qui ne fait que croître"""
+
+    TYPE = "counter"
+
+    def inc(self, amount: float = 1.0, *labels: str):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Valeur instantanée"""
+
+    TYPE = "gauge"
+
+    def set(self, value: float, *labels: str):
+        self._values[labels] = value
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+
+
+class Histogram(_Metric):
+    """Distribution par seaux cumulatifs (`le`), avec somme et effectif"""
+
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, _HistogramSeries] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = _HistogramSeries(len(self.buckets) + 1)
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.sum += value
+
+    def remove(self, *labels: str):
+        self._series.pop(labels, None)
+
+    def quantile(self, q: float, *labels: str) -> Optional[float]:
+        """Quantile estimé par interpolation linéaire dans le seau (cf. histogram_quantile)"""
+        series = self._series.get(labels)
+        return self._quantile(series, q) if series else None
+
+    def _quantile(self, series: _HistogramSeries, q: float) -> Optional[float]:
+        total = sum(series.counts)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(series.counts):
+            if seen + count >= rank and count:
+                if index == len(self.buckets):
+                    # Au-delà du dernier seau: sa borne est la meilleure estimation
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def render(self, name: str) -> Iterator[str]:
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series.counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}"
+            label_text = _format_labels(self.label_names, labels)
+            yield f"{name}_sum{label_text} {_format_value(series.sum)}"
+            yield f"{name}_count{label_text} {cumulative}"
+
+    def to_dict(self) -> List[Dict]:
+        result = []
+        for labels, series in sorted(self._series.items()):
+            count = sum(series.counts)
+            entry = {
+                "labels": dict(zip(self.label_names, labels)),
+                "count": count,
+                "sum": round(series.sum, 9),
+                "mean": round(series.sum / count, 9) if count else None,
+            }
+            for q in (0.5, 0.95, 0.99):
+                value = self._quantile(series, q)
+                entry[f"p{int(q * 100)}"] = round(value, 9) if value is not None else None
+            result.append(entry)
+        return result
+
+
+class Registry:
+    """Ensemble des métriques exportées, préfixées par `namespace`"""
+
+    def __init__(self, namespace: str = ""):
+        self.namespace = namespace
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        # Idempotent: un module rechargé retrouve sa métrique
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, *args, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Métrique {name} déjà déclarée comme {metric.TYPE}")
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = (), collect=None) -> Counter:
+        return self._register(Counter, name, help, labels, collect)
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = (), collect=None) -> Gauge:
+        return self._register(Gauge, name, help, labels, collect)
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help, labels, buckets)
+
+    def unregister(self, name: str):
+        self._metrics.pop(name, None)
+
+    def _full_name(self, name: str) -> str:
+        return f"{self.namespace}_{name}" if self.namespace else name
+
+    def render(self) -> str:
+        """Export au format texte Prometheus (version 0.0.4)"""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            full_name = self._full_name(name)
+            lines.append(f"# HELP {full_name} {metric.help}")
+            lines.append(f"# TYPE {full_name} {metric.TYPE}")
+            lines.extend(metric.render(full_name))
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> Dict:
+        """Export JSON: valeurs, et effectif / somme / quantiles des histogrammes"""
+        return {
+            self._full_name(name): {"type": metric.TYPE, "help": metric.help, "series": metric.to_dict()}
+            for name, metric in sorted(self._metrics.items())
+        }
+
+
+# Registre de l'application
+REGISTRY = Registry("football_ai")
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
@@ -0,0 +1,359 @@
+"""
+Broadcaster - Diffusion WebSocket avec une file et un émetteur par client
+
+Chaque connexion a sa propre file bornée, fusionnée par match (seule la
+dernière version d'un match en attente est conservée), et sa propre tâche
+d'envoi: un client lent ne retarde plus les autres. Un client qui n'a rien
+pu envoyer depuis `max_lag` secondes alors que des messages attendent, ou
+dont un envoi dépasse `send_timeout`, est déconnecté.
+
+Les publications ne sont routées qu'aux clients abonnés à l'un de leurs
+topics (voir `topics.py`); un client sans filtre reçoit tout.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Union
+import asyncio
+import time
+from fastapi import WebSocket
+
+from metrics.registry import DEPTH_BUCKETS, FAST_BUCKETS, histogram
+from .deltas import ClientFeedState, MatchPublication, MatchRemoval
+from .pubsub import PubSub
+from .topics import TOPIC_ALL, TopicIndex, snapshot_topics, topic
+
+Publication = Union[MatchPublication, MatchRemoval]
+
+FANOUT_SECONDS = histogram(
+    "websocket_fanout_seconds", "Mise en file d'une publication pour ses abonnés", buckets=FAST_BUCKETS
+)
+FANOUT_RECIPIENTS = histogram(
+    "websocket_fanout_recipients", "Clients destinataires d'une publication", buckets=DEPTH_BUCKETS
+)
+SEND_SECONDS = histogram("websocket_send_seconds", "Durée d'un envoi WebSocket")
+# Du début du poll upstream à la mise en file (broadcast) puis à l'envoi effectif au client
+SCRAPE_TO_BROADCAST = histogram("pipeline_scrape_to_broadcast_seconds", "Latence poll -> diffusion d'une mise à jour")
+SCRAPE_TO_SEND = histogram("pipeline_scrape_to_send_seconds", "Latence poll -> envoi au client d'une mise à jour")
+
+
+class ClientConnection:
+    """Connexion WebSocket avec sa file d'envoi fusionnée par match"""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_pending: int = 256,
+        max_lag: float = 30.0,
+        send_timeout: float = 10.0,
+        topics: Optional[Set[str]] = None
+    ):
+        self.websocket = websocket
+        self.max_pending = max_pending
+        self.max_lag = max_lag
+        self.send_timeout = send_timeout
+        self.feed = ClientFeedState()
+        # Sans filtre à la connexion: tout, jusqu'au premier `subscribe`
+        self.topics: Set[str] = set(topics) if topics else {TOPIC_ALL}
+        self.implicit_all = not topics
+
+        self._pending: "OrderedDict[str, Publication]" = OrderedDict()
+        # Dernier progrès de l'émetteur (envoi terminé ou file vide)
+        self._progress_at = time.monotonic()
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.closed = False
+        self.close_reason: Optional[str] = None
+
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    def wants(self, topics: Set[str]) -> bool:
+        return TOPIC_ALL in self.topics or not self.topics.isdisjoint(topics)
+
+    def lag(self) -> float:
+        """Secondes écoulées sans envoi alors que des messages attendent"""
+        if not self._pending:
+            return 0.0
+        return time.monotonic() - self._progress_at
+
+    def start(self):
+        self._task = asyncio.create_task(self._sender())
+
+    def enqueue(self, publication: Publication) -> bool:
+        """Mettre une publication en file (False si le client doit être évincé)"""
+        if self.closed:
+            return False
+
+        match_id = publication.match_id
+        if not self._pending:
+            self._progress_at = time.monotonic()
+
+        if match_id in self._pending:
+            # Remplacer la version en attente; le client recevra un snapshot
+            self._pending[match_id] = publication
+            self.coalesced += 1
+        else:
+            if len(self._pending) >= self.max_pending:
+                self._drop_oldest_update()
+            self._pending[match_id] = publication
+
+        self._ready.set()
+        return self.lag() <= self.max_lag
+
+    def _drop_oldest_update(self):
+        """
+        Abandonner la plus ancienne mise à jour en attente. Une suppression
+        n'est jamais abandonnée: le client garderait la carte d'un match
+        terminé (la file peut alors dépasser `max_pending`).
+        """
+        for match_id, pending in self._pending.items():
+            if isinstance(pending, MatchPublication):
+                del self._pending[match_id]
+                self.dropped += 1
+                return
+
+    def resync(self, publications: Iterable[Publication], match_ids: Optional[List[str]] = None):
+        """Renvoyer des snapshots complets (matchs suivis, ou `match_ids`)"""
+        self.feed.forget(match_ids)
+        for publication in publications:
+            if match_ids is not None and publication.match_id not in match_ids:
+                continue
+            if self.wants(snapshot_topics(publication.snapshot)):
+                self.enqueue(publication)
+
+    async def _sender(self):
+        try:
+            while not self.closed:
+                if not self._pending:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+
+                _, publication = self._pending.popitem(last=False)
+                text = self.feed.render(publication)
+                if text is None:
+                    continue
+                started = time.monotonic()
+                await asyncio.wait_for(self.websocket.send_text(text), self.send_timeout)
+                self.sent += 1
+                self._progress_at = time.monotonic()
+                SEND_SECONDS.observe(self._progress_at - started)
+                polled_at = getattr(publication, "polled_at", None)
+                if polled_at is not None:
+                    SCRAPE_TO_SEND.observe(self._progress_at - polled_at)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            await self.close("send_timeout")
+        except Exception:
+            await self.close("send_error")
+
+    async def close(self, reason: str = "closed"):
+        if self.closed:
+            return
+        self.closed = True
+        self.close_reason = reason
+        self._pending.clear()
+        self._ready.set()
+        if reason != "closed":
+            try:
+                await self.websocket.close(code=1013)
+            except Exception:
+                pass
+
+    async def stop(self):
+        await self.close()
+        if self._task and self._task is not asyncio.current_task():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+class Broadcaster:
+    """Gestionnaire des connexions WebSocket alimenté par le PubSub"""
+
+    def __init__(
+        self,
+        max_pending: int = 256,
+        max_lag: float = 30.0,
+        send_timeout: float = 10.0
+    ):
+        self.max_pending = max_pending
+        self.max_lag = max_lag
+        self.send_timeout = send_timeout
+        self.connections: Set[ClientConnection] = set()
+        self.index: TopicIndex[ClientConnection] = TopicIndex()
+        # Topics de la dernière publication de chaque match
+        self._match_topics: Dict[str, Set[str]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._closing: Set[asyncio.Task] = set()
+
+        self.published = 0
+        self.evicted = 0
+        self.fanout_seconds = 0.0
+        # Dernière latence poll -> diffusion de chaque match (secondes)
+        self.latency_by_match: Dict[str, float] = {}
+        # Compteurs des connexions fermées (ajoutés aux connexions actives)
+        self._closed_totals = {"sent": 0, "dropped": 0, "coalesced": 0}
+
+    @property
+    def active_connections(self) -> List[ClientConnection]:
+        return list(self.connections)
+
+    def start(self, pubsub: PubSub):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(pubsub))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for connection in list(self.connections):
+            await self.disconnect(connection)
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        initial: Iterable[Publication] = (),
+        topics: Optional[Set[str]] = None
+    ) -> ClientConnection:
+        """Accepter un client et lui envoyer l'état courant des matchs suivis"""
+        await websocket.accept()
+        connection = ClientConnection(websocket, self.max_pending, self.max_lag, self.send_timeout, topics)
+        for publication in initial:
+            if isinstance(publication, MatchRemoval) or connection.wants(snapshot_topics(publication.snapshot)):
+                connection.enqueue(publication)
+        connection.start()
+        self.connections.add(connection)
+        self.index.add(connection, connection.topics)
+        return connection
+
+    def subscribe(self, connection: ClientConnection, topics: Set[str], publications: Iterable[MatchPublication] = ()):
+        """Ajouter des topics; le premier abonnement explicite remplace `*`"""
+        removed = set()
+        if connection.implicit_all and TOPIC_ALL not in topics:
+            removed.add(TOPIC_ALL)
+        connection.implicit_all = False
+        self._update_topics(connection, topics, removed, publications)
+
+    def unsubscribe(self, connection: ClientConnection, topics: Set[str], publications: Iterable[MatchPublication] = ()):
+        connection.implicit_all = False
+        self._update_topics(connection, set(), topics, publications)
+
+    def _update_topics(self, connection: ClientConnection, added: Set[str], removed: Set[str], publications: Iterable[MatchPublication]):
+        """Mettre à jour l'index puis envoyer les matchs entrants et retirer les sortants"""
+        removed = (removed & connection.topics) - added
+        added = added - connection.topics
+        if connection.closed or not (added or removed):
+            return
+        if connection in self.connections:
+            self.index.remove(connection, removed)
+            self.index.add(connection, added)
+        connection.topics = (connection.topics - removed) | added
+
+        for publication in publications:
+            match_id = publication.match_id
+            if connection.wants(self._match_topics.get(match_id) or snapshot_topics(publication.snapshot)):
+                if connection.feed.sent_seq.get(match_id) != publication.seq:
+                    connection.enqueue(publication)
+            elif match_id in connection.feed.sent_seq or match_id in connection._pending:
+                connection.enqueue(MatchRemoval(match_id))
+
+    async def disconnect(self, connection: ClientConnection):
+        self._forget(connection)
+        await connection.stop()
+
+    def _forget(self, connection: ClientConnection) -> bool:
+        if connection not in self.connections:
+            return False
+        self.connections.discard(connection)
+        self.index.remove(connection, connection.topics)
+        for key in self._closed_totals:
+            self._closed_totals[key] += getattr(connection, key)
+        return True
+
+    def broadcast(self, publication: Publication):
+        """Mettre en file pour les clients abonnés (synchrone, O(1) par client)"""
+        started = time.perf_counter()
+        match_id = publication.match_id
+
+        if isinstance(publication, MatchRemoval):
+            recipients = self.index.route(self._match_topics.pop(match_id, {topic("match", match_id)}))
+            self.latency_by_match.pop(match_id, None)
+        else:
+            current = snapshot_topics(publication.snapshot)
+            previous = self._match_topics.get(match_id)
+            self._match_topics[match_id] = current
+            recipients = self.index.route(current)
+            if previous and previous != current:
+                # Clients qui ne suivent plus ce match (recommandation disparue...)
+                removal = MatchRemoval(match_id)
+                for connection in self.index.route(previous) - recipients:
+                    self._deliver(connection, removal)
+
+        for connection in recipients:
+            self._deliver(connection, publication)
+        self.published += 1
+        elapsed = time.perf_counter() - started
+        self.fanout_seconds += elapsed
+        FANOUT_SECONDS.observe(elapsed)
+        FANOUT_RECIPIENTS.observe(len(recipients))
+        polled_at = getattr(publication, "polled_at", None)
+        if polled_at is not None:
+            latency = time.monotonic() - polled_at
+            self.latency_by_match[match_id] = latency
+            SCRAPE_TO_BROADCAST.observe(latency)
+
+    def _deliver(self, connection: ClientConnection, publication: Publication):
+        if connection.closed:
+            self._forget(connection)
+        elif not connection.enqueue(publication):
+            self._evict(connection)
+
+    def _evict(self, connection: ClientConnection):
+        """Déconnecter un client trop en retard"""
+        if self._forget(connection):
+            self.evicted += 1
+            task = asyncio.create_task(connection.close("lagging"))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    async def _run(self, pubsub: PubSub):
+        with pubsub.subscribe() as subscription:
+            async for publication in subscription:
+                self.broadcast(publication)
+
+    def slowest_matches(self, limit: int = 10) -> List[Dict]:
+        """Matchs dont la dernière mise à jour a mis le plus de temps à être diffusée"""
+        ordered = sorted(self.latency_by_match.items(), key=lambda item: -item[1])[:limit]
+        return [{"match_id": match_id, "latency_ms": round(latency * 1000, 1)} for match_id, latency in ordered]
+
+    def stats(self) -> Dict:
+        depths = [connection.queue_depth for connection in self.connections]
+        totals = dict(self._closed_totals)
+        for connection in self.connections:
+            for key in totals:
+                totals[key] += getattr(connection, key)
+        return {
+            "connections": len(depths),
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "messages_sent": totals["sent"],
+            "messages_dropped": totals["dropped"],
+            "messages_coalesced": totals["coalesced"],
+            "evicted": self.evicted,
+            "published": self.published,
+            "topics": len(self.index),
+            "avg_fanout_ms": round(self.fanout_seconds / self.published * 1000, 3) if self.published else 0.0
+        }
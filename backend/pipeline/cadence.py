@@ -0,0 +1,114 @@
+"""
+Cadence - Fréquence de rafraîchissement adaptative par match
+
+Un match chaud (proche d'un seuil TES, dans la fenêtre de temps d'une
+stratégie) est rafraîchi toutes les quelques secondes, un match froid
+toutes les quelques minutes. Le budget global de requêtes est partagé
+via un token bucket.
+"""
+
+from typing import Callable, Dict, Optional
+import time
+
+from models.match_stats import MatchStats
+
+
+class TokenBucket:
+    """Budget de requêtes par seconde (non bloquant)"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self) -> int:
+        self._refill()
+        return max(0, int(self.tokens))
+
+    def take(self, count: int = 1, force: bool = False) -> int:
+        """Consommer jusqu'à `count` jetons, retourne le nombre accordé"""
+        self._refill()
+        granted = count if force else min(count, max(0, int(self.tokens)))
+        self.tokens -= granted
+        return granted
+
+    def time_until_available(self) -> float:
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+# Valeur courante de chaque seuil numérique de TESEngine.thresholds
+THRESHOLD_FEATURES: Dict[str, Callable[[MatchStats], float]] = {
+    'total_corners': lambda s: s.total('corners'),
+    'total_fouls': lambda s: s.total('fouls'),
+    'yellow_cards': lambda s: s.total('yellow_cards'),
+    'shots_on_target': lambda s: s.total('shots_on_target'),
+    'dangerous_attacks': lambda s: s.total('dangerous_attacks'),
+    'shots_min_each': lambda s: min(s.pair('shots_on_target')),
+}
+
+
+class CadencePolicy:
+    """Calcule l'intervalle avant le prochain poll d'un match"""
+
+    def __init__(
+        self,
+        thresholds: Dict[str, Dict],
+        min_interval: float = 5.0,
+        max_interval: float = 180.0,
+        halftime_interval: float = 60.0,
+        time_lead: int = 10
+    ):
+        self.thresholds = thresholds
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.halftime_interval = halftime_interval
+        self.time_lead = time_lead
+
+    def proximity(self, stats: MatchStats, minute: int) -> float:
+        """
+        Proximité (0 à 1) du match avec le déclenchement d'une stratégie
+
+        Pour chaque stratégie: ratio max entre la valeur courante et son
+        seuil, pondéré par la distance au `time_min` (0 si on en est à
+        plus de `time_lead` minutes).
+        """
+        best = 0.0
+        for threshold in self.thresholds.values():
+            time_gap = threshold.get('time_min', 0) - minute
+            if time_gap > self.time_lead:
+                continue
+            time_factor = 1.0 if time_gap <= 0 else 1 - time_gap / self.time_lead
+
+            ratios = [
+                min(1.0, feature(stats) / threshold[key])
+                for key, feature in THRESHOLD_FEATURES.items()
+                if threshold.get(key)
+            ]
+            if ratios:
+                best = max(best, max(ratios) * time_factor)
+        return best
+
+    def next_interval(self, match: Dict, stats: Optional[MatchStats], minute: Optional[int]) -> float:
+        """Intervalle (secondes) avant le prochain rafraîchissement du match"""
+        status = str(match.get('status', '')).lower()
+
+        if 'halftime' in status or 'pause' in status:
+            return self.halftime_interval
+        if 'ended' in status or 'not started' in status:
+            return self.max_interval
+        if stats is None or minute is None:
+            # Horloge ou stats inconnues: cadence intermédiaire, pas celle des matchs chauds
+            return (self.min_interval + self.max_interval) / 2
+
+        proximity = self.proximity(stats, minute)
+        # Interpolation quadratique: seuls les matchs vraiment proches sont chauds
+        return self.max_interval - (self.max_interval - self.min_interval) * proximity ** 2
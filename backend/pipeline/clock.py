@@ -0,0 +1,159 @@
+"""
+Match Clock - Minute de jeu réelle de chaque match
+
+La minute est déduite du statut et du début de la période en cours
+(`time.currentPeriodStartTimestamp` + `time.initial` chez Sofascore), temps
+additionnel compris: 47e minute en fin de première période = "45+2'". La
+mi-temps et les pauses figent l'horloge. L'état de chaque match est gardé
+entre deux polls et l'horloge avance localement, sans requête en plus.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+import time
+
+# Codes de statut Sofascore -> (période, début de période en minutes, fin réglementaire)
+PERIOD_CODES: Dict[int, Tuple[str, int, int]] = {
+    6: ('1st half', 0, 45),
+    7: ('2nd half', 45, 90),
+    41: ('1st extra', 90, 105),
+    42: ('2nd extra', 105, 120),
+}
+# Pauses: minute affichée pendant l'arrêt de jeu
+PAUSE_CODES: Dict[int, int] = {
+    31: 45,    # mi-temps
+    32: 90,    # attente des prolongations
+    33: 105,   # mi-temps des prolongations
+    34: 120,   # attente des tirs au but
+    50: 120,   # tirs au but
+}
+FINISHED_CODES = {100, 110, 120}
+
+# Repli sur le libellé du statut (autres sources, anciens matchs en cache)
+PERIOD_LABELS = [
+    ('1st extra', PERIOD_CODES[41]),
+    ('2nd extra', PERIOD_CODES[42]),
+    ('1st', PERIOD_CODES[6]),
+    ('2nd', PERIOD_CODES[7]),
+]
+PAUSE_LABELS = [
+    ('extra time halftime', 105),
+    ('awaiting extra', 90),
+    ('awaiting penalties', 120),
+    ('penalties', 120),
+    ('halftime', 45),
+    ('pause', 45),
+]
+
+# Temps additionnel maximum compté avant de considérer l'état comme périmé
+MAX_STOPPAGE = 15
+
+
+@dataclass
+class ClockState:
+    """Dernier état connu de l'horloge d'un match"""
+    period: Optional[str]
+    period_start: Optional[float]   # timestamp Unix du coup d'envoi de la période
+    offset: int                     # minutes déjà jouées au début de la période
+    regulation_end: int             # fin réglementaire de la période (45, 90...)
+    paused_at: Optional[int] = None  # minute figée (mi-temps, pause, fin)
+    finished: bool = False
+
+    def minute(self, now: Optional[float] = None) -> Optional[int]:
+        """Minute en cours (1 à 90+), temps additionnel compris"""
+        if self.paused_at is not None:
+            return self.paused_at
+        if self.period_start is None:
+            return None
+        elapsed = int(((now if now is not None else time.time()) - self.period_start) // 60)
+        minute = self.offset + max(0, elapsed) + 1
+        # Sans nouveau poll, l'horloge ne dépasse pas la fin de période + MAX_STOPPAGE
+        return min(minute, self.regulation_end + MAX_STOPPAGE)
+
+    def display(self, now: Optional[float] = None) -> Optional[str]:
+        """Libellé affiché: "67'", "45+2'", "HT", "FT" """
+        if self.finished:
+            return "FT"
+        if self.paused_at == 45:
+            return "HT"
+        minute = self.minute(now)
+        if minute is None:
+            return None
+        if self.paused_at is None and minute > self.regulation_end:
+            return f"{self.regulation_end}+{minute - self.regulation_end}'"
+        return f"{minute}'"
+
+
+def clock_state(match: Dict) -> Optional[ClockState]:
+    """
+    État d'horloge d'un match normalisé (cf. base_scraper)
+
+    Utilise `status_code` et `period_initial` quand la source les fournit,
+    sinon le libellé `status`. None si le match n'a pas commencé ou si son
+    statut est inconnu.
+    """
+    code = match.get('status_code')
+    status = str(match.get('status', '')).lower()
+    period_start = match.get('time')
+    if not isinstance(period_start, (int, float)) or not period_start:
+        period_start = None
+
+    if code in FINISHED_CODES or status in ('ended', 'ft', 'finished', 'aet', 'ap'):
+        end = 120 if code in (110, 120) or status in ('aet', 'ap') else 90
+        return ClockState(None, None, end, end, paused_at=end, finished=True)
+
+    pause = PAUSE_CODES.get(code)
+    if pause is None and code not in PERIOD_CODES:
+        pause = next((minute for label, minute in PAUSE_LABELS if label in status), None)
+    if pause is not None:
+        return ClockState(None, None, pause, pause, paused_at=pause)
+
+    period = PERIOD_CODES.get(code)
+    if period is None:
+        period = next((value for label, value in PERIOD_LABELS if label in status), None)
+    if period is None:
+        return None
+
+    name, offset, regulation_end = period
+    initial = match.get('period_initial')
+    if isinstance(initial, (int, float)) and initial >= 0:
+        # `time.initial` (secondes) fait foi pour le début de période
+        offset = int(initial) // 60
+    return ClockState(name, period_start, offset, regulation_end)
+
+
+def match_minute(match: Dict, now: Optional[float] = None) -> Optional[int]:
+    """Minute de jeu d'un match, sans cache"""
+    state = clock_state(match)
+    return state.minute(now) if state else None
+
+
+class MatchClock:
+    """Horloges de tous les matchs suivis, mises à jour à chaque découverte"""
+
+    def __init__(self):
+        self._states: Dict[str, ClockState] = {}
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def update(self, match: Dict) -> Optional[ClockState]:
+        """Mettre à jour l'horloge d'un match à partir de ses dernières infos"""
+        state = clock_state(match)
+        if state is None:
+            self._states.pop(match['id'], None)
+        else:
+            self._states[match['id']] = state
+        return state
+
+    def minute(self, match_id: str, now: Optional[float] = None) -> Optional[int]:
+        """Minute courante (avancée localement depuis le dernier état connu)"""
+        state = self._states.get(match_id)
+        return state.minute(now) if state else None
+
+    def display(self, match_id: str, now: Optional[float] = None) -> Optional[str]:
+        state = self._states.get(match_id)
+        return state.display(now) if state else None
+
+    def remove(self, match_id: str) -> bool:
+        return self._states.pop(match_id, None) is not None
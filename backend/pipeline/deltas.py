@@ -0,0 +1,219 @@
+"""
+Deltas - Snapshots versionnés par match et messages différentiels
+
+Chaque mise à jour publiée porte un numéro de séquence par match. Un client
+qui a reçu la version précédente ne reçoit que le delta (compteurs, score,
+recommandations modifiés); sinon il reçoit un snapshot complet. Le JSON de
+chaque publication n'est sérialisé qu'une fois, quel que soit le nombre de
+clients.
+"""
+
+from typing import Dict, Iterable, List, Optional, Union
+import json
+
+
+def _dumps(message: Dict) -> str:
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def diff_dict(previous: Dict, current: Dict) -> Dict:
+    """Clés modifiées de `current`, sur un niveau d'imbrication ({'home', 'away'})"""
+    changed = {}
+    for key, value in current.items():
+        old = previous.get(key)
+        if isinstance(value, dict) and isinstance(old, dict):
+            sub = {k: v for k, v in value.items() if old.get(k) != v}
+            if sub:
+                changed[key] = sub
+        elif old != value:
+            changed[key] = value
+    return changed
+
+
+def recommendation_key(rec: Dict) -> str:
+    """Identité d'une recommandation: sa stratégie (plusieurs règles peuvent viser le même type de pari)"""
+    return rec.get("strategy") or rec["bet_type"]
+
+
+def diff_recommendations(previous: List[Dict], current: List[Dict]) -> Dict:
+    """Recommandations ajoutées/modifiées et stratégies disparues"""
+    old_by_key = {recommendation_key(rec): rec for rec in previous}
+    new_keys = {recommendation_key(rec) for rec in current}
+
+    upsert = [rec for rec in current if old_by_key.get(recommendation_key(rec)) != rec]
+    removed = [key for key in old_by_key if key not in new_keys]
+
+    changes = {}
+    if upsert:
+        changes["upsert"] = upsert
+    if removed:
+        changes["removed"] = removed
+    return changes
+
+
+def apply_delta(snapshot: Dict, delta: Dict) -> Dict:
+    """Appliquer un `match_delta` à un snapshot (miroir de useWebSocket)"""
+    result = dict(snapshot)
+    for section in ("match", "stats"):
+        if section in delta:
+            merged = dict(snapshot.get(section, {}))
+            for key, value in delta[section].items():
+                if isinstance(value, dict) and isinstance(merged.get(key), dict):
+                    merged[key] = {**merged[key], **value}
+                else:
+                    merged[key] = value
+            result[section] = merged
+
+    if "recommendations" in delta:
+        changes = delta["recommendations"]
+        by_key = {recommendation_key(rec): rec for rec in snapshot.get("recommendations", [])}
+        for key in changes.get("removed", []):
+            by_key.pop(key, None)
+        for rec in changes.get("upsert", []):
+            by_key[recommendation_key(rec)] = rec
+        result["recommendations"] = sorted(by_key.values(), key=lambda r: r["probability"], reverse=True)
+
+    result["seq"] = delta["seq"]
+    result["timestamp"] = delta["timestamp"]
+    return result
+
+
+class MatchPublication:
+    """Version `seq` d'un match: snapshot complet + delta depuis `seq - 1`"""
+
+    __slots__ = ("match_id", "seq", "snapshot", "delta", "polled_at", "_snapshot_json", "_delta_json")
+
+    def __init__(self, match_id: str, seq: int, snapshot: Dict, delta: Optional[Dict]):
+        self.match_id = match_id
+        self.seq = seq
+        self.snapshot = snapshot
+        self.delta = delta
+        # Début du poll qui a produit cette version (time.monotonic), pour la latence de bout en bout
+        self.polled_at: Optional[float] = None
+        self._snapshot_json: Optional[str] = None
+        self._delta_json: Optional[str] = None
+
+    @property
+    def snapshot_json(self) -> str:
+        if self._snapshot_json is None:
+            self._snapshot_json = _dumps(self.snapshot)
+        return self._snapshot_json
+
+    @property
+    def delta_json(self) -> Optional[str]:
+        if self.delta is None:
+            return None
+        if self._delta_json is None:
+            self._delta_json = _dumps(self.delta)
+        return self._delta_json
+
+
+class SnapshotStore:
+    """Dernière publication de chaque match, côté serveur"""
+
+    def __init__(self):
+        self.latest: Dict[str, MatchPublication] = {}
+
+    def update(self, match: Dict, stats: Dict, recommendations: List[Dict], timestamp: str) -> Optional[MatchPublication]:
+        """
+        Enregistrer l'état courant d'un match
+
+        Returns:
+            La nouvelle publication, ou None si rien n'a changé
+        """
+        match_id = match["id"]
+        previous = self.latest.get(match_id)
+        seq = previous.seq + 1 if previous else 1
+
+        snapshot = {
+            "type": "match_update",
+            "match_id": match_id,
+            "seq": seq,
+            "match": match,
+            "stats": stats,
+            "recommendations": recommendations,
+            "timestamp": timestamp
+        }
+
+        delta = None
+        if previous:
+            changes = {}
+            for section in ("match", "stats"):
+                section_changes = diff_dict(previous.snapshot[section], snapshot[section])
+                if section_changes:
+                    changes[section] = section_changes
+            rec_changes = diff_recommendations(previous.snapshot["recommendations"], recommendations)
+            if rec_changes:
+                changes["recommendations"] = rec_changes
+            if not changes:
+                return None
+
+            delta = {
+                "type": "match_delta",
+                "match_id": match_id,
+                "seq": seq,
+                "base_seq": previous.seq,
+                **changes,
+                "timestamp": timestamp
+            }
+
+        publication = MatchPublication(match_id, seq, snapshot, delta)
+        self.latest[match_id] = publication
+        return publication
+
+    def remove(self, match_id: str) -> bool:
+        return self.latest.pop(match_id, None) is not None
+
+    def values(self) -> Iterable[MatchPublication]:
+        return list(self.latest.values())
+
+    def __contains__(self, match_id: str) -> bool:
+        return match_id in self.latest
+
+    def __len__(self) -> int:
+        return len(self.latest)
+
+
+class MatchRemoval:
+    """Publication signalant qu'un match n'est plus en direct"""
+
+    __slots__ = ("match_id", "json")
+
+    def __init__(self, match_id: str):
+        self.match_id = match_id
+        self.json = _dumps({"type": "match_removed", "match_id": match_id})
+
+
+class ClientFeedState:
+    """Dernière séquence envoyée à un client, par match"""
+
+    def __init__(self):
+        self.sent_seq: Dict[str, int] = {}
+        self.deltas_sent = 0
+        self.snapshots_sent = 0
+
+    def render(self, publication: Union[MatchPublication, MatchRemoval]) -> Optional[str]:
+        """Texte à envoyer pour cette publication (delta si possible), None si déjà envoyée"""
+        if isinstance(publication, MatchRemoval):
+            if self.sent_seq.pop(publication.match_id, None) is None:
+                return None
+            return publication.json
+
+        last = self.sent_seq.get(publication.match_id)
+        if last is not None and last >= publication.seq:
+            return None
+
+        self.sent_seq[publication.match_id] = publication.seq
+        if last == publication.seq - 1 and publication.delta is not None:
+            self.deltas_sent += 1
+            return publication.delta_json
+        self.snapshots_sent += 1
+        return publication.snapshot_json
+
+    def forget(self, match_ids: Optional[Iterable[str]] = None):
+        """Forcer un snapshot complet au prochain envoi (resync client)"""
+        if match_ids is None:
+            self.sent_seq.clear()
+        else:
+            for match_id in match_ids:
+                self.sent_seq.pop(match_id, None)
@@ -0,0 +1,83 @@
+"""
+PubSub - Diffusion en mémoire des mises à jour vers les abonnés
+"""
+
+from typing import Any, Set
+import asyncio
+
+from .deltas import MatchRemoval
+
+
+class Subscription:
+    """Abonnement: file bornée consommée par un itérateur asynchrone"""
+
+    def __init__(self, pubsub: "PubSub", max_queue: int):
+        self._pubsub = pubsub
+        self.max_queue = max_queue
+        # Borne appliquée par put() (cf. _drop_oldest_update)
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.dropped = 0
+
+    def put(self, message: Any):
+        """Déposer un message (file pleine: la plus ancienne mise à jour est abandonnée)"""
+        if self.queue.qsize() >= self.max_queue:
+            self._drop_oldest_update()
+        self.queue.put_nowait(message)
+
+    def _drop_oldest_update(self):
+        """
+        Abandonner le plus ancien message qui n'est pas une suppression de
+        match: le client garderait la carte d'un match terminé (la file peut
+        alors dépasser `max_queue`).
+        """
+        pending = [self.queue.get_nowait() for _ in range(self.queue.qsize())]
+        for index, message in enumerate(pending):
+            if not isinstance(message, MatchRemoval):
+                del pending[index]
+                self.dropped += 1
+                break
+        for message in pending:
+            self.queue.put_nowait(message)
+
+    def close(self):
+        self._pubsub.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Any:
+        return await self.queue.get()
+
+
+class PubSub:
+    """Canal unique publish/subscribe, sans I/O: publish ne bloque jamais"""
+
+    def __init__(self, max_queue: int = 500):
+        self.max_queue = max_queue
+        self._subscribers: Set[Subscription] = set()
+        self.published = 0
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self, self.max_queue)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    def publish(self, message: Any) -> int:
+        """Publier un message à tous les abonnés, retourne le nombre d'abonnés"""
+        self.published += 1
+        for subscription in self._subscribers:
+            subscription.put(message)
+        return len(self._subscribers)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
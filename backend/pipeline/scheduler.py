@@ -0,0 +1,336 @@
+"""
+Ingestion Scheduler - Boucle de scraping unique pour toute l'application
+
+Le scheduler découvre les matchs live toutes les `interval` secondes puis
+rafraîchit chaque match selon sa propre cadence (file de priorité sur la
+date du prochain poll), dans la limite d'un budget global de requêtes par
+seconde. Les mises à jour sont publiées dans le PubSub: les clients
+WebSocket ne font que s'abonner, la charge upstream ne dépend plus du
+nombre de dashboards ouverts.
+"""
+
+from contextlib import aclosing
+from typing import Callable, Dict, List, Optional, Tuple
+from datetime import datetime
+import asyncio
+import heapq
+import itertools
+import time
+
+from alerts.dispatcher import AlertDispatcher
+from metrics.registry import FAST_BUCKETS, histogram
+from models.match_stats import MatchStats
+from scrapers.base_scraper import BaseScraper
+from storage.history import HistoryStore
+from strategies.tes_engine import TESEngine, BetRecommendation
+from strategies.trends import TrendTracker
+from .cadence import CadencePolicy, TokenBucket
+from .clock import MatchClock
+from .deltas import MatchPublication, MatchRemoval, SnapshotStore
+from .pubsub import PubSub
+
+DISCOVERY_SECONDS = histogram("scheduler_discovery_seconds", "Durée d'une découverte des matchs live")
+POLL_SECONDS = histogram("scheduler_poll_batch_seconds", "Récupération des stats d'un lot de matchs")
+PUBLISH_SECONDS = histogram(
+    "scheduler_publish_seconds", "Analyse TES et publication d'un lot de matchs", buckets=FAST_BUCKETS
+)
+
+
+def recommendation_to_dict(rec: BetRecommendation, detailed: bool = False) -> Dict:
+    """Convertir une recommandation en dict pour le JSON"""
+    data = {
+        "bet_type": rec.bet_type.value,
+        "strategy": rec.strategy,
+        "description": rec.description,
+        "confidence": rec.confidence.value,
+        "probability": round(rec.probability * 100, 1),
+        "reasoning": rec.reasoning
+    }
+    if detailed:
+        data["current_stats"] = rec.current_stats
+        data["threshold_reached"] = rec.threshold_reached
+        if rec.raw_probability is not None:
+            data["raw_probability"] = round(rec.raw_probability * 100, 1)
+    return data
+
+
+class IngestionScheduler:
+    """Tâche de fond qui alimente le PubSub en `match_update`"""
+
+    def __init__(
+        self,
+        scraper_factory: Callable[[], BaseScraper],
+        tes_engine: TESEngine,
+        pubsub: PubSub,
+        interval: float = 30,
+        max_live_matches: int = 0,
+        max_concurrency: int = 10,
+        stats_timeout: float = 15.0,
+        error_backoff: float = 5.0,
+        cadence: Optional[CadencePolicy] = None,
+        request_budget: float = 5.0,
+        competitions: Optional[List[str]] = None,
+        history: Optional[HistoryStore] = None,
+        alerts: Optional[AlertDispatcher] = None
+    ):
+        self.scraper_factory = scraper_factory
+        self.tes_engine = tes_engine
+        self.pubsub = pubsub
+        self.interval = interval
+        self.max_live_matches = max_live_matches
+        self.max_concurrency = max_concurrency
+        self.stats_timeout = stats_timeout
+        self.error_backoff = error_backoff
+        self.cadence = cadence or CadencePolicy(tes_engine.thresholds)
+        self.budget = TokenBucket(request_budget)
+        # Compétitions suivies (None = toutes), filtrées pendant la lecture du flux
+        self.competitions = competitions or None
+        # Historique persistant de chaque poll (optionnel)
+        self.history = history
+        # Alertes sur les recommandations (optionnel, non bloquant)
+        self.alerts = alerts
+
+        # Dernière publication par match (snapshot envoyé aux nouveaux abonnés)
+        self.latest = SnapshotStore()
+        # Minute de jeu de chaque match, avancée localement entre deux découvertes
+        self.clock = MatchClock()
+        # Rythmes récents de chaque match (fenêtres glissantes lues par TES)
+        self.trends = TrendTracker()
+        self.matches: Dict[str, Dict] = {}
+        self.cycles = 0
+        self.polls = 0
+        self.last_cycle_at: Optional[datetime] = None
+
+        # File de priorité (date du prochain poll, n°, match_id); les entrées
+        # dont la date ne correspond plus à self._due sont ignorées
+        self._queue: List = []
+        self._due: Dict[str, float] = {}
+        self._counter = itertools.count()
+        self._in_flight = 0
+        self._next_discovery = 0.0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._batches: set = set()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        for task in [self._task, *self._batches]:
+            if task:
+                task.cancel()
+        for task in [self._task, *self._batches]:
+            if task:
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._batches.clear()
+
+    def schedule(self, match_id: str, delay: float):
+        """(Re)programmer le prochain poll d'un match"""
+        due = time.monotonic() + delay
+        self._due[match_id] = due
+        heapq.heappush(self._queue, (due, next(self._counter), match_id))
+        self._wakeup.set()
+
+    def queue_size(self) -> int:
+        return len(self._due)
+
+    async def _loop(self):
+        while True:
+            try:
+                async with self.scraper_factory() as scraper:
+                    while True:
+                        if time.monotonic() >= self._next_discovery:
+                            try:
+                                await self.discover(scraper)
+                            except Exception as e:
+                                # Les matchs déjà suivis continuent d'être pollés
+                                print(f"Erreur de découverte des matchs live: {e}")
+                        self._dispatch_due(scraper)
+                        await self._sleep_until_next()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Erreur dans la boucle d'ingestion: {e}")
+                await asyncio.sleep(self.error_backoff)
+
+    async def discover(self, scraper: BaseScraper):
+        """
+        Rafraîchir la liste des matchs live et programmer les nouveaux
+
+        La liste est lue en flux: chaque nouveau match part en poll dès
+        qu'il est décodé, sans attendre la fin de la réponse. Les matchs
+        absents ne sont oubliés que si la liste a été lue en entier.
+        """
+        started = time.monotonic()
+        self._next_discovery = started + self.interval
+        self.budget.take(1, force=True)
+
+        live_ids = set()
+        async with aclosing(scraper.iter_live_matches(self.competitions)) as matches:
+            async for match in matches:
+                match_id = match['id']
+                live_ids.add(match_id)
+                self.clock.update(match)
+                if match_id not in self.matches:
+                    self.matches[match_id] = match
+                    self.schedule(match_id, 0)
+                    self._dispatch_due(scraper)
+                else:
+                    self.matches[match_id] = match
+
+                # Limiter le nombre de matchs suivis (0 = pas de limite)
+                if self.max_live_matches and len(live_ids) >= self.max_live_matches:
+                    break
+
+        # Oublier les matchs qui ne sont plus en direct
+        for match_id in list(self.matches):
+            if match_id not in live_ids:
+                del self.matches[match_id]
+                self._due.pop(match_id, None)
+                self.trends.remove(match_id)
+                self.clock.remove(match_id)
+                self.tes_engine.forget(match_id)
+                if self.latest.remove(match_id):
+                    self.pubsub.publish(MatchRemoval(match_id))
+
+        self.cycles += 1
+        self.last_cycle_at = datetime.now()
+        DISCOVERY_SECONDS.observe(time.monotonic() - started)
+
+    def _pop_due(self, limit: int) -> List[str]:
+        now = time.monotonic()
+        due_ids = []
+        while self._queue and len(due_ids) < limit and self._queue[0][0] <= now:
+            due, _, match_id = heapq.heappop(self._queue)
+            if self._due.get(match_id) == due:
+                del self._due[match_id]
+                due_ids.append(match_id)
+        return due_ids
+
+    def _dispatch_due(self, scraper: BaseScraper):
+        """Lancer un lot pour les matchs échus, dans la limite du budget"""
+        limit = min(self.max_concurrency - self._in_flight, self.budget.available())
+        if limit <= 0:
+            return
+        due_ids = self._pop_due(limit)
+        if not due_ids:
+            return
+
+        self.budget.take(len(due_ids), force=True)
+        self._in_flight += len(due_ids)
+        task = asyncio.create_task(self._poll_batch(scraper, due_ids))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _sleep_until_next(self):
+        now = time.monotonic()
+        wake_at = self._next_discovery
+        if self._queue:
+            wake_at = min(wake_at, self._queue[0][0])
+        delay = max(0.0, wake_at - now)
+        if self._queue and self._queue[0][0] <= now:
+            # Des matchs attendent: budget ou concurrence épuisés
+            delay = max(0.05, self.budget.time_until_available())
+
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _poll_batch(self, scraper: BaseScraper, match_ids: List[str]):
+        started = time.monotonic()
+        try:
+            results = await scraper.get_many_match_stats(
+                match_ids,
+                max_concurrency=self.max_concurrency,
+                timeout=self.stats_timeout
+            )
+            POLL_SECONDS.observe(time.monotonic() - started)
+            polled = []
+            for match_id, result in results.items():
+                match = self.matches.get(match_id)
+                if match is None:
+                    continue
+                if not result.ok:
+                    print(f"Stats indisponibles pour le match {match_id}: {result.error}")
+                    self.schedule(match_id, self.error_backoff)
+                    continue
+                polled.append((match, result.stats))
+            self.publish_many(polled, started)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Erreur de poll pour {len(match_ids)} matchs: {e}")
+        finally:
+            # Un match sorti de la file sans être reprogrammé ne serait plus jamais pollé
+            for match_id in match_ids:
+                if match_id in self.matches and match_id not in self._due:
+                    self.schedule(match_id, self.error_backoff)
+            self._in_flight -= len(match_ids)
+            self._wakeup.set()
+
+    def publish_many(
+        self,
+        polled: List[Tuple[Dict, MatchStats]],
+        polled_at: Optional[float] = None
+    ) -> List[Optional[MatchPublication]]:
+        """Analyser un lot de (match, stats) en une passe vectorisée puis publier"""
+        if not polled:
+            return []
+        started = time.perf_counter()
+        minutes = [self.clock.minute(match['id']) for match, _ in polled]
+        trends = [self.trends.update(match['id'], stats) for match, stats in polled]
+        analyses = self.tes_engine.analyze_batch(
+            [stats for _, stats in polled], minutes, trends, [match['id'] for match, _ in polled]
+        )
+        publications = [
+            self.publish(match, stats, recommendations, minute, polled_at)
+            for (match, stats), recommendations, minute in zip(polled, analyses, minutes)
+        ]
+        PUBLISH_SECONDS.observe(time.perf_counter() - started)
+        return publications
+
+    def publish(
+        self,
+        match: Dict,
+        stats: MatchStats,
+        recommendations: Optional[List[BetRecommendation]] = None,
+        minute: Optional[int] = None,
+        polled_at: Optional[float] = None
+    ) -> Optional[MatchPublication]:
+        """
+        Analyser un match, publier la mise à jour et programmer le suivant
+
+        Rien n'est publié si ni le match, ni les stats, ni les
+        recommandations n'ont changé depuis la version précédente.
+        `polled_at` (time.monotonic au début du poll) sert à mesurer la
+        latence jusqu'aux clients WebSocket.
+        """
+        if recommendations is None:
+            minute = self.clock.minute(match['id'])
+            trend = self.trends.update(match['id'], stats)
+            recommendations = self.tes_engine.analyze_match(stats, minute, trend, match['id'])
+
+        publication = self.latest.update(
+            {**match, 'minute': minute, 'clock': self.clock.display(match['id'])},
+            stats.to_dict(),
+            [recommendation_to_dict(rec) for rec in recommendations],
+            datetime.now().isoformat()
+        )
+        if publication:
+            publication.polled_at = polled_at
+            self.pubsub.publish(publication)
+        if self.history is not None:
+            self.history.record(match, stats, recommendations, minute)
+        if self.alerts is not None and recommendations:
+            self.alerts.submit(match, recommendations, minute)
+        self.polls += 1
+
+        self.schedule(match['id'], self.cadence.next_interval(match, stats, minute))
+        return publication
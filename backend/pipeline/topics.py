@@ -0,0 +1,95 @@
+"""
+Topics - Abonnements WebSocket par match, compétition, type de pari ou confiance
+
+Chaque publication est étiquetée par ses topics (`match:<id>`,
+`competition:<nom>`, `bet_type:<type>`, `confidence:<niveau>`). Un index
+topic -> connexions permet de ne router une mise à jour qu'aux clients
+concernés, sans parcourir toutes les connexions. Les filtres d'un client
+se cumulent (union); `*` reçoit tout.
+"""
+
+from typing import Dict, Generic, Iterable, Mapping, Set, TypeVar
+
+TOPIC_ALL = "*"
+
+# Clé des messages subscribe/unsubscribe -> préfixe du topic
+FILTER_KINDS: Dict[str, str] = {
+    "matches": "match",
+    "competitions": "competition",
+    "bet_types": "bet_type",
+    "confidences": "confidence",
+}
+
+T = TypeVar("T")
+
+
+def topic(kind: str, value) -> str:
+    return f"{kind}:{value}"
+
+
+def topics_from_filters(filters: Mapping) -> Set[str]:
+    """Topics d'un message `{"matches": [...], "bet_types": [...], ...}`"""
+    topics = set()
+    if filters.get("all"):
+        topics.add(TOPIC_ALL)
+    for key, kind in FILTER_KINDS.items():
+        values = filters.get(key) or []
+        if isinstance(values, (str, int)):
+            values = [values]
+        for value in values:
+            if isinstance(value, (str, int)) and str(value):
+                topics.add(topic(kind, value))
+    return topics
+
+
+def topics_from_query(params: Mapping[str, str]) -> Set[str]:
+    """Topics des paramètres de connexion (`?matches=1,2&bet_types=corner`)"""
+    filters = {
+        key: [value for value in params[key].split(",") if value]
+        for key in FILTER_KINDS
+        if params.get(key)
+    }
+    return topics_from_filters(filters)
+
+
+def snapshot_topics(snapshot: Dict) -> Set[str]:
+    """Topics d'un snapshot `match_update`"""
+    topics = {topic("match", snapshot["match_id"])}
+    competition = snapshot.get("match", {}).get("competition")
+    if competition:
+        topics.add(topic("competition", competition))
+    for rec in snapshot.get("recommendations", []):
+        topics.add(topic("bet_type", rec["bet_type"]))
+        topics.add(topic("confidence", rec["confidence"]))
+    return topics
+
+
+class TopicIndex(Generic[T]):
+    """Index topic -> abonnés"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[T]] = {}
+
+    def add(self, subscriber: T, topics: Iterable[str]):
+        for name in topics:
+            self._subscribers.setdefault(name, set()).add(subscriber)
+
+    def remove(self, subscriber: T, topics: Iterable[str]):
+        for name in topics:
+            subscribers = self._subscribers.get(name)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[name]
+
+    def route(self, topics: Iterable[str]) -> Set[T]:
+        """Abonnés d'au moins un des topics (ou de `*`)"""
+        recipients = set(self._subscribers.get(TOPIC_ALL, ()))
+        for name in topics:
+            subscribers = self._subscribers.get(name)
+            if subscribers:
+                recipients.update(subscribers)
+        return recipients
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
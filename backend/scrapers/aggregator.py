@@ -0,0 +1,480 @@
+"""
+Aggregator Scraper - Plusieurs fournisseurs derrière l'interface BaseScraper
+
+- Découverte: tous les fournisseurs sont lus en parallèle; un match est
+  rendu dès que la première source le décrit
+- Identité: les matchs sont rapprochés d'une source à l'autre par les noms
+  d'équipe normalisés et l'heure du coup d'envoi (MatchIndex). L'identifiant
+  exposé est celui du fournisseur principal (le premier), sinon
+  "<source>:<id>"
+- Stats: la source la plus rapide d'abord; si elle tarde (`hedge_delay`) ou
+  échoue, la suivante est interrogée en parallèle. Les autres sources sont
+  relues en tâche de fond toutes les `refresh_after` secondes par match, et
+  les stats fusionnées avec leurs réponses récentes: le maximum pour les
+  compteurs (ils ne font que croître, la valeur la plus haute est la plus
+  fraîche), la réponse la plus récente pour la possession
+- Santé: latence moyenne et échecs consécutifs par fournisseur; après
+  `max_failures` échecs, un fournisseur est mis de côté `cooldown` secondes
+"""
+
+from contextlib import AsyncExitStack, aclosing
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
+from array import array
+import asyncio
+import re
+import time
+import unicodedata
+
+from models.match_stats import MatchStats, STAT_INDEX
+from .base_scraper import BaseScraper
+
+# Mots ignorés dans les noms d'équipe ("FC Barcelona" = "Barcelona")
+_TEAM_NOISE = {'fc', 'cf', 'afc', 'sc', 'ac', 'cd', 'fk', 'sk', 'club', 'the'}
+_POSSESSION = 2 * STAT_INDEX['possession']
+
+
+def team_key(name: str) -> str:
+    """Nom d'équipe comparable entre sources: sans accents, casse ni sigles"""
+    text = unicodedata.normalize('NFKD', name or '').encode('ascii', 'ignore').decode().lower()
+    tokens = re.findall(r"[a-z0-9]+", text)
+    kept = [token for token in tokens if token not in _TEAM_NOISE]
+    return " ".join(kept or tokens)
+
+
+@dataclass
+class _IndexEntry:
+    match_id: str
+    start_time: Optional[float]
+    provider_ids: Dict[str, str] = field(default_factory=dict)
+    last_seen: float = 0.0
+
+
+class MatchIndex:
+    """Correspondance des identifiants de match entre fournisseurs"""
+
+    def __init__(self, primary: str, kickoff_tolerance: float = 3 * 3600):
+        self.primary = primary
+        self.kickoff_tolerance = kickoff_tolerance
+        self._by_teams: Dict[Tuple[str, str], List[_IndexEntry]] = {}
+        self._by_provider: Dict[Tuple[str, str], _IndexEntry] = {}
+        self._by_id: Dict[str, _IndexEntry] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def resolve(self, source: str, match: Dict) -> str:
+        """Identifiant agrégé d'un match décrit par `source`"""
+        now = time.monotonic()
+        entry = self._by_provider.get((source, match['id']))
+        if entry is None:
+            entry = self._match_entry(source, match)
+            entry.provider_ids[source] = match['id']
+            self._by_provider[(source, match['id'])] = entry
+        entry.last_seen = now
+        return entry.match_id
+
+    def _match_entry(self, source: str, match: Dict) -> _IndexEntry:
+        teams = (team_key(match.get('home_team', '')), team_key(match.get('away_team', '')))
+        start_time = match.get('start_time')
+        if not isinstance(start_time, (int, float)):
+            start_time = None
+        candidates = self._by_teams.setdefault(teams, [])
+        for entry in candidates:
+            if source in entry.provider_ids:
+                continue
+            if start_time is None or entry.start_time is None \
+                    or abs(start_time - entry.start_time) <= self.kickoff_tolerance:
+                return entry
+        match_id = match['id'] if source == self.primary else f"{source}:{match['id']}"
+        entry = _IndexEntry(match_id, start_time)
+        candidates.append(entry)
+        self._by_id[match_id] = entry
+        return entry
+
+    def providers(self, match_id: str) -> Dict[str, str]:
+        """{source: identifiant chez la source}; vide si le match n'a pas été découvert"""
+        entry = self._by_id.get(match_id)
+        return entry.provider_ids if entry else {}
+
+    def prune(self, max_age: float) -> List[str]:
+        """Oublier les matchs non vus depuis `max_age` secondes"""
+        limit = time.monotonic() - max_age
+        removed = [match_id for match_id, entry in self._by_id.items() if entry.last_seen < limit]
+        for match_id in removed:
+            entry = self._by_id.pop(match_id)
+            for source, provider_id in entry.provider_ids.items():
+                self._by_provider.pop((source, provider_id), None)
+            for teams, entries in list(self._by_teams.items()):
+                if entry in entries:
+                    entries.remove(entry)
+                    if not entries:
+                        del self._by_teams[teams]
+        return removed
+
+
+class _Provider:
+    """Un fournisseur et sa santé"""
+
+    def __init__(self, scraper: BaseScraper, name: str):
+        self.scraper = scraper
+        self.name = name
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.down_until = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.wins = 0
+
+    def available(self, now: float) -> bool:
+        return self.down_until <= now
+
+    def observe(self, elapsed: float):
+        # Moyenne mobile exponentielle de la latence
+        self.latency = elapsed if self.latency is None else 0.8 * self.latency + 0.2 * elapsed
+
+    def succeeded(self, elapsed: float):
+        self.requests += 1
+        self.failures = 0
+        self.down_until = 0.0
+        self.observe(elapsed)
+
+    def failed(self, max_failures: int, cooldown: float):
+        self.requests += 1
+        self.errors += 1
+        self.failures += 1
+        if self.failures >= max_failures:
+            self.down_until = time.monotonic() + cooldown
+
+    def stats(self) -> Dict:
+        return {
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "requests": self.requests,
+            "errors": self.errors,
+            "wins": self.wins,
+            "consecutive_failures": self.failures,
+            "available": self.available(time.monotonic()),
+        }
+
+
+class AggregatorScraper(BaseScraper):
+    """Scraper qui combine plusieurs fournisseurs (cf. docstring du module)"""
+
+    def __init__(
+        self,
+        providers: Sequence[BaseScraper],
+        discovery_timeout: float = 10.0,
+        hedge_delay: float = 1.0,
+        refresh_after: float = 30.0,
+        stale_after: float = 120.0,
+        max_failures: int = 3,
+        cooldown: float = 60.0,
+        forget_after: float = 600.0
+    ):
+        """
+        Args:
+            providers: Fournisseurs, le principal en premier
+            discovery_timeout: Délai maximum d'une source pour lister les matchs
+            hedge_delay: Attente de la source préférée avant d'interroger la suivante
+            refresh_after: Intervalle de relecture des autres sources d'un match (0 = jamais)
+            stale_after: Âge maximum d'une réponse gardée pour la fusion
+            max_failures, cooldown: Mise de côté d'un fournisseur qui échoue
+            forget_after: Oubli des matchs qui ne sont plus listés
+        """
+        super().__init__()
+        if not providers:
+            raise ValueError("Au moins un fournisseur est requis")
+        self.providers = [
+            _Provider(scraper, scraper.SOURCE or type(scraper).__name__.lower())
+            for scraper in providers
+        ]
+        self._providers = {provider.name: provider for provider in self.providers}
+        if len(self._providers) != len(self.providers):
+            raise ValueError("Deux fournisseurs ont le même nom")
+        self.index = MatchIndex(self.providers[0].name)
+        self.discovery_timeout = discovery_timeout
+        self.hedge_delay = hedge_delay
+        self.refresh_after = refresh_after
+        self.stale_after = stale_after
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.forget_after = forget_after
+        # Dernière réponse de chaque source par match: {match_id: {source: (reçue à, stats)}}
+        self._snapshots: Dict[str, Dict[str, Tuple[float, MatchStats]]] = {}
+        self._stack: Optional[AsyncExitStack] = None
+        self._users = 0
+        # Relectures en tâche de fond en cours: {(match_id, source): tâche}
+        self._refreshing: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    async def __aenter__(self):
+        """
+        Ouvrir chaque fournisseur; un fournisseur qui ne s'ouvre pas est mis de côté
+
+        Réentrant: une même instance (et son index) sert au scheduler et aux
+        routes de l'API; les fournisseurs restent ouverts jusqu'à la dernière sortie.
+        """
+        self._users += 1
+        if self._stack is not None:
+            return self
+        stack = AsyncExitStack()
+        opened = 0
+        for provider in self.providers:
+            try:
+                await stack.enter_async_context(provider.scraper)
+                opened += 1
+            except Exception as e:
+                print(f"Erreur à l'ouverture du fournisseur {provider.name}: {e}")
+                provider.failed(1, self.cooldown)
+        if not opened:
+            self._users -= 1
+            await stack.aclose()
+            raise RuntimeError("Aucun fournisseur disponible")
+        self._stack = stack
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._users -= 1
+        if self._users > 0:
+            return
+        refreshing = list(self._refreshing.values())
+        for task in refreshing:
+            task.cancel()
+        await asyncio.gather(*refreshing, return_exceptions=True)
+        stack, self._stack = self._stack, None
+        if stack:
+            await stack.__aexit__(exc_type, exc_val, exc_tb)
+
+    def _ranked(self, names: Optional[Iterable[str]] = None) -> List[_Provider]:
+        """Fournisseurs disponibles, du plus rapide au plus lent (tous si aucun n'est disponible)"""
+        providers = self.providers if names is None else [self._providers[name] for name in names]
+        now = time.monotonic()
+        ranked = [provider for provider in providers if provider.available(now)] or list(providers)
+        ranked.sort(key=lambda provider: provider.latency if provider.latency is not None else 0.0)
+        return ranked
+
+    # Découverte
+
+    async def get_live_matches(
+        self,
+        competitions: Optional[Iterable[str]] = None,
+        statuses: Optional[Iterable[str]] = None
+    ) -> List[Dict]:
+        """Matchs en cours de toutes les sources, dédoublonnés"""
+        matches = []
+        try:
+            async for match in self.iter_live_matches(competitions, statuses):
+                matches.append(match)
+        except Exception as e:
+            print(f"Erreur lors de la récupération des matchs live: {e}")
+        return matches
+
+    async def iter_live_matches(
+        self,
+        competitions: Optional[Iterable[str]] = None,
+        statuses: Optional[Iterable[str]] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Matchs en cours, rendus dès la première source qui les décrit
+
+        Lève si aucune source n'a pu lister ses matchs en entier (le
+        scheduler garde alors les matchs déjà suivis).
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        providers = self._ranked()
+
+        async def pump(provider: _Provider):
+            started = time.monotonic()
+            try:
+                async with aclosing(provider.scraper.iter_live_matches(competitions, statuses)) as matches:
+                    async for match in matches:
+                        await queue.put((provider, match))
+            except Exception as e:
+                print(f"Erreur du fournisseur {provider.name} (matchs live): {e}")
+                provider.failed(self.max_failures, self.cooldown)
+                await queue.put((provider, None))
+                return
+            provider.succeeded(time.monotonic() - started)
+            await queue.put((provider, True))
+
+        tasks = {provider.name: asyncio.create_task(pump(provider)) for provider in providers}
+        deadline = time.monotonic() + self.discovery_timeout
+        pending, complete = len(tasks), 0
+        timed_out = False
+        seen = set()
+        try:
+            while pending:
+                try:
+                    provider, item = await asyncio.wait_for(queue.get(), max(0.0, deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    timed_out = True
+                    break
+                if item is None or item is True:
+                    pending -= 1
+                    complete += item is True
+                    continue
+                match_id = self.index.resolve(provider.name, item)
+                if match_id not in seen:
+                    seen.add(match_id)
+                    provider.wins += 1
+                    yield {**item, 'id': match_id}
+        finally:
+            for name, task in tasks.items():
+                if not task.done():
+                    task.cancel()
+                    if timed_out:
+                        print(f"Fournisseur {name} trop lent (matchs live), ignoré pour ce cycle")
+                        self._providers[name].failed(self.max_failures, self.cooldown)
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        if not complete:
+            raise RuntimeError("Aucun fournisseur n'a répondu à la liste des matchs live")
+        for match_id in self.index.prune(self.forget_after):
+            self._snapshots.pop(match_id, None)
+
+    def _provider_ids(self, match_id: str) -> Dict[str, str]:
+        """{source: identifiant chez la source} d'un identifiant agrégé"""
+        provider_ids = self.index.providers(match_id)
+        if provider_ids:
+            return provider_ids
+        # Match pas encore listé: identifiant du fournisseur principal ou "<source>:<id>"
+        source, _, provider_id = match_id.rpartition(':')
+        source = source or self.providers[0].name
+        if source not in self._providers:
+            raise KeyError(f"Match inconnu {match_id}")
+        return {source: provider_id}
+
+    async def get_match(self, match_id: str) -> Optional[Dict]:
+        """Infos d'un match auprès de la première source qui les fournit"""
+        provider_ids = self._provider_ids(match_id)
+        for provider in self._ranked(provider_ids):
+            match = await provider.scraper.get_match(provider_ids[provider.name])
+            if match:
+                return {**match, 'id': match_id}
+        return None
+
+    # Stats
+
+    async def get_match_stats(self, match_id: str) -> MatchStats:
+        """Stats fusionnées d'un match (stats vides en cas d'erreur)"""
+        try:
+            return await self.fetch_match_stats(match_id)
+        except Exception as e:
+            print(f"Erreur lors de la récupération des stats du match {match_id}: {e}")
+            return MatchStats(source='aggregator')
+
+    async def fetch_match_stats(self, match_id: str) -> MatchStats:
+        """Stats fusionnées d'un match (lève si aucune source ne répond)"""
+        provider_ids = self._provider_ids(match_id)
+        candidates = iter(self._ranked(provider_ids))
+        tasks: Dict[asyncio.Task, Tuple[_Provider, float]] = {}
+        asked = set()
+
+        def start_next() -> bool:
+            provider = next(candidates, None)
+            if provider is None:
+                return False
+            task = asyncio.create_task(provider.scraper.fetch_match_stats(provider_ids[provider.name]))
+            tasks[task] = (provider, time.monotonic())
+            asked.add(provider.name)
+            return True
+
+        start_next()
+        received: List[Tuple[str, MatchStats]] = []
+        error: Optional[BaseException] = None
+        try:
+            while tasks and not received:
+                done, _ = await asyncio.wait(
+                    tasks, timeout=self.hedge_delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # Source préférée trop lente: interroger la suivante en parallèle
+                    start_next()
+                    continue
+                for task in done:
+                    if self._collect(task, tasks.pop(task), received):
+                        continue
+                    error = task.exception()
+                    if not tasks:
+                        start_next()
+        finally:
+            for task, (provider, started) in tasks.items():
+                task.cancel()
+                # Perdant: sa latence est au moins celle-ci
+                provider.observe(time.monotonic() - started)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        if not received:
+            raise error or RuntimeError(f"Aucun fournisseur pour le match {match_id}")
+        self._providers[received[0][0]].wins += 1
+        self._refresh_others(match_id, provider_ids, asked)
+        return self._merge(match_id, received)
+
+    def _refresh_others(self, match_id: str, provider_ids: Dict[str, str], asked: set):
+        """Relire en tâche de fond les sources du match dont la réponse date"""
+        if not self.refresh_after:
+            return
+        now = time.monotonic()
+        snapshots = self._snapshots.get(match_id, {})
+        for name, provider_id in provider_ids.items():
+            provider = self._providers[name]
+            if name in asked or (match_id, name) in self._refreshing or not provider.available(now):
+                continue
+            received_at = snapshots[name][0] if name in snapshots else None
+            if received_at is not None and now - received_at < self.refresh_after:
+                continue
+            task = asyncio.create_task(self._refresh(provider, match_id, provider_id))
+            self._refreshing[(match_id, name)] = task
+
+    async def _refresh(self, provider: _Provider, match_id: str, provider_id: str):
+        started = time.monotonic()
+        try:
+            stats = await asyncio.wait_for(provider.scraper.fetch_match_stats(provider_id), self.discovery_timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Erreur du fournisseur {provider.name} (stats): {e}")
+            provider.failed(self.max_failures, self.cooldown)
+        else:
+            provider.succeeded(time.monotonic() - started)
+            self._snapshots.setdefault(match_id, {})[provider.name] = (time.monotonic(), stats)
+        finally:
+            self._refreshing.pop((match_id, provider.name), None)
+
+    def _collect(self, task: asyncio.Task, started: Tuple[_Provider, float], received: List) -> bool:
+        provider, started_at = started
+        if task.exception() is not None:
+            print(f"Erreur du fournisseur {provider.name} (stats): {task.exception()}")
+            provider.failed(self.max_failures, self.cooldown)
+            return False
+        provider.succeeded(time.monotonic() - started_at)
+        received.append((provider.name, task.result()))
+        return True
+
+    def _merge(self, match_id: str, received: List[Tuple[str, MatchStats]]) -> MatchStats:
+        """Fusionner les réponses reçues avec les réponses récentes des autres sources"""
+        now = time.monotonic()
+        snapshots = self._snapshots.setdefault(match_id, {})
+        for source, stats in received:
+            snapshots[source] = (now, stats)
+        fresh = sorted(
+            (entry for entry in snapshots.values() if now - entry[0] <= self.stale_after),
+            key=lambda entry: entry[0]
+        )
+        if len(fresh) == 1:
+            return fresh[0][1]
+
+        values = array('i', map(max, *(stats.values for _, stats in fresh)))
+        # Possession: dernière réponse qui la fournit (pas un compteur)
+        for _, stats in reversed(fresh):
+            if stats.values[_POSSESSION] or stats.values[_POSSESSION + 1]:
+                values[_POSSESSION:_POSSESSION + 2] = stats.values[_POSSESSION:_POSSESSION + 2]
+                break
+        return MatchStats(values, "+".join(sorted({stats.source for _, stats in fresh})))
+
+    def stats(self) -> Dict:
+        """Santé de chaque fournisseur et taille de l'index"""
+        return {
+            "matches": len(self.index),
+            "providers": {provider.name: provider.stats() for provider in self.providers},
+        }
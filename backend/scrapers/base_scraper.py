@@ -3,29 +3,110 @@ Base Scraper - Classe abstraite pour tous les scrapers
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from dataclasses import dataclass
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
 from datetime import datetime
 import asyncio
+import time
 from playwright.async_api import async_playwright, Browser, Page
+from models.match_stats import MatchStats
+from .browser_pool import BrowserPool
+from .json_stream import JsonArrayStream
+from .transports import PARSE_SECONDS, BaseTransport, PlaywrightTransport
+
+
+@dataclass
+class MatchStatsResult:
+    """Résultat individuel d'une récupération de stats en lot"""
+    match_id: str
+    stats: Optional[MatchStats] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def live_filter(
+    competitions: Optional[Iterable[str]] = None,
+    statuses: Optional[Iterable[str]] = None
+) -> Callable[[str, Iterable[str]], bool]:
+    """
+    Filtre (compétition, libellés de statut) -> bool, insensible à la casse
+
+    Sans compétitions ni statuts, tout passe.
+    """
+    wanted_competitions = {c.strip().lower() for c in competitions or [] if c.strip()}
+    wanted_statuses = {s.strip().lower() for s in statuses or [] if s.strip()}
+
+    def accept(competition: str, status_labels: Iterable[str]) -> bool:
+        if wanted_competitions and competition.lower() not in wanted_competitions:
+            return False
+        if wanted_statuses and not any(label.lower() in wanted_statuses for label in status_labels if label):
+            return False
+        return True
+
+    return accept
 
 
 class BaseScraper(ABC):
     """Classe de base pour tous les scrapers de sites de football"""
 
-    def __init__(self, headless: bool = True):
+    # Nom de la source (champ `source` des matchs et des stats)
+    SOURCE = ""
+
+    def __init__(
+        self,
+        headless: bool = True,
+        pool: Optional[BrowserPool] = None,
+        transport: Optional[BaseTransport] = None
+    ):
         self.headless = headless
+        self.pool = pool
+        self.transport = transport
+        self.playwright = None
         self.browser: Optional[Browser] = None
         self.page: Optional[Page] = None
+        self._lease = None
+        self._owns_transport = False
 
     async def __aenter__(self):
-        """Context manager pour initialiser le browser"""
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(headless=self.headless)
-        self.page = await self.browser.new_page()
+        """
+        Context manager pour initialiser le browser
+
+        Avec un transport partagé (HTTP), aucun navigateur n'est nécessaire.
+        Avec un pool, la page est empruntée à un navigateur déjà lancé;
+        sinon un Chromium dédié est démarré (usage en script).
+        """
+        if self.transport:
+            return self
+
+        if self.pool:
+            self._lease = self.pool.lease()
+            self.page = await self._lease.__aenter__()
+        else:
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(headless=self.headless)
+            self.page = await self.browser.new_page()
+
+        self.transport = PlaywrightTransport(page=self.page)
+        self._owns_transport = True
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Context manager pour fermer le browser"""
+        """Context manager pour fermer le browser (ou rendre la page au pool)"""
+        if self._owns_transport:
+            self.transport = None
+            self._owns_transport = False
+
+        if self._lease:
+            lease, self._lease = self._lease, None
+            self.page = None
+            await lease.__aexit__(exc_type, exc_val, exc_tb)
+            return
+
         if self.page:
             await self.page.close()
         if self.browser:
@@ -33,6 +114,39 @@ class BaseScraper(ABC):
         if self.playwright:
             await self.playwright.stop()
 
+    async def fetch_json(self, url: str) -> Dict:
+        """Récupérer un endpoint JSON via le transport du scraper"""
+        return await self.transport.fetch_json(url)
+
+    async def iter_json_array(self, url: str, key: str) -> AsyncIterator[Any]:
+        """Éléments du tableau `key` d'un endpoint JSON, décodés au fil du flux"""
+        stream = JsonArrayStream(key)
+        async with aclosing(self.transport.stream(url)) as chunks:
+            async for chunk in chunks:
+                started = time.perf_counter()
+                items = stream.feed(chunk)
+                PARSE_SECONDS.observe(time.perf_counter() - started, "stream")
+                for item in items:
+                    yield item
+        stream.close()
+
+    async def iter_live_matches(
+        self,
+        competitions: Optional[Iterable[str]] = None,
+        statuses: Optional[Iterable[str]] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Matchs en cours rendus un par un, filtrés par compétition ou statut
+
+        Par défaut s'appuie sur get_live_matches; les scrapers capables de
+        lire la réponse en flux la surchargent pour rendre les premiers
+        matchs avant la fin du téléchargement.
+        """
+        accept = live_filter(competitions, statuses)
+        for match in await self.get_live_matches():
+            if accept(match.get('competition', ''), [match.get('status', '')]):
+                yield match
+
     @abstractmethod
     async def get_live_matches(self) -> List[Dict]:
         """
@@ -46,13 +160,14 @@ class BaseScraper(ABC):
                 'away_team': str,
                 'score': str,
                 'time': str,
-                'competition': str
+                'competition': str,
+                'start_time': float   # coup d'envoi (timestamp Unix), si connu
             }
         """
         pass
 
     @abstractmethod
-    async def get_match_stats(self, match_id: str) -> Dict:
+    async def get_match_stats(self, match_id: str) -> MatchStats:
         """
         Récupère les statistiques détaillées d'un match
 
@@ -60,23 +175,66 @@ class BaseScraper(ABC):
             match_id: Identifiant du match
 
         Returns:
-            Dict: Stats complètes du match
-            {
-                'corners': {'home': int, 'away': int},
-                'yellow_cards': {'home': int, 'away': int},
-                'red_cards': {'home': int, 'away': int},
-                'fouls': {'home': int, 'away': int},
-                'shots': {'home': int, 'away': int},
-                'shots_on_target': {'home': int, 'away': int},
-                'possession': {'home': int, 'away': int},
-                'offsides': {'home': int, 'away': int},
-                'throw_ins': {'home': int, 'away': int},
-                'dangerous_attacks': {'home': int, 'away': int},
-                'attacks': {'home': int, 'away': int}
-            }
+            MatchStats: Stats complètes du match (home/away pour corners,
+            yellow_cards, red_cards, fouls, shots, shots_on_target,
+            possession, offsides, throw_ins, dangerous_attacks, attacks);
+            `to_dict()` donne l'ancien format {'corners': {'home', 'away'}, ...}
         """
         pass
 
+    async def get_match(self, match_id: str) -> Optional[Dict]:
+        """
+        Infos d'un match au format de get_live_matches
+
+        Par défaut None (la source ne sait pas lire un match isolé).
+        """
+        return None
+
+    async def fetch_match_stats(self, match_id: str) -> MatchStats:
+        """
+        Variante stricte de get_match_stats qui lève en cas d'échec
+
+        Par défaut délègue à get_match_stats; les scrapers qui savent
+        distinguer une erreur de stats vides la surchargent.
+        """
+        return await self.get_match_stats(match_id)
+
+    async def get_many_match_stats(
+        self,
+        match_ids: Iterable[str],
+        max_concurrency: int = 10,
+        timeout: float = 15.0
+    ) -> Dict[str, MatchStatsResult]:
+        """
+        Récupère les stats de plusieurs matchs en parallèle
+
+        Args:
+            match_ids: Identifiants des matchs
+            max_concurrency: Nombre maximum de requêtes simultanées
+            timeout: Délai maximum par match (en secondes)
+
+        Returns:
+            Dict[str, MatchStatsResult]: Un résultat par match, dans l'ordre
+            des identifiants; un échec n'affecte pas les autres matchs
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def fetch_one(match_id: str) -> MatchStatsResult:
+            async with semaphore:
+                started = time.monotonic()
+                try:
+                    stats = await asyncio.wait_for(self.fetch_match_stats(match_id), timeout)
+                    return MatchStatsResult(match_id, stats=stats, elapsed=time.monotonic() - started)
+                except asyncio.TimeoutError:
+                    error = f"timeout après {timeout}s"
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                return MatchStatsResult(match_id, error=error, elapsed=time.monotonic() - started)
+
+        match_ids = list(dict.fromkeys(match_ids))
+        results = await asyncio.gather(*(fetch_one(match_id) for match_id in match_ids))
+        return {result.match_id: result for result in results}
+
     async def wait_for_selector(self, selector: str, timeout: int = 5000):
         """Attendre qu'un sélecteur soit présent"""
         try:
@@ -0,0 +1,284 @@
+"""
+Browser Pool - Pool partagé de navigateurs et de pages Playwright
+
+Les navigateurs sont lancés une seule fois (au démarrage de l'API) et les
+pages sont prêtées aux scrapers puis rendues au pool, ce qui évite de payer
+le démarrage de Chromium à chaque requête.
+"""
+
+from typing import Dict, List, Optional
+from contextlib import asynccontextmanager
+import asyncio
+import time
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
+from metrics.registry import histogram
+
+ACQUIRE_SECONDS = histogram("browser_pool_acquire_seconds", "Attente d'une page libre du pool")
+LEASE_SECONDS = histogram("browser_pool_lease_seconds", "Durée d'emprunt d'une page")
+
+
+class BrowserPoolTimeout(Exception):
+    """Aucune page disponible dans le délai imparti (pool saturé)"""
+
+
+class BrowserPoolUnavailable(Exception):
+    """Page défectueuse impossible à recréer (navigateur qui ne relance pas)"""
+
+
+class _PooledPage:
+    """Page du pool avec son contexte et ses compteurs d'usage"""
+
+    def __init__(self, browser_index: int, context: BrowserContext, page: Page):
+        self.browser_index = browser_index
+        self.context = context
+        self.page = page
+        self.uses = 0
+        self.crashed = False
+        self.leased_at: Optional[float] = None
+        page.on("crash", self._on_crash)
+
+    def _on_crash(self, *args):
+        self.crashed = True
+
+
+class BrowserPool:
+    """
+    Pool de pages Playwright réparties sur un ou plusieurs navigateurs
+
+    - `size` pages au total, chacune dans son propre contexte (cookies isolés)
+    - `acquire` bloque tant qu'aucune page n'est libre (back-pressure) et
+      lève BrowserPoolTimeout au-delà de `acquire_timeout`
+    - les pages plantées, fermées ou trop utilisées sont recyclées, et les
+      prêts qui dépassent `max_lease_time` sont considérés comme fuités
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        browsers: int = 1,
+        headless: bool = True,
+        acquire_timeout: float = 15.0,
+        max_page_uses: int = 200,
+        max_lease_time: float = 120.0,
+        health_check_interval: float = 30.0
+    ):
+        self.size = max(1, size)
+        self.browser_count = max(1, min(browsers, self.size))
+        self.headless = headless
+        self.acquire_timeout = acquire_timeout
+        self.max_page_uses = max_page_uses
+        self.max_lease_time = max_lease_time
+        self.health_check_interval = health_check_interval
+
+        self._playwright: Optional[Playwright] = None
+        self._browsers: List[Optional[Browser]] = []
+        self._browser_locks: List[asyncio.Lock] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._leased: Dict[int, _PooledPage] = {}
+        self._health_task: Optional[asyncio.Task] = None
+        self._started = False
+
+        self.recycled = 0
+        self.recycle_failures = 0
+        self.leaks_reclaimed = 0
+        self.timeouts = 0
+        self.waiting = 0
+
+    async def start(self):
+        """Lancer les navigateurs et préchauffer toutes les pages"""
+        if self._started:
+            return
+
+        self._playwright = await async_playwright().start()
+        self._browsers = [None] * self.browser_count
+        self._browser_locks = [asyncio.Lock() for _ in range(self.browser_count)]
+        self._idle = asyncio.Queue()
+
+        for index in range(self.browser_count):
+            await self._ensure_browser(index)
+
+        for slot in range(self.size):
+            pooled = await self._new_page(slot % self.browser_count)
+            self._idle.put_nowait(pooled)
+
+        self._health_task = asyncio.create_task(self._health_loop())
+        self._started = True
+
+    async def close(self):
+        """Fermer toutes les pages, les navigateurs et Playwright"""
+        if not self._started:
+            return
+        self._started = False
+
+        if self._health_task:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+
+        while not self._idle.empty():
+            await self._discard(self._idle.get_nowait())
+        for pooled in list(self._leased.values()):
+            await self._discard(pooled)
+        self._leased.clear()
+
+        for browser in self._browsers:
+            if browser:
+                try:
+                    await browser.close()
+                except Exception:
+                    pass
+        self._browsers = []
+
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def acquire(self, timeout: Optional[float] = None) -> _PooledPage:
+        """Emprunter une page saine (attend si toutes sont occupées)"""
+        if not self._started:
+            raise RuntimeError("BrowserPool non démarré")
+
+        timeout = self.acquire_timeout if timeout is None else timeout
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            pooled = await asyncio.wait_for(self._idle.get(), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise BrowserPoolTimeout(f"Aucune page libre après {timeout}s ({self.size} pages occupées)")
+        finally:
+            self.waiting -= 1
+
+        if not self._is_healthy(pooled):
+            pooled = await self._recycle(pooled)
+            if not self._is_healthy(pooled):
+                # L'emplacement reste au pool, recyclé au prochain emprunt
+                self._idle.put_nowait(pooled)
+                raise BrowserPoolUnavailable("Page du pool impossible à recréer")
+
+        pooled.uses += 1
+        pooled.leased_at = time.monotonic()
+        ACQUIRE_SECONDS.observe(pooled.leased_at - started)
+        self._leased[id(pooled)] = pooled
+        return pooled
+
+    async def release(self, pooled: _PooledPage, discard: bool = False):
+        """Rendre une page au pool (recyclée si nécessaire)"""
+        if self._leased.pop(id(pooled), None) is None:
+            # Prêt déjà récupéré par le health check (fuite) ou pool fermé
+            return
+        LEASE_SECONDS.observe(time.monotonic() - pooled.leased_at)
+        pooled.leased_at = None
+
+        if not self._started:
+            await self._discard(pooled)
+            return
+
+        if discard or not self._is_healthy(pooled) or pooled.uses >= self.max_page_uses:
+            pooled = await self._recycle(pooled)
+        else:
+            await self._close_extra_pages(pooled)
+
+        self._idle.put_nowait(pooled)
+
+    @asynccontextmanager
+    async def lease(self, timeout: Optional[float] = None):
+        """Context manager: `async with pool.lease() as page: ...`"""
+        pooled = await self.acquire(timeout)
+        try:
+            yield pooled.page
+        finally:
+            await self.release(pooled)
+
+    def stats(self) -> Dict:
+        """Utilisation du pool (pour /api/health)"""
+        idle = self._idle.qsize() if self._idle else 0
+        return {
+            "size": self.size,
+            "browsers": self.browser_count,
+            "in_use": len(self._leased),
+            "idle": idle,
+            "waiting": self.waiting,
+            "recycled": self.recycled,
+            "recycle_failures": self.recycle_failures,
+            "leaks_reclaimed": self.leaks_reclaimed,
+            "timeouts": self.timeouts
+        }
+
+    def _is_healthy(self, pooled: _PooledPage) -> bool:
+        browser = self._browsers[pooled.browser_index] if self._browsers else None
+        return (
+            not pooled.crashed
+            and not pooled.page.is_closed()
+            and browser is not None
+            and browser.is_connected()
+        )
+
+    async def _ensure_browser(self, index: int) -> Browser:
+        """Relancer le navigateur `index` s'il n'est plus connecté"""
+        async with self._browser_locks[index]:
+            browser = self._browsers[index]
+            if browser is None or not browser.is_connected():
+                browser = await self._playwright.chromium.launch(headless=self.headless)
+                self._browsers[index] = browser
+            return browser
+
+    async def _new_page(self, browser_index: int) -> _PooledPage:
+        browser = await self._ensure_browser(browser_index)
+        context = await browser.new_context()
+        page = await context.new_page()
+        return _PooledPage(browser_index, context, page)
+
+    async def _discard(self, pooled: _PooledPage):
+        try:
+            await pooled.context.close()
+        except Exception:
+            pass
+
+    async def _recycle(self, pooled: _PooledPage) -> _PooledPage:
+        """
+        Remplacer une page défectueuse ou usée par une page neuve
+
+        En cas d'échec (navigateur qui ne relance pas), l'ancienne page est
+        retournée marquée plantée: l'emplacement reste au pool et sera
+        recyclé au prochain emprunt au lieu d'être perdu.
+        """
+        await self._discard(pooled)
+        self.recycled += 1
+        try:
+            return await self._new_page(pooled.browser_index)
+        except Exception as e:
+            self.recycle_failures += 1
+            pooled.crashed = True
+            print(f"Erreur de recyclage d'une page du pool: {e}")
+            return pooled
+
+    async def _close_extra_pages(self, pooled: _PooledPage):
+        """Fermer les pages ouvertes en plus dans le contexte (popups...)"""
+        for page in pooled.context.pages:
+            if page is not pooled.page:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+
+    async def _health_loop(self):
+        """Relancer les navigateurs morts et récupérer les prêts fuités"""
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            for index in range(self.browser_count):
+                try:
+                    await self._ensure_browser(index)
+                except Exception as e:
+                    print(f"Erreur de relance du navigateur {index}: {e}")
+            try:
+                now = time.monotonic()
+                for key, pooled in list(self._leased.items()):
+                    if pooled.leased_at and now - pooled.leased_at > self.max_lease_time:
+                        self._leased.pop(key, None)
+                        self.leaks_reclaimed += 1
+                        self._idle.put_nowait(await self._recycle(pooled))
+            except Exception as e:
+                print(f"Erreur health check du pool de navigateurs: {e}")
@@ -0,0 +1,290 @@
+"""
+Cache - Cache des réponses upstream devant les transports
+
+- TTL par endpoint (events/live, event/{id}/statistics...)
+- LRU borné en mémoire (nombre d'entrées et octets), ou Redis
+- requêtes concurrentes sur la même clé fusionnées en un seul appel
+- revalidation ETag / If-Modified-Since des entrées expirées
+- flux (`stream`) servis depuis le cache ou relayés puis mis en cache
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Pattern, Tuple
+import asyncio
+import json
+import re
+import time
+
+from .transports import BaseTransport, TransportError, TransportResponse
+
+
+@dataclass
+class CacheEntry:
+    """Réponse mise en cache"""
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    expires_at: float = 0.0
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers.items())
+
+    def to_bytes(self) -> bytes:
+        header = json.dumps({"headers": self.headers, "expires_at": self.expires_at})
+        return header.encode() + b"\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "CacheEntry":
+        header, body = raw.split(b"\n", 1)
+        meta = json.loads(header)
+        return cls(body=body, headers=meta["headers"], expires_at=meta["expires_at"])
+
+
+class CacheBackend(ABC):
+    """Stockage des entrées de cache"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        """Entrée (même expirée) ou None"""
+
+    @abstractmethod
+    async def set(self, key: str, entry: CacheEntry, retention: float):
+        """Stocker une entrée, conservée `retention` secondes pour revalidation"""
+
+    async def close(self):
+        """Libérer les connexions"""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """LRU en mémoire borné par nombre d'entrées et par taille totale"""
+
+    def __init__(self, max_entries: int = 2000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[CacheEntry, float]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        entry, retain_until = item
+        if time.time() >= retain_until:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: CacheEntry, retention: float):
+        if key in self._entries:
+            self._remove(key)
+        if entry.size > self.max_bytes:
+            return
+        self._entries[key] = (entry, time.time() + retention)
+        self.current_bytes += entry.size
+
+        while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        entry, _ = self._entries.pop(key)
+        self.current_bytes -= entry.size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache partagé entre workers via Redis (paquet `redis` requis)"""
+
+    def __init__(self, url: str, prefix: str = "football-ai:http:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("Le backend Redis nécessite le paquet `redis` (pip install redis)")
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        raw = await self._client.get(self.prefix + key)
+        return CacheEntry.from_bytes(raw) if raw else None
+
+    async def set(self, key: str, entry: CacheEntry, retention: float):
+        await self._client.set(self.prefix + key, entry.to_bytes(), px=max(1, int(retention * 1000)))
+
+    async def close(self):
+        await self._client.close()
+
+
+# TTL par défaut des endpoints Sofascore (secondes)
+DEFAULT_TTLS: List[Tuple[str, float]] = [
+    (r"/events/live$", 10.0),
+    (r"/event/\d+/statistics$", 4.0),
+    (r"/event/\d+$", 10.0),
+]
+
+
+class CachingTransport(BaseTransport):
+    """Transport qui met en cache les réponses d'un transport sous-jacent"""
+
+    def __init__(
+        self,
+        inner: BaseTransport,
+        backend: Optional[CacheBackend] = None,
+        ttls: Optional[List[Tuple[str, float]]] = None,
+        stale_factor: float = 10.0
+    ):
+        self.inner = inner
+        self.backend = backend or MemoryCacheBackend()
+        self.ttls: List[Tuple[Pattern, float]] = [
+            (re.compile(pattern), ttl) for pattern, ttl in (ttls or DEFAULT_TTLS)
+        ]
+        self.stale_factor = stale_factor
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.coalesced = 0
+
+    async def start(self):
+        await self.inner.start()
+
+    async def close(self):
+        for pending in list(self._inflight.values()):
+            pending.cancel()
+        await self.inner.close()
+        await self.backend.close()
+
+    def ttl_for(self, url: str) -> Optional[float]:
+        path = url.split("?", 1)[0]
+        for pattern, ttl in self.ttls:
+            if pattern.search(path):
+                return ttl
+        return None
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.coalesced + self.misses + self.revalidated
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "coalesced": self.coalesced,
+            # Part des lectures servies sans aller-retour upstream
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0
+        }
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> TransportResponse:
+        ttl = self.ttl_for(url)
+        if ttl is None or headers:
+            return await self.inner.fetch(url, headers)
+
+        entry = await self.backend.get(url)
+        if entry and entry.fresh:
+            self.hits += 1
+            return TransportResponse(200, entry.body, entry.headers)
+
+        # Une seule requête upstream par clé, les autres attendent son résultat.
+        # Elle tourne dans sa propre tâche: l'annulation d'un appelant (timeout)
+        # ne l'interrompt pas pour les autres.
+        while True:
+            pending = self._inflight.get(url)
+            if pending is None or pending.done():
+                pending = self._start_refresh(url, entry, ttl)
+            else:
+                self.coalesced += 1
+            response = await asyncio.shield(pending)
+            if response is not None:
+                return response
+            # Flux abandonné par son lecteur avant la fin (cf. stream): relancer
+
+    def _start_refresh(self, url: str, entry: Optional[CacheEntry], ttl: float) -> asyncio.Task:
+        task = asyncio.create_task(self._refresh(url, entry, ttl))
+        self._inflight[url] = task
+        task.add_done_callback(lambda done: self._settle(url, done))
+        return task
+
+    def _settle(self, url: str, done: asyncio.Future):
+        if self._inflight.get(url) is done:
+            del self._inflight[url]
+        if not done.cancelled():
+            done.exception()  # évite l'avertissement si personne n'attendait
+
+    async def stream(self, url: str, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        """
+        Flux servi depuis le cache si l'entrée est fraîche, sinon relayé
+
+        Le corps relayé n'est mis en cache que s'il a été lu en entier (pas
+        de revalidation conditionnelle pour les flux).
+        """
+        ttl = self.ttl_for(url)
+        if ttl is None:
+            async for chunk in self.inner.stream(url, chunk_size):
+                yield chunk
+            return
+
+        entry = await self.backend.get(url)
+        if entry and entry.fresh:
+            self.hits += 1
+            yield entry.body
+            return
+
+        if url in self._inflight:
+            response = await self.fetch(url)
+            if response.status >= 400:
+                raise TransportError(f"HTTP {response.status} pour {url}", response.status)
+            yield response.body
+            return
+
+        # Lecteur du flux: les requêtes concurrentes attendent le corps complet
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[url] = future
+        future.add_done_callback(lambda done: self._settle(url, done))
+        chunks = []
+        try:
+            async for chunk in self.inner.stream(url, chunk_size):
+                chunks.append(chunk)
+                yield chunk
+            body = b"".join(chunks)
+            future.set_result(TransportResponse(200, body, {}))
+            await self.backend.set(url, CacheEntry(body, {}, time.time() + ttl), ttl * self.stale_factor)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            raise
+        finally:
+            if not future.done():
+                # Lecture interrompue (aclosing, annulation): les suiveurs refont la requête
+                future.set_result(None)
+
+    async def _refresh(self, url: str, entry: Optional[CacheEntry], ttl: float) -> TransportResponse:
+        conditional = {}
+        if entry:
+            if entry.headers.get("etag"):
+                conditional["If-None-Match"] = entry.headers["etag"]
+            if entry.headers.get("last-modified"):
+                conditional["If-Modified-Since"] = entry.headers["last-modified"]
+
+        response = await self.inner.fetch(url, conditional or None)
+        retention = ttl * self.stale_factor
+
+        if response.status == 304 and entry:
+            self.revalidated += 1
+            entry.expires_at = time.time() + ttl
+            await self.backend.set(url, entry, retention)
+            return TransportResponse(200, entry.body, entry.headers)
+
+        self.misses += 1
+        if response.status == 200:
+            await self.backend.set(url, CacheEntry(response.body, response.headers, time.time() + ttl), retention)
+        return response
@@ -0,0 +1,172 @@
+"""
+Fake Scraper - Fournisseur local de matchs simulés
+
+Sert à développer et tester sans upstream (agrégation multi-sources,
+charge): des matchs de 90 minutes en temps réel, générés de façon
+reproductible par `seed`. Plusieurs instances avec la même graine décrivent
+les mêmes matchs avec leurs propres identifiants, noms d'équipe, latence,
+retard et taux d'échec, comme deux sites qui couvrent les mêmes rencontres.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncio
+import random
+import time
+
+import numpy as np
+
+from models.match_stats import MatchStats
+from .base_scraper import BaseScraper, live_filter
+
+# Stats simulées: moyenne par équipe et par match
+_RATES: Dict[str, float] = {
+    'corners': 5.0,
+    'yellow_cards': 2.0,
+    'fouls': 11.0,
+    'shots': 12.0,
+    'shots_on_target': 4.0,
+    'offsides': 2.0,
+    'dangerous_attacks': 50.0,
+    'attacks': 100.0,
+}
+_GOALS_PER_TEAM = 1.4
+# Durée d'un cycle: 90 minutes de jeu puis 10 minutes avant le match suivant
+_CYCLE = 100 * 60.0
+
+
+class FakeScraper(BaseScraper):
+    """Fournisseur simulé (aucune requête réseau)"""
+
+    SOURCE = 'fake'
+
+    def __init__(
+        self,
+        name: str = 'fake',
+        matches: int = 20,
+        seed: int = 0,
+        latency: float = 0.05,
+        jitter: float = 0.05,
+        failure_rate: float = 0.0,
+        lag: float = 0.0,
+        team_prefix: str = "",
+        id_offset: int = 0,
+        started_at: Optional[float] = None
+    ):
+        """
+        Args:
+            name: Source annoncée dans les matchs et les stats
+            matches: Matchs simultanés
+            seed: Graine des matchs (la même pour deux fournisseurs "concurrents")
+            latency, jitter: Délai de réponse (secondes) et sa part aléatoire
+            failure_rate: Probabilité qu'une requête échoue
+            lag: Retard des données (secondes)
+            team_prefix: Préfixe des noms d'équipe ("FC "), pour varier les libellés
+            id_offset: Décalage des identifiants de match
+            started_at: Référence des coups d'envoi (défaut: maintenant)
+        """
+        super().__init__()
+        self.SOURCE = name
+        self.matches = matches
+        self.seed = seed
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.lag = lag
+        self.team_prefix = team_prefix
+        self.id_offset = id_offset
+        self.started_at = started_at if started_at is not None else time.time()
+        self._random = random.Random()
+        self._timelines: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]] = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    async def _respond(self):
+        await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+        if self._random.random() < self.failure_rate:
+            raise ConnectionError(f"{self.SOURCE}: fournisseur simulé indisponible")
+
+    def _state(self, number: int, now: float) -> Tuple[int, float, float]:
+        """(génération, coup d'envoi, minutes jouées) du match `number`"""
+        # Coups d'envoi étalés sur 80 minutes
+        origin = self.started_at - (number * 7 % 80) * 60.0
+        elapsed = now - self.lag - origin
+        generation = int(elapsed // _CYCLE)
+        kickoff = origin + generation * _CYCLE
+        return generation, kickoff, (now - self.lag - kickoff) / 60.0
+
+    def _timeline(self, number: int, generation: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Stats (90, len(STAT_NAMES) x 2) et buts (90, 2) cumulés minute par minute"""
+        key = (number, generation)
+        timeline = self._timelines.get(key)
+        if timeline is None:
+            rng = np.random.default_rng([self.seed, number, generation])
+            intensity = rng.uniform(0.6, 1.5, size=2)
+            rates = np.array(list(_RATES.values()))[:, None] * intensity / 90.0
+            stats = rng.poisson(rates, size=(90,) + rates.shape).cumsum(axis=0)
+            goals = rng.poisson(_GOALS_PER_TEAM * intensity / 90.0, size=(90, 2)).cumsum(axis=0)
+            if len(self._timelines) > 4 * self.matches:
+                self._timelines.clear()
+            timeline = self._timelines[key] = (stats, goals)
+        return timeline
+
+    def _match(self, number: int, now: float) -> Optional[Dict]:
+        generation, kickoff, played = self._state(number, now)
+        if played >= 90:
+            return None
+        first_half = played < 45
+        _, goals = self._timeline(number, generation)
+        score = goals[min(int(played), 89)]
+        return {
+            'id': str(self.id_offset + number * 1000 + generation),
+            'home_team': f"{self.team_prefix}Équipe {2 * number + 1}",
+            'away_team': f"{self.team_prefix}Équipe {2 * number + 2}",
+            'score': f"{score[0]}-{score[1]}",
+            'time': kickoff + (0 if first_half else 45 * 60.0),
+            'competition': "Ligue simulée",
+            'status': '1st half' if first_half else '2nd half',
+            'status_code': 6 if first_half else 7,
+            'period_initial': 0 if first_half else 45 * 60,
+            'start_time': kickoff,
+            'source': self.SOURCE
+        }
+
+    async def get_live_matches(
+        self,
+        competitions: Optional[Iterable[str]] = None,
+        statuses: Optional[Iterable[str]] = None
+    ) -> List[Dict]:
+        await self._respond()
+        accept = live_filter(competitions, statuses)
+        now = time.time()
+        matches = (self._match(number, now) for number in range(self.matches))
+        return [
+            match for match in matches
+            if match is not None and accept(match['competition'], [match['status']])
+        ]
+
+    async def fetch_match_stats(self, match_id: str) -> MatchStats:
+        await self._respond()
+        number, generation = divmod(int(match_id) - self.id_offset, 1000)
+        if not 0 <= number < self.matches:
+            raise KeyError(f"Match inconnu {match_id}")
+        _, kickoff, played = self._state(number, time.time())
+        minute = min(int(played), 89)
+        stats = MatchStats(source=self.SOURCE)
+        if minute < 0:
+            return stats
+        values = self._timeline(number, generation)[0][minute]
+        for name, (home, away) in zip(_RATES, values.tolist()):
+            stats.set(name, home, away)
+        stats.set('possession', 50, 50)
+        return stats
+
+    async def get_match_stats(self, match_id: str) -> MatchStats:
+        try:
+            return await self.fetch_match_stats(match_id)
+        except Exception as e:
+            print(f"Erreur lors de la récupération des stats du match {match_id}: {e}")
+            return MatchStats(source=self.SOURCE)
@@ -0,0 +1,21 @@
+"""
+FastJSON - Décodage JSON avec orjson quand il est installé
+
+orjson (optionnel) décode directement les octets reçus, 2 à 4 fois plus
+vite que le module json standard, utilisé sinon.
+"""
+
+from typing import Any, Union
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(raw: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """Décoder un document JSON (octets ou texte)"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
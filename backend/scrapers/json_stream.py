@@ -0,0 +1,157 @@
+"""
+JSON Stream - Décodage incrémental d'un tableau JSON au fil des octets
+
+`{"events": [{...}, {...}, ...]}` est lu morceau par morceau: chaque
+élément du tableau est décodé et rendu dès qu'il est complet, sans
+attendre la fin du document. Seul le texte de l'élément en cours est gardé
+en mémoire. Les éléments sont décodés par le scanner C du module json
+(`raw_decode`); seul le début du document, jusqu'au tableau, est parcouru
+en Python.
+"""
+
+from typing import Any, List, Optional
+import codecs
+import json
+import re
+
+# Prochain caractère structurel avant le tableau (chaînes sautées à part)
+_STRUCTURAL = re.compile(r'[{}\[\]"]')
+# Fin d'une chaîne JSON à partir du caractère qui suit le guillemet ouvrant
+_STRING_END = re.compile(r'(?:[^"\\]|\\.)*"', re.S)
+# `: [` après la clé recherchée (ou début incomplet en fin de morceau)
+_ARRAY_START = re.compile(r'\s*:\s*\[')
+_INCOMPLETE_ARRAY_START = re.compile(r'\s*(?::\s*)?\Z')
+# Séparateurs entre deux éléments
+_SEPARATOR = re.compile(r'[\s,]*')
+_WHITESPACE = re.compile(r'\s*')
+# Suite possible d'un nombre coupé en fin de morceau (`12|34`, `1.|5`, `1e|-3`)
+_NUMBER_TAIL = re.compile(r'[\d.eE+\-]*\Z')
+
+_decoder = json.JSONDecoder()
+
+
+class JsonArrayStream:
+    """
+    Décode les éléments du tableau `key` de l'objet racine
+
+    Usage:
+        stream = JsonArrayStream("events")
+        for chunk in chunks:
+            for event in stream.feed(chunk):
+                ...
+        stream.close()  # lève ValueError si le document est tronqué
+    """
+
+    def __init__(self, key: str):
+        self.key = json.dumps(key)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_array = False
+        self.done = False
+        self.items = 0
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Ajouter des octets et retourner les éléments complets"""
+        if self.done:
+            return []
+        self._text += self._utf8.decode(chunk)
+        items: List[Any] = []
+        if not self._in_array:
+            self._find_array()
+        if self._in_array:
+            self._decode_items(items)
+        # Oublier ce qui a déjà été lu
+        self._text = self._text[self._pos:]
+        self._pos = 0
+        return items
+
+    def close(self):
+        """Fin du flux: vérifier que le tableau a été lu en entier"""
+        if not self.done:
+            raise ValueError(f"Document JSON tronqué (tableau {self.key} incomplet)")
+
+    def _find_array(self):
+        text = self._text
+        while True:
+            match = _STRUCTURAL.search(text, self._pos)
+            if match is None:
+                self._pos = len(text)
+                return
+            char, start = match.group(), match.start()
+
+            if char == '"':
+                end = _STRING_END.match(text, start + 1)
+                if end is None:
+                    # Chaîne coupée entre deux morceaux
+                    self._pos = start
+                    return
+                self._pos = end.end()
+                if self._depth == 1 and text[start:self._pos] == self.key:
+                    array_start = _ARRAY_START.match(text, self._pos)
+                    if array_start:
+                        self._pos = array_start.end()
+                        self._in_array = True
+                        return
+                    if _INCOMPLETE_ARRAY_START.match(text, self._pos):
+                        self._pos = start
+                        return
+                continue
+
+            self._pos = start + 1
+            self._depth += 1 if char in '{[' else -1
+            if self._depth <= 0:
+                # Objet racine terminé sans le tableau recherché
+                self.done = True
+                return
+
+    def _decode_items(self, items: List[Any]):
+        text = self._text
+        while True:
+            position = _SEPARATOR.match(text, self._pos).end()
+            if position >= len(text):
+                self._pos = position
+                return
+            if text[position] == ']':
+                # Fin du tableau: le reste du document est ignoré
+                self._pos = position + 1
+                self.done = True
+                return
+            try:
+                item, end = _decoder.raw_decode(text, position)
+            except json.JSONDecodeError as e:
+                if self._incomplete(e, text):
+                    # Élément coupé: il sera relu avec le morceau suivant
+                    self._pos = position
+                    return
+                raise
+            if self._truncated(item, text, end):
+                # Rien après l'élément: un nombre peut continuer dans le morceau suivant
+                self._pos = position
+                return
+            items.append(item)
+            self.items += 1
+            self._pos = end
+
+    @staticmethod
+    def _truncated(item: Any, text: str, end: int) -> bool:
+        # Un élément n'est sûr qu'une fois suivi d'un séparateur ou de `]`
+        if _WHITESPACE.match(text, end).end() >= len(text):
+            return True
+        is_number = isinstance(item, (int, float)) and not isinstance(item, bool)
+        return is_number and _NUMBER_TAIL.match(text, end) is not None
+
+    @staticmethod
+    def _incomplete(error: json.JSONDecodeError, text: str) -> bool:
+        # Élément coupé: l'erreur tombe en fin de texte (littéral `tru`, `nul`
+        # compris) ou sur une chaîne non terminée; sinon le JSON est invalide
+        return error.pos >= len(text) - 5 or error.msg.startswith("Unterminated string")
+
+
+def iter_array(chunks, key: str, stream: Optional[JsonArrayStream] = None):
+    """Générateur synchrone sur des morceaux d'octets (tests, fichiers)"""
+    stream = stream or JsonArrayStream(key)
+    for chunk in chunks:
+        yield from stream.feed(chunk)
+    stream.close()
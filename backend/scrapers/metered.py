@@ -0,0 +1,94 @@
+"""
+Metered Transport - Latence de chaque requête upstream, par endpoint
+
+Se place directement sur le transport upstream (sous la résilience et le
+cache): chaque requête réelle, retry ou doublon compris, est mesurée avec
+son issue (ok, http_4xx, blocked, error, cancelled pour un doublon perdant).
+"""
+
+from typing import AsyncIterator, Dict, List, Optional, Pattern, Tuple
+import asyncio
+import re
+import time
+
+from metrics.registry import counter, histogram
+from .resilience import DEFAULT_ENDPOINTS
+from .transports import BaseTransport, TransportBlocked, TransportResponse
+
+UPSTREAM_SECONDS = histogram(
+    "upstream_fetch_seconds", "Durée des requêtes upstream (corps complet)", ("endpoint", "outcome")
+)
+UPSTREAM_FIRST_BYTE = histogram(
+    "upstream_first_byte_seconds", "Délai avant le premier morceau d'une réponse lue en flux", ("endpoint",)
+)
+UPSTREAM_BYTES = counter("upstream_response_bytes_total", "Octets reçus de l'upstream", ("endpoint",))
+
+
+def _outcome(error: BaseException) -> str:
+    if isinstance(error, asyncio.CancelledError):
+        return "cancelled"
+    if isinstance(error, TransportBlocked):
+        return "blocked"
+    return "error"
+
+
+class MeteredTransport(BaseTransport):
+    """Transport qui mesure les requêtes d'un transport sous-jacent"""
+
+    def __init__(self, inner: BaseTransport, endpoints: Optional[List[Tuple[str, str]]] = None):
+        self.inner = inner
+        self.patterns: List[Tuple[str, Pattern]] = [
+            (name, re.compile(pattern)) for name, pattern in (endpoints or DEFAULT_ENDPOINTS)
+        ]
+        self._names: Dict[str, str] = {}
+
+    async def start(self):
+        await self.inner.start()
+
+    async def close(self):
+        await self.inner.close()
+
+    def endpoint_for(self, url: str) -> str:
+        path = url.split("?", 1)[0]
+        name = self._names.get(path)
+        if name is None:
+            name = next((name for name, pattern in self.patterns if pattern.search(path)), "other")
+            if len(self._names) > 10000:
+                self._names.clear()
+            self._names[path] = name
+        return name
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> TransportResponse:
+        endpoint = self.endpoint_for(url)
+        started = time.perf_counter()
+        try:
+            response = await self.inner.fetch(url, headers)
+        except BaseException as e:
+            UPSTREAM_SECONDS.observe(time.perf_counter() - started, endpoint, _outcome(e))
+            raise
+        outcome = "ok" if response.status < 400 else f"http_{response.status // 100}xx"
+        UPSTREAM_SECONDS.observe(time.perf_counter() - started, endpoint, outcome)
+        UPSTREAM_BYTES.inc(len(response.body), endpoint)
+        return response
+
+    async def stream(self, url: str, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        endpoint = self.endpoint_for(url)
+        started = time.perf_counter()
+        received = 0
+        outcome = "ok"
+        try:
+            async for chunk in self.inner.stream(url, chunk_size):
+                if not received:
+                    UPSTREAM_FIRST_BYTE.observe(time.perf_counter() - started, endpoint)
+                received += len(chunk)
+                yield chunk
+        except GeneratorExit:
+            # Lecteur arrêté avant la fin (max_live_matches...): pas un échec
+            outcome = "closed"
+            raise
+        except BaseException as e:
+            outcome = _outcome(e)
+            raise
+        finally:
+            UPSTREAM_SECONDS.observe(time.perf_counter() - started, endpoint, outcome)
+            UPSTREAM_BYTES.inc(received, endpoint)
@@ -0,0 +1,389 @@
+"""
+Resilience - Délais, requêtes doublées, budget de retries et disjoncteurs
+
+ResilientTransport se place devant le transport upstream (sous le cache):
+- délai maximum par appel, retries compris (`deadline`)
+- requête doublée (hedging): sans réponse après le p95 de la latence
+  récente de l'endpoint, une seconde requête identique part; la première
+  réponse gagne, l'autre est annulée
+- budget global de retries: chaque requête dépose `ratio` jeton, chaque
+  retry ou doublon en consomme un. Pendant une panne les requêtes échouent
+  vite au lieu de multiplier la charge sur l'upstream
+- disjoncteur par endpoint (events/live, statistics...): après
+  `failure_threshold` échecs consécutifs il s'ouvre `reset_timeout`
+  secondes; les appels échouent aussitôt en servant la dernière réponse
+  connue de l'URL, puis une requête test referme le circuit si elle réussit
+"""
+
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Deque, Dict, List, Optional, Pattern, Tuple
+import asyncio
+import random
+import re
+import time
+
+from .transports import BaseTransport, TransportBlocked, TransportError, TransportResponse
+
+# Endpoints Sofascore: un disjoncteur et une latence de référence chacun
+DEFAULT_ENDPOINTS: List[Tuple[str, str]] = [
+    ("live", r"/events/live$"),
+    ("statistics", r"/event/\d+/statistics$"),
+    ("event", r"/event/\d+$"),
+]
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(TransportError):
+    """Disjoncteur ouvert et aucune réponse connue à servir"""
+
+
+class RetryBudget:
+    """
+    Seau de jetons partagé par toutes les requêtes
+
+    Chaque requête initiale dépose `ratio` jeton (plafonné à `max_tokens`);
+    `min_per_second` jetons s'ajoutent avec le temps pour qu'un trafic
+    faible puisse quand même réessayer.
+    """
+
+    def __init__(self, ratio: float = 0.1, min_per_second: float = 1.0, max_tokens: float = 20.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.denied = 0
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.max_tokens, self.tokens + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+    def deposit(self):
+        self._refill()
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        self._refill()
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        self.denied += 1
+        return False
+
+
+class _Endpoint:
+    """Latences récentes et disjoncteur d'un endpoint"""
+
+    def __init__(self, name: str, window: int):
+        self.name = name
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self._p95: Optional[float] = None
+        self._p95_stale = 0
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        # Compteurs
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.retries = 0
+        self.fast_failures = 0
+        self.stale_served = 0
+        self.opened = 0
+
+    def observe(self, elapsed: float):
+        self.latencies.append(elapsed)
+        self._p95_stale += 1
+
+    def p95(self, min_samples: int) -> Optional[float]:
+        if len(self.latencies) < min_samples:
+            return None
+        # Recalculé toutes les 16 mesures (tri de la fenêtre)
+        if self._p95 is None or self._p95_stale >= 16:
+            ordered = sorted(self.latencies)
+            self._p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+            self._p95_stale = 0
+        return self._p95
+
+    def stats(self) -> Dict:
+        p95 = self.p95(1)
+        return {
+            "state": self.state,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "retries": self.retries,
+            "fast_failures": self.fast_failures,
+            "stale_served": self.stale_served,
+            "opened": self.opened,
+        }
+
+
+class ResilientTransport(BaseTransport):
+    """Transport qui protège les appels d'un transport sous-jacent (cf. docstring du module)"""
+
+    def __init__(
+        self,
+        inner: BaseTransport,
+        deadline: float = 8.0,
+        retries: int = 2,
+        budget: Optional[RetryBudget] = None,
+        hedge_min_delay: float = 0.2,
+        hedge_min_samples: int = 20,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        endpoints: Optional[List[Tuple[str, str]]] = None,
+        latency_window: int = 256,
+        max_last_known: int = 2000,
+        backoff_base: float = 0.1
+    ):
+        """
+        Args:
+            inner: Transport upstream (sans retries propres, cf. HttpTransport.retries)
+            deadline: Délai maximum d'un appel, retries et doublon compris
+            retries: Retries maximum par appel, dans la limite du budget
+            budget: Budget de retries partagé (défaut: 10 % des requêtes)
+            hedge_min_delay: Délai minimum avant une requête doublée
+            hedge_min_samples: Mesures de latence nécessaires avant de doubler
+            failure_threshold, reset_timeout: Ouverture et durée d'ouverture du disjoncteur
+            endpoints: (nom, motif d'URL) des endpoints, les autres URLs sont groupées
+            latency_window: Mesures gardées par endpoint pour le p95
+            max_last_known: Dernières réponses gardées (une par URL)
+            backoff_base: Base du backoff exponentiel entre deux tentatives
+        """
+        self.inner = inner
+        self.deadline = deadline
+        self.retries = retries
+        self.budget = budget or RetryBudget()
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.latency_window = latency_window
+        self.max_last_known = max_last_known
+        self.backoff_base = backoff_base
+        self.patterns: List[Tuple[str, Pattern]] = [
+            (name, re.compile(pattern)) for name, pattern in (endpoints or DEFAULT_ENDPOINTS)
+        ]
+        self._endpoints: Dict[str, _Endpoint] = {}
+        self._last_known: "OrderedDict[str, TransportResponse]" = OrderedDict()
+
+    async def start(self):
+        await self.inner.start()
+
+    async def close(self):
+        await self.inner.close()
+
+    def endpoint_for(self, url: str) -> _Endpoint:
+        path = url.split("?", 1)[0]
+        name = next((name for name, pattern in self.patterns if pattern.search(path)), "other")
+        endpoint = self._endpoints.get(name)
+        if endpoint is None:
+            endpoint = self._endpoints[name] = _Endpoint(name, self.latency_window)
+        return endpoint
+
+    def stats(self) -> Dict:
+        return {
+            "budget": {"tokens": round(self.budget.tokens, 2), "denied": self.budget.denied},
+            "endpoints": {name: endpoint.stats() for name, endpoint in self._endpoints.items()},
+        }
+
+    # Disjoncteur
+
+    def _admit(self, endpoint: _Endpoint) -> bool:
+        """L'appel peut-il partir? (circuit fermé, ou requête test en semi-ouvert)"""
+        if endpoint.state == OPEN and time.monotonic() - endpoint.opened_at >= self.reset_timeout:
+            endpoint.state = HALF_OPEN
+        if endpoint.state == CLOSED:
+            return True
+        if endpoint.state == HALF_OPEN and not endpoint.probing:
+            endpoint.probing = True
+            return True
+        return False
+
+    def _succeeded(self, endpoint: _Endpoint):
+        endpoint.failures = 0
+        endpoint.probing = False
+        if endpoint.state != CLOSED:
+            endpoint.state = CLOSED
+            print(f"Endpoint {endpoint.name} rétabli, disjoncteur refermé")
+
+    def _failed(self, endpoint: _Endpoint):
+        endpoint.errors += 1
+        endpoint.failures += 1
+        endpoint.probing = False
+        if endpoint.state == HALF_OPEN or (endpoint.state == CLOSED and endpoint.failures >= self.failure_threshold):
+            endpoint.state = OPEN
+            endpoint.opened_at = time.monotonic()
+            endpoint.opened += 1
+            print(f"Endpoint {endpoint.name} en échec ({endpoint.failures} de suite), disjoncteur ouvert {self.reset_timeout:.0f}s")
+
+    def _fail_fast(self, endpoint: _Endpoint, url: str) -> TransportResponse:
+        endpoint.fast_failures += 1
+        last = self._last_known.get(url)
+        if last is None:
+            raise CircuitOpenError(f"Disjoncteur ouvert pour {endpoint.name} ({url})")
+        endpoint.stale_served += 1
+        return last
+
+    def _remember(self, url: str, response: TransportResponse):
+        self._last_known[url] = response
+        self._last_known.move_to_end(url)
+        if len(self._last_known) > self.max_last_known:
+            self._last_known.popitem(last=False)
+
+    # Appels
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> TransportResponse:
+        endpoint = self.endpoint_for(url)
+        if not self._admit(endpoint):
+            return self._fail_fast(endpoint, url)
+
+        # Requête test du semi-ouvert: libérée même si l'appel est annulé (délai, doublon perdant, arrêt)
+        probe = endpoint.probing
+        try:
+            endpoint.calls += 1
+            self.budget.deposit()
+            deadline = time.monotonic() + self.deadline
+            attempt = 0
+            while True:
+                try:
+                    response = await self._hedged(endpoint, url, headers, deadline)
+                except TransportBlocked:
+                    # Blocage: ni retry ni doublon (le repli navigateur est sous ce transport)
+                    self._failed(endpoint)
+                    raise
+                except TransportError as e:
+                    remaining = deadline - time.monotonic()
+                    if attempt < self.retries and remaining > 0 and endpoint.state == CLOSED and self.budget.withdraw():
+                        attempt += 1
+                        endpoint.retries += 1
+                        await asyncio.sleep(min(remaining, random.uniform(0, self.backoff_base * 2 ** attempt)))
+                        continue
+                    self._failed(endpoint)
+                    if endpoint.state == OPEN and url in self._last_known:
+                        return self._fail_fast(endpoint, url)
+                    raise e
+
+                if response.status >= 500:
+                    self._failed(endpoint)
+                else:
+                    self._succeeded(endpoint)
+                    if response.status == 200 and not headers:
+                        self._remember(url, response)
+                return response
+        finally:
+            if probe:
+                endpoint.probing = False
+
+    async def _hedged(
+        self,
+        endpoint: _Endpoint,
+        url: str,
+        headers: Optional[Dict[str, str]],
+        deadline: float
+    ) -> TransportResponse:
+        """Une tentative, doublée si la première tarde plus que le p95 de l'endpoint"""
+        started = time.monotonic()
+        tasks = {asyncio.create_task(self.inner.fetch(url, headers)): False}
+        p95 = endpoint.p95(self.hedge_min_samples)
+        hedge_at = started + max(self.hedge_min_delay, p95) if p95 is not None else None
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= deadline:
+                    endpoint.timeouts += 1
+                    raise TransportError(f"Délai de {self.deadline:.1f}s dépassé pour {url}")
+                wake = deadline if hedge_at is None or hedge_at >= deadline else hedge_at
+                done, _ = await asyncio.wait(tasks, timeout=wake - now, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if hedge_at is not None and time.monotonic() >= hedge_at:
+                        hedge_at = None
+                        if self.budget.withdraw():
+                            endpoint.hedges += 1
+                            tasks[asyncio.create_task(self.inner.fetch(url, headers))] = True
+                    continue
+                for task in done:
+                    hedge = tasks.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        endpoint.observe(time.monotonic() - started)
+                        endpoint.hedge_wins += hedge
+                        return task.result()
+                    if not tasks:
+                        if isinstance(error, TransportError):
+                            raise error
+                        raise TransportError(f"{type(error).__name__} pour {url}: {error}")
+                    # Une des deux a échoué: attendre l'autre
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def stream(self, url: str, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        """
+        Flux protégé par le disjoncteur et le délai (sans doublon)
+
+        Le délai s'applique à chaque morceau; un retry n'est possible
+        qu'avant le premier octet. Le corps lu en entier devient la
+        dernière réponse connue de l'URL.
+        """
+        endpoint = self.endpoint_for(url)
+        if not self._admit(endpoint):
+            yield self._fail_fast(endpoint, url).body
+            return
+
+        probe = endpoint.probing
+        try:
+            endpoint.calls += 1
+            self.budget.deposit()
+            attempt = 0
+            while True:
+                started = time.monotonic()
+                chunks: List[bytes] = []
+                iterator = self.inner.stream(url, chunk_size).__aiter__()
+                try:
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(iterator.__anext__(), self.deadline)
+                        except StopAsyncIteration:
+                            break
+                        except asyncio.TimeoutError:
+                            endpoint.timeouts += 1
+                            raise TransportError(f"Délai de {self.deadline:.1f}s dépassé pour {url}")
+                        chunks.append(chunk)
+                        yield chunk
+                except TransportError as e:
+                    if isinstance(e, TransportBlocked) or chunks:
+                        self._failed(endpoint)
+                        raise
+                    if attempt < self.retries and endpoint.state == CLOSED and self.budget.withdraw():
+                        attempt += 1
+                        endpoint.retries += 1
+                        await asyncio.sleep(random.uniform(0, self.backoff_base * 2 ** attempt))
+                        continue
+                    self._failed(endpoint)
+                    if endpoint.state == OPEN and url in self._last_known:
+                        yield self._fail_fast(endpoint, url).body
+                        return
+                    raise
+                finally:
+                    await iterator.aclose()
+                endpoint.observe(time.monotonic() - started)
+                self._succeeded(endpoint)
+                self._remember(url, TransportResponse(200, b"".join(chunks)))
+                return
+        finally:
+            if probe:
+                endpoint.probing = False
@@ -0,0 +1,151 @@
+"""
+Sofascore Parser - Décodage de `event/{id}/statistics` en MatchStats
+
+- nom (ou clé) de stat résolu par une table précalculée, avec un cache
+  pour les noms inconnus (résolus une fois par les anciennes règles)
+- seule la période `ALL` est lue (la somme des périodes doublait tout)
+- valeurs tolérantes: 7, "54%", "7/12 (58%)", "", None
+- entrée en dict déjà décodé ou en octets bruts (orjson si disponible)
+"""
+
+from typing import Dict, List, Optional, Union
+import re
+
+from models.match_stats import MatchStats
+from . import fastjson
+
+# Clés Sofascore (champ `key`) -> stat de MatchStats (None = ignorée)
+STAT_KEYS: Dict[str, Optional[str]] = {
+    'cornerKicks': 'corners',
+    'yellowCards': 'yellow_cards',
+    'redCards': 'red_cards',
+    'fouls': 'fouls',
+    'fouledFinalThird': None,
+    'totalShotsOnGoal': 'shots',
+    'shotsOnGoal': 'shots_on_target',
+    'ballPossession': 'possession',
+    'offsides': 'offsides',
+    'throwIns': 'throw_ins',
+    'dangerousAttacks': 'dangerous_attacks',
+    'attacks': 'attacks',
+}
+
+# Noms affichés (en minuscules) -> stat de MatchStats (None = ignorée)
+STAT_NAMES: Dict[str, Optional[str]] = {
+    'corner kicks': 'corners',
+    'corners': 'corners',
+    'yellow cards': 'yellow_cards',
+    'red cards': 'red_cards',
+    'fouls': 'fouls',
+    'fouled in final third': None,
+    'total shots': 'shots',
+    'shots': 'shots',
+    'shots on target': 'shots_on_target',
+    'ball possession': 'possession',
+    'offsides': 'offsides',
+    'throw-ins': 'throw_ins',
+    'throw ins': 'throw_ins',
+    'dangerous attacks': 'dangerous_attacks',
+    'attacks': 'attacks',
+}
+
+# Anciennes règles par sous-chaîne, dans l'ordre, pour les noms inconnus
+_FALLBACK_RULES = [
+    ('corner', 'corners'),
+    ('yellow card', 'yellow_cards'),
+    ('red card', 'red_cards'),
+    ('foul', 'fouls'),
+    ('total shot', 'shots'),
+    ('on target', 'shots_on_target'),
+    ('ball possession', 'possession'),
+    ('offside', 'offsides'),
+    ('throw', 'throw_ins'),
+    ('dangerous attack', 'dangerous_attacks'),
+    ('attack', 'attacks'),
+]
+
+# Noms déjà vus (tels que reçus, sans passer par lower()), borné
+_resolved: Dict[str, Optional[str]] = {}
+_RESOLVED_MAX = 1024
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def resolve_stat(name: str) -> Optional[str]:
+    """Stat de MatchStats correspondant à un nom Sofascore (mis en cache)"""
+    try:
+        return _resolved[name]
+    except KeyError:
+        pass
+
+    normalized = name.strip().lower()
+    if normalized in STAT_NAMES:
+        stat = STAT_NAMES[normalized]
+    else:
+        stat = next((target for needle, target in _FALLBACK_RULES if needle in normalized), None)
+    if len(_resolved) >= _RESOLVED_MAX:
+        _resolved.clear()
+    _resolved[name] = stat
+    return stat
+
+
+def parse_value(value: Union[int, float, str, None]) -> int:
+    """
+    Valeur entière d'une stat
+
+    "54%" -> 54, "7/12 (58%)" -> 7 (numérateur), "12.6" -> 13, ""/None -> 0
+    """
+    if value is None or isinstance(value, bool):
+        return 0
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(round(value))
+    value = str(value)
+    if value.isdigit():
+        return int(value)
+    match = _NUMBER.search(value)
+    if match is None:
+        return 0
+    return int(round(float(match.group())))
+
+
+def select_period(periods: List[Dict]) -> Optional[Dict]:
+    """Période `ALL` (match complet), sinon la première disponible"""
+    for period in periods:
+        if period.get("period") == "ALL":
+            return period
+    return periods[0] if periods else None
+
+
+def _side_value(item: Dict, numeric_key: str, text_key: str) -> int:
+    # homeValue/awayValue sont numériques; home/away sont les textes affichés
+    value = item.get(numeric_key)
+    if value is None:
+        value = item.get(text_key)
+    return parse_value(value)
+
+
+def parse_statistics(data: Dict, stats: Optional[MatchStats] = None) -> MatchStats:
+    """Remplir (ou créer) un MatchStats à partir de la réponse décodée"""
+    stats = stats if stats is not None else MatchStats(source='sofascore')
+    period = select_period(data.get("statistics") or [])
+    if period is None:
+        return stats
+
+    for group in period.get("groups", []):
+        for item in group.get("statisticsItems", []):
+            key = item.get("key")
+            if key in STAT_KEYS:
+                stat = STAT_KEYS[key]
+            else:
+                stat = resolve_stat(item.get("name", ""))
+            if stat is not None:
+                # Une même stat peut figurer dans plusieurs groupes (même valeur)
+                stats.set(stat, _side_value(item, "homeValue", "home"), _side_value(item, "awayValue", "away"))
+    return stats
+
+
+def parse_statistics_bytes(raw: bytes, stats: Optional[MatchStats] = None) -> MatchStats:
+    """Variante sur le corps HTTP brut"""
+    return parse_statistics(fastjson.loads(raw), stats)
@@ -0,0 +1,312 @@
+"""
+Transports - Couche d'accès HTTP interchangeable sous les scrapers
+
+- HttpTransport: client aiohttp partagé (keep-alive, gzip, retries)
+- PlaywrightTransport: navigation Chromium (pool ou page dédiée)
+- FallbackTransport: HTTP d'abord, navigateur seulement si bloqué
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Optional
+import asyncio
+import random
+import time
+import aiohttp
+from playwright.async_api import Page
+from metrics.registry import FAST_BUCKETS, histogram
+from . import fastjson
+from .browser_pool import BrowserPool
+
+# Décodage et normalisation des réponses (json, events, statistics)
+PARSE_SECONDS = histogram("parse_seconds", "Durée de décodage des réponses upstream", ("stage",), FAST_BUCKETS)
+
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+    ),
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Encoding": "gzip, deflate",
+    "Accept-Language": "fr-FR,fr;q=0.9,en;q=0.8",
+    "Origin": "https://www.sofascore.com",
+    "Referer": "https://www.sofascore.com/",
+}
+
+
+class TransportError(Exception):
+    """Échec d'une requête upstream"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class TransportBlocked(TransportError):
+    """Requête refusée par l'upstream (403, 429, challenge anti-bot)"""
+
+
+@dataclass
+class TransportResponse:
+    """Réponse brute d'un transport"""
+    status: int
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get("last-modified")
+
+    def json(self) -> Dict:
+        return fastjson.loads(self.body)
+
+
+class BaseTransport(ABC):
+    """Interface commune à tous les transports"""
+
+    async def start(self):
+        """Initialiser les ressources (session, navigateur...)"""
+
+    async def close(self):
+        """Libérer les ressources"""
+
+    @abstractmethod
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> TransportResponse:
+        """
+        Exécuter un GET
+
+        Returns:
+            TransportResponse (les statuts 304 sont renvoyés tels quels)
+
+        Raises:
+            TransportBlocked: requête bloquée par l'upstream
+            TransportError: toute autre erreur après retries
+        """
+
+    async def fetch_json(self, url: str) -> Dict:
+        """GET + décodage JSON, en levant TransportError si statut >= 400"""
+        response = await self.fetch(url)
+        if response.status >= 400:
+            raise TransportError(f"HTTP {response.status} pour {url}", response.status)
+        started = time.perf_counter()
+        data = response.json()
+        PARSE_SECONDS.observe(time.perf_counter() - started, "json")
+        return data
+
+    async def stream(self, url: str, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        """
+        GET dont le corps est rendu par morceaux au fil de la réception
+
+        Par défaut le corps complet est rendu en un seul morceau; les
+        transports capables de streamer surchargent cette méthode.
+        """
+        response = await self.fetch(url)
+        if response.status >= 400:
+            raise TransportError(f"HTTP {response.status} pour {url}", response.status)
+        yield response.body
+
+
+def _lower_headers(headers) -> Dict[str, str]:
+    return {k.lower(): v for k, v in headers.items()}
+
+
+class HttpTransport(BaseTransport):
+    """Client aiohttp partagé avec pool de connexions keep-alive"""
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    BLOCKED_STATUSES = {401, 403}
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        timeout: float = 10.0,
+        connect_timeout: float = 3.0,
+        retries: int = 2,
+        backoff_base: float = 0.25,
+        backoff_max: float = 4.0,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=connect_timeout)
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=300,
+                keepalive_timeout=30
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers=self.headers,
+                auto_decompress=True
+            )
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _backoff(self, attempt: int) -> float:
+        """Backoff exponentiel avec full jitter"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> TransportResponse:
+        await self.start()
+        last_error: Optional[TransportError] = None
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self._backoff(attempt - 1))
+
+            try:
+                async with self._session.get(url, headers=headers) as response:
+                    if response.status in self.BLOCKED_STATUSES:
+                        raise TransportBlocked(f"HTTP {response.status} pour {url}", response.status)
+
+                    if response.status in self.RETRY_STATUSES:
+                        error_cls = TransportBlocked if response.status == 429 else TransportError
+                        last_error = error_cls(f"HTTP {response.status} pour {url}", response.status)
+                        continue
+
+                    body = await response.read()
+                    return TransportResponse(response.status, body, _lower_headers(response.headers))
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = TransportError(f"{type(e).__name__} pour {url}: {e}")
+
+        raise last_error
+
+    async def stream(self, url: str, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        """Corps rendu au fil de la réception (retries seulement avant le premier octet)"""
+        await self.start()
+        last_error: Optional[TransportError] = None
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self._backoff(attempt - 1))
+
+            started = False
+            try:
+                async with self._session.get(url) as response:
+                    if response.status in self.BLOCKED_STATUSES:
+                        raise TransportBlocked(f"HTTP {response.status} pour {url}", response.status)
+
+                    if response.status in self.RETRY_STATUSES:
+                        error_cls = TransportBlocked if response.status == 429 else TransportError
+                        last_error = error_cls(f"HTTP {response.status} pour {url}", response.status)
+                        continue
+
+                    if response.status >= 400:
+                        raise TransportError(f"HTTP {response.status} pour {url}", response.status)
+
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        started = True
+                        yield chunk
+                    return
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = TransportError(f"{type(e).__name__} pour {url}: {e}")
+                if started:
+                    # Des octets ont déjà été rendus: impossible de rejouer
+                    raise last_error
+
+        raise last_error
+
+
+class PlaywrightTransport(BaseTransport):
+    """
+    Transport par navigateur (contourne certains blocages anti-bot)
+
+    Utilise une page du BrowserPool par requête, ou une page fixe
+    (sérialisée par un verrou) pour un scraper autonome.
+    """
+
+    def __init__(self, pool: Optional[BrowserPool] = None, page: Optional[Page] = None):
+        if pool is None and page is None:
+            raise ValueError("PlaywrightTransport nécessite un pool ou une page")
+        self.pool = pool
+        self.page = page
+        self._page_lock = asyncio.Lock()
+
+    async def _goto(self, page: Page, url: str, headers: Optional[Dict[str, str]]) -> TransportResponse:
+        if headers:
+            await page.set_extra_http_headers(headers)
+        try:
+            response = await page.goto(url, wait_until="domcontentloaded")
+        except Exception as e:
+            raise TransportError(f"Navigation échouée pour {url}: {e}")
+        finally:
+            if headers:
+                await page.set_extra_http_headers({})
+
+        if response is None:
+            raise TransportError(f"Aucune réponse pour {url}")
+        if response.status in HttpTransport.BLOCKED_STATUSES or response.status == 429:
+            raise TransportBlocked(f"HTTP {response.status} pour {url}", response.status)
+
+        body = await response.body()
+        return TransportResponse(response.status, body, _lower_headers(await response.all_headers()))
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> TransportResponse:
+        if self.pool:
+            async with self.pool.lease() as page:
+                return await self._goto(page, url, headers)
+
+        async with self._page_lock:
+            return await self._goto(self.page, url, headers)
+
+
+class FallbackTransport(BaseTransport):
+    """Transport principal avec repli sur un second quand la requête est bloquée"""
+
+    def __init__(self, primary: BaseTransport, fallback: Optional[BaseTransport] = None):
+        self.primary = primary
+        self.fallback = fallback
+        self.fallbacks_used = 0
+
+    async def start(self):
+        await self.primary.start()
+        if self.fallback:
+            await self.fallback.start()
+
+    async def close(self):
+        await self.primary.close()
+        if self.fallback:
+            await self.fallback.close()
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> TransportResponse:
+        try:
+            return await self.primary.fetch(url, headers)
+        except TransportBlocked:
+            if self.fallback is None:
+                raise
+            self.fallbacks_used += 1
+            return await self.fallback.fetch(url, headers)
+
+    async def stream(self, url: str, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        started = False
+        try:
+            async for chunk in self.primary.stream(url, chunk_size):
+                started = True
+                yield chunk
+        except TransportBlocked:
+            if self.fallback is None or started:
+                raise
+            self.fallbacks_used += 1
+            async for chunk in self.fallback.stream(url, chunk_size):
+                yield chunk
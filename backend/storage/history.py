@@ -0,0 +1,347 @@
+"""
+History - Historique persistant des polls et recommandations (SQLite)
+
+Base embarquée en append-only, sans service externe:
+- `stats_snapshots`: un enregistrement par poll, clé (match_id, ts), stats
+  en MatchStats.to_bytes() (~100 octets)
+- `recommendations`: recommandations TES émises à chaque poll, indexées
+  sur (match_id, ts)
+- `matches`: dernière fiche connue de chaque match (équipes, compétition)
+
+`record()` ne fait qu'empiler en mémoire; une tâche de fond écrit les lots
+dans une transaction sur un thread dédié, la boucle de polling n'attend
+jamais le disque. Les lectures par plage passent par la clé primaire.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncio
+import json
+import sqlite3
+import time
+
+from models.match_stats import MatchStats
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stats_snapshots (
+    match_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    minute INTEGER,
+    score TEXT,
+    status TEXT,
+    stats BLOB NOT NULL,
+    PRIMARY KEY (match_id, ts)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS recommendations (
+    match_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    minute INTEGER,
+    bet_type TEXT NOT NULL,
+    description TEXT,
+    confidence TEXT NOT NULL,
+    probability REAL NOT NULL,
+    threshold_reached INTEGER,
+    reasoning TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_recommendations_match_ts ON recommendations (match_id, ts);
+CREATE INDEX IF NOT EXISTS idx_recommendations_ts ON recommendations (ts);
+
+CREATE TABLE IF NOT EXISTS matches (
+    match_id TEXT PRIMARY KEY,
+    home_team TEXT,
+    away_team TEXT,
+    competition TEXT,
+    data TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+"""
+
+
+@dataclass
+class StatsPoint:
+    """Un poll enregistré"""
+    match_id: str
+    ts: float
+    minute: Optional[int]
+    score: Optional[str]
+    status: Optional[str]
+    stats: MatchStats
+
+
+def _range_clause(start: Optional[float], end: Optional[float]) -> Tuple[str, List]:
+    clause, params = "", []
+    if start is not None:
+        clause += " AND ts >= ?"
+        params.append(start)
+    if end is not None:
+        clause += " AND ts < ?"
+        params.append(end)
+    return clause, params
+
+
+class HistoryStore:
+    """
+    Historique des matchs en SQLite
+
+    Usage dans l'API (écritures par lots en tâche de fond):
+        store = HistoryStore("data/history.db")
+        await store.start()
+        store.record(match, stats, recommendations, minute)
+        points = await store.fetch_stats("12345", start=ts)
+        await store.close()
+
+    Usage hors boucle asyncio (back-testing, scripts):
+        store = HistoryStore("data/history.db").open()
+        for point in store.stats_range("12345"): ...
+        store.close_sync()
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+        max_pending: int = 50_000
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._conn: Optional[sqlite3.Connection] = None
+        # Un seul thread pour toutes les requêtes: la connexion n'est jamais partagée
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stats_rows: List[Tuple] = []
+        self._rec_rows: List[Tuple] = []
+        self._match_rows: Dict[str, Tuple] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.dropped_recommendations = 0
+        self.errors = 0
+        self.batches = 0
+
+    # Connexion
+
+    def open(self) -> "HistoryStore":
+        """Ouvrir (et créer si besoin) la base, de façon synchrone"""
+        if self._conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self
+
+    async def start(self):
+        """Ouvrir la base et lancer l'écriture périodique"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history")
+        await self._run(self.open)
+        self._wakeup = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Écrire ce qui reste puis fermer la base"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        await self._run(self.close_sync)
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def close_sync(self):
+        """Fermer la base (usage hors boucle asyncio)"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def _run(self, func, *args):
+        if self._executor is None:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    # Écriture
+
+    @property
+    def pending(self) -> int:
+        return len(self._stats_rows) + len(self._rec_rows)
+
+    def record(
+        self,
+        match: Dict,
+        stats: MatchStats,
+        recommendations: Iterable = (),
+        minute: Optional[int] = None,
+        ts: Optional[float] = None
+    ):
+        """Empiler un poll et ses recommandations (BetRecommendation), sans I/O"""
+        ts = ts if ts is not None else time.time()
+        match_id = str(match['id'])
+
+        if self.pending >= self.max_pending:
+            # Disque trop lent: on abandonne le lot le plus ancien plutôt que la mémoire
+            self.dropped += len(self._stats_rows)
+            self.dropped_recommendations += len(self._rec_rows)
+            self._stats_rows.clear()
+            self._rec_rows.clear()
+
+        self._stats_rows.append((
+            match_id, ts, minute, match.get('score'), match.get('status'), stats.to_bytes()
+        ))
+        for rec in recommendations:
+            self._rec_rows.append((
+                match_id, ts, minute, rec.bet_type.value, rec.description,
+                rec.confidence.value, rec.probability, int(rec.threshold_reached),
+                json.dumps(rec.reasoning, ensure_ascii=False)
+            ))
+        buffered = self._match_rows.get(match_id)
+        self._match_rows[match_id] = (
+            match_id, match.get('home_team'), match.get('away_team'), match.get('competition'),
+            json.dumps(match, ensure_ascii=False, default=str), buffered[5] if buffered else ts, ts
+        )
+        self.recorded += 1
+
+        if self._wakeup is not None and len(self._stats_rows) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Écrire les enregistrements en attente en une transaction"""
+        if not self._stats_rows and not self._rec_rows and not self._match_rows:
+            return
+        stats_rows, self._stats_rows = self._stats_rows, []
+        rec_rows, self._rec_rows = self._rec_rows, []
+        match_rows, self._match_rows = list(self._match_rows.values()), {}
+        try:
+            await self._run(self._write, stats_rows, rec_rows, match_rows)
+            self.written += len(stats_rows)
+            self.batches += 1
+        except (sqlite3.Error, RuntimeError) as e:
+            self.errors += 1
+            self.dropped += len(stats_rows)
+            self.dropped_recommendations += len(rec_rows)
+            print(f"Erreur lors de l'écriture de l'historique: {e}")
+
+    def _write(self, stats_rows: List[Tuple], rec_rows: List[Tuple], match_rows: List[Tuple]):
+        conn = self.open()._conn
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO stats_snapshots VALUES (?, ?, ?, ?, ?, ?)", stats_rows)
+            conn.executemany("INSERT INTO recommendations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rec_rows)
+            conn.executemany(
+                "INSERT INTO matches VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(match_id) DO UPDATE SET home_team = excluded.home_team, "
+                "away_team = excluded.away_team, competition = excluded.competition, "
+                "data = excluded.data, last_seen = excluded.last_seen",
+                match_rows
+            )
+
+    # Lecture (synchrone; variantes async via le thread dédié)
+
+    def stats_range(
+        self,
+        match_id: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: Optional[int] = None
+    ) -> List[StatsPoint]:
+        """Polls d'un match entre `start` (inclus) et `end` (exclu), par date"""
+        clause, params = _range_clause(start, end)
+        query = (
+            "SELECT match_id, ts, minute, score, status, stats FROM stats_snapshots "
+            f"WHERE match_id = ?{clause} ORDER BY ts"
+        )
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        rows = self.open()._conn.execute(query, [str(match_id), *params]).fetchall()
+        return [
+            StatsPoint(row[0], row[1], row[2], row[3], row[4], MatchStats.from_bytes(row[5]))
+            for row in rows
+        ]
+
+    def recommendations_range(
+        self,
+        match_id: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None
+    ) -> List[Dict]:
+        """Recommandations émises pour un match entre `start` et `end`"""
+        clause, params = _range_clause(start, end)
+        cursor = self.open()._conn.execute(
+            "SELECT ts, minute, bet_type, description, confidence, probability, "
+            "threshold_reached, reasoning FROM recommendations "
+            f"WHERE match_id = ?{clause} ORDER BY ts",
+            [str(match_id), *params]
+        )
+        return [
+            {
+                "ts": ts,
+                "minute": minute,
+                "bet_type": bet_type,
+                "description": description,
+                "confidence": confidence,
+                "probability": probability,
+                "threshold_reached": bool(threshold_reached),
+                "reasoning": json.loads(reasoning) if reasoning else [],
+            }
+            for ts, minute, bet_type, description, confidence, probability, threshold_reached, reasoning in cursor
+        ]
+
+    def matches(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Dict]:
+        """Fiches des matchs vus sur la période (chevauchement de [first_seen, last_seen])"""
+        query, params = "SELECT data, first_seen, last_seen FROM matches WHERE 1 = 1", []
+        if start is not None:
+            query += " AND last_seen >= ?"
+            params.append(start)
+        if end is not None:
+            query += " AND first_seen < ?"
+            params.append(end)
+        rows = self.open()._conn.execute(query + " ORDER BY first_seen", params).fetchall()
+        return [
+            {**json.loads(data), "first_seen": first_seen, "last_seen": last_seen}
+            for data, first_seen, last_seen in rows
+        ]
+
+    async def fetch_stats(self, match_id: str, start: Optional[float] = None,
+                          end: Optional[float] = None, limit: Optional[int] = None) -> List[StatsPoint]:
+        return await self._run(self.stats_range, match_id, start, end, limit)
+
+    async def fetch_recommendations(self, match_id: str, start: Optional[float] = None,
+                                    end: Optional[float] = None) -> List[Dict]:
+        return await self._run(self.recommendations_range, match_id, start, end)
+
+    def stats(self) -> Dict:
+        return {
+            "path": self.path,
+            "recorded": self.recorded,
+            "written": self.written,
+            "pending": self.pending,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "dropped_recommendations": self.dropped_recommendations,
+            "errors": self.errors,
+        }
@@ -0,0 +1,45 @@
+"""
+Batch - Stats de plusieurs matchs rangées en colonnes NumPy
+
+Une ligne par match, une colonne par stat et par côté (home, away), dans la
+disposition de MatchStats: la matrice est lue directement depuis les
+tableaux d'entiers, sans parcourir de dicts. Les stratégies TES évaluent
+leurs seuils et probabilités sur des colonnes entières.
+"""
+
+from typing import Dict, Sequence, Union
+import numpy as np
+
+from models.match_stats import STAT_INDEX, STAT_NAMES, MatchStats
+
+
+def pack_stats(stats_list: Sequence[Union[MatchStats, Dict]]) -> np.ndarray:
+    """Matrice d'entiers (n_matchs, 2 * len(STAT_NAMES))"""
+    buffer = b"".join(
+        (stats if isinstance(stats, MatchStats) else MatchStats.from_dict(stats)).values.tobytes()
+        for stats in stats_list
+    )
+    return np.frombuffer(buffer, dtype=np.intc).reshape(len(stats_list), 2 * len(STAT_NAMES))
+
+
+class StatsColumns:
+    """Accès par nom aux colonnes d'une matrice de stats"""
+
+    def __init__(self, table: np.ndarray):
+        self.table = table
+
+    @classmethod
+    def from_stats(cls, stats_list: Sequence[Union[MatchStats, Dict]]) -> "StatsColumns":
+        return cls(pack_stats(stats_list))
+
+    def __len__(self) -> int:
+        return self.table.shape[0]
+
+    def home(self, key: str) -> np.ndarray:
+        return self.table[:, 2 * STAT_INDEX[key]]
+
+    def away(self, key: str) -> np.ndarray:
+        return self.table[:, 2 * STAT_INDEX[key] + 1]
+
+    def total(self, key: str) -> np.ndarray:
+        return self.home(key) + self.away(key)
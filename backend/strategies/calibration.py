@@ -0,0 +1,254 @@
+"""
+Calibration - Probabilités calibrées des stratégies TES
+
+Le score d'une règle (base + bonus fixes) n'est pas une probabilité: il
+peut dépasser 1.0 et ne correspond à aucune fréquence observée. Un modèle
+par stratégie, ajusté hors ligne sur l'historique rejoué (cf.
+backtest.calibrate), le transforme en probabilité:
+- logistique, sur les features de la règle (score, variables, conditions
+  vérifiées; cf. CompiledStrategy.feature_names), standardisées
+- isotonique, sur le score seul (fonction croissante par paliers)
+
+Les paramètres tiennent dans une petite table JSON versionnée
+(`v<N>.json` dans CALIBRATION_PATH, la plus récente est chargée). Chaque
+modèle garde l'empreinte de la règle sur laquelle il a été ajusté: si la
+règle change, il est ignoré et le score brut (borné à [0, 1]) est utilisé.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import json
+import math
+import re
+
+import numpy as np
+
+LOGISTIC = 'logistic'
+ISOTONIC = 'isotonic'
+
+_VERSION_FILE = re.compile(r"^v(\d+)\.json$")
+
+
+@dataclass
+class CalibrationModel:
+    """Modèle d'une stratégie: coefficients logistiques ou paliers isotoniques"""
+    strategy: str
+    kind: str
+    fingerprint: str
+    features: List[str] = field(default_factory=list)
+    # Logistique: z = (x - mean) / scale, p = sigmoïde(intercept + coef . z)
+    mean: List[float] = field(default_factory=list)
+    scale: List[float] = field(default_factory=list)
+    coef: List[float] = field(default_factory=list)
+    intercept: float = 0.0
+    # Isotonique: p = interpolation de (x, y) sur le score
+    x: List[float] = field(default_factory=list)
+    y: List[float] = field(default_factory=list)
+    # Qualité mesurée à l'ajustement (échantillons, Brier avant / après)
+    metrics: Dict = field(default_factory=dict)
+
+    def score(self, features: Sequence[float]) -> float:
+        """Probabilité calibrée d'une ligne de features (un match)"""
+        if self.kind == ISOTONIC:
+            return float(np.interp(features[0], self.x, self.y))
+        total = self.intercept
+        for value, mean, scale, coef in zip(features, self.mean, self.scale, self.coef):
+            if value == value:   # NaN (tendance absente): valeur moyenne
+                total += coef * (value - mean) / scale
+        return 1.0 / (1.0 + math.exp(-total))
+
+    def score_many(self, features: np.ndarray) -> np.ndarray:
+        """Version vectorisée: une ligne de features par match"""
+        features = np.asarray(features, dtype=float)
+        if self.kind == ISOTONIC:
+            return np.interp(features[:, 0], self.x, self.y)
+        z = np.nan_to_num((features - np.asarray(self.mean)) / np.asarray(self.scale))
+        return 1.0 / (1.0 + np.exp(-(self.intercept + z @ np.asarray(self.coef))))
+
+    def to_dict(self) -> Dict:
+        data = {"kind": self.kind, "fingerprint": self.fingerprint, "features": self.features, "metrics": self.metrics}
+        if self.kind == ISOTONIC:
+            data.update(x=self.x, y=self.y)
+        else:
+            data.update(mean=self.mean, scale=self.scale, coef=self.coef, intercept=self.intercept)
+        return data
+
+    @classmethod
+    def from_dict(cls, strategy: str, data: Dict) -> "CalibrationModel":
+        kind = data.get('kind', LOGISTIC)
+        if kind not in (LOGISTIC, ISOTONIC):
+            raise ValueError(f"Modèle inconnu '{kind}' pour {strategy}")
+        return cls(
+            strategy=strategy,
+            kind=kind,
+            fingerprint=data.get('fingerprint', ''),
+            features=list(data.get('features', [])),
+            mean=[float(v) for v in data.get('mean', [])],
+            scale=[float(v) for v in data.get('scale', [])],
+            coef=[float(v) for v in data.get('coef', [])],
+            intercept=float(data.get('intercept', 0.0)),
+            x=[float(v) for v in data.get('x', [])],
+            y=[float(v) for v in data.get('y', [])],
+            metrics=dict(data.get('metrics', {})),
+        )
+
+
+@dataclass
+class CalibrationTable:
+    """Version de la calibration: un modèle par stratégie"""
+    version: int
+    models: Dict[str, CalibrationModel]
+    created_at: str = ""
+    source: str = ""
+
+    def model_for(self, strategy) -> Optional[CalibrationModel]:
+        """Modèle d'une CompiledStrategy, s'il a été ajusté sur cette version de la règle"""
+        model = self.models.get(strategy.id)
+        if model is None or model.fingerprint != strategy.fingerprint:
+            return None
+        if model.kind == LOGISTIC and model.features != strategy.feature_names:
+            return None
+        return model
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": self.version,
+            "created_at": self.created_at,
+            "source": self.source,
+            "models": {strategy: model.to_dict() for strategy, model in self.models.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CalibrationTable":
+        return cls(
+            version=int(data.get('version', 0)),
+            models={
+                strategy: CalibrationModel.from_dict(strategy, model)
+                for strategy, model in data.get('models', {}).items()
+            },
+            created_at=data.get('created_at', ''),
+            source=data.get('source', ''),
+        )
+
+
+# Fichiers versionnés
+
+def _version_files(directory: Path) -> List[Path]:
+    files = [path for path in directory.glob("v*.json") if _VERSION_FILE.match(path.name)]
+    return sorted(files, key=lambda path: int(_VERSION_FILE.match(path.name).group(1)))
+
+
+def calibration_file(path: str) -> Optional[Path]:
+    """Fichier à charger: `path` lui-même ou la version la plus récente du dossier"""
+    path = Path(path)
+    if path.is_dir():
+        files = _version_files(path)
+        return files[-1] if files else None
+    return path if path.exists() else None
+
+
+def load_calibration(path: str) -> Optional[CalibrationTable]:
+    """Table de calibration (None si aucune version n'existe)"""
+    file = calibration_file(path)
+    if file is None:
+        return None
+    try:
+        return CalibrationTable.from_dict(json.loads(file.read_text(encoding='utf-8')))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Calibration invalide {file}: {e}")
+
+
+def save_calibration(directory: str, models: Dict[str, CalibrationModel], source: str = "") -> Path:
+    """Écrire une nouvelle version (v<N+1>.json) sans toucher aux précédentes"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    files = _version_files(directory)
+    version = int(_VERSION_FILE.match(files[-1].name).group(1)) + 1 if files else 1
+    table = CalibrationTable(
+        version=version,
+        models=models,
+        created_at=datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        source=source,
+    )
+    path = directory / f"v{version}.json"
+    path.write_text(json.dumps(table.to_dict(), indent=2), encoding='utf-8')
+    return path
+
+
+# Ajustement
+
+def fit_logistic(
+    features: np.ndarray,
+    outcomes: np.ndarray,
+    l2: float = 1.0,
+    iterations: int = 50
+) -> Dict:
+    """
+    Régression logistique régularisée (L2, Newton-Raphson) sur features standardisées
+
+    Returns:
+        {"mean", "scale", "coef", "intercept"}
+    """
+    features = np.asarray(features, dtype=float)
+    y = np.asarray(outcomes, dtype=float)
+    mean = np.nanmean(features, axis=0)
+    mean = np.where(np.isnan(mean), 0.0, mean)
+    scale = np.nanstd(features, axis=0)
+    scale = np.where(np.isnan(scale) | (scale < 1e-9), 1.0, scale)
+    z = np.nan_to_num((features - mean) / scale)
+    design = np.hstack([np.ones((len(z), 1)), z])
+
+    weights = np.zeros(design.shape[1])
+    penalty = np.full(design.shape[1], l2)
+    penalty[0] = 0.0   # intercept non régularisé
+    for _ in range(iterations):
+        p = 1.0 / (1.0 + np.exp(-(design @ weights)))
+        gradient = design.T @ (p - y) + penalty * weights
+        hessian = (design * (p * (1 - p))[:, None]).T @ design + np.diag(penalty) + 1e-9 * np.eye(len(weights))
+        step = np.linalg.solve(hessian, gradient)
+        weights -= step
+        if np.max(np.abs(step)) < 1e-8:
+            break
+    return {
+        "mean": mean.tolist(),
+        "scale": scale.tolist(),
+        "coef": weights[1:].tolist(),
+        "intercept": float(weights[0]),
+    }
+
+
+def fit_isotonic(scores: np.ndarray, outcomes: np.ndarray, max_points: int = 50) -> Dict:
+    """
+    Régression isotonique (pool adjacent violators) de l'issue sur le score
+
+    Returns:
+        {"x", "y"}: paliers croissants, au plus `max_points`
+    """
+    # Un bloc par score distinct (les scores de règles sont discrets): somme des x, des y, effectif
+    values, inverse = np.unique(np.round(np.asarray(scores, dtype=float), 9), return_inverse=True)
+    counts = np.bincount(inverse)
+    wins = np.bincount(inverse, weights=np.asarray(outcomes, dtype=float))
+
+    blocks: List[List[float]] = []
+    for block in zip((values * counts).tolist(), wins.tolist(), counts.astype(float).tolist()):
+        blocks.append(list(block))
+        while len(blocks) > 1 and blocks[-2][1] / blocks[-2][2] >= blocks[-1][1] / blocks[-1][2]:
+            last = blocks.pop()
+            for k in range(3):
+                blocks[-1][k] += last[k]
+
+    points_x = [block[0] / block[2] for block in blocks]
+    points_y = [block[1] / block[2] for block in blocks]
+    if len(points_x) > max_points:
+        # Sous-échantillonner les paliers en gardant les extrémités
+        keep = np.unique(np.linspace(0, len(points_x) - 1, max_points).round().astype(int))
+        points_x = [points_x[k] for k in keep]
+        points_y = [points_y[k] for k in keep]
+    return {"x": points_x, "y": points_y}
+
+
+def brier(probability: np.ndarray, outcomes: np.ndarray) -> float:
+    probability = np.clip(np.asarray(probability, dtype=float), 0.0, 1.0)
+    return float(np.mean((probability - np.asarray(outcomes, dtype=float)) ** 2))
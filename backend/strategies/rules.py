@@ -0,0 +1,720 @@
+"""
+Rules - Stratégies TES déclaratives compilées en évaluateurs
+
+Un fichier de règles (JSON, ou YAML si PyYAML est installé) décrit chaque
+stratégie: seuils, variables, porte de temps, conditions avec leur bonus de
+probabilité et leurs explications. Chaque expression (sous-ensemble de
+Python: arithmétique, comparaisons, and/or/not, `x if c else y`, abs, min,
+max) est vérifiée puis compilée une seule fois en deux versions:
+- scalaire, sur un match (analyze_match)
+- vectorisée, sur les colonnes NumPy de tous les matchs (analyze_batch)
+
+Noms utilisables dans une expression:
+- `time`: minute de jeu
+- `home.<stat>`, `away.<stat>`, `total.<stat>`: stats de MatchStats
+- `recent.<stat>`, `recent_home.<stat>`, `recent_away.<stat>`: rythme par
+  10 min sur `constants.trend_window` minutes (NaN sans tendance: toute
+  comparaison est alors fausse)
+- `threshold.<clé>` (seuils de la stratégie), `constants.<clé>` (globales)
+- les variables déjà définies de la stratégie
+Une division par zéro vaut 0.
+
+Les stratégies sont indexées par les entrées qu'elles lisent (stats,
+`time`, `recent`): un changement de stats ne réévalue que celles qu'il
+concerne (cf. CompiledStrategy.input_key, RuleSet.affected). Pour `time`,
+seules comptent les comparaisons à une constante (`time >= threshold.time_min`)
+et, si la stratégie calcule avec la minute (rythmes), la tranche de
+`constants.time_step` minutes.
+"""
+
+from dataclasses import dataclass, field
+from operator import itemgetter
+from pathlib import Path
+from string import Formatter
+from types import CodeType
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+import ast
+import copy
+import hashlib
+import json
+import keyword
+import operator
+
+import numpy as np
+
+from models.match_stats import STAT_INDEX, MatchStats
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+DEFAULT_RULES_PATH = Path(__file__).parent / "tes_rules.json"
+
+# Espaces de noms des stats (`home.corners` -> home__corners)
+_STAT_SCOPES = ('home', 'away', 'total', 'recent', 'recent_home', 'recent_away')
+# Entrée pseudo-stat des règles qui lisent les tendances
+RECENT_INPUT = 'recent'
+TIME_INPUT = 'time'
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.BinOp, ast.Add, ast.Sub,
+    ast.Mult, ast.Div, ast.UnaryOp, ast.USub, ast.UAdd, ast.Not, ast.Compare,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.IfExp, ast.Call,
+    ast.Name, ast.Load, ast.Constant, ast.Attribute,
+)
+_FUNCTIONS = ('abs', 'min', 'max')
+# `time <op> constante`, et opérateur équivalent quand la constante est à gauche
+_TIME_TESTS = {
+    ast.Eq: (operator.eq, operator.eq), ast.NotEq: (operator.ne, operator.ne),
+    ast.Lt: (operator.lt, operator.gt), ast.LtE: (operator.le, operator.ge),
+    ast.Gt: (operator.gt, operator.lt), ast.GtE: (operator.ge, operator.le),
+}
+
+
+class RuleError(ValueError):
+    """Fichier de règles invalide"""
+
+
+def _div_scalar(numerator, denominator):
+    return numerator / denominator if denominator else 0.0
+
+
+def _div_vector(numerator, denominator):
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator)
+    out = np.zeros(np.broadcast(numerator, denominator).shape)
+    return np.divide(numerator, denominator, out=out, where=denominator != 0)
+
+
+_SCALAR_GLOBALS = {'__builtins__': {}, '_div': _div_scalar, '_bool': bool, 'abs': abs, 'min': min, 'max': max}
+_VECTOR_GLOBALS = {
+    '__builtins__': {}, '_div': _div_vector, 'abs': np.abs, 'min': np.minimum, 'max': np.maximum,
+    '_not': np.logical_not, '_and': np.logical_and, '_or': np.logical_or, '_where': np.where,
+}
+# Noms du code généré (fonctions, cf. _scalar_program), interdits comme variables
+_RESERVED_NAMES = frozenset({*_SCALAR_GLOBALS, *_VECTOR_GLOBALS, 'bool'})
+
+
+class _Resolver(ast.NodeTransformer):
+    """Résout les noms et adapte l'arbre à la version scalaire ou vectorisée"""
+
+    def __init__(self, source: str, known: Set[str], constants: Dict[str, Dict], vector: bool):
+        self.source = source
+        self.known = known
+        self.constants = constants
+        self.vector = vector
+        self.names: Set[str] = set()
+        # Comparaisons `time <op> constante` et lectures de `time` ailleurs
+        self.time_tests: Set[Tuple[Callable, float]] = set()
+        self.time_uses = 0
+
+    def error(self, message: str) -> RuleError:
+        return RuleError(f"{message} dans `{self.source}`")
+
+    def visit_Attribute(self, node: ast.Attribute):
+        if not isinstance(node.value, ast.Name):
+            raise self.error("Accès d'attribut non supporté")
+        scope, attr = node.value.id, node.attr
+        if scope in _STAT_SCOPES:
+            if attr not in STAT_INDEX:
+                raise self.error(f"Stat inconnue '{attr}'")
+            name = f"{scope}__{attr}"
+            self.names.add(name)
+            return ast.copy_location(ast.Name(name, ast.Load()), node)
+        if scope in self.constants:
+            if attr not in self.constants[scope]:
+                raise self.error(f"Clé inconnue '{scope}.{attr}'")
+            value = self.constants[scope][attr]
+            if not isinstance(value, (int, float, bool)):
+                raise self.error(f"'{scope}.{attr}' n'est pas numérique")
+            return ast.copy_location(ast.Constant(value), node)
+        raise self.error(f"Espace de noms inconnu '{scope}'")
+
+    def visit_Name(self, node: ast.Name):
+        if node.id != TIME_INPUT and node.id not in self.known:
+            raise self.error(f"Nom inconnu '{node.id}'")
+        if node.id == TIME_INPUT:
+            self.time_uses += 1
+        self.names.add(node.id)
+        return node
+
+    def visit_Call(self, node: ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS or node.keywords:
+            raise self.error("Seuls abs(), min() et max() sont autorisés")
+        name = node.func.id
+        arity_ok = len(node.args) == 1 if name == 'abs' else len(node.args) >= 2
+        if not arity_ok or any(isinstance(arg, ast.Starred) for arg in node.args):
+            raise self.error(f"Nombre d'arguments invalide pour {name}()")
+        args = [self.visit(arg) for arg in node.args]
+        if name == 'abs':
+            node.args = args
+            return node
+        # np.minimum / np.maximum n'acceptent que deux opérandes: min(a, b, c) -> min(min(a, b), c)
+        result = args[0]
+        for arg in args[1:]:
+            result = ast.Call(ast.Name(name, ast.Load()), [result, arg], [])
+        return ast.copy_location(result, node)
+
+    def visit_BinOp(self, node: ast.BinOp):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Div):
+            return ast.copy_location(ast.Call(ast.Name('_div', ast.Load()), [node.left, node.right], []), node)
+        return node
+
+    def visit_Compare(self, node: ast.Compare):
+        if len(node.ops) > 1:
+            # a < b < c -> (a < b) and (b < c)
+            operands = [node.left, *node.comparators]
+            pairs = [
+                ast.Compare(operands[i], [op], [operands[i + 1]])
+                for i, op in enumerate(node.ops)
+            ]
+            return self.visit(ast.copy_location(ast.BoolOp(ast.And(), pairs), node))
+        self.generic_visit(node)
+        left, right = node.left, node.comparators[0]
+        for side, (operand, limit) in enumerate(((left, right), (right, left))):
+            if (
+                isinstance(operand, ast.Name) and operand.id == TIME_INPUT
+                and isinstance(limit, ast.Constant) and not isinstance(limit.value, bool)
+            ):
+                self.time_tests.add((_TIME_TESTS[type(node.ops[0])][side], limit.value))
+                self.time_uses -= 1
+                break
+        return node
+
+    def visit_BoolOp(self, node: ast.BoolOp):
+        # Résultat booléen dans les deux versions (`a or b` ne vaut jamais a ou b)
+        self.generic_visit(node)
+        if not self.vector:
+            return ast.copy_location(ast.Call(ast.Name('_bool', ast.Load()), [node], []), node)
+        function = '_and' if isinstance(node.op, ast.And) else '_or'
+        result = node.values[0]
+        for value in node.values[1:]:
+            result = ast.Call(ast.Name(function, ast.Load()), [result, value], [])
+        return ast.copy_location(result, node)
+
+    def visit_UnaryOp(self, node: ast.UnaryOp):
+        self.generic_visit(node)
+        if self.vector and isinstance(node.op, ast.Not):
+            return ast.copy_location(ast.Call(ast.Name('_not', ast.Load()), [node.operand], []), node)
+        return node
+
+    def visit_IfExp(self, node: ast.IfExp):
+        self.generic_visit(node)
+        if self.vector:
+            return ast.copy_location(
+                ast.Call(ast.Name('_where', ast.Load()), [node.test, node.body, node.orelse], []), node
+            )
+        return node
+
+
+@dataclass
+class Expression:
+    """Expression compilée en versions scalaire et vectorisée"""
+    source: str
+    scalar: CodeType
+    vector: CodeType
+    names: FrozenSet[str]
+    tree: ast.expr   # arbre scalaire résolu (cf. CompiledStrategy.evaluate)
+    # Comparaisons de `time` à une constante; `time` lu autrement (calcul sur la minute)
+    time_tests: FrozenSet[Tuple[Callable, float]] = frozenset()
+    time_continuous: bool = False
+
+    def __call__(self, namespace: Dict) -> Any:
+        return eval(self.scalar, _SCALAR_GLOBALS, namespace)
+
+    def columns(self, namespace: Dict) -> Any:
+        return eval(self.vector, _VECTOR_GLOBALS, namespace)
+
+
+def compile_expression(source: Any, known: Set[str], constants: Dict[str, Dict]) -> Expression:
+    """Vérifier et compiler une expression de règle"""
+    text = str(source).strip()
+    if isinstance(source, bool):
+        text = "True" if source else "False"
+    try:
+        tree = ast.parse(text, mode='eval')
+    except SyntaxError as e:
+        raise RuleError(f"Expression invalide `{text}`: {e.msg}")
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise RuleError(f"Syntaxe non autorisée ({type(node).__name__}) dans `{text}`")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, bool)):
+            raise RuleError(f"Constante non numérique dans `{text}`")
+
+    codes, trees, names, resolvers = [], [], set(), []
+    for vector in (False, True):
+        resolver = _Resolver(text, known, constants, vector)
+        resolved = ast.fix_missing_locations(resolver.visit(copy.deepcopy(tree)))
+        codes.append(compile(resolved, f"<règle {text}>", 'eval'))
+        trees.append(resolved.body)
+        names |= resolver.names
+        resolvers.append(resolver)
+    scalar = resolvers[0]
+    return Expression(
+        text, codes[0], codes[1], frozenset(names), trees[0],
+        frozenset(scalar.time_tests), scalar.time_uses > 0
+    )
+
+
+class Template:
+    """Explication avec champs calculés: "{total_corners} corners (seuil: {threshold.total_corners})" """
+
+    def __init__(self, text: str, known: Set[str], constants: Dict[str, Dict]):
+        self.text = text
+        self.parts: List[Tuple[str, Optional[Expression], str]] = []
+        try:
+            parsed = list(Formatter().parse(text))
+        except ValueError as e:
+            raise RuleError(f"Explication invalide `{text}`: {e}")
+        for literal, field_name, spec, conversion in parsed:
+            expression = None
+            if field_name is not None:
+                if conversion or '{' in (spec or ''):
+                    raise RuleError(f"Format non supporté dans `{text}`")
+                expression = compile_expression(field_name, known, constants)
+            self.parts.append((literal, expression, spec or ''))
+        self.names = frozenset(name for _, expression, _ in self.parts if expression for name in expression.names)
+
+        # Une seule f-string compilée: un eval par explication
+        values: List[ast.expr] = []
+        for literal, expression, spec in self.parts:
+            if literal:
+                values.append(ast.Constant(literal))
+            if expression:
+                format_spec = ast.JoinedStr([ast.Constant(spec)]) if spec else None
+                values.append(ast.FormattedValue(expression.tree, -1, format_spec))
+        self.tree = ast.JoinedStr(values)
+        self.code = compile(ast.fix_missing_locations(ast.Expression(self.tree)), f"<explication {text}>", 'eval')
+
+    def render(self, namespace: Dict) -> str:
+        return eval(self.code, _SCALAR_GLOBALS, namespace)
+
+
+@dataclass
+class Condition:
+    """Condition d'une stratégie: bonus et explication selon qu'elle est vraie ou non"""
+    when: Expression
+    bonus: float
+    reason: Optional[Template] = None
+    else_bonus: Optional[float] = None
+    else_reason: Optional[Template] = None
+
+
+@dataclass
+class RuleResult:
+    """Stratégie déclenchée sur un match"""
+    probability: float
+    reasoning: List[str]
+    current_stats: Dict
+    threshold_reached: bool
+    # Valeurs de CompiledStrategy.feature_names (calibration)
+    features: Tuple[float, ...] = ()
+
+
+@dataclass
+class CompiledStrategy:
+    """Stratégie prête à être évaluée"""
+    id: str
+    bet_type: str
+    description: str
+    thresholds: Dict[str, Any]
+    variables: List[Tuple[str, Expression]]
+    gate: Expression
+    base: Expression
+    conditions: List[Condition]
+    min_probability: float
+    current_stats: List[Tuple[str, Expression]]
+    threshold_reached: Expression
+    # Entrées lues: noms de stats, `time`, `recent`
+    inputs: FrozenSet[str] = field(default_factory=frozenset)
+    # Positions lues dans MatchStats.values et dans les rythmes récents (cf. input_key)
+    stat_slots: Tuple[int, ...] = ()
+    recent_slots: Tuple[int, ...] = ()
+    # Comparaisons de `time` à une constante, et tranche de minutes (0: la
+    # minute n'est lue que par ces comparaisons), cf. input_key
+    time_tests: Tuple[Tuple[Callable, float], ...] = ()
+    time_step: int = 0
+    _stat_key: Callable = field(default=tuple, repr=False, compare=False)
+    _recent_key: Callable = field(default=tuple, repr=False, compare=False)
+    # Version scalaire fusionnée en une fonction (cf. _scalar_program)
+    _program: Optional[Callable[[Dict], Optional[RuleResult]]] = field(default=None, repr=False, compare=False)
+    # Empreinte de la spécification (une calibration n'est valable que pour elle)
+    fingerprint: str = ""
+
+    @property
+    def feature_names(self) -> List[str]:
+        """Score additif, variables puis conditions vérifiées (0/1)"""
+        return (
+            ['score']
+            + [name for name, _ in self.variables]
+            + [f"condition_{index}" for index in range(len(self.conditions))]
+        )
+
+    def input_key(self, values: Sequence[int], time: int, recent: Optional[Tuple[int, Sequence[int]]]) -> Tuple:
+        """
+        Valeurs des entrées lues par la stratégie: même clé, même résultat
+        (à la tranche de `time_step` minutes près pour les calculs sur la
+        minute, comme les rythmes; les portes de temps sont exactes)
+
+        Args:
+            values: MatchStats.values du match
+            time: Minute de jeu
+            recent: État de la fenêtre de tendance (MatchTrend.window_state),
+                None sans tendance
+        """
+        if RECENT_INPUT not in self.inputs or recent is None:
+            recent_key = None
+        else:
+            start, deltas = recent
+            recent_key = (start, self._recent_key(deltas))
+        time_key = None
+        if TIME_INPUT in self.inputs:
+            time_key = (
+                tuple(test(time, limit) for test, limit in self.time_tests),
+                time // self.time_step if self.time_step else None,
+            )
+        return (time_key, self._stat_key(values), recent_key)
+
+    def evaluate(self, namespace: Dict) -> Optional[RuleResult]:
+        """Évaluer la stratégie sur un match (namespace de RuleSet.scalar_namespace)"""
+        if self._program is None:
+            self._program = _scalar_program(self)
+        return self._program(namespace)
+
+    def evaluate_batch(self, namespace: Dict, size: int) -> Iterator[Tuple[int, RuleResult]]:
+        """Version vectorisée (namespace de RuleSet.vector_namespace), une ligne par match"""
+        ns = dict(namespace)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for name, expression in self.variables:
+                ns[name] = expression.columns(ns)
+
+            probability = np.array(np.broadcast_to(self.base.columns(ns), (size,)), dtype=float)
+            flags = []
+            for condition in self.conditions:
+                when = np.broadcast_to(condition.when.columns(ns), (size,))
+                probability += np.where(when, condition.bonus, condition.else_bonus or 0.0)
+                flags.append(when)
+            gate = np.broadcast_to(self.gate.columns(ns), (size,))
+
+        rows = np.flatnonzero(gate & (probability >= self.min_probability))
+        if not len(rows):
+            return
+
+        def gather(value) -> List:
+            return np.broadcast_to(value, (size,))[rows].tolist()
+
+        # Valeurs Python des lignes retenues, pour les explications
+        template_names = set()
+        for condition in self.conditions:
+            for template in (condition.reason, condition.else_reason):
+                if template:
+                    template_names |= template.names
+        row_values = {name: gather(ns[name]) for name in template_names}
+        flag_values = [gather(flag) for flag in flags]
+        variable_values = [gather(ns[name]) for name, _ in self.variables]
+        current_values = [(key, gather(expression.columns(ns))) for key, expression in self.current_stats]
+        reached_values = gather(self.threshold_reached.columns(ns))
+
+        for k, (row, prob) in enumerate(zip(rows.tolist(), probability[rows].tolist())):
+            row_ns = {name: values[k] for name, values in row_values.items()}
+            reasoning = []
+            for condition, values in zip(self.conditions, flag_values):
+                template = condition.reason if values[k] else condition.else_reason
+                if template:
+                    reasoning.append(template.render(row_ns))
+            yield row, RuleResult(
+                prob,
+                reasoning,
+                {key: values[k] for key, values in current_values},
+                bool(reached_values[k]),
+                (prob, *(values[k] for values in variable_values), *(bool(values[k]) for values in flag_values))
+            )
+
+
+def _slot_getter(slots: Tuple[int, ...]) -> Callable[[Sequence], Any]:
+    """Lecture groupée des positions (itemgetter, sans boucle Python)"""
+    if not slots:
+        return lambda values: ()
+    return itemgetter(*slots)
+
+
+def _scalar_program(strategy: CompiledStrategy) -> Callable[[Dict], Optional[RuleResult]]:
+    """
+    Fusionner la version scalaire d'une stratégie en une seule fonction
+    Python (variables locales, un seul appel par match au lieu d'un eval
+    par expression). Les noms internes contiennent '__', interdit dans les
+    noms de variables de règles.
+    """
+    code = ast.unparse
+    variables = {name for name, _ in strategy.variables}
+    inputs = set()
+    for expression in RuleSet._expressions(strategy):
+        inputs |= expression.names - variables
+
+    lines = ["def evaluate__(ns__):"]
+    lines += [f"    {name} = ns__[{name!r}]" for name in sorted(inputs)]
+    lines += [f"    {name} = {code(expression.tree)}" for name, expression in strategy.variables]
+    lines.append(f"    if not ({code(strategy.gate.tree)}):")
+    lines.append("        return None")
+    lines.append(f"    probability__ = {code(strategy.base.tree)}")
+    lines.append("    reasoning__ = []")
+    for index, condition in enumerate(strategy.conditions):
+        branches = [
+            (condition.bonus, condition.reason),
+            (condition.else_bonus, condition.else_reason),
+        ]
+        lines.append(f"    condition_{index}__ = bool({code(condition.when.tree)})")
+        lines.append(f"    if condition_{index}__:")
+        for k, (bonus, template) in enumerate(branches):
+            if k:
+                lines.append("    else:")
+            body = []
+            if bonus is not None:
+                body.append(f"        probability__ += {bonus!r}")
+            if template:
+                body.append(f"        reasoning__.append({code(template.tree)})")
+            lines += body or ["        pass"]
+    lines.append(f"    if probability__ < {strategy.min_probability!r}:")
+    lines.append("        return None")
+    current = ", ".join(f"{key!r}: {code(expression.tree)}" for key, expression in strategy.current_stats)
+    features = ", ".join(
+        ["probability__"]
+        + [name for name, _ in strategy.variables]
+        + [f"condition_{index}__" for index in range(len(strategy.conditions))]
+    )
+    lines.append(
+        f"    return RuleResult__(probability__, reasoning__, {{{current}}}, "
+        f"bool({code(strategy.threshold_reached.tree)}), ({features},))"
+    )
+
+    scope = dict(_SCALAR_GLOBALS, RuleResult__=RuleResult, bool=bool)
+    exec(compile("\n".join(lines), f"<stratégie {strategy.id}>", 'exec'), scope)
+    return scope['evaluate__']
+
+
+class RuleSet:
+    """Ensemble de stratégies compilées à partir d'une spécification"""
+
+    def __init__(self, spec: Dict, source: str = "<dict>"):
+        self.spec = spec
+        self.source = source
+        self.constants: Dict[str, Any] = dict(spec.get('constants', {}))
+        self.trend_window = int(self.constants.get('trend_window', 10))
+        # Tranche de minutes du mémo pour les calculs sur la minute (cf. CompiledStrategy.input_key)
+        self.time_step = self.constants.get('time_step', 5)
+        if not isinstance(self.time_step, int) or isinstance(self.time_step, bool) or self.time_step < 1:
+            raise RuleError(f"constants.time_step doit être un entier >= 1 ({self.time_step!r})")
+        self.strategies: List[CompiledStrategy] = [
+            self._compile_strategy(raw) for raw in spec.get('strategies', [])
+        ]
+        ids = [strategy.id for strategy in self.strategies]
+        if len(set(ids)) != len(ids):
+            raise RuleError("Identifiants de stratégie en double")
+
+        # Stratégies par entrée lue
+        self.by_input: Dict[str, List[CompiledStrategy]] = {}
+        for strategy in self.strategies:
+            for name in strategy.inputs:
+                self.by_input.setdefault(name, []).append(strategy)
+
+        # Noms de stats à préparer pour l'ensemble des stratégies
+        needed = set()
+        for strategy in self.strategies:
+            for expression in self._expressions(strategy):
+                needed |= {name for name in expression.names if '__' in name}
+        self._stat_names = sorted(needed)
+        # (nom, portée, index dans MatchStats.values), calculé une fois
+        self._stat_plan = [
+            (name, scope, 2 * STAT_INDEX[stat])
+            for name in self._stat_names
+            for scope, stat in [name.split('__', 1)]
+        ]
+
+    @property
+    def thresholds(self) -> Dict[str, Dict]:
+        return {strategy.id: dict(strategy.thresholds) for strategy in self.strategies}
+
+    def with_thresholds(self, overrides: Dict[str, Dict[str, Any]]) -> "RuleSet":
+        """Copie recompilée avec des seuils remplacés ({stratégie: {clé: valeur}})"""
+        spec = copy.deepcopy(self.spec)
+        for raw in spec.get('strategies', []):
+            raw.setdefault('thresholds', {}).update(overrides.get(raw.get('id'), {}))
+        return RuleSet(spec, self.source)
+
+    def affected(self, changed: Iterable[str]) -> List[CompiledStrategy]:
+        """Stratégies qui lisent au moins une des entrées modifiées (ordre du fichier)"""
+        hit = {id(strategy) for name in changed for strategy in self.by_input.get(name, [])}
+        return [strategy for strategy in self.strategies if id(strategy) in hit]
+
+    # Namespaces d'évaluation
+
+    def scalar_namespace(self, stats: MatchStats, time: int, recent: Optional[Sequence[float]] = None) -> Dict:
+        """Valeurs d'un match (recent: rythmes dans la disposition de MatchStats.values)"""
+        values = stats.values
+        if isinstance(recent, np.ndarray):
+            recent = recent.tolist()
+        ns: Dict[str, Any] = {TIME_INPUT: time}
+        for name, scope, index in self._stat_plan:
+            if scope == 'home':
+                ns[name] = values[index]
+            elif scope == 'away':
+                ns[name] = values[index + 1]
+            elif scope == 'total':
+                ns[name] = values[index] + values[index + 1]
+            elif recent is None:
+                ns[name] = float('nan')
+            elif scope == 'recent':
+                ns[name] = recent[index] + recent[index + 1]
+            else:
+                ns[name] = recent[index if scope == 'recent_home' else index + 1]
+        return ns
+
+    def vector_namespace(self, table: np.ndarray, time: np.ndarray, recent: np.ndarray) -> Dict:
+        """Colonnes de tous les matchs (table et recent: n_matchs x 2 * len(STAT_NAMES))"""
+        ns: Dict[str, Any] = {TIME_INPUT: time}
+        for name, scope, index in self._stat_plan:
+            source = table if scope in ('home', 'away', 'total') else recent
+            if scope in ('home', 'recent_home'):
+                ns[name] = source[:, index]
+            elif scope in ('away', 'recent_away'):
+                ns[name] = source[:, index + 1]
+            else:
+                ns[name] = source[:, index] + source[:, index + 1]
+        return ns
+
+    # Compilation
+
+    @staticmethod
+    def _expressions(strategy: CompiledStrategy) -> Iterator[Expression]:
+        yield from (expression for _, expression in strategy.variables)
+        yield strategy.gate
+        yield strategy.base
+        for condition in strategy.conditions:
+            yield condition.when
+            for template in (condition.reason, condition.else_reason):
+                if template:
+                    yield from (expression for _, expression, _ in template.parts if expression)
+        yield from (expression for _, expression in strategy.current_stats)
+        yield strategy.threshold_reached
+
+    def _compile_strategy(self, raw: Dict) -> CompiledStrategy:
+        strategy_id = raw.get('id')
+        if not strategy_id:
+            raise RuleError("Stratégie sans `id`")
+        try:
+            thresholds = dict(raw.get('thresholds', {}))
+            constants = {'threshold': thresholds, 'constants': self.constants}
+            known: Set[str] = set()
+
+            def expr(source) -> Expression:
+                return compile_expression(source, known, constants)
+
+            def template(text: Optional[str]) -> Optional[Template]:
+                return Template(text, known, constants) if text else None
+
+            def constant(source) -> float:
+                if isinstance(source, (int, float)):
+                    return float(source)
+                expression = expr(source)
+                if expression.names:
+                    raise RuleError(f"`{source}` doit être constant (seuils et constantes uniquement)")
+                return float(expression({}))
+
+            variables = []
+            for name, source in raw.get('variables', {}).items():
+                if (
+                    not name.isidentifier() or keyword.iskeyword(name) or '__' in name
+                    or name in (TIME_INPUT, *_STAT_SCOPES, *constants) or name in _RESERVED_NAMES
+                ):
+                    raise RuleError(f"Nom de variable invalide '{name}'")
+                variables.append((name, expr(source)))
+                known.add(name)
+
+            conditions = [
+                Condition(
+                    when=expr(item['when']),
+                    bonus=constant(item.get('bonus', 0.0)),
+                    reason=template(item.get('reason')),
+                    else_bonus=constant(item['else_bonus']) if 'else_bonus' in item else None,
+                    else_reason=template(item.get('else_reason')),
+                )
+                for item in raw.get('conditions', [])
+            ]
+            strategy = CompiledStrategy(
+                id=strategy_id,
+                bet_type=raw['bet_type'],
+                description=raw.get('description', strategy_id),
+                thresholds=thresholds,
+                variables=variables,
+                gate=expr(raw.get('when', 'time >= threshold.time_min')),
+                base=expr(raw.get('base', 'threshold.confidence_base')),
+                conditions=conditions,
+                min_probability=constant(raw.get('min_probability', 0.0)),
+                current_stats=[(key, expr(source)) for key, source in raw.get('current_stats', {}).items()],
+                threshold_reached=expr(raw.get('threshold_reached', True)),
+            )
+        except KeyError as e:
+            raise RuleError(f"Stratégie '{strategy_id}': champ manquant {e}")
+        except RuleError as e:
+            raise RuleError(f"Stratégie '{strategy_id}': {e}")
+
+        strategy.fingerprint = hashlib.sha1(
+            json.dumps({'strategy': raw, 'constants': self.constants}, sort_keys=True, default=str).encode()
+        ).hexdigest()[:12]
+
+        inputs, stat_slots, recent_slots = set(), set(), set()
+        time_tests, time_continuous = set(), False
+        variable_names = {name for name, _ in variables}
+        for expression in self._expressions(strategy):
+            time_tests |= expression.time_tests
+            time_continuous = time_continuous or expression.time_continuous
+            for name in expression.names - variable_names:
+                if name == TIME_INPUT:
+                    inputs.add(TIME_INPUT)
+                    continue
+                scope, stat = name.split('__', 1)
+                index = 2 * STAT_INDEX[stat]
+                side = scope.rsplit('_', 1)[-1]
+                slots = {index} if side == 'home' else {index + 1} if side == 'away' else {index, index + 1}
+                if scope.startswith('recent'):
+                    inputs.add(RECENT_INPUT)
+                    recent_slots |= slots
+                else:
+                    inputs.add(stat)
+                    stat_slots |= slots
+        strategy.inputs = frozenset(inputs)
+        strategy.time_tests = tuple(sorted(time_tests, key=lambda test: (test[1], test[0].__name__)))
+        strategy.time_step = self.time_step if time_continuous else 0
+        strategy.stat_slots = tuple(sorted(stat_slots))
+        strategy.recent_slots = tuple(sorted(recent_slots))
+        strategy._stat_key = _slot_getter(strategy.stat_slots)
+        strategy._recent_key = _slot_getter(strategy.recent_slots)
+        # Compilée dès le chargement: une erreur est refusée au rechargement, pas à l'analyse
+        try:
+            strategy._program = _scalar_program(strategy)
+        except (SyntaxError, ValueError) as e:
+            raise RuleError(f"Stratégie '{strategy_id}': génération impossible ({e})")
+        return strategy
+
+
+def load_rules(path: Optional[str] = None) -> RuleSet:
+    """Lire et compiler un fichier de règles (.json, .yaml/.yml)"""
+    path = Path(path) if path else DEFAULT_RULES_PATH
+    text = path.read_text(encoding='utf-8')
+    if path.suffix in ('.yaml', '.yml'):
+        if yaml is None:
+            raise RuleError("PyYAML est requis pour les règles en YAML")
+        try:
+            spec = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise RuleError(f"YAML invalide: {e}")
+    else:
+        try:
+            spec = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise RuleError(f"JSON invalide: {e}")
+    if not isinstance(spec, dict):
+        raise RuleError("Le fichier de règles doit contenir un objet")
+    return RuleSet(spec, str(path))
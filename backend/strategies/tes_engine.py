@@ -1,10 +1,40 @@
 """
 TES Engine - Moteur d'analyse avec les stratégies TES
+
+Les stratégies sont décrites dans un fichier de règles (tes_rules.json par
+défaut, cf. rules.py) compilé en évaluateurs scalaires et vectorisés. Le
+fichier peut être modifié à chaud: il est recompilé puis remplacé d'un
+bloc, sans redémarrer l'API; une version invalide est ignorée.
+
+Le score additif d'une règle est transformé en probabilité par le modèle de
+calibration de la stratégie (cf. calibration.py), ou simplement borné à
+[0, 1] sans modèle.
+
+Le dernier résultat de chaque stratégie est gardé par match, avec la clé des
+entrées qu'elle lit (stats, minute, rythmes récents): entre deux événements,
+un poll ne réévalue rien et renvoie les recommandations déjà calculées.
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
+from time import perf_counter
+import asyncio
+import os
+import numpy as np
+
+from metrics.registry import FAST_BUCKETS, histogram
+from models.match_stats import MatchStats
+from .batch import pack_stats
+from .calibration import CalibrationModel, CalibrationTable, calibration_file, load_calibration
+from .rules import DEFAULT_RULES_PATH, RuleError, RuleResult, RuleSet, load_rules
+from .trends import MatchTrend, stack_rates
+
+# Évaluation d'une stratégie: un match (scalar) ou un lot de matchs (batch),
+# calibration et construction des recommandations comprises
+STRATEGY_SECONDS = histogram(
+    "tes_strategy_seconds", "Durée d'évaluation d'une stratégie TES", ("strategy", "mode"), FAST_BUCKETS
+)
 
 
 class BetType(Enum):
@@ -24,6 +54,11 @@ class Confidence(Enum):
     VERY_LOW = "very_low"    # 0-20%
 
 
+# Bornes inférieures de chaque niveau (au-dessus de VERY_LOW), cf. _get_confidence_level
+_CONFIDENCE_BOUNDS = [0.50, 0.60, 0.70, 0.80]
+_CONFIDENCE_LEVELS = [Confidence.VERY_LOW, Confidence.LOW, Confidence.MEDIUM, Confidence.HIGH, Confidence.VERY_HIGH]
+
+
 @dataclass
 class BetRecommendation:
     """Recommandation de pari"""
@@ -34,6 +69,46 @@ class BetRecommendation:
     reasoning: List[str]
     current_stats: Dict
     threshold_reached: bool
+    strategy: Optional[str] = None
+    # Score additif de la règle, avant calibration
+    raw_probability: Optional[float] = None
+    # Features de la règle (cf. CompiledStrategy.feature_names), pour l'ajustement hors ligne
+    features: Tuple = ()
+
+
+class _Scoring:
+    """Règles actives et modèle de calibration de chaque stratégie (remplacés d'un bloc)"""
+
+    __slots__ = ("rules", "calibration", "models")
+
+    def __init__(self, rules: RuleSet, calibration: Optional[CalibrationTable]):
+        self.rules = rules
+        self.calibration = calibration
+        self.models: List[Optional[CalibrationModel]] = [
+            calibration.model_for(strategy) if calibration else None
+            for strategy in rules.strategies
+        ]
+
+
+class _MatchMemo:
+    """Clé d'entrées et recommandation de chaque stratégie pour un match"""
+
+    __slots__ = ("scoring", "keys", "results")
+
+    def __init__(self, scoring: _Scoring):
+        self.scoring = scoring
+        self.keys: List[Optional[Tuple]] = [None] * len(scoring.rules.strategies)
+        self.results: List[Optional[BetRecommendation]] = [None] * len(scoring.rules.strategies)
+
+    def store(self, position: int, key: Tuple, recommendation: Optional[BetRecommendation]):
+        self.keys[position] = key
+        self.results[position] = recommendation
+
+    def recommendations(self) -> List[BetRecommendation]:
+        # Ordre des stratégies puis tri stable: même ordre qu'une analyse complète
+        recommendations = [rec for rec in self.results if rec is not None]
+        recommendations.sort(key=lambda x: x.probability, reverse=True)
+        return recommendations
 
 
 class TESEngine:
@@ -42,261 +117,329 @@ class TESEngine:
     Applique vos stratégies sur les stats en temps réel
     """
 
-    def __init__(self):
-        # Seuils configurables pour chaque stratégie
-        self.thresholds = {
-            'corner_high_activity': {
-                'total_corners': 8,
-                'time_min': 60,
-                'confidence_base': 0.75
-            },
-            'card_aggressive_match': {
-                'total_fouls': 20,
-                'yellow_cards': 3,
-                'time_min': 45,
-                'confidence_base': 0.70
-            },
-            'goal_high_pressure': {
-                'shots_on_target': 5,
-                'dangerous_attacks': 40,
-                'time_min': 55,
-                'confidence_base': 0.65
-            },
-            'both_score_balanced': {
-                'possession_diff_max': 15,
-                'shots_min_each': 3,
-                'time_min': 50,
-                'confidence_base': 0.68
-            }
-        }
+    def __init__(
+        self,
+        rules_path: Optional[str] = None,
+        rules: Optional[RuleSet] = None,
+        calibration_path: Optional[str] = None,
+        calibration: Optional[CalibrationTable] = None
+    ):
+        self.rules_path = str(rules_path or DEFAULT_RULES_PATH)
+        self._rules_mtime: Optional[int] = None
+        self.reloads = 0
+        # Calibration des probabilités (dossier de versions ou fichier; None = score brut borné)
+        self.calibration_path = calibration_path
+        self.calibration = calibration
+        self._calibration_stamp: Optional[Tuple] = None
+        # Dernier résultat de chaque stratégie par match (cf. _dirty)
+        self._memo: Dict[str, _MatchMemo] = {}
+        self.evaluations = 0
+        self.reused = 0
+        # Seuils de chaque stratégie, tirés des règles (mis à jour sur place au rechargement)
+        self.thresholds: Dict[str, Dict] = {}
+        if rules is None:
+            self._rules_mtime = self._mtime()
+            rules = load_rules(self.rules_path)
+        self._set_rules(rules)
+        if calibration is None and calibration_path:
+            self.reload_calibration()
+
+    # Règles et calibration
+
+    def _set_rules(self, rules: RuleSet):
+        # Une seule affectation: une analyse en cours garde l'ancienne version
+        self.rules = rules
+        self._scoring = _Scoring(rules, self.calibration)
+        self.thresholds.clear()
+        self.thresholds.update(rules.thresholds)
+
+    def _set_calibration(self, calibration: Optional[CalibrationTable]):
+        self.calibration = calibration
+        self._scoring = _Scoring(self.rules, calibration)
+        ignored = [
+            strategy.id for strategy, model in zip(self.rules.strategies, self._scoring.models)
+            if model is None and calibration and strategy.id in calibration.models
+        ]
+        if ignored:
+            print(f"Calibration v{calibration.version} ignorée pour {', '.join(ignored)} (règle modifiée depuis l'ajustement)")
+
+    def _mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.rules_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def reload_rules(self, force: bool = False) -> bool:
+        """
+        Recompiler le fichier de règles s'il a changé
 
-    def analyze_match(self, match_stats: Dict, time_elapsed: int) -> List[BetRecommendation]:
+        Returns:
+            True si de nouvelles règles sont actives (les anciennes sont
+            conservées si le fichier est invalide)
+        """
+        mtime = self._mtime()
+        if mtime is None or (mtime == self._rules_mtime and not force):
+            return False
+        self._rules_mtime = mtime
+        try:
+            rules = load_rules(self.rules_path)
+        except (OSError, RuleError) as e:
+            print(f"Erreur dans les règles {self.rules_path}, version précédente conservée: {e}")
+            return False
+        self._set_rules(rules)
+        self.reloads += 1
+        print(f"Règles TES rechargées: {len(rules.strategies)} stratégies")
+        return True
+
+    def reload_calibration(self, force: bool = False) -> bool:
+        """
+        Charger la version de calibration la plus récente si elle a changé
+
+        Returns:
+            True si une nouvelle table est active (l'ancienne est conservée
+            si le fichier est invalide)
+        """
+        if not self.calibration_path:
+            return False
+        file = calibration_file(self.calibration_path)
+        try:
+            stamp = (file, os.stat(file).st_mtime_ns) if file else None
+        except OSError:
+            stamp = None
+        if stamp is None or (stamp == self._calibration_stamp and not force):
+            return False
+        self._calibration_stamp = stamp
+        try:
+            calibration = load_calibration(self.calibration_path)
+        except (OSError, ValueError) as e:
+            print(f"Erreur de calibration, version précédente conservée: {e}")
+            return False
+        self._set_calibration(calibration)
+        print(f"Calibration v{calibration.version} chargée: {', '.join(calibration.models) or 'aucun modèle'}")
+        return True
+
+    async def watch_rules(self, interval: float = 5.0):
+        """Tâche de fond: recharger règles et calibration quand leurs fichiers changent"""
+        while True:
+            await asyncio.sleep(interval)
+            self.reload_rules()
+            self.reload_calibration()
+
+    # Analyse
+
+    def analyze_match(
+        self,
+        match_stats: Union[MatchStats, Dict],
+        time_elapsed: Optional[int],
+        trend: Optional[MatchTrend] = None,
+        match_id: Optional[str] = None
+    ) -> List[BetRecommendation]:
         """
         Analyse un match et retourne les recommandations de paris
 
         Args:
-            match_stats: Stats du match (format de base_scraper)
-            time_elapsed: Temps écoulé en minutes
+            match_stats: Stats du match (MatchStats, ou dict au format historique)
+            time_elapsed: Minute de jeu (cf. pipeline.clock); None si inconnue,
+                aucune stratégie n'est alors déclenchée
+            trend: Rythmes récents du match (optionnel, cf. trends.TrendTracker)
+            match_id: Identifiant du match: seules les stratégies dont les
+                entrées ont changé depuis la dernière analyse sont réévaluées
 
         Returns:
             List[BetRecommendation]: Liste des paris recommandés
         """
-        recommendations = []
-
-        # Analyser chaque stratégie
-        recommendations.extend(self._analyze_corners(match_stats, time_elapsed))
-        recommendations.extend(self._analyze_cards(match_stats, time_elapsed))
-        recommendations.extend(self._analyze_goals(match_stats, time_elapsed))
-        recommendations.extend(self._analyze_both_teams_score(match_stats, time_elapsed))
-
-        # Trier par confiance décroissante
-        recommendations.sort(key=lambda x: x.probability, reverse=True)
-
-        return recommendations
-
-    def _analyze_corners(self, stats: Dict, time: int) -> List[BetRecommendation]:
-        """Stratégie d'analyse des corners"""
-        recommendations = []
-
-        corners = stats.get('corners', {'home': 0, 'away': 0})
-        total_corners = corners['home'] + corners['away']
-
-        threshold = self.thresholds['corner_high_activity']
-
-        # Stratégie 1: Corners haute activité
-        if time >= threshold['time_min']:
-            reasoning = []
-            probability = threshold['confidence_base']
-
-            # Vérifier le seuil de corners
-            if total_corners >= threshold['total_corners']:
-                reasoning.append(f"✅ {total_corners} corners déjà marqués (seuil: {threshold['total_corners']})")
-                probability += 0.10
-            else:
-                reasoning.append(f"⏳ {total_corners}/{threshold['total_corners']} corners")
-                probability -= 0.10
-
-            # Vérifier la tendance (corners/10min)
-            corners_per_10min = (total_corners / time) * 10
-            if corners_per_10min >= 1.5:
-                reasoning.append(f"📈 Rythme élevé: {corners_per_10min:.1f} corners/10min")
-                probability += 0.08
-            else:
-                reasoning.append(f"📉 Rythme faible: {corners_per_10min:.1f} corners/10min")
-
-            # Vérifier la possession offensive
-            possession = stats.get('possession', {'home': 50, 'away': 50})
-            attacks = stats.get('attacks', {'home': 0, 'away': 0})
-            total_attacks = attacks['home'] + attacks['away']
-
-            if total_attacks >= 80:
-                reasoning.append(f"⚡ Match offensif: {total_attacks} attaques")
-                probability += 0.07
-
-            # Créer la recommandation si la probabilité est suffisante
-            if probability >= 0.60:
-                confidence = self._get_confidence_level(probability)
-
-                recommendations.append(BetRecommendation(
-                    bet_type=BetType.CORNER,
-                    description=f"Prochains corners (9+)",
-                    confidence=confidence,
-                    probability=probability,
-                    reasoning=reasoning,
-                    current_stats={'corners': total_corners, 'time': time},
-                    threshold_reached=total_corners >= threshold['total_corners']
-                ))
-
-        return recommendations
-
-    def _analyze_cards(self, stats: Dict, time: int) -> List[BetRecommendation]:
-        """Stratégie d'analyse des cartons"""
-        recommendations = []
-
-        yellow_cards = stats.get('yellow_cards', {'home': 0, 'away': 0})
-        red_cards = stats.get('red_cards', {'home': 0, 'away': 0})
-        fouls = stats.get('fouls', {'home': 0, 'away': 0})
-
-        total_yellows = yellow_cards['home'] + yellow_cards['away']
-        total_reds = red_cards['home'] + red_cards['away']
-        total_fouls = fouls['home'] + fouls['away']
-
-        threshold = self.thresholds['card_aggressive_match']
-
-        if time >= threshold['time_min']:
-            reasoning = []
-            probability = threshold['confidence_base']
-
-            # Vérifier les fautes
-            if total_fouls >= threshold['total_fouls']:
-                reasoning.append(f"✅ Match rugueux: {total_fouls} fautes (seuil: {threshold['total_fouls']})")
-                probability += 0.12
-            else:
-                reasoning.append(f"⏳ {total_fouls}/{threshold['total_fouls']} fautes")
-
-            # Vérifier les cartons déjà distribués
-            if total_yellows >= threshold['yellow_cards']:
-                reasoning.append(f"🟨 {total_yellows} cartons jaunes déjà distribués")
-                probability += 0.10
-
-            # Taux de fautes par 10min
-            fouls_per_10min = (total_fouls / time) * 10
-            if fouls_per_10min >= 4.0:
-                reasoning.append(f"⚠️ Rythme agressif: {fouls_per_10min:.1f} fautes/10min")
-                probability += 0.08
-
-            if probability >= 0.55:
-                confidence = self._get_confidence_level(probability)
-
-                recommendations.append(BetRecommendation(
-                    bet_type=BetType.CARD,
-                    description=f"Prochain carton (jaune ou rouge)",
-                    confidence=confidence,
-                    probability=probability,
-                    reasoning=reasoning,
-                    current_stats={'yellows': total_yellows, 'reds': total_reds, 'fouls': total_fouls},
-                    threshold_reached=total_fouls >= threshold['total_fouls']
-                ))
+        if isinstance(match_stats, dict):
+            match_stats = MatchStats.from_dict(match_stats)
+        scoring = self._scoring
+        rules = scoring.rules
+        time = time_elapsed or 0
+        recent = self._recent(rules, trend)
+        memo, dirty = self._dirty(scoring, match_id, match_stats, time, self._window(rules, trend))
+
+        if dirty:
+            namespace = rules.scalar_namespace(match_stats, time, recent)
+            for position, strategy, key in dirty:
+                started = perf_counter()
+                result = strategy.evaluate(namespace)
+                recommendation = None
+                if result is not None:
+                    model = scoring.models[position]
+                    probability = model.score(result.features) if model else min(max(result.probability, 0.0), 1.0)
+                    recommendation = self._recommendation(
+                        strategy, result, probability, self._get_confidence_level(probability)
+                    )
+                memo.store(position, key, recommendation)
+                STRATEGY_SECONDS.observe(perf_counter() - started, strategy.id, "scalar")
+        return memo.recommendations()
+
+    def analyze_batch(
+        self,
+        stats_list: Sequence[Union[MatchStats, Dict]],
+        times: Sequence[Optional[int]],
+        trends: Optional[Sequence[Optional[MatchTrend]]] = None,
+        match_ids: Optional[Sequence[Optional[str]]] = None
+    ) -> List[List[BetRecommendation]]:
+        """
+        Analyse plusieurs matchs d'un coup (mêmes résultats que analyze_match)
 
-        return recommendations
+        Les seuils et probabilités sont calculés sur des colonnes NumPy; les
+        recommandations et leurs explications ne sont construites que pour
+        les matchs qui passent. Avec `match_ids`, seuls les matchs et
+        stratégies dont les entrées ont changé sont réévalués.
 
-    def _analyze_goals(self, stats: Dict, time: int) -> List[BetRecommendation]:
-        """Stratégie d'analyse des buts"""
-        recommendations = []
-
-        shots = stats.get('shots', {'home': 0, 'away': 0})
-        shots_on_target = stats.get('shots_on_target', {'home': 0, 'away': 0})
-        dangerous_attacks = stats.get('dangerous_attacks', {'home': 0, 'away': 0})
-
-        total_shots = shots['home'] + shots['away']
-        total_on_target = shots_on_target['home'] + shots_on_target['away']
-        total_dangerous = dangerous_attacks['home'] + dangerous_attacks['away']
-
-        threshold = self.thresholds['goal_high_pressure']
-
-        if time >= threshold['time_min']:
-            reasoning = []
-            probability = threshold['confidence_base']
-
-            # Vérifier les tirs cadrés
-            if total_on_target >= threshold['shots_on_target']:
-                reasoning.append(f"🎯 {total_on_target} tirs cadrés (seuil: {threshold['shots_on_target']})")
-                probability += 0.13
-            else:
-                reasoning.append(f"⏳ {total_on_target}/{threshold['shots_on_target']} tirs cadrés")
-
-            # Vérifier les attaques dangereuses
-            if total_dangerous >= threshold['dangerous_attacks']:
-                reasoning.append(f"⚡ {total_dangerous} attaques dangereuses (seuil: {threshold['dangerous_attacks']})")
-                probability += 0.10
-
-            # Efficacité des tirs (% cadrés)
-            if total_shots > 0:
-                accuracy = (total_on_target / total_shots) * 100
-                if accuracy >= 40:
-                    reasoning.append(f"📊 Bonne précision: {accuracy:.0f}% de tirs cadrés")
-                    probability += 0.07
-
-            if probability >= 0.60:
-                confidence = self._get_confidence_level(probability)
-
-                recommendations.append(BetRecommendation(
-                    bet_type=BetType.GOAL,
-                    description="Prochain but imminent",
-                    confidence=confidence,
-                    probability=probability,
-                    reasoning=reasoning,
-                    current_stats={'shots_on_target': total_on_target, 'dangerous_attacks': total_dangerous},
-                    threshold_reached=total_on_target >= threshold['shots_on_target']
-                ))
+        Args:
+            stats_list: Stats de chaque match (MatchStats ou dict)
+            times: Minute de jeu de chaque match (None si inconnue), dans le même ordre
+            trends: Rythmes récents de chaque match (optionnel, None par match possible)
+            match_ids: Identifiants des matchs (optionnel, None par match possible)
 
-        return recommendations
+        Returns:
+            List[List[BetRecommendation]]: Recommandations de chaque match
+        """
+        if not stats_list:
+            return []
+
+        scoring = self._scoring
+        rules = scoring.rules
+        stats_list = [MatchStats.from_dict(stats) if isinstance(stats, dict) else stats for stats in stats_list]
+        trends = trends or [None] * len(stats_list)
+        match_ids = match_ids or [None] * len(stats_list)
+        minutes = [minute or 0 for minute in times]
+
+        # Lignes à réévaluer pour chaque stratégie
+        memos = []
+        pending: Dict[int, List[Tuple[int, Tuple]]] = {}
+        for row, (stats, time, trend, match_id) in enumerate(zip(stats_list, minutes, trends, match_ids)):
+            memo, dirty = self._dirty(scoring, match_id, stats, time, self._window(rules, trend))
+            memos.append(memo)
+            for position, _, key in dirty:
+                pending.setdefault(position, []).append((row, key))
+
+        if pending:
+            # Colonnes des seuls matchs qui ont changé
+            rows = sorted({row for entries in pending.values() for row, _ in entries})
+            table = pack_stats([stats_list[row] for row in rows])
+            time = np.asarray([minutes[row] for row in rows])
+            # Rythmes récents par 10 min (NaN sans tendance: aucun bonus)
+            recent = stack_rates([trends[row] for row in rows], rules.trend_window)
+            namespace = rules.vector_namespace(table, time, recent)
+            offsets = {row: offset for offset, row in enumerate(rows)}
+
+            for position, entries in pending.items():
+                started = perf_counter()
+                strategy = rules.strategies[position]
+                if len(entries) < len(rows):
+                    selected = np.array([offsets[row] for row, _ in entries])
+                    columns = {
+                        name: value[selected] if isinstance(value, np.ndarray) else value
+                        for name, value in namespace.items()
+                    }
+                else:
+                    columns = namespace
+                outcomes: List[Optional[RuleResult]] = [None] * len(entries)
+                for index, result in strategy.evaluate_batch(columns, len(entries)):
+                    outcomes[index] = result
+                passed = [result for result in outcomes if result is not None]
+                probabilities = iter([])
+                levels = iter([])
+                if passed:
+                    model = scoring.models[position]
+                    if model:
+                        calibrated = model.score_many(np.array([result.features for result in passed], dtype=float))
+                    else:
+                        calibrated = np.clip([result.probability for result in passed], 0.0, 1.0)
+                    probabilities = iter(calibrated.tolist())
+                    levels = iter(self._confidence_levels(calibrated))
+                for (row, key), result in zip(entries, outcomes):
+                    recommendation = None
+                    if result is not None:
+                        recommendation = self._recommendation(strategy, result, next(probabilities), next(levels))
+                    memos[row].store(position, key, recommendation)
+                STRATEGY_SECONDS.observe(perf_counter() - started, strategy.id, "batch")
+
+        return [memo.recommendations() for memo in memos]
+
+    # Mémo par match
+
+    def _recent(self, rules: RuleSet, trend: Optional[MatchTrend]) -> Optional[List[float]]:
+        """Rythmes récents en liste, None sans tendance ou si l'historique est trop court"""
+        if trend is None:
+            return None
+        rates = trend.rates(rules.trend_window)
+        # Les rythmes d'une fenêtre sont tous NaN ou tous définis (cf. MatchTrend.update)
+        return None if np.isnan(rates[0]) else rates.tolist()
+
+    def _window(self, rules: RuleSet, trend: Optional[MatchTrend]) -> Optional[Tuple[int, List[int]]]:
+        """
+        Clé de tendance du mémo: début de la fenêtre et événements depuis.
+        Un résultat gardé peut reposer sur un rythme calculé quelques
+        secondes plus tôt (au plus l'écart entre deux échantillons).
+        """
+        if trend is None:
+            return None
+        return trend.window_state(rules.trend_window)
+
+    def _dirty(self, scoring: _Scoring, match_id, stats: MatchStats, time: int, recent):
+        """Mémo du match et stratégies à réévaluer: [(position, stratégie, clé)]"""
+        rules = scoring.rules
+        if match_id is None:
+            # Sans identifiant: analyse complète, rien n'est gardé
+            return _MatchMemo(scoring), [(position, strategy, None) for position, strategy in enumerate(rules.strategies)]
+        memo = self._memo.get(match_id)
+        if memo is None or memo.scoring is not scoring:
+            memo = self._memo[match_id] = _MatchMemo(scoring)
+        dirty = []
+        for position, strategy in enumerate(rules.strategies):
+            key = strategy.input_key(stats.values, time, recent)
+            if memo.keys[position] != key:
+                dirty.append((position, strategy, key))
+        self.evaluations += len(dirty)
+        self.reused += len(rules.strategies) - len(dirty)
+        return memo, dirty
+
+    def forget(self, match_id: str) -> bool:
+        """Oublier le mémo d'un match terminé"""
+        return self._memo.pop(match_id, None) is not None
+
+    def memo_stats(self) -> Dict:
+        total = self.evaluations + self.reused
+        return {
+            "matches": len(self._memo),
+            "evaluations": self.evaluations,
+            "reused": self.reused,
+            "reuse_rate": round(self.reused / total, 3) if total else None
+        }
 
-    def _analyze_both_teams_score(self, stats: Dict, time: int) -> List[BetRecommendation]:
-        """Stratégie Both Teams to Score"""
-        recommendations = []
-
-        shots = stats.get('shots', {'home': 0, 'away': 0})
-        shots_on_target = stats.get('shots_on_target', {'home': 0, 'away': 0})
-        possession = stats.get('possession', {'home': 50, 'away': 50})
-
-        threshold = self.thresholds['both_score_balanced']
-
-        if time >= threshold['time_min']:
-            reasoning = []
-            probability = threshold['confidence_base']
-
-            # Vérifier l'équilibre de possession
-            poss_diff = abs(possession['home'] - possession['away'])
-            if poss_diff <= threshold['possession_diff_max']:
-                reasoning.append(f"⚖️ Match équilibré: {possession['home']}% - {possession['away']}% possession")
-                probability += 0.10
-
-            # Vérifier que les deux équipes attaquent
-            if (shots_on_target['home'] >= threshold['shots_min_each'] and
-                shots_on_target['away'] >= threshold['shots_min_each']):
-                reasoning.append(f"🎯 Les deux équipes attaquent: {shots_on_target['home']} et {shots_on_target['away']} tirs cadrés")
-                probability += 0.12
-
-            # Vérifier les tirs totaux
-            if shots['home'] >= 5 and shots['away'] >= 5:
-                reasoning.append(f"⚽ Match ouvert: {shots['home']} et {shots['away']} tirs")
-                probability += 0.08
-
-            if probability >= 0.65:
-                confidence = self._get_confidence_level(probability)
-
-                recommendations.append(BetRecommendation(
-                    bet_type=BetType.BOTH_TEAMS_SCORE,
-                    description="Les deux équipes marquent",
-                    confidence=confidence,
-                    probability=probability,
-                    reasoning=reasoning,
-                    current_stats={'possession_diff': poss_diff},
-                    threshold_reached=True
-                ))
+    def calibration_stats(self) -> Dict:
+        scoring = self._scoring
+        return {
+            "path": self.calibration_path,
+            "version": scoring.calibration.version if scoring.calibration else None,
+            "strategies": {
+                strategy.id: model.kind if model else None
+                for strategy, model in zip(scoring.rules.strategies, scoring.models)
+            }
+        }
 
-        return recommendations
+    @staticmethod
+    def _recommendation(strategy, result: RuleResult, probability: float, confidence: Confidence) -> BetRecommendation:
+        return BetRecommendation(
+            bet_type=BetType(strategy.bet_type),
+            description=strategy.description,
+            confidence=confidence,
+            probability=probability,
+            reasoning=result.reasoning,
+            current_stats=result.current_stats,
+            threshold_reached=result.threshold_reached,
+            strategy=strategy.id,
+            raw_probability=result.probability,
+            features=result.features
+        )
+
+    def _confidence_levels(self, probability: np.ndarray) -> List[Confidence]:
+        """Version vectorisée de _get_confidence_level"""
+        indexes = np.searchsorted(_CONFIDENCE_BOUNDS, probability, side='right')
+        return [_CONFIDENCE_LEVELS[index] for index in indexes.tolist()]
 
     def _get_confidence_level(self, probability: float) -> Confidence:
         """Convertir une probabilité en niveau de confiance"""
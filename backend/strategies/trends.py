@@ -0,0 +1,185 @@
+"""
+Trends - Rythmes récents par match sur fenêtres glissantes
+
+Les stratégies TES ne voient que des totaux cumulés divisés par le temps
+de jeu: une accélération sur les 10 dernières minutes y est diluée dans la
+moyenne du match. Chaque match garde ici un ring buffer de ses derniers
+polls (un échantillon au plus toutes les `resolution` secondes, mémoire
+constante) et expose, pour chaque stat et chaque côté:
+- le rythme (par 10 min) sur les 5/10/15 dernières minutes
+- le momentum: rythme de la fenêtre courte moins celui de la fenêtre longue
+
+Chaque fenêtre garde un pointeur sur son échantillon de départ qui ne fait
+qu'avancer: une mise à jour coûte O(1) amorti, la lecture O(1).
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import math
+import time
+
+import numpy as np
+
+from models.match_stats import STAT_INDEX, STAT_NAMES, MatchStats
+
+WINDOWS: Tuple[int, ...] = (5, 10, 15)
+_WIDTH = 2 * len(STAT_NAMES)
+
+
+class MatchTrend:
+    """Ring buffer des polls d'un match et rythmes par fenêtre"""
+
+    __slots__ = ("windows", "resolution", "capacity", "_ts", "_values", "_count", "_starts", "_rates")
+
+    def __init__(self, windows: Sequence[int] = WINDOWS, resolution: float = 15.0):
+        self.windows = tuple(sorted(windows))
+        self.resolution = resolution
+        # Assez d'échantillons espacés de `resolution` pour couvrir la plus longue fenêtre
+        self.capacity = int(self.windows[-1] * 60 / resolution) + 4
+        self._ts = np.zeros(self.capacity)
+        self._values = np.zeros((self.capacity, _WIDTH), dtype=np.intc)
+        self._count = 0
+        # N° (absolu) de l'échantillon de départ de chaque fenêtre
+        self._starts = [0] * len(self.windows)
+        # Rythmes par 10 min, une ligne par fenêtre (NaN si historique trop court)
+        self._rates = np.full((len(self.windows), _WIDTH), np.nan)
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def update(self, stats: MatchStats, ts: Optional[float] = None) -> "MatchTrend":
+        """Ajouter un poll (horodaté en secondes) et recalculer les rythmes"""
+        ts = ts if ts is not None else time.time()
+        latest = self._count - 1
+        if self._count >= 2 and ts - self._ts[(latest - 1) % self.capacity] < self.resolution:
+            # Trop proche de l'échantillon précédent: le dernier est remplacé
+            slot = latest % self.capacity
+        else:
+            self._count += 1
+            latest += 1
+            slot = latest % self.capacity
+        self._ts[slot] = ts
+        self._values[slot] = np.frombuffer(stats.values, dtype=np.intc)
+
+        oldest = max(0, self._count - self.capacity)
+        current = self._values[slot]
+        for index, window in enumerate(self.windows):
+            horizon = ts - window * 60
+            start = max(self._starts[index], oldest)
+            # Avancer jusqu'au dernier échantillon antérieur au début de la fenêtre
+            while start < latest and self._ts[(start + 1) % self.capacity] <= horizon:
+                start += 1
+            self._starts[index] = start
+
+            start_ts = self._ts[start % self.capacity]
+            span = ts - start_ts
+            # Il faut au moins la moitié de la fenêtre pour un rythme significatif
+            if start == latest or span < window * 30:
+                self._rates[index] = np.nan
+            else:
+                self._rates[index] = (current - self._values[start % self.capacity]) * (600.0 / span)
+        return self
+
+    def rates(self, window: int) -> np.ndarray:
+        """Rythmes par 10 min de toutes les stats (disposition de MatchStats.values)"""
+        return self._rates[self.windows.index(window)]
+
+    def window_state(self, window: int) -> Optional[Tuple[int, List[int]]]:
+        """
+        N° de l'échantillon de départ de la fenêtre et écarts de valeurs depuis
+        celui-ci (disposition de MatchStats.values), None si le rythme est
+        indéfini. Les rythmes changent à chaque poll (la durée couverte avance
+        avec l'horloge), cet état seulement quand un événement survient ou que
+        le début de la fenêtre avance.
+        """
+        index = self.windows.index(window)
+        if np.isnan(self._rates[index, 0]):
+            return None
+        start = self._starts[index]
+        latest = self._count - 1
+        deltas = self._values[latest % self.capacity] - self._values[start % self.capacity]
+        return start, deltas.tolist()
+
+    def rate(self, name: str, side: Optional[str] = None, window: int = 10) -> Optional[float]:
+        """
+        Rythme d'une stat par 10 min sur la fenêtre
+
+        Args:
+            name: Stat de MatchStats ('corners', 'fouls'...)
+            side: 'home', 'away' ou None pour les deux équipes
+            window: Fenêtre en minutes (parmi self.windows)
+
+        Returns:
+            None si l'historique ne couvre pas encore la fenêtre
+        """
+        rates = self.rates(window)
+        index = 2 * STAT_INDEX[name]
+        if side == 'home':
+            value = rates[index]
+        elif side == 'away':
+            value = rates[index + 1]
+        else:
+            value = rates[index] + rates[index + 1]
+        return None if math.isnan(value) else float(value)
+
+    def momentum(self, name: str, side: Optional[str] = None) -> Optional[float]:
+        """Rythme de la fenêtre la plus courte moins celui de la plus longue"""
+        short = self.rate(name, side, self.windows[0])
+        long = self.rate(name, side, self.windows[-1])
+        if short is None or long is None:
+            return None
+        return short - long
+
+    def to_dict(self) -> Dict:
+        """{'corners': {'home': {'5': 1.2, '10': ..., 'momentum': ...}, 'away': ...}}"""
+        def rounded(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value, 2)
+
+        return {
+            name: {
+                side: {
+                    **{str(window): rounded(self.rate(name, side, window)) for window in self.windows},
+                    'momentum': rounded(self.momentum(name, side)),
+                }
+                for side in ('home', 'away')
+            }
+            for name in STAT_NAMES
+        }
+
+
+class TrendTracker:
+    """MatchTrend de chaque match suivi"""
+
+    def __init__(self, windows: Sequence[int] = WINDOWS, resolution: float = 15.0):
+        self.windows = tuple(windows)
+        self.resolution = resolution
+        self._trends: Dict[str, MatchTrend] = {}
+
+    def __len__(self) -> int:
+        return len(self._trends)
+
+    def get(self, match_id: str) -> Optional[MatchTrend]:
+        return self._trends.get(match_id)
+
+    def update(self, match_id: str, stats: MatchStats, ts: Optional[float] = None) -> MatchTrend:
+        trend = self._trends.get(match_id)
+        if trend is None:
+            trend = self._trends[match_id] = MatchTrend(self.windows, self.resolution)
+        return trend.update(stats, ts)
+
+    def remove(self, match_id: str) -> bool:
+        return self._trends.pop(match_id, None) is not None
+
+    def retain(self, match_ids: Iterable[str]):
+        """Oublier les matchs qui ne sont plus suivis"""
+        keep = set(match_ids)
+        for match_id in [match_id for match_id in self._trends if match_id not in keep]:
+            del self._trends[match_id]
+
+
+def stack_rates(trends: Sequence[Optional[MatchTrend]], window: int) -> np.ndarray:
+    """Matrice (n_matchs, 2 * len(STAT_NAMES)) des rythmes, NaN sans tendance"""
+    table = np.full((len(trends), _WIDTH), np.nan)
+    for row, trend in enumerate(trends):
+        if trend is not None:
+            table[row] = trend.rates(window)
+    return table
@@ -0,0 +1,11 @@
+"""
+Configuration pytest: backend/ sur le chemin d'import (comme pour uvicorn api.main:app)
+
+Lancer depuis backend/:
+    python -m pytest -q
+"""
+
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
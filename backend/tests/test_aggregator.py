@@ -0,0 +1,194 @@
+"""
+AggregatorScraper: identité des matchs, fusion des stats et bascule entre fournisseurs
+"""
+
+from typing import Dict, List, Optional
+import asyncio
+
+import pytest
+
+from models.match_stats import MatchStats
+from scrapers.aggregator import AggregatorScraper, MatchIndex, team_key
+from scrapers.base_scraper import BaseScraper
+
+
+class FakeProvider(BaseScraper):
+    """Fournisseur scripté: matchs listés, stats par identifiant, délai et pannes"""
+
+    def __init__(self, name: str, matches: List[Dict], stats: Dict[str, MatchStats], delay: float = 0.0):
+        """`delay`: temps de réponse des stats (la liste des matchs est immédiate)"""
+        super().__init__()
+        self.SOURCE = name
+        self.matches = matches
+        self.stats = stats
+        self.delay = delay
+        self.fail = False
+        self.stats_calls: List[str] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    async def get_live_matches(self) -> List[Dict]:
+        await asyncio.sleep(0)
+        if self.fail:
+            raise ConnectionError(f"{self.SOURCE} indisponible")
+        return list(self.matches)
+
+    async def get_match_stats(self, match_id: str) -> MatchStats:
+        return await self.fetch_match_stats(match_id)
+
+    async def fetch_match_stats(self, match_id: str) -> MatchStats:
+        self.stats_calls.append(match_id)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError(f"{self.SOURCE} indisponible")
+        return self.stats[match_id]
+
+
+def match(match_id: str, home: str, away: str, start_time: Optional[float] = 1_700_000_000.0) -> Dict:
+    return {'id': match_id, 'home_team': home, 'away_team': away, 'competition': "Ligue 1",
+            'status': '1st half', 'start_time': start_time}
+
+
+def stats(source: str, corners=(0, 0), fouls=(0, 0), possession=(0, 0)) -> MatchStats:
+    result = MatchStats(source=source)
+    result.set('corners', *corners)
+    result.set('fouls', *fouls)
+    result.set('possession', *possession)
+    return result
+
+
+async def live(aggregator: AggregatorScraper) -> List[Dict]:
+    return [item async for item in aggregator.iter_live_matches()]
+
+
+async def discover(aggregator: AggregatorScraper, *order: str) -> Dict[str, str]:
+    """Découverte puis ordre de préférence fixé; {équipe à domicile: identifiant agrégé}"""
+    matches = await live(aggregator)
+    for rank, name in enumerate(order):
+        aggregator._providers[name].latency = 0.001 * (rank + 1)
+    return {item['home_team']: item['id'] for item in matches}
+
+
+def test_team_key_ignores_accents_case_and_club_prefixes():
+    assert team_key("FC Barcelona") == team_key("barcelona") == "barcelona"
+    assert team_key("Atlético Madrid") == "atletico madrid"
+    assert team_key("AC Milan") == team_key("Milan")
+
+
+def test_index_matches_sources_by_teams_and_kickoff():
+    index = MatchIndex("primary")
+    assert index.resolve("primary", match("1", "PSG", "Marseille")) == "1"
+    assert index.resolve("backup", match("b7", "Paris Saint-Germain", "Marseille")) == "backup:b7"
+    # Mêmes équipes et coup d'envoi proche: même match
+    assert index.resolve("backup", match("b1", "psg", "Marseille", 1_700_000_600.0)) == "1"
+    assert index.providers("1") == {"primary": "1", "backup": "b1"}
+    # Même affiche un autre jour: autre match
+    assert index.resolve("other", match("o1", "PSG", "Marseille", 1_700_500_000.0)) == "other:o1"
+
+
+async def test_discovery_deduplicates_matches_across_providers():
+    primary = FakeProvider("primary", [match("1", "PSG", "Marseille"), match("2", "Lyon", "Nice")], {})
+    backup = FakeProvider("backup", [match("b1", "PSG", "Marseille"), match("b3", "Lens", "Lille")], {})
+    aggregator = AggregatorScraper([primary, backup])
+
+    async with aggregator:
+        matches = await live(aggregator)
+
+    assert sorted(item['id'] for item in matches) == ["1", "2", "backup:b3"]
+
+
+async def test_discovery_survives_a_failing_provider():
+    primary = FakeProvider("primary", [match("1", "PSG", "Marseille")], {})
+    backup = FakeProvider("backup", [match("b2", "Lyon", "Nice")], {})
+    primary.fail = True
+    aggregator = AggregatorScraper([primary, backup])
+
+    async with aggregator:
+        matches = await live(aggregator)
+
+    assert [item['id'] for item in matches] == ["backup:b2"]
+    assert aggregator.providers[0].failures == 1
+
+
+async def test_discovery_raises_when_no_provider_answers():
+    primary = FakeProvider("primary", [], {})
+    primary.fail = True
+    aggregator = AggregatorScraper([primary])
+
+    async with aggregator:
+        with pytest.raises(RuntimeError):
+            await live(aggregator)
+
+
+async def test_stats_fail_over_to_the_next_provider():
+    primary = FakeProvider("primary", [match("1", "PSG", "Marseille")], {"1": stats("primary")})
+    backup = FakeProvider("backup", [match("b1", "PSG", "Marseille")], {"b1": stats("backup", corners=(4, 2))})
+    aggregator = AggregatorScraper([primary, backup], refresh_after=0)
+
+    async with aggregator:
+        ids = await discover(aggregator, "primary", "backup")
+        primary.fail = True
+        result = await aggregator.fetch_match_stats(ids["PSG"])
+
+    assert result.pair('corners') == (4, 2)
+    assert primary.stats_calls == ["1"] and backup.stats_calls == ["b1"]
+
+
+async def test_slow_provider_is_hedged():
+    primary = FakeProvider("primary", [match("1", "PSG", "Marseille")], {"1": stats("primary")}, delay=0.5)
+    backup = FakeProvider("backup", [match("b1", "PSG", "Marseille")], {"b1": stats("backup", corners=(1, 0))})
+    aggregator = AggregatorScraper([primary, backup], hedge_delay=0.05, refresh_after=0, discovery_timeout=2)
+
+    async with aggregator:
+        ids = await discover(aggregator, "primary", "backup")
+        result = await asyncio.wait_for(aggregator.fetch_match_stats(ids["PSG"]), 0.3)
+
+    assert result.pair('corners') == (1, 0)
+    assert primary.stats_calls == ["1"] and backup.stats_calls == ["b1"]
+
+
+async def test_failing_provider_is_put_aside():
+    primary = FakeProvider("primary", [match("1", "PSG", "Marseille")], {"1": stats("primary")})
+    backup = FakeProvider("backup", [match("b1", "PSG", "Marseille")], {"b1": stats("backup")})
+    aggregator = AggregatorScraper([primary, backup], max_failures=2, cooldown=60, refresh_after=0)
+
+    async with aggregator:
+        ids = await discover(aggregator, "primary", "backup")
+        primary.fail = True
+        for _ in range(2):
+            await aggregator.fetch_match_stats(ids["PSG"])
+        primary.stats_calls.clear()
+        await aggregator.fetch_match_stats(ids["PSG"])
+
+    assert not aggregator.providers[0].stats()["available"]
+    assert primary.stats_calls == []
+
+
+async def test_stats_are_merged_with_recent_answers_of_other_sources():
+    primary = FakeProvider(
+        "primary", [match("1", "PSG", "Marseille")],
+        {"1": stats("primary", corners=(3, 1), fouls=(5, 7), possession=(55, 45))}
+    )
+    backup = FakeProvider(
+        "backup", [match("b1", "PSG", "Marseille")],
+        {"b1": stats("backup", corners=(4, 1), fouls=(5, 6), possession=(60, 40))}
+    )
+    aggregator = AggregatorScraper([primary, backup], refresh_after=0.01)
+
+    async with aggregator:
+        ids = await discover(aggregator, "primary", "backup")
+        await aggregator.fetch_match_stats(ids["PSG"])
+        # La relecture de la source secondaire part en tâche de fond
+        await asyncio.gather(*aggregator._refreshing.values())
+        primary.stats["1"] = stats("primary", corners=(3, 2), fouls=(6, 7), possession=(52, 48))
+        merged = await aggregator.fetch_match_stats(ids["PSG"])
+
+    # Compteurs: maximum des sources; possession: réponse la plus récente
+    assert merged.pair('corners') == (4, 2)
+    assert merged.pair('fouls') == (6, 7)
+    assert merged.pair('possession') == (52, 48)
+    assert merged.source == "backup+primary"
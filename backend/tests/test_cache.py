@@ -0,0 +1,219 @@
+"""
+CachingTransport: TTL, requêtes fusionnées, revalidation, flux et backend Redis
+"""
+
+from typing import Dict, List, Optional
+import asyncio
+import time
+
+import pytest
+
+from scrapers.cache import CacheEntry, CachingTransport, RedisCacheBackend
+from scrapers.transports import BaseTransport, TransportError, TransportResponse
+
+LIVE = "https://api.sofascore.com/api/v1/sport/football/events/live"
+STATS = "https://api.sofascore.com/api/v1/event/1/statistics"
+
+
+class FakeUpstream(BaseTransport):
+    """Upstream simulé: compte les appels, répond après `delay`, gère If-None-Match"""
+
+    def __init__(self, delay: float = 0.0, etag: Optional[str] = None, status: int = 200):
+        self.delay = delay
+        self.etag = etag
+        self.status = status
+        self.calls: List[Dict] = []
+        self.body = b'{"events":[]}'
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> TransportResponse:
+        self.calls.append({"url": url, "headers": headers or {}})
+        await asyncio.sleep(self.delay)
+        if self.etag and (headers or {}).get("If-None-Match") == self.etag:
+            return TransportResponse(304, b"", {"etag": self.etag})
+        return TransportResponse(self.status, self.body, {"etag": self.etag} if self.etag else {})
+
+    async def stream(self, url: str, chunk_size: int = 64 * 1024):
+        self.calls.append({"url": url, "headers": {}})
+        for start in range(0, len(self.body), 4):
+            await asyncio.sleep(self.delay / 4)
+            yield self.body[start:start + 4]
+
+
+class FakeRedis:
+    """Sous-ensemble de redis.asyncio utilisé par RedisCacheBackend (get, set px, close)"""
+
+    def __init__(self):
+        self.data: Dict[str, tuple] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        item = self.data.get(key)
+        if item is None or time.monotonic() >= item[1]:
+            return None
+        return item[0]
+
+    async def set(self, key: str, value: bytes, px: int):
+        self.data[key] = (value, time.monotonic() + px / 1000)
+
+    async def close(self):
+        pass
+
+
+def fake_redis_backend() -> RedisCacheBackend:
+    backend = RedisCacheBackend.__new__(RedisCacheBackend)
+    backend.prefix = "test:"
+    backend._client = FakeRedis()
+    return backend
+
+
+async def read(transport: CachingTransport, url: str) -> bytes:
+    return b"".join([chunk async for chunk in transport.stream(url)])
+
+
+async def test_fresh_entry_is_served_from_cache():
+    upstream = FakeUpstream()
+    cache = CachingTransport(upstream, ttls=[(r"/events/live$", 10.0)])
+
+    first = await cache.fetch(LIVE)
+    second = await cache.fetch(LIVE)
+
+    assert first.body == second.body == upstream.body
+    assert len(upstream.calls) == 1
+    assert (cache.misses, cache.hits) == (1, 1)
+
+
+async def test_expired_entry_is_refetched():
+    upstream = FakeUpstream()
+    cache = CachingTransport(upstream, ttls=[(r"/events/live$", 0.05)])
+
+    await cache.fetch(LIVE)
+    await asyncio.sleep(0.1)
+    await cache.fetch(LIVE)
+
+    assert len(upstream.calls) == 2
+
+
+async def test_url_without_ttl_is_not_cached():
+    upstream = FakeUpstream()
+    cache = CachingTransport(upstream, ttls=[(r"/events/live$", 10.0)])
+
+    await cache.fetch(STATS)
+    await cache.fetch(STATS)
+
+    assert len(upstream.calls) == 2
+
+
+async def test_errors_are_not_cached():
+    upstream = FakeUpstream(status=503)
+    cache = CachingTransport(upstream, ttls=[(r"/events/live$", 10.0)])
+
+    assert (await cache.fetch(LIVE)).status == 503
+    assert (await cache.fetch(LIVE)).status == 503
+    assert len(upstream.calls) == 2
+
+
+async def test_concurrent_misses_are_coalesced():
+    upstream = FakeUpstream(delay=0.05)
+    cache = CachingTransport(upstream, ttls=[(r"/events/live$", 10.0)])
+
+    responses = await asyncio.gather(*(cache.fetch(LIVE) for _ in range(10)))
+
+    assert len(upstream.calls) == 1
+    assert all(response.body == upstream.body for response in responses)
+    assert cache.coalesced == 9
+    assert not cache._inflight
+
+
+async def test_cancelled_leader_does_not_cancel_followers():
+    upstream = FakeUpstream(delay=0.05)
+    cache = CachingTransport(upstream, ttls=[(r"/events/live$", 10.0)])
+
+    leader = asyncio.create_task(cache.fetch(LIVE))
+    await asyncio.sleep(0.01)
+    follower = asyncio.create_task(cache.fetch(LIVE))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    response = await follower
+    assert response.status == 200
+    assert len(upstream.calls) == 1
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+async def test_expired_entry_is_revalidated_with_etag():
+    upstream = FakeUpstream(etag='"v1"')
+    cache = CachingTransport(upstream, ttls=[(r"/events/live$", 0.05)])
+
+    await cache.fetch(LIVE)
+    await asyncio.sleep(0.1)
+    response = await cache.fetch(LIVE)
+
+    assert upstream.calls[1]["headers"] == {"If-None-Match": '"v1"'}
+    # Le 304 est servi comme un 200 avec le corps gardé
+    assert (response.status, response.body) == (200, upstream.body)
+    assert cache.revalidated == 1
+
+
+async def test_concurrent_stream_and_fetch_misses_are_coalesced():
+    upstream = FakeUpstream(delay=0.05)
+    cache = CachingTransport(upstream, ttls=[(r"/events/live$", 10.0)])
+
+    results = await asyncio.gather(read(cache, LIVE), read(cache, LIVE), cache.fetch(LIVE))
+
+    assert len(upstream.calls) == 1
+    assert results[0] == results[1] == results[2].body == upstream.body
+    # Le corps relayé est en cache
+    assert await read(cache, LIVE) == upstream.body
+    assert len(upstream.calls) == 1
+
+
+async def test_abandoned_stream_lets_followers_refetch():
+    upstream = FakeUpstream(delay=0.05)
+    cache = CachingTransport(upstream, ttls=[(r"/events/live$", 10.0)])
+
+    async def read_first_chunk():
+        stream = cache.stream(LIVE)
+        async for _ in stream:
+            break
+        await stream.aclose()
+
+    reader = asyncio.create_task(read_first_chunk())
+    await asyncio.sleep(0.005)
+    follower = asyncio.create_task(cache.fetch(LIVE))
+    await reader
+
+    assert (await follower).body == upstream.body
+    assert len(upstream.calls) == 2
+    assert not cache._inflight
+
+
+async def test_stream_error_reaches_followers():
+    upstream = FakeUpstream(status=503)
+    cache = CachingTransport(upstream, ttls=[(r"/events/live$", 10.0)])
+
+    # Le flux par défaut de BaseTransport lève sur un statut >= 400
+    upstream.stream = BaseTransport.stream.__get__(upstream)
+    with pytest.raises(TransportError):
+        await read(cache, LIVE)
+
+
+async def test_redis_backend_round_trip():
+    upstream = FakeUpstream(etag='"v1"')
+    cache = CachingTransport(upstream, backend=fake_redis_backend(), ttls=[(r"/events/live$", 10.0)])
+
+    await cache.fetch(LIVE)
+    response = await cache.fetch(LIVE)
+
+    assert (response.status, response.body, response.headers) == (200, upstream.body, {"etag": '"v1"'})
+    assert len(upstream.calls) == 1
+
+
+async def test_redis_backend_keeps_expired_entries_for_revalidation():
+    backend = fake_redis_backend()
+    entry = CacheEntry(b"{}", {"etag": '"v1"'}, time.time() - 1)
+    await backend.set(LIVE, entry, retention=10.0)
+
+    stored = await backend.get(LIVE)
+
+    assert stored is not None and not stored.fresh
+    assert (stored.body, stored.headers) == (b"{}", {"etag": '"v1"'})
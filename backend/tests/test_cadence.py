@@ -0,0 +1,131 @@
+"""
+Cadence: paliers d'intervalle par état de match et budget TokenBucket (horloge simulée)
+"""
+
+import pytest
+
+from models.match_stats import MatchStats
+from pipeline import cadence
+from pipeline.cadence import CadencePolicy, TokenBucket
+
+THRESHOLDS = {
+    'corner_high_activity': {'total_corners': 8, 'time_min': 60},
+    'card_aggressive_match': {'total_fouls': 20, 'yellow_cards': 3, 'time_min': 45},
+}
+
+
+class FakeClock:
+    """Remplace time.monotonic du module testé"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cadence, "time", fake)
+    return fake
+
+
+def stats(corners: int = 0, fouls: int = 0) -> MatchStats:
+    result = MatchStats()
+    result.set('corners', corners - corners // 2, corners // 2)
+    result.set('fouls', fouls - fouls // 2, fouls // 2)
+    return result
+
+
+def live(status: str = "2nd half") -> dict:
+    return {'id': "1", 'status': status}
+
+
+def test_bucket_starts_full_and_runs_out(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+
+    assert bucket.take(2) == 2
+    assert bucket.take(5) == 1
+    assert bucket.take(1) == 0
+    assert bucket.available() == 0
+    assert bucket.time_until_available() == pytest.approx(0.5)
+
+
+def test_bucket_refills_at_its_rate_up_to_its_capacity(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    bucket.take(3)
+
+    clock.advance(1.0)
+    assert bucket.available() == 2
+    clock.advance(60)
+    assert bucket.available() == 3
+    assert bucket.time_until_available() == 0.0
+
+
+def test_forced_take_goes_into_debt(clock):
+    bucket = TokenBucket(rate=1, burst=1)
+
+    assert bucket.take(3, force=True) == 3
+    assert bucket.tokens == pytest.approx(-2)
+    assert bucket.time_until_available() == pytest.approx(3.0)
+    clock.advance(2.5)
+    assert bucket.take(1) == 0
+    clock.advance(0.5)
+    assert bucket.take(1) == 1
+
+
+def test_default_burst_is_one_second_of_budget(clock):
+    assert TokenBucket(rate=5).capacity == 5
+    assert TokenBucket(rate=0.2).capacity == 1.0
+
+
+@pytest.mark.parametrize("status, expected", [
+    ("Halftime", 60.0),
+    ("Pause", 60.0),
+    ("Ended", 180.0),
+    ("Not started", 180.0),
+])
+def test_match_state_tiers(status, expected):
+    policy = CadencePolicy(THRESHOLDS)
+    assert policy.next_interval(live(status), stats(20, 40), 70) == expected
+
+
+def test_unknown_clock_or_stats_use_the_middle_interval():
+    policy = CadencePolicy(THRESHOLDS, min_interval=5, max_interval=185)
+    assert policy.next_interval(live(), None, 70) == 95
+    assert policy.next_interval(live(), stats(), None) == 95
+
+
+def test_cold_and_hot_matches():
+    policy = CadencePolicy(THRESHOLDS, min_interval=5, max_interval=180, time_lead=10)
+
+    # Plus de `time_lead` minutes avant toute porte de temps: froid
+    assert policy.next_interval(live("1st half"), stats(8, 20), 20) == 180
+    # Seuils atteints après la porte: chaud
+    assert policy.next_interval(live(), stats(8, 20), 70) == 5
+    # Rien au compteur: froid même après la porte
+    assert policy.next_interval(live(), stats(), 70) == 180
+
+
+def test_interval_shrinks_as_the_match_nears_a_threshold():
+    policy = CadencePolicy(THRESHOLDS, min_interval=5, max_interval=180)
+    intervals = [policy.next_interval(live(), stats(corners), 70) for corners in range(0, 9, 2)]
+
+    assert intervals == sorted(intervals, reverse=True)
+    assert intervals[0] == 180 and intervals[-1] == 5
+    # Interpolation quadratique: à mi-chemin du seuil, encore proche du max
+    assert intervals[2] == pytest.approx(180 - 175 * 0.25)
+
+
+def test_proximity_is_weighted_by_the_time_gate():
+    policy = CadencePolicy({'corners': {'total_corners': 8, 'time_min': 60}}, time_lead=10)
+    full = stats(8)
+
+    assert policy.proximity(full, 45) == 0.0
+    assert policy.proximity(full, 55) == pytest.approx(0.5)
+    assert policy.proximity(full, 60) == 1.0
+    assert policy.proximity(stats(4), 75) == pytest.approx(0.5)
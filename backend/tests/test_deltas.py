@@ -0,0 +1,56 @@
+"""
+Deltas: recommandations identifiées par stratégie, snapshot + delta == snapshot suivant
+"""
+
+from pipeline.deltas import ClientFeedState, SnapshotStore, apply_delta, diff_recommendations
+
+MATCH = {"id": "1", "home_team": "PSG", "away_team": "Marseille", "score": "1-0"}
+
+
+def rec(strategy: str, bet_type: str, probability: float) -> dict:
+    return {"bet_type": bet_type, "strategy": strategy, "description": strategy,
+            "confidence": "high", "probability": probability, "reasoning": []}
+
+
+def stats(corners: int) -> dict:
+    return {"corners": {"home": corners, "away": 2}}
+
+
+def test_two_strategies_with_the_same_bet_type_are_kept_apart():
+    previous = [rec("corner_high_activity", "corner", 72.0), rec("corner_late_pressure", "corner", 65.0)]
+    current = [rec("corner_high_activity", "corner", 74.0)]
+
+    changes = diff_recommendations(previous, current)
+
+    assert changes == {"upsert": [current[0]], "removed": ["corner_late_pressure"]}
+
+
+def test_snapshot_plus_delta_gives_the_next_snapshot():
+    store = SnapshotStore()
+    first = store.update(MATCH, stats(3), [rec("corner_high_activity", "corner", 72.0),
+                                           rec("corner_late_pressure", "corner", 65.0)], "t1")
+    second = store.update(MATCH, stats(4), [rec("corner_late_pressure", "corner", 68.0),
+                                            rec("card_aggressive_match", "card", 61.0)], "t2")
+
+    assert second.delta["recommendations"]["removed"] == ["corner_high_activity"]
+    assert apply_delta(first.snapshot, second.delta) == second.snapshot
+
+
+def test_recommendations_without_strategy_fall_back_to_bet_type():
+    previous = [{"bet_type": "goal", "probability": 60.0}]
+    assert diff_recommendations(previous, []) == {"removed": ["goal"]}
+
+
+def test_client_gets_a_delta_only_after_the_previous_version():
+    store = SnapshotStore()
+    feed = ClientFeedState()
+    first = store.update(MATCH, stats(3), [], "t1")
+    second = store.update(MATCH, stats(4), [], "t2")
+    third = store.update(MATCH, stats(5), [], "t3")
+
+    assert feed.render(first) == first.snapshot_json
+    assert feed.render(second) == second.delta_json
+    # Resync: snapshot complet au prochain envoi
+    feed.forget(["1"])
+    assert feed.render(third) == third.snapshot_json
+    assert store.update(MATCH, stats(5), [], "t4") is None
@@ -0,0 +1,246 @@
+"""
+AlertDispatcher: filtre, déduplication, lots, débit par canal et retries, contre un serveur aiohttp local
+"""
+
+from email.utils import formatdate
+from typing import Dict, List, Tuple
+import asyncio
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+import pytest
+
+from alerts.channels import TelegramChannel, WebhookChannel, parse_retry_after
+from alerts.dispatcher import AlertDispatcher
+from strategies.tes_engine import BetRecommendation, BetType, Confidence
+
+MATCH = {'id': "1", 'home_team': "PSG", 'away_team': "Marseille", 'competition': "Ligue 1", 'score': "1-0"}
+
+
+class FakeService:
+    """Service d'alertes local: enregistre les requêtes, répond selon `replies` puis 200"""
+
+    def __init__(self):
+        self.requests: List[Tuple[float, str, Dict]] = []
+        # (statut, corps JSON, en-têtes) pour les premières requêtes
+        self.replies: List[Tuple[int, Dict, Dict]] = []
+        self.server = TestServer(self._app())
+
+    def _app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/{path:.*}', self._handle)
+        return app
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.requests.append((time.monotonic(), request.path, await request.json()))
+        if self.replies:
+            status, body, headers = self.replies.pop(0)
+            return web.json_response(body, status=status, headers=headers)
+        return web.json_response({"ok": True})
+
+    def url(self, path: str) -> str:
+        return str(self.server.make_url(path))
+
+    @property
+    def payloads(self) -> List[Dict]:
+        return [payload for _, _, payload in self.requests]
+
+
+@pytest.fixture
+async def service():
+    fake = FakeService()
+    await fake.server.start_server()
+    yield fake
+    await fake.server.close()
+
+
+def rec(bet_type: BetType = BetType.CORNER, confidence: Confidence = Confidence.HIGH) -> BetRecommendation:
+    return BetRecommendation(
+        bet_type=bet_type, description=f"Pari {bet_type.value}", confidence=confidence, probability=0.72,
+        reasoning=["Rythme élevé"], current_stats={}, threshold_reached=True, strategy="test"
+    )
+
+
+def match(match_id: str) -> Dict:
+    return dict(MATCH, id=match_id)
+
+
+async def wait_for_requests(service: FakeService, count: int, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while len(service.requests) < count:
+        assert time.monotonic() < deadline, f"{len(service.requests)}/{count} requêtes reçues"
+        await asyncio.sleep(0.01)
+
+
+async def test_low_confidence_and_duplicates_are_not_sent(service):
+    dispatcher = AlertDispatcher([WebhookChannel(service.url("/hook"))], batch_window=0.05)
+    dispatcher.start()
+    try:
+        assert dispatcher.submit(MATCH, [rec(), rec(BetType.CARD, Confidence.MEDIUM)], minute=60) == 1
+        # Même (match, type de pari) dans la fenêtre: ignoré
+        assert dispatcher.submit(MATCH, [rec(confidence=Confidence.VERY_HIGH)], minute=61) == 0
+        await wait_for_requests(service, 1)
+        await asyncio.sleep(0.1)
+    finally:
+        await dispatcher.close()
+
+    assert len(service.requests) == 1
+    alerts = service.payloads[0]["alerts"]
+    assert [(alert["match_id"], alert["bet_type"], alert["minute"]) for alert in alerts] == [("1", "corner", 60)]
+    assert (dispatcher.filtered, dispatcher.duplicates) == (1, 1)
+
+
+async def test_dedup_window_expires(service):
+    dispatcher = AlertDispatcher([WebhookChannel(service.url("/hook"))], dedup_window=0.05, batch_window=0)
+    assert dispatcher.submit(MATCH, [rec()]) == 1
+    await asyncio.sleep(0.1)
+    assert dispatcher.submit(MATCH, [rec()]) == 1
+    await dispatcher.close()
+
+
+async def test_alert_dropped_by_every_channel_is_not_deduplicated(service):
+    dispatcher = AlertDispatcher([WebhookChannel(service.url("/hook"))], max_pending=1)
+    assert dispatcher.submit(match("1"), [rec()]) == 1
+    # File pleine: l'alerte du match 2 est refusée, elle pourra être reproposée
+    assert dispatcher.submit(match("2"), [rec()]) == 0
+    assert dispatcher.stats()["channels"]["webhook"]["dropped"] == 1
+    dispatcher.workers[0].queue.get_nowait()
+    assert dispatcher.submit(match("2"), [rec()]) == 1
+    assert dispatcher.duplicates == 0
+    await dispatcher.close()
+
+
+async def test_alerts_arriving_together_share_one_message(service):
+    dispatcher = AlertDispatcher([WebhookChannel(service.url("/hook"), max_batch=3)], batch_window=0.1)
+    dispatcher.start()
+    try:
+        for match_id in ("1", "2", "3", "4"):
+            dispatcher.submit(match(match_id), [rec()])
+            await asyncio.sleep(0.01)
+        await wait_for_requests(service, 2)
+    finally:
+        await dispatcher.close()
+
+    assert [[alert["match_id"] for alert in payload["alerts"]] for payload in service.payloads] == \
+        [["1", "2", "3"], ["4"]]
+    assert dispatcher.stats()["channels"]["webhook"]["messages"] == 2
+
+
+async def test_each_channel_keeps_its_own_rate(service):
+    fast = WebhookChannel(service.url("/hook"), rate=100, burst=10, max_batch=1)
+    slow = TelegramChannel("token", "42", api_url=service.url("/"), rate=5, burst=1, max_batch=1)
+    dispatcher = AlertDispatcher([fast, slow], batch_window=0)
+    dispatcher.start()
+    try:
+        dispatcher.submit(MATCH, [rec(bet_type) for bet_type in (BetType.CORNER, BetType.CARD, BetType.GOAL)])
+        await wait_for_requests(service, 6)
+    finally:
+        await dispatcher.close()
+
+    times = {path: [at for at, request_path, _ in service.requests if request_path == path]
+             for path in ("/hook", "/bottoken/sendMessage")}
+    # Le webhook part d'un coup; Telegram à 5 messages/s (un jeton à la fois)
+    assert times["/hook"][-1] - times["/hook"][0] < 0.1
+    telegram = times["/bottoken/sendMessage"]
+    assert len(telegram) == 3
+    assert all(later - earlier >= 0.15 for earlier, later in zip(telegram, telegram[1:]))
+    assert all(payload["chat_id"] == "42" for _, path, payload in service.requests if path != "/hook")
+
+
+async def test_rate_limited_message_is_retried_after_the_requested_delay(service):
+    service.replies = [(429, {"ok": False, "parameters": {"retry_after": 0.2}}, {})]
+    dispatcher = AlertDispatcher([WebhookChannel(service.url("/hook"))], batch_window=0)
+    dispatcher.start()
+    try:
+        dispatcher.submit(MATCH, [rec()])
+        await wait_for_requests(service, 2)
+    finally:
+        await dispatcher.close()
+
+    (first, _, _), (second, _, payload) = service.requests
+    assert second - first >= 0.2
+    assert payload["alerts"][0]["match_id"] == "1"
+    webhook = dispatcher.stats()["channels"]["webhook"]
+    assert (webhook["retries"], webhook["sent"], webhook["failures"]) == (1, 1, 0)
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(0.5) == 0.5
+    assert 1.0 < parse_retry_after(formatdate(time.time() + 3, usegmt=True)) <= 3.0
+    assert parse_retry_after(formatdate(time.time() - 60, usegmt=True)) == 0.0
+    assert parse_retry_after("bientôt") is None
+    assert parse_retry_after("inf") is None
+    assert parse_retry_after(None) is None
+
+
+async def test_retry_after_http_date_is_honoured(service):
+    service.replies = [(429, {}, {"Retry-After": formatdate(time.time() + 1, usegmt=True)})]
+    dispatcher = AlertDispatcher([WebhookChannel(service.url("/hook"))], batch_window=0)
+    dispatcher.start()
+    try:
+        dispatcher.submit(MATCH, [rec()])
+        await wait_for_requests(service, 2, timeout=3.0)
+        # Le canal continue de servir sa file
+        dispatcher.submit(MATCH, [rec(BetType.CARD)])
+        await wait_for_requests(service, 3)
+    finally:
+        await dispatcher.close()
+
+    webhook = dispatcher.stats()["channels"]["webhook"]
+    assert (webhook["retries"], webhook["sent"], webhook["failures"]) == (1, 2, 0)
+
+
+async def test_unexpected_channel_error_does_not_stop_the_channel(service):
+    class FlakyChannel(WebhookChannel):
+        broken = True
+
+        async def send(self, alerts):
+            if self.broken:
+                self.broken = False
+                raise RuntimeError("réponse inattendue")
+            await super().send(alerts)
+
+    dispatcher = AlertDispatcher([FlakyChannel(service.url("/hook"))], batch_window=0)
+    dispatcher.start()
+    try:
+        dispatcher.submit(MATCH, [rec()])
+        await asyncio.sleep(0.05)
+        dispatcher.submit(MATCH, [rec(BetType.CARD)])
+        await wait_for_requests(service, 1)
+    finally:
+        await dispatcher.close()
+
+    webhook = dispatcher.stats()["channels"]["webhook"]
+    assert (webhook["failures"], webhook["sent"]) == (1, 1)
+    assert webhook["last_error"] == "RuntimeError: réponse inattendue"
+
+
+async def test_server_errors_are_retried_and_client_errors_are_not(service):
+    service.replies = [(503, {}, {}), (400, {}, {})]
+    dispatcher = AlertDispatcher([WebhookChannel(service.url("/hook"))], batch_window=0, backoff_base=0.01)
+    dispatcher.start()
+    try:
+        dispatcher.submit(MATCH, [rec()])
+        await wait_for_requests(service, 2)
+        await asyncio.sleep(0.1)
+    finally:
+        await dispatcher.close()
+
+    assert len(service.requests) == 2
+    webhook = dispatcher.stats()["channels"]["webhook"]
+    assert (webhook["retries"], webhook["sent"], webhook["failures"]) == (1, 0, 1)
+    assert webhook["last_error"] == "webhook: HTTP 400"
+
+
+async def test_stale_alerts_are_not_sent(service):
+    dispatcher = AlertDispatcher([WebhookChannel(service.url("/hook"))], batch_window=0, max_age=0.05)
+    dispatcher.submit(MATCH, [rec()])
+    await asyncio.sleep(0.1)
+    dispatcher.start()
+    await asyncio.sleep(0.05)
+    await dispatcher.close()
+
+    assert service.requests == []
+    assert dispatcher.stats()["channels"]["webhook"]["expired"] == 1
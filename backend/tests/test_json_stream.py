@@ -0,0 +1,63 @@
+"""
+JsonArrayStream: éléments identiques à json.loads quel que soit le découpage en morceaux
+"""
+
+from typing import List
+import json
+
+import pytest
+
+from scrapers.json_stream import JsonArrayStream, iter_array
+
+NUMBERS = b'{"events": [12345, 67, -8, 0, 3.25, -0.5, 1e3, 2.5E-2, 1234567890123, true, null]}'
+STRINGS = '{"events": ["", "a,b]c", "guillemet \\" et \\\\", "\\u00e9t\\u00e9", "Atlético Málaga ⚽"]}'.encode()
+NESTED = json.dumps({
+    "meta": {"events": "pas ici", "list": [1, {"events": []}]},
+    "events": [
+        {"id": 1, "homeTeam": {"name": "Paris Saint-Germain"}, "score": [1, 0], "tags": []},
+        {"id": 22, "homeTeam": {"name": "Olympique de Marseille"}, "status": {"type": "inprogress"}},
+        [[], [{}], {"a": [1, [2, [3]]]}],
+    ],
+    "after": [99],
+}, ensure_ascii=False).encode()
+
+
+def split(document: bytes, size: int) -> List[bytes]:
+    return [document[start:start + size] for start in range(0, len(document), size)]
+
+
+@pytest.mark.parametrize("document", [NUMBERS, STRINGS, NESTED], ids=["numbers", "strings", "nested"])
+def test_every_chunk_size_gives_the_same_items(document):
+    expected = json.loads(document)["events"]
+    for size in range(1, len(document) + 1):
+        assert list(iter_array(split(document, size), "events")) == expected, f"morceaux de {size} octets"
+
+
+@pytest.mark.parametrize("document", [NUMBERS, STRINGS, NESTED], ids=["numbers", "strings", "nested"])
+def test_every_split_point_gives_the_same_items(document):
+    expected = json.loads(document)["events"]
+    for cut in range(len(document) + 1):
+        assert list(iter_array([document[:cut], document[cut:]], "events")) == expected, f"coupure à {cut}"
+
+
+def test_items_are_returned_as_soon_as_they_are_complete():
+    stream = JsonArrayStream("events")
+    assert stream.feed(b'{"events": [{"id": 1}, {"id"') == [{"id": 1}]
+    # Un nombre en fin de morceau attend la suite
+    assert stream.feed(b': 2}, 12') == [{"id": 2}]
+    assert stream.feed(b'34') == []
+    assert stream.feed(b']}') == [1234]
+    stream.close()
+    assert stream.items == 3
+
+
+def test_truncated_document_is_reported():
+    stream = JsonArrayStream("events")
+    stream.feed(b'{"events": [1, 2')
+    with pytest.raises(ValueError):
+        stream.close()
+
+
+def test_invalid_item_raises():
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_array([b'{"events": [1, {"id": tru e}]}'], "events"))
@@ -0,0 +1,52 @@
+"""
+PubSub: file bornée par abonné, sans jamais perdre une suppression de match
+"""
+
+from pipeline.deltas import MatchRemoval
+from pipeline.pubsub import PubSub
+
+
+def drain(subscription):
+    return [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+
+
+def test_overflow_drops_the_oldest_update():
+    pubsub = PubSub(max_queue=3)
+    subscription = pubsub.subscribe()
+    for message in ("a", "b", "c", "d"):
+        pubsub.publish(message)
+
+    assert drain(subscription) == ["b", "c", "d"]
+    assert subscription.dropped == 1
+
+
+def test_overflow_never_drops_a_removal():
+    pubsub = PubSub(max_queue=3)
+    subscription = pubsub.subscribe()
+    removal = MatchRemoval("1")
+    for message in (removal, "a", "b", "c", "d"):
+        pubsub.publish(message)
+
+    assert drain(subscription) == [removal, "c", "d"]
+    assert subscription.dropped == 2
+
+
+def test_queue_full_of_removals_grows_past_capacity():
+    pubsub = PubSub(max_queue=2)
+    subscription = pubsub.subscribe()
+    removals = [MatchRemoval(str(match_id)) for match_id in range(4)]
+    for removal in removals:
+        pubsub.publish(removal)
+
+    assert drain(subscription) == removals
+    assert subscription.dropped == 0
+
+
+async def test_subscriber_reads_in_order_and_unsubscribes():
+    pubsub = PubSub()
+    with pubsub.subscribe() as subscription:
+        pubsub.publish("a")
+        pubsub.publish("b")
+        assert [await subscription.__anext__(), await subscription.__anext__()] == ["a", "b"]
+        assert pubsub.subscriber_count == 1
+    assert pubsub.subscriber_count == 0
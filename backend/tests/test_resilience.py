@@ -0,0 +1,220 @@
+"""
+ResilientTransport: requête doublée, budget de retries et requête test du disjoncteur
+"""
+
+from typing import Dict, List, Optional, Tuple, Union
+import asyncio
+import time
+
+import pytest
+
+from scrapers.resilience import CLOSED, HALF_OPEN, OPEN, CircuitOpenError, ResilientTransport, RetryBudget
+from scrapers.transports import BaseTransport, TransportBlocked, TransportError, TransportResponse
+
+STATS = "https://api.sofascore.com/api/v1/event/1/statistics"
+BODY = b'{"statistics":[]}'
+
+
+class StubTransport(BaseTransport):
+    """Réponses scriptées par appel: (délai, statut ou exception); la dernière se répète"""
+
+    def __init__(self, *script: Tuple[float, Union[int, Exception]]):
+        self.script: List[Tuple[float, Union[int, Exception]]] = list(script)
+        self.calls = 0
+        self.cancelled = 0
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> TransportResponse:
+        delay, outcome = self.script[min(self.calls, len(self.script) - 1)]
+        self.calls += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if isinstance(outcome, Exception):
+            raise outcome
+        return TransportResponse(outcome, BODY, {"x-call": str(self.calls)})
+
+
+def warm(transport: ResilientTransport, latency: float, samples: int = 20):
+    """Latences récentes de l'endpoint (le doublon part au p95)"""
+    endpoint = transport.endpoint_for(STATS)
+    for _ in range(samples):
+        endpoint.observe(latency)
+    return endpoint
+
+
+def failing() -> TransportError:
+    return TransportError("connexion refusée")
+
+
+async def test_slow_call_is_hedged_after_the_p95_delay():
+    stub = StubTransport((0.5, 200), (0.0, 200))
+    transport = ResilientTransport(stub, hedge_min_delay=0.05, hedge_min_samples=20)
+    endpoint = warm(transport, 0.01)
+
+    started = time.monotonic()
+    response = await transport.fetch(STATS)
+    elapsed = time.monotonic() - started
+
+    assert response.headers == {"x-call": "2"}
+    assert 0.05 <= elapsed < 0.3
+    assert (endpoint.hedges, endpoint.hedge_wins) == (1, 1)
+    # La requête perdante est annulée
+    assert stub.cancelled == 1
+
+
+async def test_hedge_waits_for_the_p95_when_it_is_above_the_minimum():
+    stub = StubTransport((0.15, 200), (0.0, 200))
+    transport = ResilientTransport(stub, hedge_min_delay=0.01)
+    endpoint = warm(transport, 0.2)
+
+    response = await transport.fetch(STATS)
+
+    # Réponse avant le p95 (0.2s): pas de doublon
+    assert response.headers == {"x-call": "1"}
+    assert (stub.calls, endpoint.hedges) == (1, 0)
+
+
+async def test_no_hedge_without_enough_latency_samples():
+    stub = StubTransport((0.1, 200), (0.0, 200))
+    transport = ResilientTransport(stub, hedge_min_delay=0.01, hedge_min_samples=20)
+    warm(transport, 0.001, samples=5)
+
+    await transport.fetch(STATS)
+
+    assert stub.calls == 1
+
+
+async def test_hedge_needs_a_budget_token():
+    stub = StubTransport((0.1, 200), (0.0, 200))
+    budget = RetryBudget(ratio=0, min_per_second=0, max_tokens=0)
+    transport = ResilientTransport(stub, budget=budget, hedge_min_delay=0.01)
+    endpoint = warm(transport, 0.001)
+
+    await transport.fetch(STATS)
+
+    assert (stub.calls, endpoint.hedges, budget.denied) == (1, 0, 1)
+
+
+async def test_retries_stop_at_the_per_call_limit():
+    stub = StubTransport((0.0, failing()))
+    transport = ResilientTransport(stub, retries=2, backoff_base=0.001, failure_threshold=100)
+
+    with pytest.raises(TransportError):
+        await transport.fetch(STATS)
+
+    assert stub.calls == 3
+    assert transport.endpoint_for(STATS).retries == 2
+
+
+async def test_retry_budget_caps_retries_across_calls():
+    stub = StubTransport((0.0, failing()))
+    budget = RetryBudget(ratio=0.5, min_per_second=0, max_tokens=1)
+    transport = ResilientTransport(stub, retries=5, budget=budget, backoff_base=0.001, failure_threshold=100)
+
+    for _ in range(3):
+        with pytest.raises(TransportError):
+            await transport.fetch(STATS)
+
+    # 1 jeton au départ + 0.5 déposé par appel (plafond 1): 1 retry, 0, puis 1
+    assert stub.calls == 3 + 2
+    assert budget.denied == 3
+
+
+async def test_blocked_requests_are_not_retried():
+    stub = StubTransport((0.0, TransportBlocked("HTTP 403", 403)))
+    transport = ResilientTransport(stub, retries=3, backoff_base=0.001)
+
+    with pytest.raises(TransportBlocked):
+        await transport.fetch(STATS)
+
+    assert stub.calls == 1
+
+
+async def open_circuit(transport: ResilientTransport, failures: int):
+    for _ in range(failures):
+        with pytest.raises(TransportError):
+            await transport.fetch(STATS)
+    return transport.endpoint_for(STATS)
+
+
+async def test_open_circuit_fails_fast_with_the_last_known_response():
+    stub = StubTransport((0.0, 200), (0.0, failing()))
+    transport = ResilientTransport(stub, retries=0, failure_threshold=2, reset_timeout=60)
+
+    await transport.fetch(STATS)
+    with pytest.raises(TransportError):
+        await transport.fetch(STATS)
+    # Deuxième échec: circuit ouvert, dernière réponse servie
+    assert (await transport.fetch(STATS)).headers == {"x-call": "1"}
+    endpoint = transport.endpoint_for(STATS)
+    assert endpoint.state == OPEN
+
+    calls = stub.calls
+    assert (await transport.fetch(STATS)).headers == {"x-call": "1"}
+    assert stub.calls == calls
+    assert endpoint.stale_served == 2
+
+    with pytest.raises(CircuitOpenError):
+        await transport.fetch("https://api.sofascore.com/api/v1/event/2/statistics")
+
+
+async def test_half_open_allows_exactly_one_probe_and_releases_it_on_failure():
+    stub = StubTransport((0.0, failing()))
+    transport = ResilientTransport(stub, retries=0, failure_threshold=2, reset_timeout=0.05)
+    endpoint = await open_circuit(transport, 2)
+    assert endpoint.state == OPEN
+    await asyncio.sleep(0.06)
+
+    stub.script = [(0.05, failing())]
+    calls = stub.calls
+    probe = asyncio.create_task(transport.fetch(STATS))
+    await asyncio.sleep(0.01)
+    assert (endpoint.state, endpoint.probing) == (HALF_OPEN, True)
+    # Pendant la requête test, les autres appels échouent sans toucher l'upstream
+    with pytest.raises(CircuitOpenError):
+        await transport.fetch(STATS)
+    with pytest.raises(TransportError):
+        await probe
+
+    assert stub.calls == calls + 1
+    assert (endpoint.state, endpoint.probing) == (OPEN, False)
+
+    # Après un nouveau délai, une requête test réussie referme le circuit
+    stub.script = [(0.0, 200)]
+    await asyncio.sleep(0.06)
+    assert (await transport.fetch(STATS)).status == 200
+    assert (endpoint.state, endpoint.failures, endpoint.probing) == (CLOSED, 0, False)
+
+
+async def test_cancelled_probe_is_released():
+    stub = StubTransport((0.0, failing()))
+    transport = ResilientTransport(stub, retries=0, failure_threshold=1, reset_timeout=0.05)
+    endpoint = await open_circuit(transport, 1)
+    await asyncio.sleep(0.06)
+
+    stub.script = [(1.0, 200)]
+    probe = asyncio.create_task(transport.fetch(STATS))
+    await asyncio.sleep(0.01)
+    assert endpoint.probing
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    assert not endpoint.probing
+    stub.script = [(0.0, 200)]
+    assert (await transport.fetch(STATS)).status == 200
+    assert endpoint.state == CLOSED
+
+
+async def test_server_errors_count_towards_opening_the_circuit():
+    stub = StubTransport((0.0, 503))
+    transport = ResilientTransport(stub, retries=0, failure_threshold=3, reset_timeout=60)
+
+    for _ in range(3):
+        assert (await transport.fetch(STATS)).status == 503
+
+    assert transport.endpoint_for(STATS).state == OPEN
+    with pytest.raises(CircuitOpenError):
+        await transport.fetch(STATS)
@@ -0,0 +1,147 @@
+"""
+Règles déclaratives: syntaxe autorisée, accord scalaire / NumPy, erreurs de fichier
+"""
+
+from array import array
+import json
+import random
+
+import numpy as np
+import pytest
+
+from models.match_stats import STAT_NAMES, MatchStats
+from strategies.batch import pack_stats
+from strategies.rules import RuleError, RuleSet, compile_expression, load_rules
+
+CONSTANTS = {'threshold': {'time_min': 60, 'name': "texte"}, 'constants': {'surge_factor': 1.25}}
+
+
+def compile_rule(source):
+    return compile_expression(source, {'known'}, CONSTANTS)
+
+
+@pytest.mark.parametrize("source", [
+    "home.corners.real",
+    "(1).real",
+    "known.__class__",
+    "home.__class__",
+    "__import__('os')",
+    "__builtins__",
+    "_div(1, 0)",
+    "open('x')",
+    "known()",
+    "(lambda: 1)()",
+    "[1, 2][0]",
+    "home.corners[0]",
+    "f'{known}'",
+    "max(*[1, 2])",
+    "abs(x=1)",
+    "min(1)",
+    "threshold.name",
+    "'texte'",
+    "unknown + 1",
+    "known := 1",
+    "1 if",
+])
+def test_disallowed_expressions_are_rejected(source):
+    with pytest.raises(RuleError):
+        compile_rule(source)
+
+
+@pytest.mark.parametrize("source, namespace, expected", [
+    ("min(known, 3, 2)", {'known': 5}, 2),
+    ("max(known, 1) - abs(-2)", {'known': 5}, 3),
+    ("known / 0", {'known': 5}, 0.0),
+    ("known > 1 and known < 10", {'known': 5}, True),
+    ("known > 1 or 0", {'known': 0}, False),
+    ("not known >= threshold.time_min", {'known': 70}, False),
+    ("1 < known <= 5", {'known': 5}, True),
+    ("known * constants.surge_factor if known else -1", {'known': 4}, 5.0),
+])
+def test_scalar_and_vector_versions_agree_on_expressions(source, namespace, expected):
+    expression = compile_rule(source)
+    assert expression(dict(namespace)) == expected
+    columns = expression.columns({name: np.array([value, value]) for name, value in namespace.items()})
+    assert np.broadcast_to(columns, (2,)).tolist() == [expected, expected]
+
+
+def random_matches(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    stats_list, times, recent = [], [], np.full((count, 2 * len(STAT_NAMES)), np.nan)
+    for row in range(count):
+        values = array('i', [rng.randint(0, 30) for _ in range(2 * len(STAT_NAMES))])
+        stats_list.append(MatchStats(values))
+        times.append(rng.choice([0, 30, 45, 55, 60, 75, 90]))
+        if rng.random() < 0.7:
+            recent[row] = [rng.uniform(0, 6) for _ in range(2 * len(STAT_NAMES))]
+    return stats_list, times, recent
+
+
+def test_scalar_program_and_batch_path_agree_on_shipped_rules():
+    rules = load_rules()
+    stats_list, times, recent = random_matches(300)
+    vector = rules.vector_namespace(pack_stats(stats_list), np.asarray(times), recent)
+    triggered = 0
+
+    for strategy in rules.strategies:
+        batch = dict(strategy.evaluate_batch(vector, len(stats_list)))
+        for row, (stats, time) in enumerate(zip(stats_list, times)):
+            rates = None if np.isnan(recent[row, 0]) else recent[row]
+            scalar = strategy.evaluate(rules.scalar_namespace(stats, time, rates))
+            if scalar is None:
+                assert row not in batch, (strategy.id, row)
+                continue
+            triggered += 1
+            other = batch[row]
+            assert other.probability == pytest.approx(scalar.probability), (strategy.id, row)
+            assert other.reasoning == scalar.reasoning
+            assert other.current_stats == pytest.approx(scalar.current_stats)
+            assert other.threshold_reached == scalar.threshold_reached
+            assert other.features == pytest.approx(scalar.features, nan_ok=True)
+    # Les stats aléatoires déclenchent une partie des stratégies
+    assert triggered > 50
+
+
+def write_rules(tmp_path, spec, name="rules.json"):
+    path = tmp_path / name
+    path.write_text(spec if isinstance(spec, str) else json.dumps(spec), encoding='utf-8')
+    return path
+
+
+def strategy(**fields):
+    raw = {"id": "corners", "bet_type": "corner", "thresholds": {"time_min": 60, "confidence_base": 0.7}}
+    raw.update(fields)
+    return {"strategies": [raw]}
+
+
+@pytest.mark.parametrize("spec, message", [
+    ("{pas du json", "JSON invalide"),
+    ("[]", "doit contenir un objet"),
+    (strategy(conditions=[{"when": "home.corner > 3"}]), "Stratégie 'corners': Stat inconnue 'corner'"),
+    (strategy(conditions=[{"when": "home.corners.__class__"}]), "Stratégie 'corners'"),
+    (strategy(variables={"max": "home.corners"}), "Nom de variable invalide 'max'"),
+    (strategy(variables={"if": "home.corners"}), "Nom de variable invalide 'if'"),
+    (strategy(when="time >= threshold.missing"), "Clé inconnue 'threshold.missing'"),
+    (strategy(conditions=[{"when": "True", "bonus": "home.corners"}]), "doit être constant"),
+    ({"strategies": [{"id": "corners"}]}, "champ manquant 'bet_type'"),
+    ({"strategies": [strategy()["strategies"][0]] * 2}, "Identifiants de stratégie en double"),
+    ({"constants": {"time_step": 0}, "strategies": []}, "time_step"),
+])
+def test_bad_rule_file_gives_a_clear_error(tmp_path, spec, message):
+    with pytest.raises(RuleError, match=message):
+        load_rules(str(write_rules(tmp_path, spec)))
+
+
+def test_valid_rule_file_is_loaded(tmp_path):
+    rules = load_rules(str(write_rules(tmp_path, strategy(
+        variables={"corners": "total.corners"},
+        conditions=[{"when": "corners >= 8", "bonus": 0.1, "reason": "{corners} corners"}],
+    ))))
+    stats = MatchStats()
+    stats.set('corners', 5, 4)
+
+    result = rules.strategies[0].evaluate(rules.scalar_namespace(stats, 70))
+
+    assert isinstance(rules, RuleSet)
+    assert result.probability == pytest.approx(0.8)
+    assert result.reasoning == ["9 corners"]
@@ -0,0 +1,164 @@
+"""
+IngestionScheduler: file de priorité des polls et budget de requêtes (horloge simulée)
+"""
+
+from typing import Dict, List
+import asyncio
+
+import pytest
+
+from pipeline import cadence, scheduler
+from pipeline.cadence import CadencePolicy
+from pipeline.pubsub import PubSub
+from pipeline.scheduler import IngestionScheduler
+from strategies.tes_engine import TESEngine
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def perf_counter(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+class HeldScraper:
+    """Scraper dont les lots restent en cours jusqu'à `release`"""
+
+    def __init__(self):
+        self.batches: List[List[str]] = []
+        self.release = asyncio.Event()
+
+    async def get_many_match_stats(self, match_ids, max_concurrency: int = 10, timeout: float = 15.0) -> Dict:
+        self.batches.append(list(match_ids))
+        await self.release.wait()
+        return {}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cadence, "time", fake)
+    monkeypatch.setattr(scheduler, "time", fake)
+    return fake
+
+
+def make_scheduler(**kwargs) -> IngestionScheduler:
+    return IngestionScheduler(
+        scraper_factory=None, tes_engine=TESEngine(), pubsub=PubSub(), cadence=CadencePolicy({}), **kwargs
+    )
+
+
+def test_due_matches_come_out_earliest_first(clock):
+    ingestion = make_scheduler()
+    ingestion.schedule("late", 30)
+    ingestion.schedule("soon", 5)
+    ingestion.schedule("now", 0)
+    ingestion.schedule("also_now", 0)
+
+    assert ingestion._pop_due(10) == ["now", "also_now"]
+    clock.advance(10)
+    assert ingestion._pop_due(10) == ["soon"]
+    clock.advance(30)
+    assert ingestion._pop_due(10) == ["late"]
+    assert ingestion.queue_size() == 0
+
+
+def test_rescheduling_replaces_the_previous_date(clock):
+    ingestion = make_scheduler()
+    ingestion.schedule("1", 60)
+    ingestion.schedule("2", 20)
+    # Match devenu chaud: avancé; l'ancienne entrée du tas est ignorée
+    ingestion.schedule("1", 5)
+
+    clock.advance(10)
+    assert ingestion._pop_due(10) == ["1"]
+    clock.advance(60)
+    assert ingestion._pop_due(10) == ["2"]
+    assert ingestion._queue == []
+
+
+def test_pop_respects_the_limit(clock):
+    ingestion = make_scheduler()
+    for index in range(5):
+        ingestion.schedule(str(index), index)
+    clock.advance(10)
+
+    assert ingestion._pop_due(2) == ["0", "1"]
+    assert ingestion._pop_due(2) == ["2", "3"]
+    assert ingestion.queue_size() == 1
+
+
+async def test_dispatch_stops_when_the_budget_is_spent(clock):
+    ingestion = make_scheduler(request_budget=2, max_concurrency=10)
+    scraper = HeldScraper()
+    for index in range(5):
+        ingestion.matches[str(index)] = {'id': str(index)}
+        ingestion.schedule(str(index), 0)
+
+    ingestion._dispatch_due(scraper)
+    ingestion._dispatch_due(scraper)
+    await asyncio.sleep(0)
+    assert scraper.batches == [["0", "1"]]
+    assert ingestion.budget.available() == 0
+
+    # Une seconde plus tard: deux jetons de plus
+    clock.advance(1.0)
+    ingestion._dispatch_due(scraper)
+    await asyncio.sleep(0)
+    assert scraper.batches == [["0", "1"], ["2", "3"]]
+    assert ingestion.queue_size() == 1
+
+    scraper.release.set()
+    await asyncio.gather(*ingestion._batches)
+
+
+async def test_dispatch_respects_max_concurrency(clock):
+    ingestion = make_scheduler(request_budget=100, max_concurrency=3)
+    scraper = HeldScraper()
+    for index in range(5):
+        ingestion.matches[str(index)] = {'id': str(index)}
+        ingestion.schedule(str(index), 0)
+
+    ingestion._dispatch_due(scraper)
+    ingestion._dispatch_due(scraper)
+    await asyncio.sleep(0)
+    assert scraper.batches == [["0", "1", "2"]]
+    assert ingestion._in_flight == 3
+
+    scraper.release.set()
+    await asyncio.gather(*ingestion._batches)
+    # Lot terminé sans stats: chaque match est reprogrammé après `error_backoff`
+    assert ingestion._in_flight == 0
+    assert ingestion._due["0"] == pytest.approx(clock.now + ingestion.error_backoff)
+    ingestion._dispatch_due(scraper)
+    await asyncio.sleep(0)
+    assert scraper.batches[-1] == ["3", "4"]
+    await ingestion.stop()
+
+
+async def test_forced_discovery_request_delays_polls(clock):
+    ingestion = make_scheduler(request_budget=1)
+    scraper = HeldScraper()
+    ingestion.matches["1"] = {'id': "1"}
+    ingestion.schedule("1", 0)
+
+    # La découverte consomme toujours son jeton, quitte à creuser le budget
+    ingestion.budget.take(1, force=True)
+    ingestion._dispatch_due(scraper)
+    await asyncio.sleep(0)
+    assert scraper.batches == []
+    assert ingestion.budget.time_until_available() == pytest.approx(1.0)
+
+    clock.advance(1.0)
+    ingestion._dispatch_due(scraper)
+    await asyncio.sleep(0)
+    assert scraper.batches == [["1"]]
+    scraper.release.set()
+    await ingestion.stop()
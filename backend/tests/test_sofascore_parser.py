@@ -0,0 +1,138 @@
+"""
+Parser Sofascore: période ALL, table des clés et des noms, valeurs texte
+"""
+
+from pathlib import Path
+import json
+
+import pytest
+
+from models.match_stats import MatchStats
+from scrapers.sofascore_parser import parse_statistics, parse_statistics_bytes, parse_value, resolve_stat
+
+FIXTURES = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures" / "sofascore"
+
+
+def fixture(name: str) -> dict:
+    return json.loads((FIXTURES / f"statistics_{name}.json").read_text(encoding='utf-8'))
+
+
+def item(name: str, home, away, key=None, numeric=True) -> dict:
+    data = {"name": name, "home": str(home), "away": str(away)}
+    if numeric:
+        data.update(homeValue=home, awayValue=away)
+    if key:
+        data["key"] = key
+    return data
+
+
+def period(name: str, *items) -> dict:
+    return {"period": name, "groups": [{"groupName": "Match overview", "statisticsItems": list(items)}]}
+
+
+def test_full_match_reads_only_the_all_period():
+    stats = parse_statistics(fixture("full_match"))
+
+    # ALL: 7-4 corners (1ST 3-2 + 2ND 4-2 ne sont pas additionnés)
+    assert stats.pair('corners') == (7, 4)
+    assert stats.pair('fouls') == (11, 14)
+    assert stats.pair('possession') == (54, 46)
+    assert stats.pair('red_cards') == (0, 1)
+
+
+def test_first_half_fixture():
+    stats = parse_statistics(fixture("first_half"))
+    assert stats.pair('corners') == (3, 2)
+    assert stats.pair('shots_on_target') == (3, 1)
+
+
+def test_all_period_is_found_wherever_it_is_listed():
+    data = {"statistics": [
+        period("1ST", item("Corner kicks", 3, 2, "cornerKicks")),
+        period("ALL", item("Corner kicks", 5, 4, "cornerKicks")),
+    ]}
+    assert parse_statistics(data).pair('corners') == (5, 4)
+
+
+def test_first_period_is_used_without_all():
+    data = {"statistics": [
+        period("1ST", item("Corner kicks", 3, 2, "cornerKicks")),
+        period("2ND", item("Corner kicks", 1, 1, "cornerKicks")),
+    ]}
+    assert parse_statistics(data).pair('corners') == (3, 2)
+
+
+@pytest.mark.parametrize("data", [{}, {"statistics": []}, {"statistics": None}])
+def test_missing_statistics_give_empty_stats(data):
+    assert parse_statistics(data) == MatchStats(source='sofascore')
+
+
+def test_legacy_text_values_are_resolved_by_name():
+    stats = parse_statistics(fixture("legacy_text"))
+
+    assert stats.pair('corners') == (9, 2)
+    assert stats.pair('possession') == (61, 39)
+    assert stats.pair('throw_ins') == (21, 18)
+    # "" vaut 0; "Shots off target" et "Accurate passes" ne sont pas des stats suivies
+    assert stats.pair('red_cards') == (0, 0)
+    assert stats.pair('shots') == (17, 6)
+
+
+def test_unknown_keys_fall_back_to_names_or_are_ignored():
+    data = {"statistics": [period(
+        "ALL",
+        item("Corner kicks", 6, 1, "cornerKicksNew"),
+        item("Expected goals", 1.4, 0.3, "expectedGoals"),
+        item("Fouls", 10, 12, "fouls"),
+        # Clé connue et ignorée: le nom contient "foul" mais ne remplace pas les fautes
+        item("Fouled in final third", 40, 50, "fouledFinalThird"),
+    )]}
+    stats = parse_statistics(data)
+
+    assert stats.pair('corners') == (6, 1)
+    assert stats.pair('fouls') == (10, 12)
+    assert sum(stats.values) == 6 + 1 + 10 + 12
+
+
+def test_resolve_stat_uses_table_then_legacy_rules():
+    assert resolve_stat("Ball possession") == 'possession'
+    assert resolve_stat("  THROW-INS ") == 'throw_ins'
+    assert resolve_stat("Total shots inside box") == 'shots'
+    assert resolve_stat("Fouled in final third") is None
+    assert resolve_stat("Expected goals") is None
+    # Deuxième lecture depuis le cache
+    assert resolve_stat("Total shots inside box") == 'shots'
+
+
+@pytest.mark.parametrize("value, expected", [
+    (7, 7),
+    (12.6, 13),
+    ("54%", 54),
+    ("7/12 (58%)", 7),
+    ("498/561 (89%)", 498),
+    ("12.4", 12),
+    ("-1", -1),
+    ("", 0),
+    ("-", 0),
+    (None, 0),
+    (True, 0),
+])
+def test_parse_value(value, expected):
+    assert parse_value(value) == expected
+
+
+def test_fraction_values_keep_the_numerator():
+    data = {"statistics": [period("ALL", item("Shots on target", "4/9 (44%)", "2/5 (40%)", numeric=False))]}
+    assert parse_statistics(data).pair('shots_on_target') == (4, 2)
+
+
+def test_raw_bytes_and_decoded_dict_agree():
+    raw = (FIXTURES / "statistics_full_match.json").read_bytes()
+    assert parse_statistics_bytes(raw) == parse_statistics(json.loads(raw))
+
+
+def test_existing_stats_are_filled_in_place():
+    stats = MatchStats(source='aggregator')
+    result = parse_statistics(fixture("first_half"), stats)
+    assert result is stats and stats.source == 'aggregator'
+    assert stats.pair('corners') == (3, 2)
@@ -0,0 +1,59 @@
+"""
+TESEngine: mémo par match (seules les stratégies dont les entrées changent sont réévaluées)
+"""
+
+from models.match_stats import MatchStats
+from strategies.tes_engine import TESEngine
+
+
+def busy_match() -> MatchStats:
+    stats = MatchStats()
+    stats.set('corners', 6, 4)
+    stats.set('fouls', 12, 11)
+    stats.set('yellow_cards', 2, 2)
+    stats.set('shots_on_target', 4, 3)
+    stats.set('dangerous_attacks', 30, 25)
+    stats.set('attacks', 50, 45)
+    return stats
+
+
+def test_unchanged_stats_are_not_re_evaluated_when_the_minute_advances():
+    engine = TESEngine()
+    strategies = len(engine.rules.strategies)
+    stats = busy_match()
+
+    first = engine.analyze_match(stats, 60, match_id="1")
+    for minute in range(61, 65):
+        assert engine.analyze_match(stats, minute, match_id="1") == first
+
+    assert (engine.evaluations, engine.reused) == (strategies, 4 * strategies)
+
+
+def test_time_gates_and_rate_steps_trigger_re_evaluation():
+    engine = TESEngine()
+    stats = busy_match()
+
+    engine.analyze_match(stats, 58, match_id="1")
+    before = list(engine._memo["1"].keys)
+    # 60e minute: la porte de corner_high_activity s'ouvre et la tranche de 5 min change
+    recommendations = engine.analyze_match(stats, 60, match_id="1")
+    after = engine._memo["1"].keys
+
+    changed = {strategy.id for strategy, old, new in zip(engine.rules.strategies, before, after) if old != new}
+    assert "corner_high_activity" in changed
+    assert any(rec.strategy == "corner_high_activity" for rec in recommendations)
+    # Une stratégie qui ne lit la minute que dans sa porte garde sa clé
+    gated_only = {strategy.id for strategy in engine.rules.strategies if not strategy.time_step}
+    assert gated_only and not changed & gated_only
+
+
+def test_memo_matches_a_full_analysis():
+    engine = TESEngine()
+    reference = TESEngine()
+    stats = busy_match()
+    for minute in (44, 45, 50, 59, 60, 61, 70, 90):
+        cached = engine.analyze_match(stats, minute, match_id="1")
+        full = reference.analyze_match(stats, minute)
+        # Aucun rythme ne franchit de seuil dans une tranche: mêmes décisions et probabilités
+        assert [(rec.strategy, rec.probability) for rec in cached] == \
+            [(rec.strategy, rec.probability) for rec in full]
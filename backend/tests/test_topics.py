@@ -0,0 +1,188 @@
+"""
+Topics: index de routage et filtrage des snapshots à l'abonnement WebSocket
+"""
+
+from typing import Dict, List
+import asyncio
+import json
+
+import pytest
+
+from pipeline.broadcaster import Broadcaster
+from pipeline.deltas import SnapshotStore
+from pipeline.topics import (
+    TOPIC_ALL, TopicIndex, snapshot_topics, topics_from_filters, topics_from_query
+)
+
+
+class FakeWebSocket:
+    """WebSocket qui garde les messages envoyés"""
+
+    def __init__(self):
+        self.messages: List[Dict] = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        self.messages.append(json.loads(text))
+
+    async def close(self, code: int = 1000):
+        pass
+
+    def take(self) -> List[tuple]:
+        """(type, match_id) des messages reçus depuis le dernier appel"""
+        received = [(message["type"], message["match_id"]) for message in self.messages]
+        self.messages.clear()
+        return received
+
+
+def rec(bet_type: str, confidence: str = "high") -> dict:
+    return {"bet_type": bet_type, "strategy": f"{bet_type}_rule", "confidence": confidence, "probability": 70.0}
+
+
+def match(match_id: str, competition: str) -> dict:
+    return {"id": match_id, "home_team": "A", "away_team": "B", "competition": competition}
+
+
+@pytest.fixture
+def store() -> SnapshotStore:
+    store = SnapshotStore()
+    store.update(match("1", "Ligue 1"), {}, [rec("corner")], "t1")
+    store.update(match("2", "Serie A"), {}, [rec("card", "medium")], "t1")
+    store.update(match("3", "Ligue 1"), {}, [], "t1")
+    return store
+
+
+@pytest.fixture
+async def broadcaster():
+    manager = Broadcaster()
+    yield manager
+    await manager.stop()
+
+
+async def flush():
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+def test_topics_from_filters():
+    assert topics_from_filters({"matches": ["1", 2], "bet_types": "corner"}) == {
+        "match:1", "match:2", "bet_type:corner"
+    }
+    assert topics_from_filters({"all": True, "competitions": []}) == {TOPIC_ALL}
+    # Valeurs vides ou d'un autre type ignorées
+    assert topics_from_filters({"matches": ["", None, {"id": 1}], "unknown": ["x"]}) == set()
+
+
+def test_topics_from_query():
+    params = {"matches": "1,,2", "confidences": "high", "bet_types": ""}
+    assert topics_from_query(params) == {"match:1", "match:2", "confidence:high"}
+    assert topics_from_query({}) == set()
+
+
+def test_snapshot_topics(store):
+    assert snapshot_topics(store.latest["1"].snapshot) == {
+        "match:1", "competition:Ligue 1", "bet_type:corner", "confidence:high"
+    }
+    assert snapshot_topics(store.latest["3"].snapshot) == {"match:3", "competition:Ligue 1"}
+
+
+def test_index_routes_to_subscribers_of_any_topic():
+    index = TopicIndex()
+    index.add("a", {"match:1", "bet_type:corner"})
+    index.add("b", {"bet_type:card"})
+    index.add("c", {TOPIC_ALL})
+
+    assert index.route({"match:1"}) == {"a", "c"}
+    assert index.route({"bet_type:card", "bet_type:corner"}) == {"a", "b", "c"}
+    assert index.route({"match:9"}) == {"c"}
+
+
+def test_index_drops_empty_topics():
+    index = TopicIndex()
+    index.add("a", {"match:1", "match:2"})
+    index.add("b", {"match:2"})
+
+    index.remove("a", {"match:1", "match:2", "match:9"})
+
+    assert len(index) == 1
+    assert index.route({"match:1", "match:2"}) == {"b"}
+
+
+async def test_connect_without_filters_receives_every_match(broadcaster, store):
+    websocket = FakeWebSocket()
+    connection = await broadcaster.connect(websocket, store.values())
+    await flush()
+
+    assert connection.topics == {TOPIC_ALL} and connection.implicit_all
+    assert websocket.take() == [("match_update", "1"), ("match_update", "2"), ("match_update", "3")]
+
+
+async def test_connect_with_query_filters_receives_only_matching_snapshots(broadcaster, store):
+    websocket = FakeWebSocket()
+    await broadcaster.connect(websocket, store.values(), topics_from_query({"bet_types": "card"}))
+    await flush()
+
+    assert websocket.take() == [("match_update", "2")]
+
+
+async def test_first_subscribe_replaces_all_and_removes_other_matches(broadcaster, store):
+    websocket = FakeWebSocket()
+    connection = await broadcaster.connect(websocket, store.values())
+    await flush()
+    websocket.take()
+
+    broadcaster.subscribe(connection, topics_from_filters({"bet_types": ["corner"]}), store.values())
+    await flush()
+
+    assert connection.topics == {"bet_type:corner"}
+    # Match 1 déjà envoyé: rien à renvoyer; les autres sortent du flux
+    assert websocket.take() == [("match_removed", "2"), ("match_removed", "3")]
+    assert broadcaster.index.route({"match:2"}) == set()
+
+
+async def test_subscribe_sends_snapshots_of_newly_matching_matches(broadcaster, store):
+    websocket = FakeWebSocket()
+    connection = await broadcaster.connect(websocket, store.values(), {"bet_type:corner"})
+    await flush()
+    assert websocket.take() == [("match_update", "1")]
+
+    broadcaster.subscribe(connection, topics_from_filters({"competitions": ["Ligue 1"]}), store.values())
+    await flush()
+
+    assert websocket.take() == [("match_update", "3")]
+    # Déjà abonné: aucun envoi
+    broadcaster.subscribe(connection, {"bet_type:corner"}, store.values())
+    await flush()
+    assert websocket.take() == []
+
+
+async def test_unsubscribe_removes_matches_and_stops_routing(broadcaster, store):
+    websocket = FakeWebSocket()
+    connection = await broadcaster.connect(websocket, store.values(), {"match:1", "match:2"})
+    await flush()
+    websocket.take()
+
+    broadcaster.unsubscribe(connection, topics_from_filters({"matches": ["2"]}), store.values())
+    await flush()
+    assert websocket.take() == [("match_removed", "2")]
+
+    broadcaster.broadcast(store.update(match("2", "Serie A"), {"corners": 3}, [rec("card", "medium")], "t2"))
+    broadcaster.broadcast(store.update(match("1", "Ligue 1"), {"corners": 3}, [rec("corner")], "t2"))
+    await flush()
+    assert websocket.take() == [("match_delta", "1")]
+
+
+async def test_match_leaving_the_filter_is_removed_on_broadcast(broadcaster, store):
+    websocket = FakeWebSocket()
+    await broadcaster.connect(websocket, store.values(), {"bet_type:corner"})
+    for publication in store.values():
+        broadcaster.broadcast(publication)
+    await flush()
+    websocket.take()
+
+    # Recommandation corner disparue: le match sort du flux de ce client
+    broadcaster.broadcast(store.update(match("1", "Ligue 1"), {}, [], "t2"))
+    await flush()
+    assert websocket.take() == [("match_removed", "1")]
@@ -63,7 +63,7 @@ function App() {
 
     try {
       const stats = await fetchMatchStats(matchId);
-      const timeElapsed = parseInt(String(matchData.match.time)) || 60;
+      const timeElapsed = matchData.match.minute ?? 60;
 
       // Parser le score pour le moteur TES
       const scoreParts = matchData.match.score.split('-');
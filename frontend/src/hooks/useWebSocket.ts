@@ -1,30 +1,85 @@
 import { useEffect, useState, useRef, useCallback } from 'react';
-import { MatchUpdate } from '../types';
+import { BetRecommendation, LiveFeedFilters, LiveFeedMessage, MatchDelta, MatchUpdate } from '../types';
 
 interface UseWebSocketOptions {
   url: string;
   onMessage?: (data: MatchUpdate) => void;
   onError?: (error: Event) => void;
   reconnectInterval?: number;
+  filters?: LiveFeedFilters;
 }
 
+// Filtres passés en paramètres de connexion (`?matches=1,2&bet_types=corner`)
+const withFilters = (url: string, filters?: LiveFeedFilters) => {
+  const params = Object.entries(filters ?? {})
+    .filter(([, values]) => values && values.length > 0)
+    .map(([key, values]) => `${key}=${encodeURIComponent(values.join(','))}`);
+  if (params.length === 0) return url;
+  return `${url}${url.includes('?') ? '&' : '?'}${params.join('&')}`;
+};
+
+// Fusionner les valeurs modifiées (un niveau d'imbrication: {home, away})
+const mergeSection = (base: object, changes: object) => {
+  const merged: Record<string, any> = { ...base };
+  for (const [key, value] of Object.entries(changes)) {
+    merged[key] =
+      value && typeof value === 'object' && !Array.isArray(value) && typeof merged[key] === 'object'
+        ? { ...merged[key], ...value }
+        : value;
+  }
+  return merged;
+};
+
+// Identité d'une recommandation: sa stratégie (plusieurs règles par type de pari)
+const recommendationKey = (rec: BetRecommendation) => rec.strategy ?? rec.bet_type;
+
+// Appliquer un delta au dernier snapshot connu du match
+const applyDelta = (snapshot: MatchUpdate, delta: MatchDelta): MatchUpdate => {
+  let recommendations = snapshot.recommendations;
+  if (delta.recommendations) {
+    const byKey = new Map<string, BetRecommendation>(recommendations.map((rec) => [recommendationKey(rec), rec]));
+    delta.recommendations.removed?.forEach((key) => byKey.delete(key));
+    delta.recommendations.upsert?.forEach((rec) => byKey.set(recommendationKey(rec), rec));
+    recommendations = [...byKey.values()].sort((a, b) => b.probability - a.probability);
+  }
+
+  return {
+    ...snapshot,
+    match: delta.match ? (mergeSection(snapshot.match, delta.match) as MatchUpdate['match']) : snapshot.match,
+    stats: delta.stats ? (mergeSection(snapshot.stats, delta.stats) as MatchUpdate['stats']) : snapshot.stats,
+    recommendations,
+    seq: delta.seq,
+    timestamp: delta.timestamp,
+  };
+};
+
 export const useWebSocket = ({
   url,
   onMessage,
   onError,
   reconnectInterval = 5000,
+  filters,
 }: UseWebSocketOptions) => {
   const [isConnected, setIsConnected] = useState(false);
   const [lastUpdate, setLastUpdate] = useState<MatchUpdate | null>(null);
+  const [matches, setMatches] = useState<MatchUpdate[]>([]);
   const wsRef = useRef<WebSocket | null>(null);
+  const snapshotsRef = useRef<Map<string, MatchUpdate>>(new Map());
+  // Matchs dont un snapshot a été redemandé (une seule demande par trou)
+  const resyncingRef = useRef<Set<string>>(new Set());
   const reconnectTimeoutRef = useRef<ReturnType<typeof setTimeout>>();
+  // Reconnexion seulement si le contenu des filtres change, pas leur identité
+  const filtersKey = JSON.stringify(filters ?? {});
 
   const connect = useCallback(() => {
     try {
-      const ws = new WebSocket(url);
+      const ws = new WebSocket(withFilters(url, JSON.parse(filtersKey)));
 
       ws.onopen = () => {
         console.log('WebSocket connecté');
+        // Le serveur renvoie des snapshots complets à chaque connexion
+        snapshotsRef.current.clear();
+        resyncingRef.current.clear();
         setIsConnected(true);
         if (reconnectTimeoutRef.current) {
           clearTimeout(reconnectTimeoutRef.current);
@@ -33,7 +88,36 @@ export const useWebSocket = ({
 
       ws.onmessage = (event) => {
         try {
-          const data: MatchUpdate = JSON.parse(event.data);
+          const message: LiveFeedMessage = JSON.parse(event.data);
+          const snapshots = snapshotsRef.current;
+          const resyncing = resyncingRef.current;
+
+          if (message.type === 'match_removed') {
+            snapshots.delete(message.match_id);
+            resyncing.delete(message.match_id);
+            setMatches([...snapshots.values()]);
+            return;
+          }
+
+          let data: MatchUpdate;
+          if (message.type === 'match_delta') {
+            // Snapshot déjà redemandé: deltas ignorés jusqu'à sa réception
+            if (resyncing.has(message.match_id)) return;
+            const base = snapshots.get(message.match_id);
+            if (!base || base.seq !== message.base_seq) {
+              // Trou dans la séquence: redemander un snapshot complet
+              resyncing.add(message.match_id);
+              ws.send(JSON.stringify({ type: 'resync', match_ids: [message.match_id] }));
+              return;
+            }
+            data = applyDelta(base, message);
+          } else {
+            data = message;
+            resyncing.delete(data.match_id ?? String(data.match.id));
+          }
+
+          snapshots.set(data.match_id ?? String(data.match.id), data);
+          setMatches([...snapshots.values()]);
           setLastUpdate(data);
           onMessage?.(data);
         } catch (error) {
@@ -62,7 +146,7 @@ export const useWebSocket = ({
       console.error('Erreur création WebSocket:', error);
       reconnectTimeoutRef.current = setTimeout(connect, reconnectInterval);
     }
-  }, [url, onMessage, onError, reconnectInterval]);
+  }, [url, filtersKey, onMessage, onError, reconnectInterval]);
 
   useEffect(() => {
     connect();
@@ -83,9 +167,22 @@ export const useWebSocket = ({
     }
   }, []);
 
+  const subscribe = useCallback(
+    (topics: LiveFeedFilters) => sendMessage({ type: 'subscribe', ...topics }),
+    [sendMessage]
+  );
+
+  const unsubscribe = useCallback(
+    (topics: LiveFeedFilters) => sendMessage({ type: 'unsubscribe', ...topics }),
+    [sendMessage]
+  );
+
   return {
     isConnected,
     lastUpdate,
+    matches,
     sendMessage,
+    subscribe,
+    unsubscribe,
   };
 };
@@ -4,6 +4,8 @@ export interface Match {
   awayTeam: string;
   score: string;
   time: string | number;
+  minute?: number | null;   // minute de jeu calculée par le backend
+  clock?: string | null;    // "67'", "45+2'", "HT"
   status: 'live' | 'finished' | 'scheduled' | 'unknown';
   league?: string;
 }
@@ -50,6 +52,8 @@ export type Confidence =
 
 export interface BetRecommendation {
   bet_type: BetType;
+  // Stratégie qui a produit la recommandation (clé des deltas)
+  strategy?: string;
   description: string;
   confidence: Confidence;
   probability: number;
@@ -60,12 +64,45 @@ export interface BetRecommendation {
 
 export interface MatchUpdate {
   type: 'match_update';
+  match_id?: string;
+  seq?: number;
   match: Match;
   stats: MatchStats;
   recommendations: BetRecommendation[];
   timestamp: string;
 }
 
+// Mise à jour différentielle: seules les valeurs modifiées depuis base_seq
+export interface MatchDelta {
+  type: 'match_delta';
+  match_id: string;
+  seq: number;
+  base_seq: number;
+  match?: Partial<Match>;
+  stats?: Record<string, any>;
+  recommendations?: {
+    upsert?: BetRecommendation[];
+    // Identifiants de stratégie
+    removed?: string[];
+  };
+  timestamp: string;
+}
+
+export interface MatchRemoved {
+  type: 'match_removed';
+  match_id: string;
+}
+
+export type LiveFeedMessage = MatchUpdate | MatchDelta | MatchRemoved;
+
+// Filtres d'abonnement au flux live (cumulés; aucun filtre = tous les matchs)
+export interface LiveFeedFilters {
+  matches?: string[];
+  competitions?: string[];
+  bet_types?: BetType[];
+  confidences?: Confidence[];
+}
+
 export interface LiveMatchesResponse {
   success: boolean;
   count: number;
@@ -76,7 +113,7 @@ export interface LiveMatchesResponse {
 export interface MatchAnalysisResponse {
   success: boolean;
   match_id: string;
-  time_elapsed: number;
+  time_elapsed: number | null;
   recommendations: BetRecommendation[];
   stats: MatchStats;
   timestamp: string;